@@ -147,6 +147,9 @@ class ProductionConfig:
     db_password: str = ""
     db_host: str = "localhost"
     db_port: str = "5432"
+    db_conn_max_age: int = 60
+    db_conn_health_checks: bool = True
+    db_pgbouncer_transaction_pooling: bool = False
     
     # Domain & CORS
     domain: str = ""
@@ -3144,6 +3147,13 @@ ALLOWED_HOSTS={config.allowed_hosts}
 # PostgreSQL production database
 DATABASE_URL=postgresql://{config.db_user}:{config.db_password}@{config.db_host}:{config.db_port}/{config.db_name}
 
+# Persistent connections (seconds each worker thread reuses a connection)
+CONN_MAX_AGE={config.db_conn_max_age}
+CONN_HEALTH_CHECKS={config.db_conn_health_checks}
+
+# Set to True when DATABASE_URL points at PgBouncer in transaction pooling mode
+PGBOUNCER_TRANSACTION_POOLING={config.db_pgbouncer_transaction_pooling}
+
 # ==========================================
 # SECURITY SETTINGS
 # ==========================================
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:40
+
+from django.db import migrations
+
+import apps.core.search
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("accounts_receivables", "0002_add_performance_indexes"),
+    ]
+
+    operations = [
+        apps.core.search.AddSearchIndex(
+            model_name="accountsreceivable",
+            vector=[
+                ("name", "A"),
+                ("email", "B"),
+            ],
+            trigram=["name"],
+        ),
+    ]
@@ -0,0 +1,142 @@
+"""
+Benchmark the entity extraction engine.
+
+Generates large synthetic documents and times, for each one, extracting
+entities and classifying the document:
+
+* ``legacy``: the original extractor, from ``apps.ai_assistant.test_support``;
+* ``engine``: ``entity_extractor.analyze`` one document at a time;
+* ``batch``: ``entity_extractor.analyze_batch`` over a process pool.
+
+The tests check the engine's results against the legacy implementation
+(see ``EntityExtractionEngineTest``).
+
+Usage:
+    python manage.py benchmark_extraction --documents 20 --size 200000
+"""
+
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.ai_assistant.services import entity_extractor
+from apps.ai_assistant.test_support import legacy_document_type, legacy_extract_entities
+
+# Fragments of the kind of text the extractor looks for, mixed with filler
+FRAGMENTS = [
+    "Purchase Order PO-2024-{n:03d}",
+    "Invoice INV-{n:05d} payment terms net 30",
+    "from Prime Beef Suppliers and Miller Family Farms",
+    "{n} lbs of ground beef",
+    "{n} kg salmon",
+    "{n} pounds of pork belly",
+    "{n} lbs chicken breast and {n} lbs wings",
+    "leg of lamb",
+    "total $1,{n:03d}.50",
+    "{n}.99/lb",
+    "{n} dollars",
+    "delivered 01/{d:02d}/2024 and 2024-02-{d:02d}",
+    "March {d}, 2024",
+    "1{n:02d} Main Street Dallas, TX",
+    "Kansas City, MO",
+    "USDA inspected, HACCP and Organic certified, Non-GMO",
+    "contact orders{n}@meats.example.com or (555) 123-{n:04d}",
+    "held at {d} degrees fahrenheit",
+    "fat: 1{d}.5 moisture {d}% protein 2{d}",
+    "pH 5.{d}",
+    "stored at 3{d}°F, pH: 6.{d}, acidity {d}",
+    "the ecosystem Contract covers subsystem Meat and Coastal Farm Co. lots",
+]
+
+FILLER = (
+    "the shipment was loaded at the plant and checked by the receiving team "
+    "before the carrier left for the distribution center"
+).split()
+
+
+def synthetic_document(size: int, seed: int) -> str:
+    """Build a document of about ``size`` characters."""
+    rng = random.Random(seed)
+    parts = []
+    length = 0
+    while length < size:
+        if rng.random() < 0.2:
+            part = rng.choice(FRAGMENTS).format(
+                n=rng.randint(1, 999), d=rng.randint(1, 28)
+            )
+        else:
+            part = " ".join(rng.choices(FILLER, k=rng.randint(3, 12)))
+        parts.append(part)
+        length += len(part) + 2
+    return ". ".join(parts)
+
+
+class Command(BaseCommand):
+    help = "Benchmark entity extraction on large synthetic documents"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--documents", type=int, default=20, help="Number of documents"
+        )
+        parser.add_argument(
+            "--size", type=int, default=200_000, help="Characters per document"
+        )
+        parser.add_argument(
+            "--workers", type=int, default=None, help="Process pool size for batch"
+        )
+
+    def handle(self, *args, **options):
+        documents = [
+            synthetic_document(options["size"], seed)
+            for seed in range(options["documents"])
+        ]
+        self.stdout.write(
+            f"{len(documents)} documents of {options['size']:,} characters"
+        )
+
+        started = time.perf_counter()
+        legacy_results = [
+            {
+                "entities": legacy_extract_entities(text),
+                "document_type": legacy_document_type(text),
+            }
+            for text in documents
+        ]
+        legacy = time.perf_counter() - started
+
+        started = time.perf_counter()
+        results = [entity_extractor.analyze(text) for text in documents]
+        single = time.perf_counter() - started
+
+        started = time.perf_counter()
+        batch_results = entity_extractor.analyze_batch(
+            documents, workers=options["workers"]
+        )
+        batch = time.perf_counter() - started
+
+        for name, seconds in (
+            ("legacy", legacy),
+            ("engine", single),
+            ("batch", batch),
+        ):
+            self.stdout.write(
+                f"{name:>8}: {seconds:8.3f}s  "
+                f"{seconds / len(documents) * 1000:8.1f} ms/doc  "
+                f"x{legacy / seconds:5.1f}"
+            )
+
+        engine_matches = all(
+            result["entities"] == legacy_result["entities"]
+            and result["document_type"] == legacy_result["document_type"]
+            for result, legacy_result in zip(results, legacy_results)
+        )
+        if engine_matches:
+            self.stdout.write(self.style.SUCCESS("Engine results match legacy"))
+        else:
+            self.stdout.write(self.style.ERROR("Engine results differ from legacy"))
+
+        if batch_results == results:
+            self.stdout.write(self.style.SUCCESS("Batch results match the engine"))
+        else:
+            self.stdout.write(self.style.ERROR("Batch results differ from the engine"))
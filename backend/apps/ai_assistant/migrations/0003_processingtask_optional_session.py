@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-16 19:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ai_assistant", "0002_usageanalytics"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="processingtask",
+            name="session",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Chat session this task belongs to, if started from a chat",
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="processing_tasks",
+                to="ai_assistant.chatsession",
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:09
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ai_assistant", "0003_processingtask_optional_session"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="usageanalytics",
+            name="created_at",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now,
+                help_text="When the action was performed",
+            ),
+        ),
+    ]
@@ -0,0 +1,133 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ai_assistant", "0004_usageanalytics_event_time"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UsageRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "period",
+                    models.CharField(
+                        choices=[("hour", "Hour"), ("day", "Day")],
+                        help_text="Length of the aggregated period",
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "bucket_start",
+                    models.DateTimeField(help_text="Start of the aggregated period"),
+                ),
+                (
+                    "action_type",
+                    models.CharField(help_text="Type of action", max_length=50),
+                ),
+                (
+                    "ai_provider",
+                    models.CharField(help_text="AI provider used", max_length=50),
+                ),
+                (
+                    "ai_model",
+                    models.CharField(
+                        help_text="Specific AI model used", max_length=100
+                    ),
+                ),
+                (
+                    "count",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Number of actions"
+                    ),
+                ),
+                (
+                    "success_count",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text="Number of actions that completed successfully",
+                    ),
+                ),
+                (
+                    "tokens_used",
+                    models.PositiveBigIntegerField(
+                        default=0, help_text="Total AI tokens used"
+                    ),
+                ),
+                (
+                    "processing_time_total",
+                    models.FloatField(
+                        default=0, help_text="Total processing time in seconds"
+                    ),
+                ),
+                (
+                    "latency_buckets",
+                    models.JSONField(
+                        default=list, help_text="Processing time histogram counts"
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Usage Rollup",
+                "verbose_name_plural": "Usage Rollups",
+                "db_table": "ai_assistant_usage_rollup",
+                "ordering": ["-bucket_start", "action_type"],
+            },
+        ),
+        migrations.CreateModel(
+            name="UsageRollupState",
+            fields=[
+                (
+                    "name",
+                    models.CharField(max_length=50, primary_key=True, serialize=False),
+                ),
+                (
+                    "processed_through",
+                    models.DateTimeField(
+                        help_text="Rows created before this time have been rolled up"
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "ai_assistant_usage_rollup_state",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="usageanalytics",
+            index=models.Index(
+                fields=["created_at"], name="ai_assistan_created_02b817_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="usagerollup",
+            index=models.Index(
+                fields=["period", "-bucket_start"], name="ai_assistan_period_86aa27_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="usagerollup",
+            constraint=models.UniqueConstraint(
+                fields=(
+                    "period",
+                    "bucket_start",
+                    "action_type",
+                    "ai_provider",
+                    "ai_model",
+                ),
+                name="unique_usage_rollup_bucket",
+            ),
+        ),
+    ]
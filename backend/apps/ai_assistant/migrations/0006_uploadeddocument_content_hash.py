@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ai_assistant", "0005_usage_rollups"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="uploadeddocument",
+            name="content_hash",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="SHA-256 of the file content; identical uploads share results",
+                max_length=64,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="uploadeddocument",
+            index=models.Index(
+                fields=["content_hash"], name="ai_assistan_content_015629_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:18
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ai_assistant", "0006_uploadeddocument_content_hash"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="uploadeddocument",
+            name="file",
+            field=models.FileField(
+                help_text="Uploaded document file",
+                upload_to="ai_assistant/documents/%Y/%m/%d/",
+                validators=[
+                    django.core.validators.FileExtensionValidator(
+                        allowed_extensions=[
+                            "pdf",
+                            "jpg",
+                            "jpeg",
+                            "png",
+                            "txt",
+                            "csv",
+                            "doc",
+                            "docx",
+                            "xls",
+                            "xlsx",
+                        ]
+                    )
+                ],
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:40
+
+from django.db import migrations
+
+import apps.core.search
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ai_assistant", "0007_uploadeddocument_csv"),
+    ]
+
+    operations = [
+        apps.core.search.AddSearchIndex(
+            model_name="uploadeddocument",
+            vector=[
+                ("original_filename", "A"),
+                ("extracted_text", "D"),
+            ],
+            trigram=["original_filename"],
+        ),
+    ]
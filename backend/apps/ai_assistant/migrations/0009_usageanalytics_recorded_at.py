@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-16 21:02
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def copy_created_at(apps, schema_editor):
+    # Existing rows were rolled up by created_at; keep them where they were
+    UsageAnalytics = apps.get_model("ai_assistant", "UsageAnalytics")
+    UsageAnalytics.objects.update(recorded_at=models.F("created_at"))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ai_assistant", "0008_uploadeddocument_search_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="usageanalytics",
+            name="recorded_at",
+            field=models.DateTimeField(
+                auto_now_add=True,
+                default=django.utils.timezone.now,
+                help_text="When the row was written",
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_created_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="usagerollupstate",
+            name="processed_through",
+            field=models.DateTimeField(
+                help_text="Rows written before this time have been rolled up"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="usageanalytics",
+            index=models.Index(
+                fields=["recorded_at"], name="ai_assistan_recorde_1c04ed_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:23
+
+import apps.ai_assistant.models
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ai_assistant", "0009_usageanalytics_recorded_at"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="uploadeddocument",
+            name="file",
+            field=models.FileField(
+                help_text="Uploaded document file",
+                upload_to=apps.ai_assistant.models.document_upload_to,
+                validators=[
+                    django.core.validators.FileExtensionValidator(
+                        allowed_extensions=[
+                            "pdf",
+                            "jpg",
+                            "jpeg",
+                            "png",
+                            "txt",
+                            "csv",
+                            "doc",
+                            "docx",
+                            "xls",
+                            "xlsx",
+                        ]
+                    )
+                ],
+            ),
+        ),
+    ]
@@ -12,12 +12,17 @@ Key Features:
 - Context-aware responses for meat industry workflows
 """
 
+import posixpath
 import uuid
 
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.validators import FileExtensionValidator
 from django.db import models
+from django.db.models import Count, Exists, OuterRef
+from django.utils import timezone
 
+from apps.core.cache import get_cache
 from apps.core.models import OwnedModel, StatusModel
 
 
@@ -29,6 +34,26 @@ class ChatSessionStatusChoices(models.TextChoices):
     ARCHIVED = "archived", "Archived"
 
 
+class ChatSessionQuerySet(models.QuerySet):
+    """QuerySet helpers for chat sessions."""
+
+    def with_message_stats(self):
+        """
+        Annotate ``message_total`` and ``has_uploaded_documents``.
+
+        Lets list pages read per-session message stats from the same query
+        instead of two extra queries per row.
+        """
+        return self.annotate(
+            message_total=Count("messages"),
+            has_uploaded_documents=Exists(
+                ChatMessage.objects.filter(
+                    session=OuterRef("pk"), uploaded_document__isnull=False
+                )
+            ),
+        )
+
+
 class ChatSession(OwnedModel, StatusModel):
     """
     Chat session model for managing conversations with the AI assistant.
@@ -71,6 +96,8 @@ class ChatSession(OwnedModel, StatusModel):
         auto_now=True, help_text="Timestamp of last activity in this session"
     )
 
+    objects = ChatSessionQuerySet.as_manager()
+
     class Meta:
         db_table = "ai_assistant_chat_sessions"
         verbose_name = "Chat Session"
@@ -199,6 +226,22 @@ class DocumentProcessingStatusChoices(models.TextChoices):
     MANUAL_REVIEW = "manual_review", "Requires Manual Review"
 
 
+def document_upload_to(instance, filename: str) -> str:
+    """
+    Storage name of an uploaded document.
+
+    Hashed uploads are stored under their content hash, so identical files
+    share one stored file that reveals nothing about who uploaded it first.
+    """
+    if not instance.content_hash:
+        return posixpath.join(
+            timezone.now().strftime("ai_assistant/documents/%Y/%m/%d"), filename
+        )
+    extension = posixpath.splitext(filename)[1].lower()
+    digest = instance.content_hash
+    return f"ai_assistant/documents/{digest[:2]}/{digest}{extension}"
+
+
 class UploadedDocument(OwnedModel, StatusModel):
     """
     Document uploaded for AI processing.
@@ -216,7 +259,7 @@ class UploadedDocument(OwnedModel, StatusModel):
 
     # File information
     file = models.FileField(
-        upload_to="ai_assistant/documents/%Y/%m/%d/",
+        upload_to=document_upload_to,
         validators=[
             FileExtensionValidator(
                 allowed_extensions=[
@@ -225,6 +268,7 @@ class UploadedDocument(OwnedModel, StatusModel):
                     "jpeg",
                     "png",
                     "txt",
+                    "csv",
                     "doc",
                     "docx",
                     "xls",
@@ -245,6 +289,13 @@ class UploadedDocument(OwnedModel, StatusModel):
         max_length=100, help_text="MIME type of the uploaded file"
     )
 
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        help_text="SHA-256 of the file content; identical uploads share results",
+    )
+
     # Document classification
     document_type = models.CharField(
         max_length=50,
@@ -305,6 +356,7 @@ class UploadedDocument(OwnedModel, StatusModel):
             models.Index(fields=["processing_status"]),
             models.Index(fields=["owner", "-created_on"]),
             models.Index(fields=["confidence_score"]),
+            models.Index(fields=["content_hash"]),
         ]
 
     def __str__(self):
@@ -397,6 +449,13 @@ class AIConfiguration(models.Model):
         if self.is_default:
             AIConfiguration.objects.filter(is_default=True).update(is_default=False)
         super().save(*args, **kwargs)
+        # Drop the cached default so AIService picks up the change
+        get_cache("ai_assistant").delete("default_config")
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        get_cache("ai_assistant").delete("default_config")
+        return result
 
 
 class UsageAnalytics(models.Model):
@@ -474,8 +533,15 @@ class UsageAnalytics(models.Model):
     ai_model = models.CharField(max_length=100, help_text="Specific AI model used")
 
     # Timing
+    # Set when the event is recorded, not when a buffered batch is written
     created_at = models.DateTimeField(
-        auto_now_add=True, help_text="When the action was performed"
+        default=timezone.now, help_text="When the action was performed"
+    )
+
+    # Rollups pick up rows by when they were written, so a batch flushed late
+    # (e.g. spooled through a database outage) is still counted
+    recorded_at = models.DateTimeField(
+        auto_now_add=True, help_text="When the row was written"
     )
 
     class Meta:
@@ -489,6 +555,8 @@ class UsageAnalytics(models.Model):
             models.Index(fields=["success"]),
             models.Index(fields=["ai_provider", "-created_at"]),
             models.Index(fields=["processing_time"]),
+            models.Index(fields=["created_at"]),
+            models.Index(fields=["recorded_at"]),
         ]
 
     def __str__(self):
@@ -496,13 +564,123 @@ class UsageAnalytics(models.Model):
 
     @classmethod
     def log_action(cls, user, action_type, processing_time, **kwargs):
-        """Convenience method to log an action."""
-        return cls.objects.create(
+        """
+        Convenience method to log an action.
+
+        The record is queued on the analytics buffer and written in a later
+        batch (see ``services.analytics``), so the returned instance may not
+        be saved yet. With ``ANALYTICS_BUFFERED = False`` it is saved now.
+        """
+        record = cls(
             user=user,
             action_type=action_type,
             processing_time=processing_time,
             **kwargs,
         )
+        if not settings.ANALYTICS_BUFFERED:
+            record.save(force_insert=True)
+            return record
+
+        from .services.analytics import analytics_buffer
+
+        analytics_buffer.add(record)
+        return record
+
+
+class RollupPeriodChoices(models.TextChoices):
+    """Period choices for usage rollups."""
+
+    HOUR = "hour", "Hour"
+    DAY = "day", "Day"
+
+
+class UsageRollup(models.Model):
+    """
+    Aggregated usage analytics per period, action type, provider and model.
+
+    Maintained incrementally from ``UsageAnalytics`` by the
+    ``rollup_usage_analytics`` task so dashboards never scan raw rows.
+    ``latency_buckets`` holds non-cumulative counts for each upper bound in
+    ``services.usage_rollups.LATENCY_BUCKETS`` plus a final overflow bucket.
+    """
+
+    period = models.CharField(
+        max_length=10,
+        choices=RollupPeriodChoices.choices,
+        help_text="Length of the aggregated period",
+    )
+
+    bucket_start = models.DateTimeField(help_text="Start of the aggregated period")
+
+    action_type = models.CharField(max_length=50, help_text="Type of action")
+
+    ai_provider = models.CharField(max_length=50, help_text="AI provider used")
+
+    ai_model = models.CharField(max_length=100, help_text="Specific AI model used")
+
+    count = models.PositiveIntegerField(default=0, help_text="Number of actions")
+
+    success_count = models.PositiveIntegerField(
+        default=0, help_text="Number of actions that completed successfully"
+    )
+
+    tokens_used = models.PositiveBigIntegerField(
+        default=0, help_text="Total AI tokens used"
+    )
+
+    processing_time_total = models.FloatField(
+        default=0, help_text="Total processing time in seconds"
+    )
+
+    latency_buckets = models.JSONField(
+        default=list, help_text="Processing time histogram counts"
+    )
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "ai_assistant_usage_rollup"
+        verbose_name = "Usage Rollup"
+        verbose_name_plural = "Usage Rollups"
+        ordering = ["-bucket_start", "action_type"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=[
+                    "period",
+                    "bucket_start",
+                    "action_type",
+                    "ai_provider",
+                    "ai_model",
+                ],
+                name="unique_usage_rollup_bucket",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["period", "-bucket_start"]),
+        ]
+
+    def __str__(self):
+        return f"{self.action_type} {self.period} {self.bucket_start:%Y-%m-%d %H:%M}"
+
+    @property
+    def success_rate(self) -> float:
+        return self.success_count / self.count if self.count else 0.0
+
+
+class UsageRollupState(models.Model):
+    """How far ``UsageAnalytics`` rows have been folded into the rollups."""
+
+    name = models.CharField(max_length=50, primary_key=True)
+
+    processed_through = models.DateTimeField(
+        help_text="Rows written before this time have been rolled up"
+    )
+
+    class Meta:
+        db_table = "ai_assistant_usage_rollup_state"
+
+    def __str__(self):
+        return f"{self.name} through {self.processed_through}"
 
 
 class ProcessingTask(OwnedModel):
@@ -534,8 +712,10 @@ class ProcessingTask(OwnedModel):
     session = models.ForeignKey(
         ChatSession,
         on_delete=models.CASCADE,
+        blank=True,
+        null=True,
         related_name="processing_tasks",
-        help_text="Chat session this task belongs to",
+        help_text="Chat session this task belongs to, if started from a chat",
     )
 
     # Task status
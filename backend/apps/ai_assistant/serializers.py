@@ -11,12 +11,16 @@ from django.contrib.auth.models import User
 from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
+from apps.core.uploads import content_hash
+
 from .models import (
     AIConfiguration,
     ChatMessage,
     ChatSession,
     ProcessingTask,
     UploadedDocument,
+    UsageRollup,
+    document_upload_to,
 )
 
 
@@ -36,7 +40,28 @@ class UserBasicSerializer(serializers.ModelSerializer):
         return obj.get_full_name() or obj.username
 
 
-class ChatSessionListSerializer(serializers.ModelSerializer):
+class ChatSessionStatsMixin:
+    """
+    Message stats for chat session serializers.
+
+    Reads the ``with_message_stats()`` annotations and only falls back to the
+    per-instance model properties for unannotated sessions.
+    """
+
+    @extend_schema_field(serializers.IntegerField())
+    def get_message_count(self, obj) -> int:
+        """Get the total number of messages in this session."""
+        count = getattr(obj, "message_total", None)
+        return obj.message_count if count is None else count
+
+    @extend_schema_field(serializers.BooleanField())
+    def get_has_documents(self, obj) -> bool:
+        """Check if this session has any uploaded documents."""
+        has_documents = getattr(obj, "has_uploaded_documents", None)
+        return obj.has_documents if has_documents is None else has_documents
+
+
+class ChatSessionListSerializer(ChatSessionStatsMixin, serializers.ModelSerializer):
     """Serializer for ChatSession list view."""
 
     owner = UserBasicSerializer(read_only=True)
@@ -65,18 +90,8 @@ class ChatSessionListSerializer(serializers.ModelSerializer):
             "created_on",
         ]
 
-    @extend_schema_field(serializers.IntegerField())
-    def get_message_count(self, obj) -> int:
-        """Get the total number of messages in this session."""
-        return obj.message_count
-
-    @extend_schema_field(serializers.BooleanField())
-    def get_has_documents(self, obj) -> bool:
-        """Check if this session has any uploaded documents."""
-        return obj.has_documents
 
-
-class ChatSessionDetailSerializer(serializers.ModelSerializer):
+class ChatSessionDetailSerializer(ChatSessionStatsMixin, serializers.ModelSerializer):
     """Detailed serializer for ChatSession."""
 
     owner = UserBasicSerializer(read_only=True)
@@ -114,16 +129,6 @@ class ChatSessionDetailSerializer(serializers.ModelSerializer):
             "modified_by",
         ]
 
-    @extend_schema_field(serializers.IntegerField())
-    def get_message_count(self, obj) -> int:
-        """Get the total number of messages in this session."""
-        return obj.message_count
-
-    @extend_schema_field(serializers.BooleanField())
-    def get_has_documents(self, obj) -> bool:
-        """Check if this session has any uploaded documents."""
-        return obj.has_documents
-
 
 class UploadedDocumentSerializer(serializers.ModelSerializer):
     """Serializer for UploadedDocument."""
@@ -143,6 +148,7 @@ class UploadedDocumentSerializer(serializers.ModelSerializer):
             "file_size",
             "file_size_mb",
             "file_type",
+            "content_hash",
             "document_type",
             "confidence_score",
             "processing_status",
@@ -161,6 +167,7 @@ class UploadedDocumentSerializer(serializers.ModelSerializer):
             "file_size",
             "file_size_mb",
             "file_type",
+            "content_hash",
             "confidence_score",
             "processing_status",
             "is_processed",
@@ -274,6 +281,7 @@ class DocumentUploadSerializer(serializers.ModelSerializer):
             "jpeg",
             "png",
             "txt",
+            "csv",
             "doc",
             "docx",
             "xls",
@@ -299,6 +307,15 @@ class DocumentUploadSerializer(serializers.ModelSerializer):
         if not validated_data.get("original_filename"):
             validated_data["original_filename"] = file.name
 
+        # Identical content is stored once, under a name derived from its hash
+        validated_data["content_hash"] = content_hash(file)
+        stored_name = document_upload_to(
+            UploadedDocument(content_hash=validated_data["content_hash"]), file.name
+        )
+        storage = UploadedDocument._meta.get_field("file").storage
+        if storage.exists(stored_name):
+            validated_data["file"] = stored_name
+
         return super().create(validated_data)
 
 
@@ -376,6 +393,45 @@ class ProcessingTaskSerializer(serializers.ModelSerializer):
         return None
 
 
+class UsageRollupSerializer(serializers.ModelSerializer):
+    """Serializer for UsageRollup (read-only)."""
+
+    success_rate = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = UsageRollup
+        fields = [
+            "id",
+            "period",
+            "bucket_start",
+            "action_type",
+            "ai_provider",
+            "ai_model",
+            "count",
+            "success_count",
+            "success_rate",
+            "tokens_used",
+            "processing_time_total",
+            "latency_buckets",
+        ]
+        read_only_fields = fields
+
+
+class UsageSummarySerializer(serializers.Serializer):
+    """Serializer for usage totals over a range of rollups."""
+
+    action_type = serializers.CharField()
+    ai_provider = serializers.CharField()
+    ai_model = serializers.CharField()
+    count = serializers.IntegerField()
+    success_rate = serializers.FloatField()
+    tokens_used = serializers.IntegerField()
+    avg_processing_time = serializers.FloatField(allow_null=True)
+    p50_processing_time = serializers.FloatField(allow_null=True)
+    p95_processing_time = serializers.FloatField(allow_null=True)
+    p99_processing_time = serializers.FloatField(allow_null=True)
+
+
 class ChatBotRequestSerializer(serializers.Serializer):
     """Serializer for chatbot API requests."""
 
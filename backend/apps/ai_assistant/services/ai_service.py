@@ -8,18 +8,33 @@ and document processing in the meat market business context.
 
 import hashlib
 import logging
+import re
 import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Tuple
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from django.conf import settings
-from django.core.cache import cache
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from django.utils import timezone
 
+from apps.core.cache import MISSING, get_cache
+
 from ..models import AIConfiguration, ChatMessage, MessageTypeChoices
+from . import entity_extractor, intent_router
+from .provider_registry import ProviderRegistry
 
 logger = logging.getLogger(__name__)
 
+# Seconds a chat response is reused for the same question and context
+RESPONSE_CACHE_TIMEOUT = 3600
+
+FALLBACK_RESPONSE = (
+    "I apologize, but I am experiencing technical difficulties right now. "
+    "Please try again in a moment, or contact support if the issue persists."
+)
+
 
 class AIProviderInterface(ABC):
     """Abstract interface for AI providers."""
@@ -39,6 +54,18 @@ class AIProviderInterface(ABC):
         """Classify document type and extract key information."""
         pass
 
+    def stream_response(self, messages: List[Dict], **kwargs) -> Iterator[Dict]:
+        """
+        Stream a response as ``{"delta": text}`` chunks.
+
+        The last chunk is ``{"done": True, ...}`` with the usage, model and
+        finish_reason of ``generate_response``. Providers without native
+        streaming send the whole completion as a single chunk.
+        """
+        result = dict(self.generate_response(messages, **kwargs))
+        yield {"delta": result.pop("response")}
+        yield {"done": True, **result}
+
 
 class MockAIProvider(AIProviderInterface):
     """
@@ -47,6 +74,9 @@ class MockAIProvider(AIProviderInterface):
     Provides realistic responses without requiring external API keys.
     """
 
+    # Delay between streamed chunks, to mimic token-by-token generation
+    stream_chunk_delay = 0.02
+
     def __init__(self, config: AIConfiguration):
         self.config = config
         self.model_name = config.model_name
@@ -63,256 +93,51 @@ class MockAIProvider(AIProviderInterface):
 
         return {
             "response": response,
-            "usage": {
-                "prompt_tokens": len(user_message.split()) * 2,
-                "completion_tokens": len(response.split()),
-                "total_tokens": len(user_message.split()) * 2 + len(response.split()),
-            },
+            "usage": self._usage(user_message, response),
             "model": self.model_name,
             "finish_reason": "stop",
         }
 
-    def extract_entities(self, text: str, **kwargs) -> Dict[str, Any]:
-        """Extract enhanced entities from text with meat industry focus."""
-        entities = {
-            "suppliers": [],
-            "customers": [],
-            "products": [],
-            "quantities": [],
-            "prices": [],
-            "dates": [],
-            "locations": [],
-            "certifications": [],
-            "purchase_orders": [],
-            "invoice_numbers": [],
-            "contact_info": [],
-            "quality_metrics": [],
-            "confidence": 0.85,
-        }
-
-        # Simple keyword-based extraction for demo with enhanced patterns
-        text_lower = text.lower()
-
-        # Extract potential suppliers with more sophisticated patterns
-        supplier_patterns = [
-            r"([A-Z][a-z]+ (?:Beef|Pork|Meat|Farm|Ranch|Processing|Suppliers?|Inc|LLC|Corp|Co\.?))",
-            r"([A-Z][a-z]+ [A-Z][a-z]+ (?:Farms?|Ranches?|Meat|Processing))",
-            r"((?:Prime|Quality|Fresh|Local|Regional|Global) [A-Z][a-z]+ (?:Suppliers?|Distributors?))",
-        ]
-
-        import re
+    def stream_response(self, messages: List[Dict], **kwargs) -> Iterator[Dict]:
+        """Stream the mock response one word at a time."""
+        user_message = messages[-1].get("content", "") if messages else ""
+        response = self._generate_mock_response(user_message)
 
-        for pattern in supplier_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                entities["suppliers"].append(
-                    {
-                        "name": match,
-                        "confidence": 0.85,
-                        "extracted_from": "pattern_matching",
-                    }
-                )
+        for chunk in re.findall(r"\s*\S+\s*", response):
+            if self.stream_chunk_delay:
+                time.sleep(self.stream_chunk_delay)
+            yield {"delta": chunk}
 
-        # Extract meat products with quantities and grades
-        meat_products = {
-            "beef": [
-                "ground beef",
-                "ribeye",
-                "sirloin",
-                "chuck",
-                "brisket",
-                "prime rib",
-            ],
-            "pork": [
-                "pork chops",
-                "bacon",
-                "ham",
-                "sausage",
-                "pork belly",
-                "tenderloin",
-            ],
-            "chicken": ["whole chicken", "chicken breast", "chicken thighs", "wings"],
-            "lamb": ["lamb chops", "leg of lamb", "lamb shoulder"],
-            "turkey": ["whole turkey", "turkey breast", "ground turkey"],
-            "seafood": ["salmon", "shrimp", "lobster", "crab", "tuna"],
+        yield {
+            "done": True,
+            "usage": self._usage(user_message, response),
+            "model": self.model_name,
+            "finish_reason": "stop",
         }
 
-        for category, products in meat_products.items():
-            for product in products:
-                if product in text_lower:
-                    # Look for quantities nearby
-                    quantity_pattern = rf"(\d+(?:\.\d+)?)\s*(?:lbs?|pounds?|kg|kilograms?|tons?)?\s*(?:of\s+)?{re.escape(product)}"
-                    quantity_matches = re.findall(quantity_pattern, text_lower)
-
-                    for qty in quantity_matches:
-                        entities["quantities"].append(
-                            {
-                                "product": product.title(),
-                                "quantity": qty,
-                                "category": category,
-                                "confidence": 0.90,
-                            }
-                        )
-
-                    entities["products"].append(
-                        {
-                            "name": product.title(),
-                            "category": category,
-                            "confidence": 0.90,
-                        }
-                    )
-
-        # Extract prices with currency
-        price_patterns = [
-            r"\$(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)",  # $1,234.56
-            r"(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)\s*(?:dollars?|USD)",  # 1,234.56 dollars
-            r"(\d+(?:\.\d{2})?)\s*/\s*(?:lb|pound|kg)",  # 5.99/lb
-        ]
-
-        for pattern in price_patterns:
-            amounts = re.findall(pattern, text, re.IGNORECASE)
-            for amount in amounts:
-                entities["prices"].append(
-                    {"amount": amount, "currency": "USD", "confidence": 0.95}
-                )
-
-        # Extract dates with multiple formats
-        date_patterns = [
-            r"(\d{1,2}[-/]\d{1,2}[-/]\d{4})",  # MM/DD/YYYY or MM-DD-YYYY
-            r"(\d{4}[-/]\d{1,2}[-/]\d{1,2})",  # YYYY-MM-DD
-            r"((?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{1,2},?\s+\d{4})",  # January 15, 2024
-        ]
-
-        for pattern in date_patterns:
-            dates = re.findall(pattern, text, re.IGNORECASE)
-            for date in dates:
-                entities["dates"].append(
-                    {"date": date, "format": "detected", "confidence": 0.90}
-                )
-
-        # Extract purchase order numbers
-        po_patterns = [
-            r"(?:PO|Purchase Order|Order)\s*#?\s*([A-Z0-9-]+)",
-            r"(\d{4,}-\d{3,})",  # Pattern like 2024-001
-        ]
-
-        for pattern in po_patterns:
-            pos = re.findall(pattern, text, re.IGNORECASE)
-            for po in pos:
-                entities["purchase_orders"].append(
-                    {"po_number": po, "confidence": 0.85}
-                )
-
-        # Extract invoice numbers
-        invoice_patterns = [
-            r"(?:Invoice|INV)\s*#?\s*([A-Z0-9-]+)",
-            r"(?:Bill|Receipt)\s*#?\s*([A-Z0-9-]+)",
-        ]
-
-        for pattern in invoice_patterns:
-            invoices = re.findall(pattern, text, re.IGNORECASE)
-            for inv in invoices:
-                entities["invoice_numbers"].append(
-                    {"invoice_number": inv, "confidence": 0.85}
-                )
-
-        # Extract locations (cities, states, addresses)
-        location_patterns = [
-            r"(\d+\s+[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\s+(?:St|Street|Ave|Avenue|Blvd|Boulevard|Rd|Road))",  # Street addresses
-            r"([A-Z][a-z]+,\s*[A-Z]{2})",  # City, ST
-            r"([A-Z][a-z]+\s+[A-Z][a-z]+,\s*[A-Z]{2})",  # City Name, ST
-        ]
-
-        for pattern in location_patterns:
-            locations = re.findall(pattern, text)
-            for location in locations:
-                entities["locations"].append(
-                    {"location": location, "type": "address", "confidence": 0.80}
-                )
-
-        # Extract certifications and compliance info
-        certification_keywords = [
-            "USDA",
-            "FDA",
-            "HACCP",
-            "SQF",
-            "BRC",
-            "ISO",
-            "Organic",
-            "Halal",
-            "Kosher",
-            "SSOP",
-            "GMP",
-            "FSIS",
-            "Non-GMO",
-            "Grass-fed",
-            "Free-range",
-            "Cage-free",
-        ]
-
-        for cert in certification_keywords:
-            if cert.lower() in text_lower:
-                entities["certifications"].append(
-                    {
-                        "certification": cert,
-                        "type": (
-                            "food_safety"
-                            if cert in ["USDA", "FDA", "HACCP", "FSIS"]
-                            else "quality"
-                        ),
-                        "confidence": 0.95,
-                    }
-                )
-
-        # Extract contact information
-        contact_patterns = [
-            r"([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})",  # Email
-            r"(\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4})",  # Phone numbers
-            r"(\d{3}-\d{2}-\d{4})",  # SSN or Tax ID format
-        ]
-
-        contact_types = ["email", "phone", "tax_id"]
-        for i, pattern in enumerate(contact_patterns):
-            contacts = re.findall(pattern, text)
-            for contact in contacts:
-                entities["contact_info"].append(
-                    {"value": contact, "type": contact_types[i], "confidence": 0.90}
-                )
-
-        # Extract quality metrics
-        quality_patterns = [
-            r"(\d+(?:\.\d+)?)\s*(?:°F|degrees?|fahrenheit)",  # Temperature
-            r"(\d+(?:\.\d+)?)\s*(?:%|percent)",  # Percentages
-            r"(?:pH|acidity)\s*:?\s*(\d+(?:\.\d+)?)",  # pH levels
-            r"(?:moisture|fat|protein)\s*:?\s*(\d+(?:\.\d+)?)",  # Composition
-        ]
-
-        quality_types = ["temperature", "percentage", "ph_level", "composition"]
-        for i, pattern in enumerate(quality_patterns):
-            metrics = re.findall(pattern, text_lower)
-            for metric in metrics:
-                entities["quality_metrics"].append(
-                    {"value": metric, "type": quality_types[i], "confidence": 0.85}
-                )
+    @staticmethod
+    def _usage(user_message: str, response: str) -> Dict[str, int]:
+        prompt_tokens = len(user_message.split()) * 2
+        completion_tokens = len(response.split())
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
 
-        return entities
+    def extract_entities(self, text: str, **kwargs) -> Dict[str, Any]:
+        """Extract enhanced entities from text with meat industry focus."""
+        return entity_extractor.extract_entities(text)
 
     def classify_document(self, text: str, **kwargs) -> Dict[str, Any]:
         """Classify document type with enhanced meat industry intelligence."""
-        text_lower = text.lower()
+        # One keyword pass scores every document type
+        scan = entity_extractor.engine.scan(text.lower())
+        document_type = scan.document_type
 
         # Enhanced classification logic with confidence scoring
-        if any(
-            word in text_lower
-            for word in [
-                "purchase order",
-                "po number",
-                "order date",
-                "ship to",
-                "bill to",
-            ]
-        ):
-            confidence = 0.95 if "purchase order" in text_lower else 0.85
+        if document_type == "purchase_order":
+            confidence = 0.95 if scan.has("purchase order") else 0.85
             return {
                 "document_type": "purchase_order",
                 "confidence": confidence,
@@ -329,11 +154,8 @@ class MockAIProvider(AIProviderInterface):
                     "special_instructions": self._extract_special_instructions(text),
                 },
             }
-        elif any(
-            word in text_lower
-            for word in ["invoice", "bill", "amount due", "payment terms", "remit to"]
-        ):
-            confidence = 0.92 if "invoice" in text_lower else 0.80
+        elif document_type == "invoice":
+            confidence = 0.92 if scan.has("invoice") else 0.80
             return {
                 "document_type": "invoice",
                 "confidence": confidence,
@@ -351,10 +173,7 @@ class MockAIProvider(AIProviderInterface):
                     "discount_available": self._check_early_payment_discount(text),
                 },
             }
-        elif any(
-            word in text_lower
-            for word in ["contract", "agreement", "terms and conditions", "whereas"]
-        ):
+        elif document_type == "contract":
             confidence = 0.88
             return {
                 "document_type": "contract",
@@ -372,10 +191,7 @@ class MockAIProvider(AIProviderInterface):
                     "termination_clause": self._check_termination_clause(text),
                 },
             }
-        elif any(
-            word in text_lower
-            for word in ["certificate", "inspection", "usda", "haccp", "organic"]
-        ):
+        elif document_type == "certificate":
             confidence = 0.90
             return {
                 "document_type": "certificate",
@@ -393,10 +209,7 @@ class MockAIProvider(AIProviderInterface):
                     "renewal_required": self._check_renewal_required(text),
                 },
             }
-        elif any(
-            word in text_lower
-            for word in ["delivery", "receipt", "shipment", "bol", "bill of lading"]
-        ):
+        elif document_type == "delivery_receipt":
             confidence = 0.85
             return {
                 "document_type": "delivery_receipt",
@@ -415,10 +228,7 @@ class MockAIProvider(AIProviderInterface):
                     "signature_required": self._check_signature_required(text),
                 },
             }
-        elif any(
-            word in text_lower
-            for word in ["quality", "test", "lab", "analysis", "results"]
-        ):
+        elif document_type == "quality_report":
             confidence = 0.87
             return {
                 "document_type": "quality_report",
@@ -673,383 +483,41 @@ class MockAIProvider(AIProviderInterface):
         return ["Consider adding more context keywords", "Check document formatting"]
 
     def _generate_mock_response(self, user_message: str) -> str:
-        """Generate contextual mock responses with enhanced meat industry focus."""
-        message_lower = user_message.lower()
-
-        # Greeting responses
-        if any(
-            greeting in message_lower
-            for greeting in ["hello", "hi", "hey", "good morning", "good afternoon"]
-        ):
-            return (
-                "Hello! Welcome to your ProjectMeats AI Assistant! 🥩\n\n"
-                "I'm here to streamline your meat market operations with:\n\n"
-                "🔍 **Smart Document Processing**\n"
-                "• Purchase orders, invoices, contracts, and receipts\n"
-                "• Automatic data extraction and entity recognition\n"
-                "• Document classification with 90%+ accuracy\n\n"
-                "📊 **Business Intelligence**\n"
-                "• Supplier performance analytics\n"
-                "• Purchase trend analysis\n"
-                "• Quality control insights\n"
-                "• Cost optimization recommendations\n\n"
-                "⚡ **Workflow Automation**\n"
-                "• Supplier and customer management\n"
-                "• Plant operations coordination\n"
-                "• Regulatory compliance tracking\n\n"
-                "What would you like to accomplish today?"
-            )
-
-        # Document processing queries
-        elif any(
-            word in message_lower
-            for word in ["document", "upload", "process", "file", "scan"]
-        ):
-            return (
-                "I excel at processing meat industry documents! 📄\n\n"
-                "**Supported Document Types:**\n"
-                "📋 **Purchase Orders** - Extract supplier, quantities, pricing, delivery dates\n"
-                "🧾 **Invoices** - Capture amounts, due dates, payment terms, line items\n"
-                "📄 **Supplier Contracts** - Identify key terms, pricing agreements, quality specs\n"
-                "🏪 **Vendor Certificates** - USDA, HACCP, organic certifications\n"
-                "📊 **Quality Reports** - Temperature logs, inspection results, compliance data\n"
-                "🚚 **Delivery Receipts** - Track shipments, weights, condition reports\n\n"
-                "**Processing Features:**\n"
-                "• OCR for scanned documents and images\n"
-                "• Automatic data validation against your database\n"
-                "• Duplicate detection and conflict resolution\n"
-                "• Batch processing for multiple documents\n\n"
-                "Simply drag and drop your files, and I'll extract all relevant data to create or update records automatically!"
-            )
-
-        # Purchase order queries
-        elif any(
-            word in message_lower
-            for word in ["purchase order", "po", "order", "ordering", "procurement"]
-        ):
-            return (
-                "I'll help optimize your purchase order management! 📦\n\n"
-                "**Purchase Order Capabilities:**\n"
-                "🎯 **Smart Order Creation**\n"
-                "• Extract data from supplier catalogs and quotes\n"
-                "• Auto-populate based on historical orders\n"
-                "• Suggest optimal quantities based on demand forecasting\n\n"
-                "📈 **Order Intelligence**\n"
-                "• Track order status and delivery performance\n"
-                "• Monitor supplier reliability metrics\n"
-                "• Identify cost-saving opportunities\n"
-                "• Flag potential supply chain risks\n\n"
-                "🔄 **Workflow Automation**\n"
-                "• Automatic approval routing based on amount thresholds\n"
-                "• Email notifications for status changes\n"
-                "• Integration with accounting systems\n"
-                "• Compliance checking for regulatory requirements\n\n"
-                "Would you like me to process a purchase order document or help you analyze existing orders?"
-            )
-
-        # Supplier management
-        elif any(
-            word in message_lower
-            for word in ["supplier", "vendor", "partnership", "sourcing"]
-        ):
-            return (
-                "I provide comprehensive supplier intelligence! 🏢\n\n"
-                "**Supplier Management Features:**\n"
-                "📊 **Performance Analytics**\n"
-                "• On-time delivery rates and trends\n"
-                "• Quality metrics and defect tracking\n"
-                "• Price competitiveness analysis\n"
-                "• Risk assessment and scoring\n\n"
-                "📋 **Compliance Monitoring**\n"
-                "• USDA certification status tracking\n"
-                "• Food safety audit results\n"
-                "• Insurance and bonding verification\n"
-                "• Regulatory compliance alerts\n\n"
-                "💡 **Strategic Insights**\n"
-                "• Supplier diversification recommendations\n"
-                "• Cost optimization opportunities\n"
-                "• Market trend analysis\n"
-                "• Alternative supplier suggestions\n\n"
-                "🔄 **Relationship Management**\n"
-                "• Contact management and communication history\n"
-                "• Contract renewal tracking\n"
-                "• Performance review scheduling\n"
-                "• Supplier scorecard generation\n\n"
-                "What specific supplier information or analysis would you like me to provide?"
-            )
-
-        # Quality and safety queries
-        elif any(
-            word in message_lower
-            for word in [
-                "quality",
-                "safety",
-                "inspection",
-                "compliance",
-                "haccp",
-                "usda",
-            ]
-        ):
-            return (
-                "Quality and food safety are paramount in meat operations! 🛡️\n\n"
-                "**Quality Management Support:**\n"
-                "🔬 **Inspection & Testing**\n"
-                "• Track temperature logs and cold chain compliance\n"
-                "• Monitor microbiological test results\n"
-                "• Document HACCP critical control points\n"
-                "• Generate quality assurance reports\n\n"
-                "📋 **Regulatory Compliance**\n"
-                "• USDA/FSIS regulation tracking\n"
-                "• FDA food safety requirements\n"
-                "• State and local health department compliance\n"
-                "• International export certification\n\n"
-                "⚠️ **Risk Management**\n"
-                "• Early warning systems for quality issues\n"
-                "• Recall preparation and traceability\n"
-                "• Supplier audit scheduling and tracking\n"
-                "• Non-conformance reporting and CAPA\n\n"
-                "📊 **Analytics & Insights**\n"
-                "• Quality trend analysis across suppliers\n"
-                "• Cost of quality calculations\n"
-                "• Customer complaint pattern analysis\n"
-                "• Continuous improvement recommendations\n\n"
-                "How can I assist with your quality or compliance needs today?"
-            )
-
-        # Inventory and logistics
-        elif any(
-            word in message_lower
-            for word in [
-                "inventory",
-                "stock",
-                "warehouse",
-                "logistics",
-                "shipping",
-                "cold chain",
-            ]
-        ):
-            return (
-                "I'll help optimize your inventory and logistics operations! 🚚\n\n"
-                "**Inventory Intelligence:**\n"
-                "📦 **Stock Management**\n"
-                "• Real-time inventory tracking across facilities\n"
-                "• Automated reorder point calculations\n"
-                "• Expiration date monitoring and FIFO compliance\n"
-                "• Lot/batch traceability throughout the supply chain\n\n"
-                "🌡️ **Cold Chain Monitoring**\n"
-                "• Temperature compliance tracking\n"
-                "• Cold storage capacity optimization\n"
-                "• Energy efficiency recommendations\n"
-                "• Equipment maintenance scheduling\n\n"
-                "🚛 **Logistics Optimization**\n"
-                "• Route planning for delivery efficiency\n"
-                "• Carrier performance evaluation\n"
-                "• Freight cost analysis and optimization\n"
-                "• Delivery scheduling coordination\n\n"
-                "📈 **Predictive Analytics**\n"
-                "• Demand forecasting based on seasonal trends\n"
-                "• Optimal safety stock calculations\n"
-                "• Waste reduction opportunities\n"
-                "• Cost per unit delivered analysis\n\n"
-                "What inventory or logistics challenge can I help you solve?"
-            )
-
-        # Financial and accounting
-        elif any(
-            word in message_lower
-            for word in [
-                "finance",
-                "accounting",
-                "cost",
-                "profit",
-                "price",
-                "margin",
-                "budget",
-            ]
-        ):
-            return (
-                "I provide powerful financial insights for your meat business! 💰\n\n"
-                "**Financial Analytics:**\n"
-                "📊 **Cost Analysis**\n"
-                "• Product cost breakdowns (materials, labor, overhead)\n"
-                "• Supplier price trend analysis\n"
-                "• Transportation and logistics cost tracking\n"
-                "• Yield and shrinkage impact calculations\n\n"
-                "💹 **Profitability Insights**\n"
-                "• Margin analysis by product and customer\n"
-                "• Price optimization recommendations\n"
-                "• Customer profitability ranking\n"
-                "• Market pricing competitive analysis\n\n"
-                "📋 **Accounts Management**\n"
-                "• Accounts receivable aging analysis\n"
-                "• Payment pattern tracking\n"
-                "• Credit risk assessment\n"
-                "• Cash flow forecasting\n\n"
-                "🎯 **Performance Metrics**\n"
-                "• KPI dashboards and scorecards\n"
-                "• Budget vs. actual variance analysis\n"
-                "• ROI calculations for investments\n"
-                "• Industry benchmark comparisons\n\n"
-                "What financial analysis or insights would you like me to provide?"
-            )
-
-        # Analytics and reporting
-        elif any(
-            word in message_lower
-            for word in [
-                "analytics",
-                "report",
-                "dashboard",
-                "insights",
-                "data",
-                "trends",
-            ]
-        ):
-            return (
-                "I'll generate powerful analytics and insights for your business! 📊\n\n"
-                "**Advanced Analytics Capabilities:**\n"
-                "📈 **Business Intelligence**\n"
-                "• Sales trend analysis and forecasting\n"
-                "• Customer behavior pattern recognition\n"
-                "• Seasonal demand predictions\n"
-                "• Market opportunity identification\n\n"
-                "🎯 **Operational Insights**\n"
-                "• Production efficiency metrics\n"
-                "• Equipment utilization analysis\n"
-                "• Labor productivity tracking\n"
-                "• Energy consumption optimization\n\n"
-                "📋 **Custom Reporting**\n"
-                "• Executive summary dashboards\n"
-                "• Regulatory compliance reports\n"
-                "• Customer-specific analytics\n"
-                "• Supplier performance scorecards\n\n"
-                "🔮 **Predictive Models**\n"
-                "• Demand forecasting algorithms\n"
-                "• Risk prediction models\n"
-                "• Quality issue early detection\n"
-                "• Maintenance scheduling optimization\n\n"
-                "What type of analysis or report would you like me to create?"
-            )
-
-        # General help
-        elif any(
-            word in message_lower
-            for word in ["help", "what can you do", "capabilities", "features"]
-        ):
-            return (
-                "I'm your comprehensive AI assistant for meat market operations! 🤖\n\n"
-                "**Core Capabilities:**\n"
-                "🔍 **Document Intelligence**\n"
-                "• OCR and text extraction from any document format\n"
-                "• Automatic classification and data extraction\n"
-                "• Entity recognition and database integration\n"
-                "• Duplicate detection and data validation\n\n"
-                "💬 **Business Intelligence Chat**\n"
-                "• Natural language queries about your data\n"
-                "• Real-time analytics and insights\n"
-                "• Trend analysis and forecasting\n"
-                "• Custom report generation\n\n"
-                "⚡ **Process Automation**\n"
-                "• Workflow optimization recommendations\n"
-                "• Automated data entry and updates\n"
-                "• Alert systems for critical events\n"
-                "• Integration with existing systems\n\n"
-                "🎯 **Industry Expertise**\n"
-                "• Deep knowledge of meat industry regulations\n"
-                "• Best practices for food safety and quality\n"
-                "• Supply chain optimization strategies\n"
-                "• Market intelligence and trends\n\n"
-                "**Quick Start Tips:**\n"
-                "• Upload documents for instant processing\n"
-                "• Ask questions about your suppliers, customers, or orders\n"
-                "• Request specific reports or analytics\n"
-                "• Get recommendations for process improvements\n\n"
-                "Try saying something like: 'Analyze my top suppliers' or 'Process this invoice'"
-            )
-
-        # Specific product queries
-        elif any(
-            word in message_lower
-            for word in ["beef", "pork", "chicken", "lamb", "turkey", "veal", "meat"]
-        ):
-            detected_products = []
-            meat_products = ["beef", "pork", "chicken", "lamb", "turkey", "veal"]
-            for product in meat_products:
-                if product in message_lower:
-                    detected_products.append(product.title())
-
-            products_text = (
-                ", ".join(detected_products) if detected_products else "meat products"
-            )
-
-            return (
-                f"I can provide comprehensive insights about {products_text}! 🥩\n\n"
-                "**Product Intelligence:**\n"
-                "📊 **Market Analysis**\n"
-                f"• Current {products_text.lower()} pricing trends and forecasts\n"
-                "• Seasonal demand patterns and planning\n"
-                "• Competitive pricing analysis\n"
-                "• Margin optimization opportunities\n\n"
-                "🏭 **Supply Chain Insights**\n"
-                "• Supplier quality ratings and certifications\n"
-                "• Alternative sourcing recommendations\n"
-                "• Geographic sourcing optimization\n"
-                "• Risk assessment and mitigation strategies\n\n"
-                "📋 **Quality & Compliance**\n"
-                "• Grade standards and specifications\n"
-                "• Inspection requirements and scheduling\n"
-                "• Traceability and lot tracking\n"
-                "• Regulatory compliance monitoring\n\n"
-                "💡 **Optimization Recommendations**\n"
-                "• Inventory turnover improvements\n"
-                "• Yield optimization strategies\n"
-                "• Waste reduction opportunities\n"
-                "• Customer preference analysis\n\n"
-                f"What specific information about {products_text.lower()} would you like me to analyze?"
-            )
-
-        # Default response with suggestions
-        else:
-            return (
-                "I'm here to assist with your meat market operations! 🎯\n\n"
-                "I can help you with various tasks. Here are some suggestions:\n\n"
-                "📄 **Document Processing:**\n"
-                '• "Process this purchase order"\n'
-                '• "Extract data from this invoice"\n'
-                '• "Classify this supplier document"\n\n'
-                "📊 **Business Analytics:**\n"
-                '• "Show me my top suppliers"\n'
-                '• "Analyze purchase trends"\n'
-                '• "Generate a quality report"\n\n'
-                "🔍 **Data Insights:**\n"
-                '• "Which customers are most profitable?"\n'
-                '• "What are my inventory levels?"\n'
-                '• "Show delivery performance metrics"\n\n'
-                "⚙️ **Operations:**\n"
-                '• "Help me optimize my supply chain"\n'
-                '• "Review quality compliance"\n'
-                '• "Analyze cost reduction opportunities"\n\n'
-                "Just describe what you'd like to accomplish, or upload a document for me to process!"
-            )
+        """Generate contextual mock responses from the intent table."""
+        return intent_router.router.route(user_message)
 
 
 class OpenAIProvider(AIProviderInterface):
-    """OpenAI provider implementation."""
+    """
+    OpenAI provider implementation.
+
+    Instances are long-lived (see ``ProviderRegistry``) so the SDK client and
+    its HTTP connection pool are reused across requests.
+    """
 
     def __init__(self, config: AIConfiguration):
         self.config = config
         self.api_key = self._get_api_key()
         self.model_name = config.model_name
+        self.mock = MockAIProvider(config)
 
         # Import OpenAI client if available
         try:
             import openai
 
-            self.client = openai.OpenAI(api_key=self.api_key)
+            client_options = {"api_key": self.api_key}
+            if config.api_endpoint:
+                client_options["base_url"] = config.api_endpoint
+            self.client = openai.OpenAI(**client_options)
         except ImportError:
             logger.warning("OpenAI library not installed. Using mock responses.")
             self.client = None
 
+    def close(self) -> None:
+        """Close the client's HTTP connections."""
+        if self.client is not None:
+            self.client.close()
+
     def _get_api_key(self) -> Optional[str]:
         """Get API key from environment variables."""
         if self.config.api_key_name:
@@ -1060,8 +528,7 @@ class OpenAIProvider(AIProviderInterface):
         """Generate response using OpenAI API."""
         if not self.client:
             # Fallback to mock if OpenAI not available
-            mock_provider = MockAIProvider(self.config)
-            return mock_provider.generate_response(messages, **kwargs)
+            return self.mock.generate_response(messages, **kwargs)
 
         try:
             # Add system message for meat industry context
@@ -1091,30 +558,56 @@ class OpenAIProvider(AIProviderInterface):
         except Exception as e:
             logger.error(f"OpenAI API error: {str(e)}")
             # Fallback to mock on error
-            mock_provider = MockAIProvider(self.config)
-            return mock_provider.generate_response(messages, **kwargs)
+            return self.mock.generate_response(messages, **kwargs)
 
-    def extract_entities(self, text: str, **kwargs) -> Dict[str, Any]:
-        """Extract entities using OpenAI."""
+    def stream_response(self, messages: List[Dict], **kwargs) -> Iterator[Dict]:
+        """Stream a response using the OpenAI streaming API."""
         if not self.client:
-            mock_provider = MockAIProvider(self.config)
-            return mock_provider.extract_entities(text, **kwargs)
+            yield from self.mock.stream_response(messages, **kwargs)
+            return
 
+        system_message = {"role": "system", "content": self._get_system_prompt()}
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.model_name,
+                messages=[system_message] + messages,
+                stream=True,
+                **self.config.configuration,
+            )
+        except Exception as e:
+            logger.error(f"OpenAI API error: {str(e)}")
+            yield from self.mock.stream_response(messages, **kwargs)
+            return
+
+        model = self.model_name
+        finish_reason = "unknown"
+        for chunk in stream:
+            model = chunk.model or model
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            if choice.delta.content:
+                yield {"delta": choice.delta.content}
+            finish_reason = choice.finish_reason or finish_reason
+
+        yield {
+            "done": True,
+            "usage": {},
+            "model": model,
+            "finish_reason": finish_reason,
+        }
+
+    def extract_entities(self, text: str, **kwargs) -> Dict[str, Any]:
+        """Extract entities using OpenAI."""
         # Implementation would use OpenAI for entity extraction
         # For now, fallback to mock
-        mock_provider = MockAIProvider(self.config)
-        return mock_provider.extract_entities(text, **kwargs)
+        return self.mock.extract_entities(text, **kwargs)
 
     def classify_document(self, text: str, **kwargs) -> Dict[str, Any]:
         """Classify document using OpenAI."""
-        if not self.client:
-            mock_provider = MockAIProvider(self.config)
-            return mock_provider.classify_document(text, **kwargs)
-
         # Implementation would use OpenAI for document classification
         # For now, fallback to mock
-        mock_provider = MockAIProvider(self.config)
-        return mock_provider.classify_document(text, **kwargs)
+        return self.mock.classify_document(text, **kwargs)
 
     def _get_system_prompt(self) -> str:
         """Get system prompt for meat industry context."""
@@ -1147,29 +640,43 @@ class AIService:
             "anthropic": MockAIProvider,  # Would be Anthropic implementation
             "local": MockAIProvider,  # Would be local model implementation
         }
+        # One long-lived provider per configuration, with a concurrency limit
+        self.registry = ProviderRegistry(self.providers, MockAIProvider)
+
+    @property
+    def cache(self):
+        """Shared two-tier cache for the ai_assistant namespace."""
+        return get_cache("ai_assistant")
 
     def get_default_config(self) -> Optional[AIConfiguration]:
         """Get the default AI configuration with caching."""
-        cache_key = "ai_assistant:default_config"
-        config = cache.get(cache_key)
-
-        if config is None:
-            try:
-                config = AIConfiguration.objects.filter(
+        try:
+            # Cache for 5 minutes (a missing default is cached too); one
+            # process reloads it while the others keep using the cached one
+            return self.cache.get_or_compute(
+                "default_config",
+                lambda: AIConfiguration.objects.filter(
                     is_active=True, is_default=True
-                ).first()
-                # Cache for 5 minutes
-                cache.set(cache_key, config, 300)
-            except Exception as e:
-                logger.error(f"Error getting default AI config: {str(e)}")
-                return None
-
-        return config
+                ).first(),
+                300,
+            )
+        except Exception as e:
+            logger.error(f"Error getting default AI config: {str(e)}")
+            return None
 
     def get_provider(
         self, config: Optional[AIConfiguration] = None
     ) -> AIProviderInterface:
-        """Get AI provider instance based on configuration."""
+        """Get the shared AI provider instance for a configuration."""
+        return self.registry.get(self._resolve_config(config))
+
+    @contextmanager
+    def use_provider(self, config: Optional[AIConfiguration] = None):
+        """Hold a concurrency slot and the shared provider for a configuration."""
+        with self.registry.use(self._resolve_config(config)) as provider:
+            yield provider
+
+    def _resolve_config(self, config: Optional[AIConfiguration]) -> AIConfiguration:
         if not config:
             config = self.get_default_config()
 
@@ -1181,19 +688,23 @@ class AIService:
                 model_name="mock-model",
                 configuration={},
             )
-
-        provider_class = self.providers.get(config.provider, MockAIProvider)
-        return provider_class(config)
+        return config
 
     def generate_chat_response(
-        self, user_message: str, session_messages: List[ChatMessage] = None, **kwargs
+        self,
+        user_message: str,
+        session_messages: List[ChatMessage] = None,
+        summary: str = "",
+        **kwargs,
     ) -> Tuple[str, Dict[str, Any]]:
         """
         Generate AI response for chat conversation with caching.
 
         Args:
             user_message: User's input message
-            session_messages: Previous messages in the session
+            session_messages: Previous messages in the session, already
+                limited to the context window (see ``context_builder``)
+            summary: Rolling summary of older messages in the session
             **kwargs: Additional parameters
 
         Returns:
@@ -1202,82 +713,199 @@ class AIService:
         start_time = time.time()
 
         # Create cache key for similar queries
-        cache_key = self._create_cache_key(user_message, session_messages)
-        cached_response = cache.get(cache_key)
-
-        if cached_response and not kwargs.get("force_refresh", False):
-            logger.info(f"Using cached response for query: {user_message[:50]}...")
-            cached_response["metadata"]["cached"] = True
-            cached_response["metadata"]["processing_time"] = time.time() - start_time
-            return cached_response["response"], cached_response["metadata"]
-
-        try:
-            # Get AI provider
-            provider = self.get_provider()
+        cache_key = self._create_cache_key(user_message, session_messages, summary)
+        generated = False
 
-            # Prepare conversation history
-            messages = []
-            if session_messages:
-                for msg in session_messages[-10:]:  # Last 10 messages for context
-                    if msg.message_type == MessageTypeChoices.USER:
-                        messages.append({"role": "user", "content": msg.content})
-                    elif msg.message_type == MessageTypeChoices.ASSISTANT:
-                        messages.append({"role": "assistant", "content": msg.content})
+        def generate():
+            nonlocal generated
+            generated = True
 
-            # Add current user message
-            messages.append({"role": "user", "content": user_message})
+            messages = self._build_messages(user_message, session_messages, summary)
 
             # Generate response
-            result = provider.generate_response(messages, **kwargs)
-
-            processing_time = time.time() - start_time
-
-            # Prepare metadata
-            metadata = {
-                "provider": (
-                    provider.config.provider if hasattr(provider, "config") else "mock"
-                ),
-                "model": result.get("model", "unknown"),
-                "processing_time": processing_time,
-                "usage": result.get("usage", {}),
-                "finish_reason": result.get("finish_reason", "unknown"),
-                "cached": False,
-                "timestamp": timezone.now().isoformat(),
-            }
-
-            # Cache the response for 1 hour for similar queries
-            cache_data = {"response": result["response"], "metadata": metadata.copy()}
-            cache.set(cache_key, cache_data, 3600)
+            with self.use_provider() as provider:
+                result = provider.generate_response(messages, **kwargs)
 
-            return result["response"], metadata
+            metadata = self._response_metadata(provider, result, start_time)
+            return {"response": result["response"], "metadata": metadata}
 
+        try:
+            # Cache the response for 1 hour for similar queries; concurrent
+            # identical questions wait for a single upstream call
+            cached_response = self.cache.get_or_compute(
+                cache_key,
+                generate,
+                RESPONSE_CACHE_TIMEOUT,
+                force=kwargs.get("force_refresh", False),
+            )
         except Exception as e:
             logger.error(f"Error generating chat response: {str(e)}")
+            return FALLBACK_RESPONSE, self._fallback_metadata(e, start_time)
 
-            # Fallback response
-            processing_time = time.time() - start_time
-            fallback_response = (
-                "I apologize, but I am experiencing technical difficulties right now. "
-                "Please try again in a moment, or contact support if the issue persists."
+        metadata = dict(cached_response["metadata"])
+        if not generated:
+            logger.info(f"Using cached response for query: {user_message[:50]}...")
+            metadata["cached"] = True
+            metadata["processing_time"] = time.time() - start_time
+        return cached_response["response"], metadata
+
+    def stream_chat_response(
+        self,
+        user_message: str,
+        session_messages: List[ChatMessage] = None,
+        summary: str = "",
+        **kwargs,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream an AI chat response.
+
+        Yields ``{"delta": text}`` chunks as the provider produces them, then
+        ``{"done": True, "response": full_text, "metadata": {...}}``. The
+        provider's concurrency slot is held until the stream finishes or the
+        consumer closes it. Completed responses are cached like
+        ``generate_chat_response``.
+        """
+        start_time = time.time()
+        cache_key = self._create_cache_key(user_message, session_messages, summary)
+        force_refresh = kwargs.get("force_refresh", False)
+        cached_response = (
+            MISSING if force_refresh else self.cache.peek(cache_key, MISSING)
+        )
+
+        if cached_response is MISSING:
+            with self.cache.lock(cache_key) as leader:
+                if leader or force_refresh:
+                    yield from self._stream_and_cache(
+                        cache_key,
+                        user_message,
+                        session_messages,
+                        summary,
+                        start_time,
+                        **kwargs,
+                    )
+                    return
+            # The same question is being answered elsewhere: wait for it
+            cached_response = self.cache.wait(cache_key)
+            if cached_response is MISSING:
+                yield from self._stream_and_cache(
+                    cache_key,
+                    user_message,
+                    session_messages,
+                    summary,
+                    start_time,
+                    **kwargs,
+                )
+                return
+
+        metadata = dict(cached_response["metadata"])
+        metadata["cached"] = True
+        metadata["processing_time"] = time.time() - start_time
+        yield {"delta": cached_response["response"]}
+        yield {
+            "done": True,
+            "response": cached_response["response"],
+            "metadata": metadata,
+        }
+
+    def _stream_and_cache(
+        self, cache_key, user_message, session_messages, summary, start_time, **kwargs
+    ) -> Iterator[Dict[str, Any]]:
+        """Stream a response from the provider and cache it once complete."""
+        parts = []
+        try:
+            messages = self._build_messages(user_message, session_messages, summary)
+
+            with self.use_provider() as provider:
+                result = {}
+                for chunk in provider.stream_response(messages, **kwargs):
+                    if chunk.get("done"):
+                        result = chunk
+                    elif chunk.get("delta"):
+                        parts.append(chunk["delta"])
+                        yield {"delta": chunk["delta"]}
+
+            response = "".join(parts)
+            metadata = self._response_metadata(provider, result, start_time)
+            self.cache.store(
+                cache_key,
+                {"response": response, "metadata": metadata},
+                RESPONSE_CACHE_TIMEOUT,
+                cost=time.time() - start_time,
             )
 
-            metadata = {
-                "provider": "fallback",
-                "model": "error",
-                "processing_time": processing_time,
-                "error": str(e),
-                "cached": False,
-                "timestamp": timezone.now().isoformat(),
-            }
+        except Exception as e:
+            logger.error(f"Error streaming chat response: {str(e)}")
+            metadata = self._fallback_metadata(e, start_time)
+            if parts:
+                response = "".join(parts)
+            else:
+                response = FALLBACK_RESPONSE
+                yield {"delta": response}
+
+        yield {"done": True, "response": response, "metadata": metadata}
+
+    def _build_messages(
+        self,
+        user_message: str,
+        session_messages: List[ChatMessage] = None,
+        summary: str = "",
+    ) -> List[Dict[str, str]]:
+        """Build the provider conversation from the session's context window."""
+        messages = []
+        if summary:
+            messages.append(
+                {
+                    "role": "system",
+                    "content": f"Summary of earlier conversation:\n{summary}",
+                }
+            )
+        if session_messages:
+            for msg in session_messages:
+                if msg.message_type == MessageTypeChoices.USER:
+                    messages.append({"role": "user", "content": msg.content})
+                elif msg.message_type == MessageTypeChoices.ASSISTANT:
+                    messages.append({"role": "assistant", "content": msg.content})
+
+        # Add current user message
+        messages.append({"role": "user", "content": user_message})
+        return messages
+
+    def _response_metadata(
+        self, provider, result: Dict[str, Any], start_time: float
+    ) -> Dict[str, Any]:
+        return {
+            "provider": (
+                provider.config.provider if hasattr(provider, "config") else "mock"
+            ),
+            "model": result.get("model", "unknown"),
+            "processing_time": time.time() - start_time,
+            "usage": result.get("usage", {}),
+            "finish_reason": result.get("finish_reason", "unknown"),
+            "cached": False,
+            "timestamp": timezone.now().isoformat(),
+        }
 
-            return fallback_response, metadata
+    def _fallback_metadata(self, error: Exception, start_time: float) -> Dict:
+        return {
+            "provider": "fallback",
+            "model": "error",
+            "processing_time": time.time() - start_time,
+            "error": str(error),
+            "cached": False,
+            "timestamp": timezone.now().isoformat(),
+        }
 
     def _create_cache_key(
-        self, user_message: str, session_messages: List[ChatMessage] = None
+        self,
+        user_message: str,
+        session_messages: List[ChatMessage] = None,
+        summary: str = "",
     ) -> str:
         """Create a cache key for the conversation context."""
         # Create a hash of the user message and recent context
         content_to_hash = user_message.lower().strip()
+        if summary:
+            content_to_hash += " " + summary.lower().strip()
 
         # Add recent context if available
         if session_messages:
@@ -1287,15 +915,15 @@ class AIService:
 
         # Create hash
         hash_object = hashlib.md5(content_to_hash.encode())
-        cache_key = f"ai_assistant:response:{hash_object.hexdigest()}"
+        cache_key = f"response:{hash_object.hexdigest()}"
 
         return cache_key
 
     def extract_document_entities(self, text: str, **kwargs) -> Dict[str, Any]:
         """Extract business entities from document text."""
         try:
-            provider = self.get_provider()
-            return provider.extract_entities(text, **kwargs)
+            with self.use_provider() as provider:
+                return provider.extract_entities(text, **kwargs)
         except Exception as e:
             logger.error(f"Error extracting entities: {str(e)}")
             return {"error": str(e), "entities": {}}
@@ -1303,8 +931,8 @@ class AIService:
     def classify_document_type(self, text: str, **kwargs) -> Dict[str, Any]:
         """Classify document type and extract key information."""
         try:
-            provider = self.get_provider()
-            return provider.classify_document(text, **kwargs)
+            with self.use_provider() as provider:
+                return provider.classify_document(text, **kwargs)
         except Exception as e:
             logger.error(f"Error classifying document: {str(e)}")
             return {"document_type": "unknown", "confidence": 0.0, "error": str(e)}
@@ -1312,3 +940,9 @@ class AIService:
 
 # Global AI service instance
 ai_service = AIService()
+
+
+@receiver(post_delete, sender=AIConfiguration)
+def _discard_provider(sender, instance, **kwargs):
+    """Release a deleted configuration's provider and its connections."""
+    ai_service.registry.discard(instance)
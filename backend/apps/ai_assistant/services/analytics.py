@@ -0,0 +1,252 @@
+"""
+Buffered writer for ProjectMeats AI Assistant usage analytics.
+
+``UsageAnalytics.log_action`` hands events to the process-wide
+``analytics_buffer`` instead of inserting a row on the request path.
+Events are written with ``bulk_create``:
+
+* by a background thread every ``ANALYTICS_FLUSH_INTERVAL`` seconds, or as
+  soon as ``ANALYTICS_BUFFER_SIZE`` events are waiting;
+* when the process exits (gunicorn's ``worker_exit`` hook and ``atexit``).
+
+Events wait in process memory by default. With ``ANALYTICS_SPOOL_URL`` set
+they wait in a Redis list shared by every worker instead, so events buffered
+by a worker that crashes are written by the others. Set
+``ANALYTICS_BUFFERED = False`` to insert each event immediately.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.signals import setting_changed
+from django.db import (
+    DatabaseError,
+    InterfaceError,
+    OperationalError,
+    close_old_connections,
+    transaction,
+)
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+SPOOL_KEY = "projectmeats:analytics:spool"
+
+
+class MemorySpool:
+    """Events waiting in this process."""
+
+    def __init__(self):
+        self._events = deque()
+        self._lock = threading.Lock()
+
+    def push(self, event: Dict[str, Any]) -> int:
+        with self._lock:
+            self._events.append(event)
+            return len(self._events)
+
+    def take(self, count: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                self._events.popleft() for _ in range(min(count, len(self._events)))
+            ]
+
+    def restore(self, events: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._events.extendleft(reversed(events))
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+
+class RedisSpool:
+    """Events waiting in a Redis list shared by every worker."""
+
+    def __init__(self, url: str, key: str = SPOOL_KEY):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.key = key
+
+    def push(self, event: Dict[str, Any]) -> int:
+        return self.client.rpush(self.key, json.dumps(event, cls=DjangoJSONEncoder))
+
+    def take(self, count: int) -> List[Dict[str, Any]]:
+        # Read and remove the batch in one transaction
+        pipe = self.client.pipeline(transaction=True)
+        pipe.lrange(self.key, 0, count - 1)
+        pipe.ltrim(self.key, count, -1)
+        raw, _ = pipe.execute()
+        return [json.loads(item) for item in raw]
+
+    def restore(self, events: List[Dict[str, Any]]) -> None:
+        if events:
+            payload = [json.dumps(event, cls=DjangoJSONEncoder) for event in events]
+            self.client.lpush(self.key, *reversed(payload))
+
+    def __len__(self) -> int:
+        return self.client.llen(self.key)
+
+
+class AnalyticsBuffer:
+    """Batches ``UsageAnalytics`` rows and writes them with ``bulk_create``."""
+
+    def __init__(self):
+        self._spool = None
+        self._pid = None
+        self._thread: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._atexit_registered = False
+
+    @property
+    def spool(self):
+        self._ensure_started()
+        return self._spool
+
+    def add(self, record) -> None:
+        """Queue an unsaved ``UsageAnalytics`` instance for writing."""
+        event = {
+            field.attname: getattr(record, field.attname)
+            for field in record._meta.concrete_fields
+        }
+        try:
+            waiting = self.spool.push(event)
+        except Exception as e:
+            logger.warning(f"Analytics spool unavailable, writing directly: {str(e)}")
+            record.save(force_insert=True)
+            return
+
+        if waiting >= settings.ANALYTICS_BUFFER_SIZE:
+            if self._thread is not None:
+                self._wake.set()
+            else:
+                self.flush()
+
+    def flush(self) -> int:
+        """Write every waiting event; returns the number written."""
+        from ..models import UsageAnalytics
+
+        batch_size = settings.ANALYTICS_BUFFER_SIZE
+        written = 0
+        with self._flush_lock:
+            while True:
+                events = self.spool.take(batch_size)
+                if not events:
+                    break
+                records = [UsageAnalytics(**event) for event in events]
+                try:
+                    UsageAnalytics.objects.bulk_create(records, batch_size=batch_size)
+                except (OperationalError, InterfaceError) as e:
+                    # Database unavailable: keep the batch for the next flush
+                    logger.error(f"Failed to write usage analytics: {str(e)}")
+                    self.spool.restore(events)
+                    break
+                except DatabaseError:
+                    written += self._write_each(records)
+                    continue
+                written += len(records)
+        return written
+
+    @staticmethod
+    def _write_each(records) -> int:
+        """Insert rows one by one, dropping those the database rejects."""
+        written = 0
+        for record in records:
+            try:
+                with transaction.atomic():
+                    record.save(force_insert=True)
+                written += 1
+            except DatabaseError as e:
+                logger.error(f"Dropped usage analytics event {record.pk}: {str(e)}")
+        return written
+
+    def pending(self) -> int:
+        return len(self.spool)
+
+    def shutdown(self) -> None:
+        """Stop the flush thread and write whatever is left."""
+        self._stop.set()
+        self._wake.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=settings.ANALYTICS_FLUSH_INTERVAL + 5)
+        if self._spool is not None:
+            self.flush()
+
+    def reset(self) -> None:
+        """Drop the spool and thread so settings are read again."""
+        self.shutdown()
+        with self._lock:
+            self._spool = None
+            self._thread = None
+            self._pid = None
+            self._stop.clear()
+            self._wake.clear()
+
+    def _ensure_started(self) -> None:
+        # Forked workers must not share the parent's spool or thread
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._spool = self._make_spool()
+            self._thread = None
+            self._stop.clear()
+            if settings.ANALYTICS_FLUSH_INTERVAL > 0:
+                self._thread = threading.Thread(
+                    target=self._run, name="analytics-flush", daemon=True
+                )
+                self._thread.start()
+            if not self._atexit_registered:
+                atexit.register(self.shutdown)
+                self._atexit_registered = True
+            self._pid = os.getpid()
+
+    @staticmethod
+    def _make_spool():
+        url = settings.ANALYTICS_SPOOL_URL
+        if not url:
+            return MemorySpool()
+        try:
+            return RedisSpool(url)
+        except ImportError:
+            logger.warning(
+                "redis library not installed. Buffering analytics in memory."
+            )
+            return MemorySpool()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(settings.ANALYTICS_FLUSH_INTERVAL)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Analytics flush failed: {str(e)}")
+            finally:
+                close_old_connections()
+
+
+analytics_buffer = AnalyticsBuffer()
+
+
+@receiver(setting_changed)
+def _reset_on_setting_change(setting, **kwargs):
+    if setting in (
+        "ANALYTICS_BUFFERED",
+        "ANALYTICS_BUFFER_SIZE",
+        "ANALYTICS_FLUSH_INTERVAL",
+        "ANALYTICS_SPOOL_URL",
+    ):
+        analytics_buffer.reset()
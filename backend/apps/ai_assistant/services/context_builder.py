@@ -0,0 +1,138 @@
+"""
+Conversation context for ProjectMeats AI Assistant chat turns.
+
+Each turn sends the provider a bounded window of recent messages rather
+than the whole session history:
+
+* the newest ``AI_CONTEXT_MAX_MESSAGES`` messages are read with a single
+  ``LIMIT`` query on the (session, created_on) index;
+* messages are kept, newest first, until ``AI_CONTEXT_TOKEN_BUDGET``
+  estimated tokens are used;
+* messages that fall out of the window are folded into a rolling summary
+  stored in ``ChatSession.context_data["summary"]``.
+
+Only messages newer than the summary are read, so a turn costs the same
+however long the session gets.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import List
+
+from django.conf import settings
+from django.utils.dateparse import parse_datetime
+
+from ..models import ChatMessage, ChatSession, MessageTypeChoices
+
+SUMMARY_KEY = "summary"
+
+# Longest excerpt of a single message kept in the summary
+SUMMARY_LINE_CHARS = 200
+
+SPEAKERS = {
+    MessageTypeChoices.USER: "User",
+    MessageTypeChoices.ASSISTANT: "Assistant",
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting (about four characters per token)."""
+    if not text:
+        return 0
+    return (len(text) + 3) // 4
+
+
+@dataclass
+class ConversationContext:
+    """Messages and summary to send with a chat turn."""
+
+    messages: List[ChatMessage] = field(default_factory=list)
+    summary: str = ""
+
+
+def build_context(session: ChatSession, before=None) -> ConversationContext:
+    """
+    Build the conversation context for the next turn of ``session``.
+
+    Args:
+        session: Chat session being continued
+        before: Only consider messages created before this time, usually
+            the new user message's ``created_on``
+
+    Returns:
+        ConversationContext with chronological messages and the summary of
+        everything older
+    """
+    summary = dict(session.context_data.get(SUMMARY_KEY) or {})
+    through = parse_datetime(summary["through"]) if summary.get("through") else None
+
+    history = ChatMessage.objects.filter(
+        session=session, message_type__in=list(SPEAKERS)
+    ).only("id", "session_id", "message_type", "content", "created_on")
+    if before is not None:
+        history = history.filter(created_on__lt=before)
+    if through is not None:
+        history = history.filter(created_on__gt=through)
+
+    limit = settings.AI_CONTEXT_MAX_MESSAGES
+    tail = list(history.order_by("-created_on")[:limit])
+
+    budget = settings.AI_CONTEXT_TOKEN_BUDGET - estimate_tokens(summary.get("text"))
+    window = []
+    for message in tail:
+        budget -= estimate_tokens(message.content)
+        if budget < 0:
+            break
+        window.append(message)
+
+    if len(tail) < limit:
+        # Everything newer than the summary was read: the rest is evicted
+        evicted = tail[len(window) :][::-1]
+    else:
+        # Older messages may not have been read; catch up from the summary
+        # forwards, a bounded batch per turn
+        older = history
+        if window:
+            older = older.filter(created_on__lt=window[-1].created_on)
+        evicted = list(older.order_by("created_on")[:limit])
+
+    if evicted:
+        summary = _update_summary(session, summary, evicted)
+
+        # Make room for the grown summary; messages dropped here are newer
+        # than the summary, so a later turn folds them in
+        budget = settings.AI_CONTEXT_TOKEN_BUDGET - estimate_tokens(summary["text"])
+        while window and sum(estimate_tokens(m.content) for m in window) > budget:
+            window.pop()
+
+    return ConversationContext(messages=window[::-1], summary=summary.get("text", ""))
+
+
+def _update_summary(session: ChatSession, summary: dict, evicted: List[ChatMessage]):
+    """Fold evicted messages into the session's rolling summary and save it."""
+    lines = summary.get("text", "").splitlines()
+    lines.extend(_summary_line(message) for message in evicted)
+
+    # Drop the oldest lines once the summary outgrows its own budget
+    budget = settings.AI_CONTEXT_SUMMARY_TOKENS
+    while len(lines) > 1 and estimate_tokens("\n".join(lines)) > budget:
+        lines.pop(0)
+
+    summary = {
+        "text": "\n".join(lines),
+        "through": evicted[-1].created_on.isoformat(),
+        "message_count": summary.get("message_count", 0) + len(evicted),
+    }
+    context_data = {**session.context_data, SUMMARY_KEY: summary}
+
+    # A single UPDATE, so last_activity and other columns are left alone
+    ChatSession.objects.filter(pk=session.pk).update(context_data=context_data)
+    session.context_data = context_data
+    return summary
+
+
+def _summary_line(message: ChatMessage) -> str:
+    text = re.sub(r"\s+", " ", message.content).strip()
+    if len(text) > SUMMARY_LINE_CHARS:
+        text = text[: SUMMARY_LINE_CHARS - 3].rstrip() + "..."
+    return f"{SPEAKERS.get(message.message_type, 'User')}: {text}"
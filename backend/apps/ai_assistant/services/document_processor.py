@@ -0,0 +1,321 @@
+"""
+Document processing pipeline stages for ProjectMeats AI Assistant.
+
+Each uploaded document is processed in three stages, run as a Celery task
+chain (see ``apps.ai_assistant.tasks``):
+
+1. text extraction (``services.text_extraction``)
+2. document classification
+3. business entity extraction
+
+Progress is recorded on the document's ``ProcessingTask`` so clients can
+poll ``/api/v1/ai-assistant/processing-tasks/{id}/``. Stages write their
+results with single ``UPDATE`` statements rather than re-saving the whole
+document.
+
+Results are shared between documents with the same ``content_hash``: the
+extraction stage completes the task straight from a previous result for
+identical content and the same ``PIPELINE_VERSION``, unless the
+``force`` processing option is set.
+"""
+
+import logging
+import os
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.utils import timezone
+
+from apps.core.cache import get_cache
+
+from ..models import DocumentProcessingStatusChoices, ProcessingTask, UploadedDocument
+from .ai_service import ai_service
+from .text_extraction import extract_text
+
+logger = logging.getLogger(__name__)
+
+# Progress reported once each stage has finished
+STAGE_PROGRESS = {
+    "extraction": 40,
+    "classification": 70,
+    "entities": 100,
+}
+
+# Bump when a stage's output changes so earlier results are not reused
+PIPELINE_VERSION = 2
+
+# Document fields copied from a previous result for identical content
+RESULT_FIELDS = (
+    "extracted_text",
+    "document_type",
+    "confidence_score",
+    "extracted_data",
+)
+
+
+class DocumentProcessor:
+    """Run pipeline stages for a single ``ProcessingTask``."""
+
+    def __init__(self, task_id):
+        self.task = ProcessingTask.objects.select_related("document").get(pk=task_id)
+        self.document = self.task.document
+
+    @property
+    def is_failed(self) -> bool:
+        return self.task.status == DocumentProcessingStatusChoices.FAILED
+
+    @property
+    def is_finished(self) -> bool:
+        return self.task.status in (
+            DocumentProcessingStatusChoices.COMPLETED,
+            DocumentProcessingStatusChoices.FAILED,
+        )
+
+    @property
+    def options(self) -> Dict[str, Any]:
+        return (self.task.input_data or {}).get("processing_options") or {}
+
+    def run_stage(self, stage: str) -> bool:
+        """
+        Run one pipeline stage, recording progress or failure.
+
+        Returns False when the task has failed or already completed and
+        later stages should be skipped.
+        """
+        if self.is_finished:
+            return False
+
+        try:
+            getattr(self, f"_{stage}")()
+        except Exception as e:
+            logger.error(
+                f"Document processing stage '{stage}' failed for task "
+                f"{self.task.pk}: {str(e)}"
+            )
+            self.fail(stage, e)
+            return False
+
+        # A reused result completes the task early
+        if not self.is_finished:
+            self._update_task(progress_percentage=STAGE_PROGRESS[stage])
+        return True
+
+    def fail(self, stage: str, error: Exception) -> None:
+        """Mark the task and its document as failed."""
+        now = timezone.now()
+        self._update_task(
+            status=DocumentProcessingStatusChoices.FAILED,
+            error_details=f"{stage}: {error}",
+            completed_at=now,
+        )
+        self._update_document(
+            processing_status=DocumentProcessingStatusChoices.FAILED,
+            processing_error=str(error),
+        )
+
+    def _extraction(self) -> None:
+        now = timezone.now()
+        self._update_task(
+            status=DocumentProcessingStatusChoices.PROCESSING, started_at=now
+        )
+
+        if self._reuse_result():
+            return
+
+        self._update_document(
+            processing_status=DocumentProcessingStatusChoices.PROCESSING,
+            processing_error=None,
+        )
+        extension = os.path.splitext(self.document.original_filename)[1]
+        if not extension:
+            extension = os.path.splitext(self.document.file.name)[1]
+        result = extract_text(
+            self.document.file, extension, on_progress=self._extraction_progress
+        )
+
+        self._update_document(
+            extracted_text=result.text,
+            extracted_data={"extraction": result.as_metadata()},
+        )
+
+    def _extraction_progress(self, pages_done: int, pages: int) -> None:
+        progress = STAGE_PROGRESS["extraction"] * pages_done // pages
+        self._update_task(progress_percentage=progress)
+
+    def _classification(self) -> None:
+        classification = ai_service.classify_document_type(
+            self.document.extracted_text or ""
+        )
+        self._update_document(
+            document_type=classification.get("document_type", "unknown"),
+            confidence_score=classification.get("confidence", 0.0),
+            extracted_data={
+                **(self.document.extracted_data or {}),
+                "classification": classification,
+            },
+        )
+
+    def _entities(self) -> None:
+        started_at = self.task.started_at or timezone.now()
+        entities = ai_service.extract_document_entities(
+            self.document.extracted_text or ""
+        )
+        now = timezone.now()
+
+        extracted_data = dict(self.document.extracted_data or {})
+        extracted_data.update(
+            {"entities": entities, "processing_timestamp": now.isoformat()}
+        )
+        self._complete(
+            {"extracted_data": extracted_data},
+            processing_method="ai_service",
+            started_at=started_at,
+        )
+        if self.document is not None and self.document.content_hash:
+            store_result(self.document)
+
+    def _reuse_result(self) -> bool:
+        """Complete the task from a previous result for identical content."""
+        if self.document is None or not self.document.content_hash:
+            return False
+        if self.options.get("force"):
+            return False
+
+        result = cached_result(self.document.content_hash)
+        if result is None:
+            return False
+
+        now = timezone.now()
+        fields = dict(result)
+        fields["extracted_data"] = {
+            **(result.get("extracted_data") or {}),
+            "processing_timestamp": now.isoformat(),
+        }
+        self._complete(
+            fields,
+            processing_method="content_hash",
+            started_at=self.task.started_at or now,
+        )
+        logger.info(
+            f"Reused processing result for document {self.document.pk} "
+            f"({self.document.content_hash[:12]})"
+        )
+        return True
+
+    def _complete(self, fields: Dict[str, Any], processing_method: str, started_at):
+        """Write the final results and mark the document and task completed."""
+        now = timezone.now()
+        processing_metadata = {
+            "processing_method": processing_method,
+            "model_used": self._model_name(),
+            "processing_time": (now - started_at).total_seconds(),
+            "task_id": str(self.task.pk),
+            "pipeline_version": PIPELINE_VERSION,
+        }
+        self._update_document(
+            **fields,
+            processing_error=None,
+            processing_metadata=processing_metadata,
+            processing_status=DocumentProcessingStatusChoices.COMPLETED,
+        )
+        self._update_task(
+            progress_percentage=STAGE_PROGRESS["entities"],
+            status=DocumentProcessingStatusChoices.COMPLETED,
+            completed_at=now,
+            output_data={
+                "document_type": self.document.document_type,
+                "confidence": self.document.confidence_score,
+            },
+        )
+
+    def _model_name(self) -> str:
+        config = ai_service.get_default_config()
+        return config.model_name if config else "mock"
+
+    def _update_task(self, **fields: Any) -> None:
+        fields["modified_on"] = timezone.now()
+        ProcessingTask.objects.filter(pk=self.task.pk).update(**fields)
+        for name, value in fields.items():
+            setattr(self.task, name, value)
+
+    def _update_document(self, **fields: Any) -> None:
+        if self.document is None:
+            return
+        fields["modified_on"] = timezone.now()
+        UploadedDocument.objects.filter(pk=self.document.pk).update(**fields)
+        for name, value in fields.items():
+            setattr(self.document, name, value)
+
+
+def create_processing_task(
+    document: UploadedDocument,
+    session=None,
+    options: Optional[Dict[str, Any]] = None,
+) -> ProcessingTask:
+    """Create the ProcessingTask that tracks a document through the pipeline."""
+    return ProcessingTask.objects.create(
+        task_type="document_processing",
+        document=document,
+        session=session,
+        input_data={
+            "document_id": str(document.pk),
+            "processing_options": options or {},
+        },
+        owner_id=document.owner_id,
+        created_by_id=document.owner_id,
+        modified_by_id=document.owner_id,
+    )
+
+
+def active_processing_task(document: UploadedDocument) -> Optional[ProcessingTask]:
+    """The document's queued or running ProcessingTask, if there is one."""
+    return (
+        document.processing_tasks.filter(
+            status__in=[
+                DocumentProcessingStatusChoices.PENDING,
+                DocumentProcessingStatusChoices.PROCESSING,
+            ]
+        )
+        .order_by("-created_on")
+        .first()
+    )
+
+
+def _result_key(content_hash: str) -> str:
+    return f"result:{content_hash}:{PIPELINE_VERSION}"
+
+
+def cached_result(content_hash: str) -> Optional[Dict[str, Any]]:
+    """Return the processing result for identical content, if there is one."""
+    cache = get_cache("documents")
+    result = cache.get(_result_key(content_hash))
+    if result is not None:
+        return result
+
+    # Evicted, or never cached by this deployment: any completed document
+    # with the same content and pipeline version has the same result
+    source = (
+        UploadedDocument.objects.filter(
+            content_hash=content_hash,
+            processing_status=DocumentProcessingStatusChoices.COMPLETED,
+            processing_metadata__pipeline_version=PIPELINE_VERSION,
+        )
+        .only(*RESULT_FIELDS)
+        .first()
+    )
+    if source is None:
+        return None
+
+    result = {field: getattr(source, field) for field in RESULT_FIELDS}
+    cache.set(_result_key(content_hash), result, settings.DOCUMENT_RESULT_CACHE_TIMEOUT)
+    return result
+
+
+def store_result(document: UploadedDocument) -> None:
+    """Share a completed document's result with later identical uploads."""
+    result = {field: getattr(document, field) for field in RESULT_FIELDS}
+    get_cache("documents").set(
+        _result_key(document.content_hash),
+        result,
+        settings.DOCUMENT_RESULT_CACHE_TIMEOUT,
+    )
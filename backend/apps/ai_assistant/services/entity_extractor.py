@@ -0,0 +1,530 @@
+"""
+Entity extraction engine for ProjectMeats AI Assistant.
+
+Used by ``MockAIProvider`` (and so by every deployment without an AI API
+key) to pull meat-industry entities out of document text and classify it.
+Everything is compiled once at import time:
+
+* a single keyword automaton (a trie-shaped regex) over the product,
+  certification and document-type dictionaries. One pass over the
+  lowercased text finds every keyword occurrence, which gives products,
+  certifications and per-document-type scores together;
+* one quantity pattern covering every product, instead of a search per
+  product found;
+* precompiled pattern banks for suppliers, prices, dates, references,
+  locations, contacts and quality metrics. Banks whose required literal
+  (e.g. "@" for emails) did not turn up in the keyword pass are skipped,
+  and case-insensitive patterns run on the lowercased text (see
+  ``CaselessPattern``).
+
+Results match the original per-keyword implementation exactly. On the
+``benchmark_extraction`` command's documents (20 x 200,000 characters, one
+core) the engine takes about 160 ms per document against 350 ms for the
+original, about 2.2x faster. The pattern banks take most of that time.
+They stay separate scans: a single named-group alternation over all of
+them measured several times slower with Python's ``re``, which then tries
+every branch at every position and loses each pattern's prefix search.
+``analyze_batch`` runs many documents in a process pool.
+"""
+
+import multiprocessing
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+MEAT_PRODUCTS = {
+    "beef": ["ground beef", "ribeye", "sirloin", "chuck", "brisket", "prime rib"],
+    "pork": ["pork chops", "bacon", "ham", "sausage", "pork belly", "tenderloin"],
+    "chicken": ["whole chicken", "chicken breast", "chicken thighs", "wings"],
+    "lamb": ["lamb chops", "leg of lamb", "lamb shoulder"],
+    "turkey": ["whole turkey", "turkey breast", "ground turkey"],
+    "seafood": ["salmon", "shrimp", "lobster", "crab", "tuna"],
+}
+
+CERTIFICATIONS = [
+    "USDA",
+    "FDA",
+    "HACCP",
+    "SQF",
+    "BRC",
+    "ISO",
+    "Organic",
+    "Halal",
+    "Kosher",
+    "SSOP",
+    "GMP",
+    "FSIS",
+    "Non-GMO",
+    "Grass-fed",
+    "Free-range",
+    "Cage-free",
+]
+
+FOOD_SAFETY_CERTIFICATIONS = {"USDA", "FDA", "HACCP", "FSIS"}
+
+# Checked in order: the first type with a keyword in the text wins
+DOCUMENT_TYPE_KEYWORDS = {
+    "purchase_order": [
+        "purchase order",
+        "po number",
+        "order date",
+        "ship to",
+        "bill to",
+    ],
+    "invoice": ["invoice", "bill", "amount due", "payment terms", "remit to"],
+    "contract": ["contract", "agreement", "terms and conditions", "whereas"],
+    "certificate": ["certificate", "inspection", "usda", "haccp", "organic"],
+    "delivery_receipt": ["delivery", "receipt", "shipment", "bol", "bill of lading"],
+    "quality_report": ["quality", "test", "lab", "analysis", "results"],
+}
+
+MONTHS = [
+    "jan",
+    "feb",
+    "mar",
+    "apr",
+    "may",
+    "jun",
+    "jul",
+    "aug",
+    "sep",
+    "oct",
+    "nov",
+    "dec",
+]
+
+# Literals (lowercase) at least one of which every match of a gated pattern
+# contains; the pattern only runs when the keyword pass found one
+PATTERN_GATES = {
+    "premium_supplier": ["prime", "quality", "fresh", "local", "regional", "global"],
+    "price_words": ["dollar", "usd"],
+    "price_per_unit": ["lb", "pound", "kg"],
+    "month_date": MONTHS,
+    "po_reference": ["po", "order"],
+    "invoice_reference": ["inv"],
+    "bill_reference": ["bill", "receipt"],
+    "email": ["@"],
+    "temperature": ["degree", "fahrenheit"],
+    "percentage": ["%", "percent"],
+    "ph_level": ["acidity"],
+    "composition": ["moisture", "fat", "protein"],
+}
+
+
+# Characters ``re.IGNORECASE`` equates with ASCII letters that ``str.lower``
+# doesn't turn into them: dotted capital I, dotless i and long s
+CASE_FOLDED_RE = re.compile("[\u0130\u0131\u017f]")
+
+
+class CaselessPattern:
+    """
+    A case-insensitive pattern, run case-sensitively on lowercased text.
+
+    ``re.IGNORECASE`` slows down every character comparison. Unless the
+    text contains a ``CASE_FOLDED_RE`` character, lowercasing keeps every
+    character's position and the lowercased pattern finds the same spans
+    in the lowercased text; each match's single group is then read from
+    the original text. Other text falls back to the ``IGNORECASE`` pattern.
+    """
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+        self.regex = re.compile(pattern, re.IGNORECASE)
+        self.lower_regex = re.compile(pattern.lower())
+
+    def findall(self, text: str, lowered: Optional[str] = None) -> List[str]:
+        if lowered is None:
+            return self.regex.findall(text)
+        return [
+            text[match.start(1) : match.end(1)]
+            for match in self.lower_regex.finditer(lowered)
+        ]
+
+
+UNIT_PATTERN = r"(\d+(?:\.\d+)?)\s*(?:lbs?|pounds?|kg|kilograms?|tons?)?\s*(?:of\s+)?"
+
+SUPPLIER_PATTERNS = [
+    (
+        None,
+        CaselessPattern(
+            r"([A-Z][a-z]+ "
+            r"(?:Beef|Pork|Meat|Farm|Ranch|Processing|Suppliers?|Inc|LLC|Corp|Co\.?))"
+        ),
+    ),
+    (
+        None,
+        CaselessPattern(
+            r"([A-Z][a-z]+ [A-Z][a-z]+ (?:Farms?|Ranches?|Meat|Processing))"
+        ),
+    ),
+    (
+        "premium_supplier",
+        CaselessPattern(
+            r"((?:Prime|Quality|Fresh|Local|Regional|Global) [A-Z][a-z]+ "
+            r"(?:Suppliers?|Distributors?))"
+        ),
+    ),
+]
+
+PRICE_PATTERNS = [
+    (None, CaselessPattern(r"\$(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)")),
+    (
+        "price_words",
+        CaselessPattern(r"(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)\s*(?:dollars?|USD)"),
+    ),
+    (
+        "price_per_unit",
+        CaselessPattern(r"(\d+(?:\.\d{2})?)\s*/\s*(?:lb|pound|kg)"),
+    ),
+]
+
+DATE_PATTERNS = [
+    (None, CaselessPattern(r"(\d{1,2}[-/]\d{1,2}[-/]\d{4})")),
+    (None, CaselessPattern(r"(\d{4}[-/]\d{1,2}[-/]\d{1,2})")),
+    (
+        "month_date",
+        CaselessPattern(
+            r"((?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*"
+            r"\s+\d{1,2},?\s+\d{4})"
+        ),
+    ),
+]
+
+PO_PATTERNS = [
+    (
+        "po_reference",
+        CaselessPattern(r"(?:PO|Purchase Order|Order)\s*#?\s*([A-Z0-9-]+)"),
+    ),
+    (None, CaselessPattern(r"(\d{4,}-\d{3,})")),
+]
+
+INVOICE_PATTERNS = [
+    (
+        "invoice_reference",
+        CaselessPattern(r"(?:Invoice|INV)\s*#?\s*([A-Z0-9-]+)"),
+    ),
+    (
+        "bill_reference",
+        CaselessPattern(r"(?:Bill|Receipt)\s*#?\s*([A-Z0-9-]+)"),
+    ),
+]
+
+LOCATION_PATTERNS = [
+    (
+        None,
+        re.compile(
+            r"(\d+\s+[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\s+"
+            r"(?:St|Street|Ave|Avenue|Blvd|Boulevard|Rd|Road))"
+        ),
+    ),
+    (None, re.compile(r"([A-Z][a-z]+,\s*[A-Z]{2})")),
+    (None, re.compile(r"([A-Z][a-z]+\s+[A-Z][a-z]+,\s*[A-Z]{2})")),
+]
+
+CONTACT_PATTERNS = [
+    ("email", "email", re.compile(r"([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})")),
+    ("phone", None, re.compile(r"(\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4})")),
+    ("tax_id", None, re.compile(r"(\d{3}-\d{2}-\d{4})")),
+]
+
+# Run against the lowercased text, like the original, so the "°F" and "pH"
+# alternatives never match: "38°F" and "pH 6.2" are not reported
+QUALITY_PATTERNS = [
+    (
+        "temperature",
+        "temperature",
+        re.compile(r"(\d+(?:\.\d+)?)\s*(?:°F|degrees?|fahrenheit)"),
+    ),
+    ("percentage", "percentage", re.compile(r"(\d+(?:\.\d+)?)\s*(?:%|percent)")),
+    ("ph_level", "ph_level", re.compile(r"(?:pH|acidity)\s*:?\s*(\d+(?:\.\d+)?)")),
+    (
+        "composition",
+        "composition",
+        re.compile(r"(?:moisture|fat|protein)\s*:?\s*(\d+(?:\.\d+)?)"),
+    ),
+]
+
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """
+    Build a regex alternation for ``words`` shaped like a prefix trie.
+
+    At any position the pattern matches the longest word starting there,
+    and the engine rejects positions after a single character test instead
+    of trying each word in turn.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    return _node_pattern(trie)
+
+
+def _node_pattern(node: Dict[str, dict]) -> str:
+    is_word = "" in node
+    branches = [
+        re.escape(char) + _node_pattern(child)
+        for char, child in sorted(node.items())
+        if char
+    ]
+    if not branches:
+        return ""
+    if len(branches) == 1 and not is_word:
+        return branches[0]
+    pattern = "(?:" + "|".join(branches) + ")"
+    # Optional tail: greedy, so longer words are preferred
+    return pattern + "?" if is_word else pattern
+
+
+@dataclass
+class ScanResult:
+    """Keyword occurrences found in one pass over a document."""
+
+    counts: Counter = field(default_factory=Counter)
+    document_scores: Dict[str, int] = field(default_factory=dict)
+
+    def has(self, keyword: str) -> bool:
+        return self.counts[keyword] > 0
+
+    def has_any(self, keywords: Iterable[str]) -> bool:
+        return any(self.counts[keyword] for keyword in keywords)
+
+    @property
+    def document_type(self) -> str:
+        """First document type (in priority order) with a keyword present."""
+        for document_type, score in self.document_scores.items():
+            if score:
+                return document_type
+        return "unknown"
+
+
+class ExtractionEngine:
+    """Compiled keyword automaton and pattern banks for entity extraction."""
+
+    def __init__(
+        self,
+        products: Dict[str, List[str]] = MEAT_PRODUCTS,
+        certifications: Sequence[str] = CERTIFICATIONS,
+        document_types: Dict[str, List[str]] = DOCUMENT_TYPE_KEYWORDS,
+        gates: Dict[str, List[str]] = PATTERN_GATES,
+    ):
+        self.products: List[Tuple[str, str]] = [
+            (product, category)
+            for category, names in products.items()
+            for product in names
+        ]
+        self.product_order = {
+            product: index for index, (product, _category) in enumerate(self.products)
+        }
+        self.certifications = list(certifications)
+        self.document_types = {
+            name: list(words) for name, words in document_types.items()
+        }
+        self.gates = gates
+
+        keywords = set(self.product_order)
+        keywords.update(cert.lower() for cert in self.certifications)
+        for words in list(self.document_types.values()) + list(gates.values()):
+            keywords.update(words)
+
+        # A zero-width lookahead visits every position, so keywords inside
+        # or overlapping other keywords are all found. Keywords that are a
+        # prefix of the longest match at a position are credited below.
+        self.keyword_re = re.compile(f"(?=({trie_pattern(keywords)}))")
+        self.implied = {
+            keyword: tuple(other for other in keywords if keyword.startswith(other))
+            for keyword in keywords
+        }
+
+        product_pattern = trie_pattern(self.product_order)
+        self.quantity_re = re.compile(UNIT_PATTERN + f"({product_pattern})")
+        self.product_implied = {
+            product: tuple(
+                other for other in self.product_order if product.startswith(other)
+            )
+            for product in self.product_order
+        }
+
+    def scan(self, text_lower: str) -> ScanResult:
+        """Find every keyword occurrence in lowercased text in one pass."""
+        counts: Counter = Counter()
+        for keyword, count in Counter(self.keyword_re.findall(text_lower)).items():
+            for implied in self.implied[keyword]:
+                counts[implied] += count
+
+        document_scores = {
+            name: sum(counts[word] for word in words)
+            for name, words in self.document_types.items()
+        }
+        return ScanResult(counts=counts, document_scores=document_scores)
+
+    def analyze(self, text: str) -> Dict[str, Any]:
+        """Extract entities and score document types in a single scan."""
+        text_lower = text.lower()
+        scan = self.scan(text_lower)
+        return {
+            "entities": self._extract(text, text_lower, scan),
+            "document_type": scan.document_type,
+            "document_scores": scan.document_scores,
+        }
+
+    def extract_entities(self, text: str) -> Dict[str, Any]:
+        """Extract entities in the format returned by ``MockAIProvider``."""
+        text_lower = text.lower()
+        return self._extract(text, text_lower, self.scan(text_lower))
+
+    def _extract(self, text: str, text_lower: str, scan: ScanResult) -> Dict[str, Any]:
+        entities = {
+            "suppliers": [],
+            "customers": [],
+            "products": [],
+            "quantities": [],
+            "prices": [],
+            "dates": [],
+            "locations": [],
+            "certifications": [],
+            "purchase_orders": [],
+            "invoice_numbers": [],
+            "contact_info": [],
+            "quality_metrics": [],
+            "confidence": 0.85,
+        }
+
+        lowered = None if CASE_FOLDED_RE.search(text) else text_lower
+
+        def matches(bank, subject):
+            for gate, pattern in bank:
+                caseless = isinstance(pattern, CaselessPattern)
+                # The keyword pass can't see case-folded matches ("İnvoice")
+                gated = gate is not None and (lowered is not None or not caseless)
+                if gated and not scan.has_any(self.gates[gate]):
+                    continue
+                if caseless:
+                    yield from pattern.findall(subject, lowered)
+                else:
+                    yield from pattern.findall(subject)
+
+        for name in matches(SUPPLIER_PATTERNS, text):
+            entities["suppliers"].append(
+                {"name": name, "confidence": 0.85, "extracted_from": "pattern_matching"}
+            )
+
+        self._extract_products(text_lower, scan, entities)
+
+        for amount in matches(PRICE_PATTERNS, text):
+            entities["prices"].append(
+                {"amount": amount, "currency": "USD", "confidence": 0.95}
+            )
+
+        for date in matches(DATE_PATTERNS, text):
+            entities["dates"].append(
+                {"date": date, "format": "detected", "confidence": 0.90}
+            )
+
+        for po in matches(PO_PATTERNS, text):
+            entities["purchase_orders"].append({"po_number": po, "confidence": 0.85})
+
+        for invoice in matches(INVOICE_PATTERNS, text):
+            entities["invoice_numbers"].append(
+                {"invoice_number": invoice, "confidence": 0.85}
+            )
+
+        for location in matches(LOCATION_PATTERNS, text):
+            entities["locations"].append(
+                {"location": location, "type": "address", "confidence": 0.80}
+            )
+
+        for cert in self.certifications:
+            if scan.has(cert.lower()):
+                entities["certifications"].append(
+                    {
+                        "certification": cert,
+                        "type": (
+                            "food_safety"
+                            if cert in FOOD_SAFETY_CERTIFICATIONS
+                            else "quality"
+                        ),
+                        "confidence": 0.95,
+                    }
+                )
+
+        for contact_type, gate, pattern in CONTACT_PATTERNS:
+            for contact in matches([(gate, pattern)], text):
+                entities["contact_info"].append(
+                    {"value": contact, "type": contact_type, "confidence": 0.90}
+                )
+
+        for metric_type, gate, pattern in QUALITY_PATTERNS:
+            for metric in matches([(gate, pattern)], text_lower):
+                entities["quality_metrics"].append(
+                    {"value": metric, "type": metric_type, "confidence": 0.85}
+                )
+
+        return entities
+
+    def _extract_products(self, text_lower: str, scan: ScanResult, entities) -> None:
+        """Add products, each preceded by its quantities, in dictionary order."""
+        found = [
+            (product, category)
+            for product, category in self.products
+            if scan.has(product)
+        ]
+        if not found:
+            return
+
+        quantities: Dict[str, List[str]] = {}
+        for match in self.quantity_re.finditer(text_lower):
+            for product in self.product_implied[match.group(2)]:
+                quantities.setdefault(product, []).append(match.group(1))
+
+        for product, category in found:
+            for quantity in quantities.get(product, []):
+                entities["quantities"].append(
+                    {
+                        "product": product.title(),
+                        "quantity": quantity,
+                        "category": category,
+                        "confidence": 0.90,
+                    }
+                )
+            entities["products"].append(
+                {"name": product.title(), "category": category, "confidence": 0.90}
+            )
+
+
+engine = ExtractionEngine()
+
+
+def extract_entities(text: str) -> Dict[str, Any]:
+    """Extract entities from one document with the shared engine."""
+    return engine.extract_entities(text)
+
+
+def analyze(text: str) -> Dict[str, Any]:
+    """Extract entities and document type scores with the shared engine."""
+    return engine.analyze(text)
+
+
+def analyze_batch(
+    texts: Sequence[str], workers: Optional[int] = None, chunksize: int = 4
+) -> List[Dict[str, Any]]:
+    """
+    Analyze many documents, spreading them over a process pool.
+
+    Runs inline for a single document, with ``workers=1``, or inside a
+    daemonic process (such as a Celery prefork worker) that can't start
+    children. Results are returned in input order.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(texts))
+    if workers <= 1 or multiprocessing.current_process().daemon:
+        return [analyze(text) for text in texts]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(analyze, texts, chunksize=chunksize))
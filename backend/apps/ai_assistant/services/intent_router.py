@@ -0,0 +1,278 @@
+"""
+Intent routing for ProjectMeats AI Assistant mock responses.
+
+The intents the mock provider answers are declared in a JSON table
+(``AI_INTENTS_FILE``, by default ``apps/ai_assistant/intents.json``):
+
+* each intent has a ``name``, a ``priority`` (lowest wins), the
+  ``keywords`` that trigger it and a response ``template``;
+* ``slots`` fill template placeholders from terms found in the message:
+  ``{name}`` is the title-cased terms joined with ``separator`` (or
+  ``default``), and ``{name_lower}`` the same text lowercased;
+* ``fallback`` is answered when no keyword matches.
+
+All keywords and slot terms are compiled into a single trie-shaped regex,
+so routing a message is one pass over its text however many intents the
+table holds. The file is checked for changes at most every
+``AI_INTENTS_RELOAD_INTERVAL`` seconds and reloaded in place; a table that
+fails to load is logged and the previous one kept.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from django.conf import settings
+
+from .entity_extractor import trie_pattern
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTENTS_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "intents.json"
+)
+
+
+class IntentTableError(ValueError):
+    """Raised when an intent table is malformed."""
+
+
+@dataclass(frozen=True)
+class Slot:
+    """Template placeholder filled from terms found in the message."""
+
+    name: str
+    terms: Tuple[str, ...]
+    separator: str = ", "
+    default: str = ""
+
+    def render(self, found: FrozenSet[str]) -> Dict[str, str]:
+        terms = [term.title() for term in self.terms if term in found]
+        text = self.separator.join(terms) if terms else self.default
+        return {self.name: text, f"{self.name}_lower": text.lower()}
+
+
+@dataclass(frozen=True)
+class Intent:
+    """One routable intent."""
+
+    name: str
+    priority: int
+    keywords: Tuple[str, ...]
+    template: str
+    slots: Tuple[Slot, ...] = ()
+
+    def render(self, found: FrozenSet[str]) -> str:
+        if not self.slots:
+            return self.template
+        values = {}
+        for slot in self.slots:
+            values.update(slot.render(found))
+        return self.template.format_map(values)
+
+
+@dataclass
+class IntentTable:
+    """A compiled intent table."""
+
+    intents: List[Intent]
+    fallback: str
+    version: Optional[int] = None
+    keyword_re: Optional[re.Pattern] = None
+    implied: Dict[str, Tuple[str, ...]] = field(default_factory=dict)
+    # Keyword -> (rank, intent) of the best intent it triggers
+    routes: Dict[str, Tuple[Tuple[int, int], Intent]] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "IntentTable":
+        """Validate and compile a table loaded from JSON."""
+        if not isinstance(data, dict) or not isinstance(data.get("intents"), list):
+            raise IntentTableError("Intent table needs an 'intents' list")
+
+        intents = []
+        for index, entry in enumerate(data["intents"]):
+            try:
+                slots = tuple(
+                    Slot(
+                        name=name,
+                        terms=tuple(term.lower() for term in spec["terms"]),
+                        separator=spec.get("separator", ", "),
+                        default=spec.get("default", ""),
+                    )
+                    for name, spec in entry.get("slots", {}).items()
+                )
+                intent = Intent(
+                    name=entry["name"],
+                    priority=int(entry.get("priority", 0)),
+                    keywords=tuple(word.lower() for word in entry["keywords"]),
+                    template=_join_template(entry["template"]),
+                    slots=slots,
+                )
+            except (KeyError, TypeError, ValueError) as e:
+                raise IntentTableError(f"Invalid intent at index {index}: {e}")
+            if not intent.keywords or not all(intent.keywords):
+                raise IntentTableError(f"Intent '{intent.name}' has an empty keyword")
+            if slots:
+                _check_placeholders(intent)
+            intents.append(intent)
+
+        fallback = data.get("fallback") or {}
+        table = cls(
+            intents=intents,
+            fallback=_join_template(fallback.get("template", "")),
+            version=data.get("version"),
+        )
+        table.compile()
+        return table
+
+    def compile(self) -> None:
+        # Equal priorities are settled by table order
+        routes: Dict[str, Tuple[Tuple[int, int], Intent]] = {}
+        for index, intent in enumerate(self.intents):
+            rank = (intent.priority, index)
+            for keyword in intent.keywords:
+                if keyword not in routes or rank < routes[keyword][0]:
+                    routes[keyword] = (rank, intent)
+        self.routes = routes
+
+        words = set(routes)
+        for intent in self.intents:
+            for slot in intent.slots:
+                words.update(slot.terms)
+
+        # A lookahead at every position finds overlapping occurrences; each
+        # match also implies the shorter words it starts with
+        self.keyword_re = re.compile(f"(?=({trie_pattern(words)}))") if words else None
+        self.implied = {
+            word: tuple(other for other in words if word.startswith(other))
+            for word in words
+        }
+
+    def scan(self, text_lower: str) -> FrozenSet[str]:
+        """Return every keyword and slot term occurring in lowercased text."""
+        if self.keyword_re is None:
+            return frozenset()
+        found = set()
+        for word in set(self.keyword_re.findall(text_lower)):
+            found.update(self.implied[word])
+        return frozenset(found)
+
+    def match(self, message: str) -> Tuple[Optional[Intent], FrozenSet[str]]:
+        """Return the best intent for ``message`` and the words found in it."""
+        found = self.scan(message.lower())
+        routes = [self.routes[word] for word in found if word in self.routes]
+        intent = min(routes, key=lambda route: route[0])[1] if routes else None
+        return intent, found
+
+    def respond(self, message: str) -> str:
+        intent, found = self.match(message)
+        if intent is None:
+            return self.fallback
+        return intent.render(found)
+
+
+class IntentRouter:
+    """Routes messages with the intent table from ``AI_INTENTS_FILE``."""
+
+    def __init__(self, path: Optional[str] = None):
+        self._path = path
+        self._table: Optional[IntentTable] = None
+        self._loaded_path: Optional[str] = None
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> str:
+        return (
+            self._path
+            or getattr(settings, "AI_INTENTS_FILE", None)
+            or DEFAULT_INTENTS_FILE
+        )
+
+    @property
+    def table(self) -> IntentTable:
+        """The current table, reloaded first if the file has changed."""
+        path = self.path
+        table = self._table
+        interval = settings.AI_INTENTS_RELOAD_INTERVAL
+        if (
+            table is None
+            or path != self._loaded_path
+            or time.monotonic() - self._checked_at >= interval
+        ):
+            table = self._refresh(path)
+        return table
+
+    def route(self, message: str) -> str:
+        """Return the templated response for ``message``."""
+        return self.table.respond(message)
+
+    def match(self, message: str) -> Optional[Intent]:
+        """Return the intent ``message`` is routed to, or None for the fallback."""
+        return self.table.match(message)[0]
+
+    def reload(self) -> IntentTable:
+        """Load the table now, whether or not the file has changed."""
+        path = self.path
+        with self._lock:
+            self._mtime = None
+            return self._load(path)
+
+    def _refresh(self, path: str) -> IntentTable:
+        with self._lock:
+            if self._table is not None and path == self._loaded_path:
+                self._checked_at = time.monotonic()
+                try:
+                    if os.path.getmtime(path) == self._mtime:
+                        return self._table
+                except OSError as e:
+                    logger.error(f"Cannot read intent table {path}: {str(e)}")
+                    return self._table
+            return self._load(path)
+
+    def _load(self, path: str) -> IntentTable:
+        self._checked_at = time.monotonic()
+        try:
+            mtime = os.path.getmtime(path)
+            with open(path, encoding="utf-8") as f:
+                table = IntentTable.from_dict(json.load(f))
+        except (OSError, ValueError) as e:
+            if self._table is None:
+                raise
+            logger.error(f"Keeping previous intent table; {path} failed: {str(e)}")
+            return self._table
+
+        if self._table is not None:
+            logger.info(f"Reloaded intent table from {path}")
+        # Publish the compiled table in one assignment
+        self._table = table
+        self._loaded_path = path
+        self._mtime = mtime
+        return table
+
+
+def _join_template(template) -> str:
+    if isinstance(template, list):
+        return "\n".join(template)
+    if not isinstance(template, str):
+        raise TypeError("template must be a string or a list of lines")
+    return template
+
+
+def _check_placeholders(intent: Intent) -> None:
+    names = {}
+    for slot in intent.slots:
+        names.update(dict.fromkeys([slot.name, f"{slot.name}_lower"], ""))
+    try:
+        intent.template.format_map(names)
+    except (KeyError, IndexError, ValueError) as e:
+        raise IntentTableError(f"Intent '{intent.name}' has a bad placeholder: {e}")
+
+
+router = IntentRouter()
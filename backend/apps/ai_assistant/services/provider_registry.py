@@ -0,0 +1,177 @@
+"""
+Long-lived AI provider instances for ProjectMeats AI Assistant.
+
+Building a provider can be expensive: ``OpenAIProvider`` creates an SDK
+client with its own HTTP connection pool. ``ProviderRegistry`` keeps one
+provider per ``AIConfiguration`` for the life of the process and rebuilds
+it only when the configuration changes (its ``updated_at`` moves on).
+
+Each configuration also gets a semaphore bounding how many upstream calls
+one worker process makes at once (``AI_PROVIDER_MAX_CONCURRENCY``). Callers
+that can't get a slot within ``AI_PROVIDER_ACQUIRE_TIMEOUT`` seconds get a
+``ProviderBusyError`` instead of opening another connection.
+
+Calls made inside ``use()`` count as users of the provider. A provider that
+is replaced or discarded while other threads are still using it is closed
+when the last of them finishes, not in the middle of their requests.
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderBusyError(Exception):
+    """Raised when a provider has no free concurrency slot."""
+
+
+class ProviderRegistry:
+    """Process-wide cache of provider instances and their concurrency limits."""
+
+    def __init__(self, factories: Dict[str, Callable[[Any], Any]], default_factory):
+        self.factories = factories
+        self.default_factory = default_factory
+        self._providers: Dict[Hashable, Tuple[Hashable, Any]] = {}
+        self._semaphores: Dict[Hashable, threading.BoundedSemaphore] = {}
+        # Threads inside use() per provider, and replaced providers still in use
+        self._users: Dict[int, int] = {}
+        self._retired: Dict[int, Any] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def config_key(config) -> Hashable:
+        """Identify a configuration; unsaved configurations are keyed by value."""
+        if config.pk is not None:
+            return config.pk
+        return ("unsaved", config.provider, config.model_name, config.api_endpoint)
+
+    @staticmethod
+    def config_version(config) -> Hashable:
+        return (config.updated_at, config.provider, config.model_name)
+
+    def get(self, config):
+        """
+        Return the provider for ``config``, building it on first use.
+
+        Make requests inside ``use()`` instead, so the provider isn't closed
+        by a configuration change in the middle of them.
+        """
+        entry = self._providers.get(self.config_key(config))
+        if entry is not None and entry[0] == self.config_version(config):
+            return entry[1]
+
+        with self._lock:
+            provider, stale = self._current(config)
+        self._close(stale)
+        return provider
+
+    @contextmanager
+    def use(self, config, timeout: Optional[float] = None):
+        """Hold a concurrency slot and the provider for ``config``."""
+        with self.limit(config, timeout):
+            with self._lock:
+                provider, stale = self._current(config)
+                self._users[id(provider)] = self._users.get(id(provider), 0) + 1
+            self._close(stale)
+            try:
+                yield provider
+            finally:
+                self._release(provider)
+
+    @contextmanager
+    def limit(self, config, timeout: Optional[float] = None):
+        """Hold one of the configuration's concurrency slots."""
+        semaphore = self._semaphore(self.config_key(config))
+        if timeout is None:
+            timeout = settings.AI_PROVIDER_ACQUIRE_TIMEOUT
+        if not semaphore.acquire(timeout=timeout):
+            raise ProviderBusyError(
+                f"AI provider '{config.provider}' is at its concurrency limit"
+            )
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+    def discard(self, config) -> None:
+        """Drop the provider for a configuration, e.g. after it is deleted."""
+        key = self.config_key(config)
+        with self._lock:
+            entry = self._providers.pop(key, None)
+            stale = self._retire(entry[1]) if entry is not None else None
+        self._close(stale)
+
+    def clear(self) -> None:
+        """Drop every provider and semaphore."""
+        with self._lock:
+            stale = [self._retire(provider) for _, provider in self._providers.values()]
+            self._providers.clear()
+            self._semaphores.clear()
+        for provider in stale:
+            self._close(provider)
+
+    def _current(self, config) -> Tuple[Any, Any]:
+        """
+        Return the provider for ``config`` and a replaced one to close.
+
+        Called with the lock held.
+        """
+        key = self.config_key(config)
+        version = self.config_version(config)
+        entry = self._providers.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1], None
+
+        factory = self.factories.get(config.provider, self.default_factory)
+        provider = factory(config)
+        self._providers[key] = (version, provider)
+        if entry is None:
+            return provider, None
+        logger.info(f"Rebuilt AI provider for configuration {key}")
+        return provider, self._retire(entry[1])
+
+    def _retire(self, provider):
+        """
+        Return ``provider`` if it can be closed now; if it is still in use,
+        keep it until its last user releases it. Called with the lock held.
+        """
+        if self._users.get(id(provider)):
+            self._retired[id(provider)] = provider
+            return None
+        return provider
+
+    def _release(self, provider) -> None:
+        with self._lock:
+            users = self._users.pop(id(provider)) - 1
+            if users:
+                self._users[id(provider)] = users
+                return
+            retired = self._retired.pop(id(provider), None)
+        self._close(retired)
+
+    def _semaphore(self, key: Hashable) -> threading.BoundedSemaphore:
+        semaphore = self._semaphores.get(key)
+        if semaphore is None:
+            with self._lock:
+                semaphore = self._semaphores.setdefault(
+                    key,
+                    threading.BoundedSemaphore(settings.AI_PROVIDER_MAX_CONCURRENCY),
+                )
+        return semaphore
+
+    @staticmethod
+    def _close(provider) -> None:
+        if provider is None:
+            return
+        close = getattr(provider, "close", None)
+        if close is None:
+            return
+        try:
+            close()
+        except Exception as e:
+            logger.warning(f"Error closing AI provider: {str(e)}")
@@ -0,0 +1,317 @@
+"""
+Text extraction for documents uploaded to ProjectMeats AI Assistant.
+
+Extractors are registered per file extension with ``register_extractor``:
+
+* ``txt`` / ``csv``: streamed in chunks and decoded incrementally;
+* ``pdf``: page text via the pure-Python ``pypdf`` parser, reporting
+  progress after each batch of pages;
+* ``jpg`` / ``jpeg`` / ``png``: local OCR with ``pytesseract`` when
+  ``DOCUMENT_OCR_ENABLED`` is set.
+
+Parsing runs in a bounded process pool (``DOCUMENT_EXTRACTION_WORKERS``)
+whose workers are capped at ``DOCUMENT_EXTRACTION_MEMORY_MB`` of extra
+memory, so a large or malformed file never parses on a web request thread.
+Each file is one worker task; its progress reports come back through a
+manager queue. Workers are started with ``spawn`` rather than forked:
+forking a threaded gunicorn worker copies locks other threads may hold
+(logging, database connections) into the child. Inside a daemonic process
+(a Celery prefork worker, which is already off the request path) parsing
+runs inline. Extracted text is capped at ``DOCUMENT_TEXT_MAX_CHARS``
+characters.
+"""
+
+import codecs
+import logging
+import multiprocessing
+import os
+import queue
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+# Bytes read from a file at a time
+CHUNK_SIZE = 64 * 1024
+
+# PDF pages parsed between progress reports
+PAGES_PER_BATCH = 10
+
+# Seconds between checks that a worker task is done while relaying progress
+PROGRESS_POLL_INTERVAL = 0.1
+
+
+class ExtractionError(Exception):
+    """Raised when text cannot be extracted from a file."""
+
+
+@dataclass
+class ExtractionResult:
+    """Text extracted from a file."""
+
+    text: str
+    method: str
+    pages: int = 0
+    truncated: bool = False
+
+    def as_metadata(self) -> Dict[str, Any]:
+        return {
+            "method": self.method,
+            "pages": self.pages,
+            "characters": len(self.text),
+            "truncated": self.truncated,
+        }
+
+
+Progress = Callable[[int, int], None]
+
+Extractor = Callable[[str, int, Dict[str, Any], Progress], ExtractionResult]
+
+EXTRACTORS: Dict[str, Extractor] = {}
+
+
+def register_extractor(*extensions: str):
+    """
+    Register an extractor for file extensions.
+
+    Extractors are called in a worker process as
+    ``extractor(path, max_chars, options, on_progress)`` and must be
+    module-level functions that don't touch the database. Paged formats
+    call ``on_progress(pages_done, total_pages)`` as they go.
+    """
+
+    def decorator(func: Extractor) -> Extractor:
+        for extension in extensions:
+            EXTRACTORS[extension.lower()] = func
+        return func
+
+    return decorator
+
+
+@register_extractor("txt", "csv")
+def extract_plain_text(path, max_chars, options, on_progress) -> ExtractionResult:
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    parts = []
+    length = 0
+    truncated = False
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            text = decoder.decode(chunk, final=not chunk)
+            if length + len(text) > max_chars:
+                parts.append(text[: max_chars - length])
+                truncated = True
+                break
+            parts.append(text)
+            length += len(text)
+            if not chunk:
+                break
+    return ExtractionResult(text="".join(parts), method="text", truncated=truncated)
+
+
+@register_extractor("pdf")
+def extract_pdf(path, max_chars, options, on_progress) -> ExtractionResult:
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise ExtractionError("PDF extraction requires the pypdf library")
+
+    reader = PdfReader(path)
+    total = len(reader.pages)
+    batch = options.get("pages_per_batch", PAGES_PER_BATCH)
+
+    parts = []
+    length = 0
+    for number, page in enumerate(reader.pages, 1):
+        text = page.extract_text() or ""
+        if length + len(text) > max_chars:
+            # The page separator may already have used up the budget
+            remaining = max_chars - length
+            if remaining > 0:
+                parts.append(text[:remaining])
+            on_progress(total, total)
+            return ExtractionResult(
+                text="\n".join(parts), method="pdf", pages=total, truncated=True
+            )
+        parts.append(text)
+        length += len(text) + 1
+        if number % batch == 0 or number == total:
+            on_progress(number, total)
+
+    return ExtractionResult(text="\n".join(parts), method="pdf", pages=total)
+
+
+@register_extractor("jpg", "jpeg", "png")
+def extract_image(path, max_chars, options, on_progress) -> ExtractionResult:
+    if not options.get("ocr"):
+        return ExtractionResult(text="", method="ocr_disabled")
+    try:
+        import pytesseract
+        from PIL import Image
+    except ImportError:
+        raise ExtractionError("OCR requires the pytesseract library")
+
+    with Image.open(path) as image:
+        text = pytesseract.image_to_string(image)
+    return ExtractionResult(
+        text=text[:max_chars], method="ocr", truncated=len(text) > max_chars
+    )
+
+
+def extract_text(
+    file, extension: str, on_progress: Optional[Callable[[int, int], None]] = None
+) -> ExtractionResult:
+    """
+    Extract the text of a stored file.
+
+    Args:
+        file: ``FieldFile`` of the uploaded document
+        extension: File extension choosing the extractor
+        on_progress: Called with (pages done, total pages) after each batch
+            of pages, on the calling thread
+
+    Returns:
+        ExtractionResult for the whole file; unsupported types give empty
+        text with method ``unsupported``
+    """
+    extractor = EXTRACTORS.get(extension.lower().lstrip("."))
+    if extractor is None:
+        return ExtractionResult(text="", method="unsupported")
+
+    options = {"ocr": settings.DOCUMENT_OCR_ENABLED}
+    with local_path(file) as path:
+        return _run(
+            extractor,
+            path,
+            settings.DOCUMENT_TEXT_MAX_CHARS,
+            options,
+            on_progress or _ignore_progress,
+        )
+
+
+@contextmanager
+def local_path(file):
+    """Yield a local path for a stored file, copying remote files in chunks."""
+    try:
+        path = file.path
+    except NotImplementedError:
+        path = None
+    if path is not None:
+        yield path
+        return
+
+    suffix = os.path.splitext(file.name)[1]
+    with tempfile.NamedTemporaryFile(suffix=suffix) as copy:
+        with file.open("rb") as source:
+            shutil.copyfileobj(source, copy, CHUNK_SIZE)
+        copy.flush()
+        yield copy.name
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_manager = None
+_pool_lock = threading.Lock()
+
+
+def _ignore_progress(pages_done: int, pages: int) -> None:
+    pass
+
+
+def _run(extractor, path, max_chars, options, on_progress) -> ExtractionResult:
+    executor = _executor()
+    if executor is None:
+        return extractor(path, max_chars, options, on_progress)
+    pool, manager = executor
+    try:
+        progress = manager.Queue()
+        future = pool.submit(_extract, extractor, path, max_chars, options, progress)
+        while True:
+            finished = future.done()
+            try:
+                report = progress.get(
+                    block=not finished, timeout=PROGRESS_POLL_INTERVAL
+                )
+            except queue.Empty:
+                # Reports are queued before the task returns, so none are left
+                if finished:
+                    return future.result()
+                continue
+            on_progress(*report)
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory): start a fresh pool next time
+        shutdown_pool()
+        raise ExtractionError("Text extraction worker exited unexpectedly")
+
+
+def _extract(extractor, path, max_chars, options, progress) -> ExtractionResult:
+    """Run ``extractor`` in a worker, queueing its progress reports."""
+    return extractor(
+        path, max_chars, options, lambda done, pages: progress.put((done, pages))
+    )
+
+
+def _executor() -> Optional[Tuple[ProcessPoolExecutor, Any]]:
+    """The extraction pool and its progress queue manager, started on first use."""
+    global _pool, _manager
+    workers = settings.DOCUMENT_EXTRACTION_WORKERS
+    if workers <= 0 or multiprocessing.current_process().daemon:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            context = multiprocessing.get_context("spawn")
+            _manager = context.Manager()
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=context,
+                initializer=_limit_memory,
+                initargs=(settings.DOCUMENT_EXTRACTION_MEMORY_MB,),
+            )
+        return _pool, _manager
+
+
+def shutdown_pool() -> None:
+    """Stop the extraction workers; a new pool is started on next use."""
+    global _pool, _manager
+    with _pool_lock:
+        pool, _pool = _pool, None
+        manager, _manager = _manager, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+    if manager is not None:
+        manager.shutdown()
+
+
+def _limit_memory(megabytes: int) -> None:
+    """Cap a worker's address space at its size now plus ``megabytes``."""
+    if megabytes <= 0:
+        return
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - not available on Windows
+        return
+    try:
+        with open("/proc/self/statm") as f:
+            current = int(f.read().split()[0]) * resource.getpagesize()
+    except (OSError, ValueError):
+        current = 0
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    limit = current + megabytes * 1024 * 1024
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+@receiver(setting_changed)
+def _reset_on_setting_change(setting, **kwargs):
+    if setting in ("DOCUMENT_EXTRACTION_WORKERS", "DOCUMENT_EXTRACTION_MEMORY_MB"):
+        shutdown_pool()
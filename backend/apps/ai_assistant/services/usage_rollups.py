@@ -0,0 +1,311 @@
+"""
+Usage analytics rollups for ProjectMeats AI Assistant.
+
+``rollup_usage`` folds new ``UsageAnalytics`` rows into hourly and daily
+``UsageRollup`` rows (per action type, provider and model). Each run reads
+only rows written (``recorded_at``) since the previous run, up to
+``ANALYTICS_ROLLUP_LAG`` seconds ago so rows still being committed are not
+missed, and aggregates them by the hour they were created in with a single
+grouped query. Events the analytics buffer writes late, e.g. after a
+database outage, are added to the hours they belong to.
+
+``purge_usage_analytics`` deletes raw rows older than
+``ANALYTICS_RETENTION_DAYS`` in batches, never touching rows that have not
+been rolled up yet.
+"""
+
+import logging
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from ..models import RollupPeriodChoices, UsageAnalytics, UsageRollup, UsageRollupState
+
+logger = logging.getLogger(__name__)
+
+STATE_NAME = "usage_analytics"
+
+# Upper bounds (seconds) of the processing time histogram buckets; the last
+# bucket counts everything slower. Changing these invalidates stored rollups.
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+TOTAL_FIELDS = ("count", "success_count", "tokens_used", "processing_time_total")
+
+
+def rollup_usage(now=None) -> int:
+    """
+    Fold rows written since the previous run into the rollups.
+
+    Returns:
+        Number of raw rows rolled up
+    """
+    end = (now or timezone.now()) - timedelta(seconds=settings.ANALYTICS_ROLLUP_LAG)
+
+    with transaction.atomic():
+        state = _locked_state(end)
+        if state is None:
+            return 0
+
+        start = state.processed_through
+        if start >= end:
+            return 0
+
+        groups = _aggregate(start, end)
+        _apply(groups)
+
+        state.processed_through = end
+        state.save(update_fields=["processed_through"])
+
+    rows = sum(group["count"] for group in groups)
+    logger.info(f"Rolled up {rows} usage analytics rows up to {end.isoformat()}")
+    return rows
+
+
+def purge_usage_analytics(now=None) -> int:
+    """
+    Delete raw rows past the retention window, in batches.
+
+    Returns:
+        Number of rows deleted
+    """
+    cutoff = (now or timezone.now()) - timedelta(days=settings.ANALYTICS_RETENTION_DAYS)
+    state = UsageRollupState.objects.filter(name=STATE_NAME).first()
+    if state is None:
+        return 0
+    expired = UsageAnalytics.objects.filter(
+        created_at__lt=cutoff, recorded_at__lt=state.processed_through
+    )
+
+    batch_size = settings.ANALYTICS_PURGE_BATCH_SIZE
+    deleted = 0
+    while True:
+        batch = list(expired.values_list("pk", flat=True)[:batch_size])
+        if not batch:
+            break
+        # Analytics rows have no dependent relations or signal receivers, so
+        # each batch is deleted by one statement without loading it
+        count, _ = UsageAnalytics.objects.filter(pk__in=batch).delete()
+        deleted += count
+
+    if deleted:
+        logger.info(
+            f"Purged {deleted} usage analytics rows before {cutoff.isoformat()}"
+        )
+    return deleted
+
+
+def _locked_state(end) -> Optional[UsageRollupState]:
+    """
+    Lock and return the rollup state, creating it on the first run.
+
+    The lock keeps concurrent runs from counting rows twice. Returns None
+    while no rows were written before ``end``.
+    """
+    states = UsageRollupState.objects.select_for_update()
+    state = states.filter(name=STATE_NAME).first()
+    if state is not None:
+        return state
+    first = (
+        UsageAnalytics.objects.order_by("recorded_at")
+        .values_list("recorded_at", flat=True)
+        .first()
+    )
+    if first is None or first >= end:
+        return None
+    # Another first run may create the row meanwhile; then wait for its lock
+    UsageRollupState.objects.get_or_create(
+        name=STATE_NAME, defaults={"processed_through": first}
+    )
+    return states.get(name=STATE_NAME)
+
+
+def percentile(buckets: List[int], quantile: float) -> Optional[float]:
+    """
+    Estimate a processing time quantile from histogram bucket counts.
+
+    Interpolates linearly inside the bucket holding the quantile; a quantile
+    in the overflow bucket is reported as the largest bucket bound.
+    """
+    total = sum(buckets)
+    if not total:
+        return None
+    rank = quantile * total
+    seen = 0
+    for index, count in enumerate(buckets):
+        if count and seen + count >= rank:
+            if index >= len(LATENCY_BUCKETS):
+                return float(LATENCY_BUCKETS[-1])
+            lower = LATENCY_BUCKETS[index - 1] if index else 0.0
+            upper = LATENCY_BUCKETS[index]
+            return lower + (upper - lower) * (rank - seen) / count
+        seen += count
+    return float(LATENCY_BUCKETS[-1])
+
+
+def summarize(rollups: Iterable[UsageRollup]) -> List[Dict]:
+    """Combine rollups into one summary per action type, provider and model."""
+    combined: Dict[Tuple[str, str, str], Dict] = {}
+    for rollup in rollups:
+        key = (rollup.action_type, rollup.ai_provider, rollup.ai_model)
+        entry = combined.setdefault(key, _empty_totals())
+        _add(entry, _totals(rollup))
+
+    summaries = []
+    for (action_type, provider, model), entry in sorted(combined.items()):
+        count = entry["count"]
+        summaries.append(
+            {
+                "action_type": action_type,
+                "ai_provider": provider,
+                "ai_model": model,
+                "count": count,
+                "success_rate": entry["success_count"] / count if count else 0.0,
+                "tokens_used": entry["tokens_used"],
+                "avg_processing_time": (
+                    entry["processing_time_total"] / count if count else None
+                ),
+                "p50_processing_time": percentile(entry["latency_buckets"], 0.5),
+                "p95_processing_time": percentile(entry["latency_buckets"], 0.95),
+                "p99_processing_time": percentile(entry["latency_buckets"], 0.99),
+            }
+        )
+    return summaries
+
+
+def _aggregate(start, end) -> List[Dict]:
+    """Hourly totals for rows written in [start, end), in one query."""
+    histogram = {}
+    lower = None
+    for index, upper in enumerate(LATENCY_BUCKETS):
+        condition = Q(processing_time__lte=upper)
+        if lower is not None:
+            condition &= Q(processing_time__gt=lower)
+        histogram[f"bucket_{index}"] = Count("pk", filter=condition)
+        lower = upper
+    histogram[f"bucket_{len(LATENCY_BUCKETS)}"] = Count(
+        "pk", filter=Q(processing_time__gt=lower)
+    )
+
+    rows = (
+        UsageAnalytics.objects.filter(recorded_at__gte=start, recorded_at__lt=end)
+        .annotate(hour=TruncHour("created_at"))
+        .values("hour", "action_type", "ai_provider", "ai_model")
+        .annotate(
+            count=Count("pk"),
+            success_count=Count("pk", filter=Q(success=True)),
+            tokens_used=Sum("tokens_used"),
+            processing_time_total=Sum("processing_time"),
+            **histogram,
+        )
+        .order_by()
+    )
+
+    groups = []
+    for row in rows:
+        row["latency_buckets"] = [
+            row.pop(f"bucket_{index}") for index in range(len(LATENCY_BUCKETS) + 1)
+        ]
+        row["tokens_used"] = row["tokens_used"] or 0
+        row["processing_time_total"] = row["processing_time_total"] or 0.0
+        groups.append(row)
+    return groups
+
+
+def _apply(groups: List[Dict]) -> None:
+    """Add hourly totals to the hour and day rollups."""
+    increments: Dict[Tuple, Dict] = {}
+    for group in groups:
+        hour = group["hour"]
+        day = timezone.localtime(hour).replace(hour=0, minute=0, second=0)
+        dimensions = (group["action_type"], group["ai_provider"], group["ai_model"])
+        for period, bucket_start in (
+            (RollupPeriodChoices.HOUR, hour),
+            (RollupPeriodChoices.DAY, day),
+        ):
+            key = (period, bucket_start) + dimensions
+            _add(increments.setdefault(key, _empty_totals()), group)
+
+    if not increments:
+        return
+
+    existing = {}
+    lookup = Q()
+    for period in RollupPeriodChoices.values:
+        starts = {key[1] for key in increments if key[0] == period}
+        if starts:
+            lookup |= Q(period=period, bucket_start__in=starts)
+    for rollup in UsageRollup.objects.filter(lookup):
+        existing[_key(rollup)] = rollup
+
+    to_create, to_update = [], []
+    for key, totals in increments.items():
+        rollup = existing.get(key)
+        if rollup is None:
+            period, bucket_start, action_type, provider, model = key
+            rollup = UsageRollup(
+                period=period,
+                bucket_start=bucket_start,
+                action_type=action_type,
+                ai_provider=provider,
+                ai_model=model,
+                latency_buckets=[0] * (len(LATENCY_BUCKETS) + 1),
+            )
+            to_create.append(rollup)
+        else:
+            # bulk_update doesn't apply auto_now
+            rollup.updated_at = timezone.now()
+            to_update.append(rollup)
+        for field in TOTAL_FIELDS:
+            setattr(rollup, field, getattr(rollup, field) + totals[field])
+        rollup.latency_buckets = _merge(
+            rollup.latency_buckets, totals["latency_buckets"]
+        )
+
+    UsageRollup.objects.bulk_create(to_create)
+    UsageRollup.objects.bulk_update(
+        to_update, [*TOTAL_FIELDS, "latency_buckets", "updated_at"]
+    )
+
+
+def _key(rollup: UsageRollup) -> Tuple:
+    return (
+        rollup.period,
+        rollup.bucket_start,
+        rollup.action_type,
+        rollup.ai_provider,
+        rollup.ai_model,
+    )
+
+
+def _empty_totals() -> Dict:
+    totals = dict.fromkeys(TOTAL_FIELDS, 0)
+    totals["latency_buckets"] = [0] * (len(LATENCY_BUCKETS) + 1)
+    return totals
+
+
+def _totals(rollup: UsageRollup) -> Dict:
+    totals = {field: getattr(rollup, field) for field in TOTAL_FIELDS}
+    totals["latency_buckets"] = rollup.latency_buckets
+    return totals
+
+
+def _add(totals: Dict, increment: Dict) -> None:
+    for field in TOTAL_FIELDS:
+        totals[field] += increment[field]
+    totals["latency_buckets"] = _merge(
+        totals["latency_buckets"], increment["latency_buckets"]
+    )
+
+
+def _merge(left: List[int], right: List[int]) -> List[int]:
+    size = max(len(left), len(right))
+    left = list(left) + [0] * (size - len(left))
+    return [
+        count + (right[index] if index < len(right) else 0)
+        for index, count in enumerate(left)
+    ]
@@ -0,0 +1,111 @@
+"""
+Celery tasks for AI Assistant background processing.
+
+Uploaded documents are processed by an extraction -> classification ->
+entity-extraction chain executed by the ``celery -A projectmeats worker``
+service. With ``CELERY_TASK_ALWAYS_EAGER`` (the default when no broker is
+configured, and in tests) the chain runs inline instead.
+
+Usage analytics rollup and purge tasks are run periodically by celery beat
+(``CELERY_BEAT_SCHEDULE``).
+"""
+
+import logging
+from typing import Any, Dict, Optional
+
+from django.db import transaction
+
+from .models import ProcessingTask, UploadedDocument
+from .services import usage_rollups
+from .services.document_processor import DocumentProcessor, create_processing_task
+
+logger = logging.getLogger(__name__)
+
+try:
+    from celery import chain, shared_task
+
+    CELERY_AVAILABLE = True
+except ImportError:  # pragma: no cover - Celery is a production dependency
+    CELERY_AVAILABLE = False
+
+    def shared_task(*args, **kwargs):
+        """Fallback decorator so tasks remain plain callables without Celery."""
+
+        def decorator(func):
+            return func
+
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return decorator
+
+
+@shared_task(ignore_result=True)
+def extract_document_text(task_id: str) -> Optional[str]:
+    """Stage 1: extract text from the uploaded file."""
+    if DocumentProcessor(task_id).run_stage("extraction"):
+        return task_id
+    return None
+
+
+@shared_task(ignore_result=True)
+def classify_document(task_id: Optional[str]) -> Optional[str]:
+    """Stage 2: classify the document type from its text."""
+    if task_id and DocumentProcessor(task_id).run_stage("classification"):
+        return task_id
+    return None
+
+
+@shared_task(ignore_result=True)
+def extract_document_entities(task_id: Optional[str]) -> Optional[str]:
+    """Stage 3: extract business entities and complete the task."""
+    if task_id and DocumentProcessor(task_id).run_stage("entities"):
+        return task_id
+    return None
+
+
+def run_document_pipeline(task_id) -> None:
+    """Dispatch the processing chain for a ProcessingTask."""
+    task_id = str(task_id)
+    if not CELERY_AVAILABLE:
+        extract_document_entities(classify_document(extract_document_text(task_id)))
+        return
+
+    pipeline = chain(
+        extract_document_text.si(task_id),
+        classify_document.s(),
+        extract_document_entities.s(),
+    )
+    try:
+        pipeline.apply_async()
+    except Exception as e:
+        # Broker unavailable: leave a failed task rather than a pending one
+        logger.error(f"Could not queue document processing task {task_id}: {str(e)}")
+        DocumentProcessor(task_id).fail("queue", e)
+
+
+def queue_document_processing(
+    document: UploadedDocument,
+    session=None,
+    options: Optional[Dict[str, Any]] = None,
+) -> ProcessingTask:
+    """
+    Create a ProcessingTask for a document and queue the pipeline.
+
+    The chain is dispatched once the surrounding transaction commits, so
+    workers never see a task row that isn't there yet.
+    """
+    task = create_processing_task(document, session=session, options=options)
+    transaction.on_commit(lambda: run_document_pipeline(task.pk))
+    return task
+
+
+@shared_task(ignore_result=True)
+def rollup_usage_analytics() -> int:
+    """Fold new usage analytics rows into the hourly and daily rollups."""
+    return usage_rollups.rollup_usage()
+
+
+@shared_task(ignore_result=True)
+def purge_usage_analytics() -> int:
+    """Delete raw usage analytics rows past the retention window."""
+    return usage_rollups.purge_usage_analytics()
@@ -0,0 +1,263 @@
+"""
+Test support for the AI Assistant.
+
+The entity extraction and document classification from before the
+extraction engine (``services/entity_extractor.py``). The tests check the
+engine's results against it and the ``benchmark_extraction`` command
+times it as the baseline. Nothing else should import it.
+"""
+
+import re
+from typing import Any, Dict
+
+DOCUMENT_TYPE_WORDS = [
+    (
+        "purchase_order",
+        ["purchase order", "po number", "order date", "ship to", "bill to"],
+    ),
+    ("invoice", ["invoice", "bill", "amount due", "payment terms", "remit to"]),
+    ("contract", ["contract", "agreement", "terms and conditions", "whereas"]),
+    ("certificate", ["certificate", "inspection", "usda", "haccp", "organic"]),
+    ("delivery_receipt", ["delivery", "receipt", "shipment", "bol", "bill of lading"]),
+    ("quality_report", ["quality", "test", "lab", "analysis", "results"]),
+]
+
+
+def legacy_document_type(text: str) -> str:
+    """Document type chosen by the original ``classify_document`` checks."""
+    text_lower = text.lower()
+    for document_type, words in DOCUMENT_TYPE_WORDS:
+        if any(word in text_lower for word in words):
+            return document_type
+    return "unknown"
+
+
+def legacy_extract_entities(text: str) -> Dict[str, Any]:
+    """``MockAIProvider.extract_entities`` before the extraction engine."""
+    entities = {
+        "suppliers": [],
+        "customers": [],
+        "products": [],
+        "quantities": [],
+        "prices": [],
+        "dates": [],
+        "locations": [],
+        "certifications": [],
+        "purchase_orders": [],
+        "invoice_numbers": [],
+        "contact_info": [],
+        "quality_metrics": [],
+        "confidence": 0.85,
+    }
+
+    # Simple keyword-based extraction for demo with enhanced patterns
+    text_lower = text.lower()
+
+    # Extract potential suppliers with more sophisticated patterns
+    supplier_patterns = [
+        r"([A-Z][a-z]+ "
+        r"(?:Beef|Pork|Meat|Farm|Ranch|Processing|Suppliers?|Inc|LLC|Corp|Co\.?))",
+        r"([A-Z][a-z]+ [A-Z][a-z]+ (?:Farms?|Ranches?|Meat|Processing))",
+        r"((?:Prime|Quality|Fresh|Local|Regional|Global) [A-Z][a-z]+ "
+        r"(?:Suppliers?|Distributors?))",
+    ]
+
+    for pattern in supplier_patterns:
+        matches = re.findall(pattern, text, re.IGNORECASE)
+        for match in matches:
+            entities["suppliers"].append(
+                {
+                    "name": match,
+                    "confidence": 0.85,
+                    "extracted_from": "pattern_matching",
+                }
+            )
+
+    # Extract meat products with quantities and grades
+    meat_products = {
+        "beef": [
+            "ground beef",
+            "ribeye",
+            "sirloin",
+            "chuck",
+            "brisket",
+            "prime rib",
+        ],
+        "pork": [
+            "pork chops",
+            "bacon",
+            "ham",
+            "sausage",
+            "pork belly",
+            "tenderloin",
+        ],
+        "chicken": ["whole chicken", "chicken breast", "chicken thighs", "wings"],
+        "lamb": ["lamb chops", "leg of lamb", "lamb shoulder"],
+        "turkey": ["whole turkey", "turkey breast", "ground turkey"],
+        "seafood": ["salmon", "shrimp", "lobster", "crab", "tuna"],
+    }
+
+    for category, products in meat_products.items():
+        for product in products:
+            if product in text_lower:
+                # Look for quantities nearby
+                quantity_pattern = (
+                    r"(\d+(?:\.\d+)?)\s*(?:lbs?|pounds?|kg|kilograms?|tons?)?\s*"
+                    rf"(?:of\s+)?{re.escape(product)}"
+                )
+                quantity_matches = re.findall(quantity_pattern, text_lower)
+
+                for qty in quantity_matches:
+                    entities["quantities"].append(
+                        {
+                            "product": product.title(),
+                            "quantity": qty,
+                            "category": category,
+                            "confidence": 0.90,
+                        }
+                    )
+
+                entities["products"].append(
+                    {
+                        "name": product.title(),
+                        "category": category,
+                        "confidence": 0.90,
+                    }
+                )
+
+    # Extract prices with currency
+    price_patterns = [
+        r"\$(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)",  # $1,234.56
+        r"(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)\s*(?:dollars?|USD)",  # 1,234.56 dollars
+        r"(\d+(?:\.\d{2})?)\s*/\s*(?:lb|pound|kg)",  # 5.99/lb
+    ]
+
+    for pattern in price_patterns:
+        amounts = re.findall(pattern, text, re.IGNORECASE)
+        for amount in amounts:
+            entities["prices"].append(
+                {"amount": amount, "currency": "USD", "confidence": 0.95}
+            )
+
+    # Extract dates with multiple formats
+    date_patterns = [
+        r"(\d{1,2}[-/]\d{1,2}[-/]\d{4})",  # MM/DD/YYYY or MM-DD-YYYY
+        r"(\d{4}[-/]\d{1,2}[-/]\d{1,2})",  # YYYY-MM-DD
+        # January 15, 2024
+        r"((?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*"
+        r"\s+\d{1,2},?\s+\d{4})",
+    ]
+
+    for pattern in date_patterns:
+        dates = re.findall(pattern, text, re.IGNORECASE)
+        for date in dates:
+            entities["dates"].append(
+                {"date": date, "format": "detected", "confidence": 0.90}
+            )
+
+    # Extract purchase order numbers
+    po_patterns = [
+        r"(?:PO|Purchase Order|Order)\s*#?\s*([A-Z0-9-]+)",
+        r"(\d{4,}-\d{3,})",  # Pattern like 2024-001
+    ]
+
+    for pattern in po_patterns:
+        pos = re.findall(pattern, text, re.IGNORECASE)
+        for po in pos:
+            entities["purchase_orders"].append({"po_number": po, "confidence": 0.85})
+
+    # Extract invoice numbers
+    invoice_patterns = [
+        r"(?:Invoice|INV)\s*#?\s*([A-Z0-9-]+)",
+        r"(?:Bill|Receipt)\s*#?\s*([A-Z0-9-]+)",
+    ]
+
+    for pattern in invoice_patterns:
+        invoices = re.findall(pattern, text, re.IGNORECASE)
+        for inv in invoices:
+            entities["invoice_numbers"].append(
+                {"invoice_number": inv, "confidence": 0.85}
+            )
+
+    # Extract locations (cities, states, addresses)
+    location_patterns = [
+        # Street addresses
+        r"(\d+\s+[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\s+"
+        r"(?:St|Street|Ave|Avenue|Blvd|Boulevard|Rd|Road))",
+        r"([A-Z][a-z]+,\s*[A-Z]{2})",  # City, ST
+        r"([A-Z][a-z]+\s+[A-Z][a-z]+,\s*[A-Z]{2})",  # City Name, ST
+    ]
+
+    for pattern in location_patterns:
+        locations = re.findall(pattern, text)
+        for location in locations:
+            entities["locations"].append(
+                {"location": location, "type": "address", "confidence": 0.80}
+            )
+
+    # Extract certifications and compliance info
+    certification_keywords = [
+        "USDA",
+        "FDA",
+        "HACCP",
+        "SQF",
+        "BRC",
+        "ISO",
+        "Organic",
+        "Halal",
+        "Kosher",
+        "SSOP",
+        "GMP",
+        "FSIS",
+        "Non-GMO",
+        "Grass-fed",
+        "Free-range",
+        "Cage-free",
+    ]
+
+    for cert in certification_keywords:
+        if cert.lower() in text_lower:
+            entities["certifications"].append(
+                {
+                    "certification": cert,
+                    "type": (
+                        "food_safety"
+                        if cert in ["USDA", "FDA", "HACCP", "FSIS"]
+                        else "quality"
+                    ),
+                    "confidence": 0.95,
+                }
+            )
+
+    # Extract contact information
+    contact_patterns = [
+        r"([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})",  # Email
+        r"(\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4})",  # Phone numbers
+        r"(\d{3}-\d{2}-\d{4})",  # SSN or Tax ID format
+    ]
+
+    contact_types = ["email", "phone", "tax_id"]
+    for i, pattern in enumerate(contact_patterns):
+        contacts = re.findall(pattern, text)
+        for contact in contacts:
+            entities["contact_info"].append(
+                {"value": contact, "type": contact_types[i], "confidence": 0.90}
+            )
+
+    # Extract quality metrics
+    quality_patterns = [
+        r"(\d+(?:\.\d+)?)\s*(?:°F|degrees?|fahrenheit)",  # Temperature
+        r"(\d+(?:\.\d+)?)\s*(?:%|percent)",  # Percentages
+        r"(?:pH|acidity)\s*:?\s*(\d+(?:\.\d+)?)",  # pH levels
+        r"(?:moisture|fat|protein)\s*:?\s*(\d+(?:\.\d+)?)",  # Composition
+    ]
+
+    quality_types = ["temperature", "percentage", "ph_level", "composition"]
+    for i, pattern in enumerate(quality_patterns):
+        metrics = re.findall(pattern, text_lower)
+        for metric in metrics:
+            entities["quality_metrics"].append(
+                {"value": metric, "type": quality_types[i], "confidence": 0.85}
+            )
+
+    return entities
@@ -5,25 +5,66 @@ Comprehensive test suite for chat sessions, message handling,
 document processing, and AI service integration.
 """
 
+import hashlib
+import http.client
+import json
+import os
+import queue
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
 import uuid
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from importlib.util import find_spec
+from typing import List
+from unittest import mock, skipUnless
 
 from django.contrib.auth.models import User
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.reverse import reverse
 from rest_framework.test import APITestCase
 
+from .management.commands.benchmark_extraction import synthetic_document
 from .models import (
     AIConfiguration,
     ChatMessage,
     ChatSession,
     ChatSessionStatusChoices,
+    DocumentProcessingStatusChoices,
     DocumentTypeChoices,
     MessageTypeChoices,
+    ProcessingTask,
     UploadedDocument,
+    UsageAnalytics,
+    UsageRollup,
+    UsageRollupState,
 )
-from .services.ai_service import MockAIProvider, ai_service
+from .services import entity_extractor, text_extraction
+from .services.ai_service import AIProviderInterface, MockAIProvider, ai_service
+from .services.analytics import analytics_buffer
+from .services.context_builder import build_context, estimate_tokens
+from .services.intent_router import IntentRouter
+from .services.provider_registry import ProviderBusyError, ProviderRegistry
+from .services.usage_rollups import percentile, purge_usage_analytics, rollup_usage
+from .test_support import legacy_document_type, legacy_extract_entities
+
+
+def use_temporary_media_root(test_case):
+    """Point MEDIA_ROOT at a throwaway directory for the duration of a test."""
+    media_root = tempfile.mkdtemp()
+    test_case.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+    media_override = override_settings(MEDIA_ROOT=media_root)
+    media_override.enable()
+    test_case.addCleanup(media_override.disable)
 
 
 class ChatSessionModelTest(TestCase):
@@ -121,6 +162,7 @@ class UploadedDocumentModelTest(TestCase):
 
     def setUp(self):
         """Set up test data."""
+        use_temporary_media_root(self)
         self.user = User.objects.create_user(
             username="testuser", email="test@example.com", password="testpass123"
         )
@@ -191,6 +233,35 @@ class AIServiceTest(TestCase):
         self.assertIsInstance(metadata, dict)
         self.assertIn("processing_time", metadata)
 
+    def test_concurrent_identical_questions_call_provider_once(self):
+        """Test that identical in-flight questions share one provider call."""
+        ai_service.get_default_config()
+        message = f"Show supplier list {uuid.uuid4()}"
+        original = MockAIProvider.generate_response
+        calls = []
+
+        def generate_response(provider, messages, **kwargs):
+            calls.append(1)
+            return original(provider, messages, **kwargs)
+
+        responses = []
+        barrier = threading.Barrier(4)
+
+        def ask():
+            barrier.wait()
+            responses.append(ai_service.generate_chat_response(message, []))
+
+        with mock.patch.object(MockAIProvider, "generate_response", generate_response):
+            threads = [threading.Thread(target=ask) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len({text for text, _ in responses}), 1)
+        self.assertEqual(sum(not meta["cached"] for _, meta in responses), 1)
+
     def test_extract_document_entities(self):
         """Test document entity extraction."""
         test_text = "Purchase Order PO-2025-001 for beef products from Supplier Inc, total amount $1,500.00"
@@ -230,11 +301,251 @@ class AIServiceTest(TestCase):
         self.assertGreater(len(result["response"]), 0)
 
 
+@override_settings(
+    AI_CONTEXT_TOKEN_BUDGET=200,
+    AI_CONTEXT_MAX_MESSAGES=10,
+    AI_CONTEXT_SUMMARY_TOKENS=60,
+)
+class ConversationContextTest(TestCase):
+    """Test the token-budgeted conversation context builder."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+        self.session = ChatSession.objects.create(
+            title="Long Session",
+            owner=self.user,
+            created_by=self.user,
+            modified_by=self.user,
+        )
+        self.start = timezone.now() - timedelta(days=1)
+        self.count = 0
+
+    def add_messages(self, count):
+        """Add alternating user/assistant messages of about 25 tokens each."""
+        for _ in range(count):
+            message = ChatMessage.objects.create(
+                session=self.session,
+                message_type=(
+                    MessageTypeChoices.USER
+                    if self.count % 2 == 0
+                    else MessageTypeChoices.ASSISTANT
+                ),
+                content=f"{self.count:03d} " + "x" * 96,
+                owner=self.user,
+                created_by=self.user,
+                modified_by=self.user,
+            )
+            ChatMessage.objects.filter(pk=message.pk).update(
+                created_on=self.start + timedelta(seconds=self.count)
+            )
+            self.count += 1
+
+    def build(self):
+        self.session.refresh_from_db()
+        return build_context(self.session)
+
+    def test_window_within_token_budget(self):
+        """Test the window holds the newest messages that fit the budget."""
+        self.add_messages(10)
+
+        context = self.build()
+
+        contents = [message.content[:3] for message in context.messages]
+        self.assertEqual(contents, [f"{i:03d}" for i in range(5, 10)])
+        self.assertLessEqual(
+            sum(estimate_tokens(m.content) for m in context.messages)
+            + estimate_tokens(context.summary),
+            200,
+        )
+        self.assertIn("User: 000", context.summary)
+
+    def test_rolling_summary_has_constant_cost(self):
+        """Test long sessions are summarised and later turns stay bounded."""
+        self.add_messages(40)
+
+        # Older history is folded into the summary a bounded batch per turn
+        for _ in range(10):
+            context = self.build()
+        summary = self.session.context_data["summary"]
+
+        self.assertEqual(summary["message_count"] + len(context.messages), 40)
+        self.assertEqual(context.messages[-1].content[:3], "039")
+        self.assertLessEqual(estimate_tokens(summary["text"]), 60)
+
+        window = len(context.messages)
+        self.add_messages(2)
+        self.session.refresh_from_db()
+
+        # One LIMIT query for the tail and one UPDATE for the summary
+        with self.assertNumQueries(2):
+            context = build_context(self.session)
+
+        summary = self.session.context_data["summary"]
+        self.assertEqual(len(context.messages), window)
+        self.assertEqual(summary["message_count"], 42 - window)
+        self.assertEqual(context.messages[-1].content[:3], "041")
+
+
+class EntityExtractionEngineTest(TestCase):
+    """Test the precompiled entity extraction engine."""
+
+    def test_matches_legacy_extractor(self):
+        """Test the engine returns exactly what the original code did."""
+        documents = [synthetic_document(20_000, seed) for seed in range(3)]
+        documents.append("Purchase Order PO-2025-001 for 40 lbs ribeye, café USDA")
+        documents.append("nothing to see here")
+        documents.append("Held at 38°F and 40 °F, pH 6.2, PH: 5.8, acidity: 5.9")
+        documents.append("the system Contract cold chain, ecosystem Farm Co, ÉCO Beef")
+        documents.append("subsystem Meat from Xmiller Family Farms and Prime Beef Co.")
+        documents.append(
+            "Fresh Beef \u017fuppliers, T\u0131ny Farm, \u0130nvoice 7, \u212aent Co"
+        )
+
+        for text in documents:
+            result = entity_extractor.analyze(text)
+            self.assertEqual(result["entities"], legacy_extract_entities(text))
+            self.assertEqual(result["document_type"], legacy_document_type(text))
+
+    def test_case_folded_characters(self):
+        """Test CASE_FOLDED_RE lists every non-ASCII match lowercasing misses."""
+        letter = re.compile("[a-z]", re.IGNORECASE)
+        missed = "".join(
+            char
+            for char in map(chr, range(0x80, sys.maxunicode + 1))
+            if letter.fullmatch(char)
+            and not (len(char.lower()) == 1 and char.lower().isascii())
+        )
+
+        self.assertTrue(missed)
+        self.assertEqual(entity_extractor.CASE_FOLDED_RE.sub("", missed), "")
+
+    def test_quality_metrics_match_lowercased_patterns(self):
+        """Test "°F" and "pH" aren't reported, as in the original code."""
+        metrics = entity_extractor.analyze("38°F, 40 degrees, pH 6.2, acidity 5.9")[
+            "entities"
+        ]["quality_metrics"]
+
+        self.assertEqual(
+            [(metric["type"], metric["value"]) for metric in metrics],
+            [("temperature", "40"), ("ph_level", "5.9")],
+        )
+
+    def test_suppliers_found_inside_words(self):
+        """Test findall resuming inside a word matches the original names."""
+        suppliers = entity_extractor.analyze("the system Contract cold")["entities"][
+            "suppliers"
+        ]
+
+        self.assertEqual(
+            [supplier["name"] for supplier in suppliers], ["system Co", "ntract co"]
+        )
+
+    def test_keyword_scan_finds_overlapping_keywords(self):
+        """Test keywords inside or overlapping longer keywords are counted."""
+        scan = entity_extractor.engine.scan("bill of lading for bacontract ham")
+
+        self.assertTrue(scan.has("bill of lading"))
+        self.assertTrue(scan.has("bill"))
+        self.assertTrue(scan.has("bacon"))
+        self.assertTrue(scan.has("contract"))
+        self.assertEqual(scan.document_scores["delivery_receipt"], 1)
+        self.assertEqual(scan.document_scores["invoice"], 1)
+        self.assertEqual(scan.document_type, "invoice")
+
+    def test_analyze_batch(self):
+        """Test batch analysis matches single-document analysis in order."""
+        documents = [synthetic_document(5_000, seed) for seed in range(4)]
+
+        results = entity_extractor.analyze_batch(documents, workers=2)
+
+        self.assertEqual(
+            results, [entity_extractor.analyze(text) for text in documents]
+        )
+
+
+class IntentRouterTest(TestCase):
+    """Test the data-driven intent router behind mock chat responses."""
+
+    def setUp(self):
+        self.router = IntentRouter()
+        self.provider = MockAIProvider(AIConfiguration(name="Mock", provider="mock"))
+
+    def write_table(self, path, intents, fallback="Fallback"):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"intents": intents, "fallback": {"template": fallback}}, f)
+
+    def test_priority_and_substring_matching(self):
+        """Test the highest-priority intent wins wherever its keyword is."""
+        cases = {
+            "Hello there": "greeting",
+            # "hi" occurs inside "shipping", and greetings come first
+            "Track shipping": "greeting",
+            "Generate a report": "purchase_orders",
+            "Show the dashboard": "analytics",
+            "HACCP audit": "quality",
+            "Beef prices": "finance",
+            "Beef": "products",
+        }
+        for message, name in cases.items():
+            self.assertEqual(self.router.match(message).name, name, message)
+        self.assertIsNone(self.router.match("xyz"))
+        self.assertIn("suggestions", self.provider._generate_mock_response("xyz"))
+
+    def test_product_slot(self):
+        """Test detected products fill the products template."""
+        response = self.provider._generate_mock_response("Veal and lamb")
+
+        self.assertIn("insights about Lamb, Veal!", response)
+        self.assertIn("Current lamb, veal pricing trends", response)
+
+        response = self.provider._generate_mock_response("meat")
+        self.assertIn("insights about meat products!", response)
+
+    @override_settings(AI_INTENTS_RELOAD_INTERVAL=0)
+    def test_hot_reload(self):
+        """Test table edits apply without a restart and bad edits are ignored."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "intents.json")
+            self.write_table(
+                path, [{"name": "a", "keywords": ["alpha"], "template": "First"}]
+            )
+            with override_settings(AI_INTENTS_FILE=path):
+                self.assertEqual(self.router.route("alpha"), "First")
+
+                self.write_table(
+                    path,
+                    [
+                        {"name": "a", "keywords": ["alpha"], "template": "Second"},
+                        {
+                            "name": "b",
+                            "priority": -1,
+                            "keywords": ["alp"],
+                            "template": "Third",
+                        },
+                    ],
+                )
+                os.utime(path, (time.time() + 10, time.time() + 10))
+                self.assertEqual(self.router.route("alpha"), "Third")
+
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write("{not json")
+                os.utime(path, (time.time() + 20, time.time() + 20))
+                with self.assertLogs(
+                    "apps.ai_assistant.services.intent_router", "ERROR"
+                ):
+                    self.assertEqual(self.router.route("alpha"), "Third")
+                self.assertEqual(self.router.route("beta"), "Fallback")
+
+
 class ChatSessionAPITest(APITestCase):
     """Test ChatSession API endpoints."""
 
     def setUp(self):
         """Set up test data."""
+        use_temporary_media_root(self)
         self.user = User.objects.create_user(
             username="testuser", email="test@example.com", password="testpass123"
         )
@@ -263,6 +574,99 @@ class ChatSessionAPITest(APITestCase):
         self.assertEqual(len(response.data["results"]), 1)
         self.assertEqual(response.data["results"][0]["title"], "Test Session")
 
+    def _create_session_with_messages(self, with_document=False):
+        session = ChatSession.objects.create(
+            title="Session",
+            owner=self.user,
+            created_by=self.user,
+            modified_by=self.user,
+        )
+        for message_type in (MessageTypeChoices.USER, MessageTypeChoices.ASSISTANT):
+            ChatMessage.objects.create(
+                session=session,
+                message_type=message_type,
+                content="Hello",
+                owner=self.user,
+                created_by=self.user,
+                modified_by=self.user,
+            )
+        if with_document:
+            document = UploadedDocument.objects.create(
+                file=SimpleUploadedFile("doc.txt", b"text"),
+                original_filename="doc.txt",
+                file_size=4,
+                file_type="text/plain",
+                owner=self.user,
+                created_by=self.user,
+                modified_by=self.user,
+            )
+            ChatMessage.objects.create(
+                session=session,
+                message_type=MessageTypeChoices.DOCUMENT,
+                content="Uploaded doc.txt",
+                uploaded_document=document,
+                owner=self.user,
+                created_by=self.user,
+                modified_by=self.user,
+            )
+        return session
+
+    def test_list_chat_sessions_query_count_is_constant(self):
+        """Test that message stats don't add queries per session."""
+        self.client.force_authenticate(user=self.user)
+        url = reverse("ai-session-list")
+
+        # Page count query + page query, whatever the page size
+        with self.assertNumQueries(2):
+            self.client.get(url)
+
+        for index in range(10):
+            self._create_session_with_messages(with_document=index % 2 == 0)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+
+        self.assertEqual(len(response.data["results"]), 11)
+
+    def test_list_chat_sessions_message_stats(self):
+        """Test that annotated stats match the model properties."""
+        self.client.force_authenticate(user=self.user)
+        session = self._create_session_with_messages(with_document=True)
+
+        response = self.client.get(reverse("ai-session-detail", args=[session.id]))
+
+        self.assertEqual(response.data["message_count"], session.message_count)
+        self.assertEqual(response.data["message_count"], 3)
+        self.assertTrue(response.data["has_documents"])
+
+        results = self.client.get(reverse("ai-session-list")).data["results"]
+        self.assertEqual(
+            {row["id"]: row["message_count"] for row in results},
+            {str(self.session.id): 0, str(session.id): 3},
+        )
+
+    def test_messages_cursor_pagination(self):
+        """Test keyset pagination of messages on (session, created_on)."""
+        self.client.force_authenticate(user=self.user)
+        for _ in range(3):
+            self._create_session_with_messages()
+        expected = [
+            str(pk)
+            for pk in ChatMessage.objects.order_by(
+                "session_id", "created_on", "pk"
+            ).values_list("pk", flat=True)
+        ]
+
+        response = self.client.get(
+            reverse("ai-message-list"), {"pagination": "cursor", "page_size": 4}
+        )
+        seen = [row["id"] for row in response.data["results"]]
+        while response.data["next"]:
+            response = self.client.get(response.data["next"])
+            seen += [row["id"] for row in response.data["results"]]
+
+        self.assertEqual(seen, expected)
+
     def test_create_chat_session(self):
         """Test creating a new chat session."""
         self.client.force_authenticate(user=self.user)
@@ -305,6 +709,7 @@ class ChatBotAPITest(APITestCase):
 
     def setUp(self):
         """Set up test data."""
+        use_temporary_media_root(self)
         self.user = User.objects.create_user(
             username="testuser", email="test@example.com", password="testpass123"
         )
@@ -362,6 +767,41 @@ class ChatBotAPITest(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
+    def test_chat_api_stream(self):
+        """Test chat API streaming the response as server-sent events."""
+        self.client.force_authenticate(user=self.user)
+        url = reverse("ai-chatbot-chat") + "?stream=1"
+
+        data = {"message": f"What is the price of beef today? {uuid.uuid4()}"}
+
+        with mock.patch.object(MockAIProvider, "stream_chunk_delay", 0):
+            response = self.client.post(url, data, format="json")
+            body = b"".join(response.streaming_content).decode()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+
+        events = []
+        for block in body.strip().split("\n\n"):
+            event_line, data_line = block.split("\n")
+            events.append(
+                (event_line[len("event: ") :], json.loads(data_line[len("data: ") :]))
+            )
+
+        names = [name for name, _ in events]
+        self.assertEqual(names[0], "session")
+        self.assertEqual(names[-1], "done")
+        self.assertGreater(names.count("delta"), 1)
+
+        done = events[-1][1]
+        streamed = "".join(payload["content"] for name, payload in events[1:-1])
+        self.assertEqual(streamed, done["response"])
+
+        ai_msg = ChatMessage.objects.get(id=done["message_id"])
+        self.assertEqual(ai_msg.message_type, MessageTypeChoices.ASSISTANT)
+        self.assertEqual(ai_msg.content, done["response"])
+        self.assertEqual(str(ai_msg.session_id), events[0][1]["session_id"])
+
     def test_chat_api_empty_message(self):
         """Test chat API with empty message."""
         self.client.force_authenticate(user=self.user)
@@ -373,12 +813,49 @@ class ChatBotAPITest(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_upload_then_process_document(self):
+        """Test process_document returns the task queued on upload."""
+        self.client.force_authenticate(user=self.user)
+        upload = self.client.post(
+            reverse("ai-document-list"),
+            {
+                "file": SimpleUploadedFile("po.txt", b"PO", content_type="text/plain"),
+                "original_filename": "po.txt",
+            },
+            format="multipart",
+        )
+        url = reverse("ai-chatbot-process-document")
+        data = {"document_id": upload.data["id"]}
+
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(
+            str(response.data["task_id"]), upload.data["processing_task_id"]
+        )
+        self.assertEqual(ProcessingTask.objects.count(), 1)
+        task = ProcessingTask.objects.get()
+        self.assertIsNotNone(task.session)
+
+        # Asking again returns the same task
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(ProcessingTask.objects.count(), 1)
+
+        # Once the queued task has finished the document is processed again
+        ProcessingTask.objects.update(status=DocumentProcessingStatusChoices.COMPLETED)
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(ProcessingTask.objects.count(), 2)
+
 
 class DocumentUploadAPITest(APITestCase):
     """Test document upload API endpoints."""
 
     def setUp(self):
         """Set up test data."""
+        use_temporary_media_root(self)
         self.user = User.objects.create_user(
             username="testuser", email="test@example.com", password="testpass123"
         )
@@ -399,9 +876,169 @@ class DocumentUploadAPITest(APITestCase):
 
         response = self.client.post(url, data, format="multipart")
 
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
         self.assertEqual(response.data["original_filename"], "test_purchase_order.txt")
         self.assertEqual(response.data["owner"]["id"], self.user.id)
+        self.assertEqual(response.data["processing_status"], "pending")
+        self.assertIn("processing_task_id", response.data)
+
+    def test_upload_runs_processing_pipeline(self):
+        """Test that the queued pipeline records progress on the task."""
+        self.client.force_authenticate(user=self.user)
+        test_file = SimpleUploadedFile(
+            "po.txt", b"Purchase Order PO-2025-001", content_type="text/plain"
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("ai-document-list"),
+                {"file": test_file, "original_filename": "po.txt"},
+                format="multipart",
+            )
+
+        task = ProcessingTask.objects.get(id=response.data["processing_task_id"])
+        self.assertEqual(task.status, DocumentProcessingStatusChoices.COMPLETED)
+        self.assertEqual(task.progress_percentage, 100)
+        self.assertIsNotNone(task.started_at)
+        self.assertIsNotNone(task.completed_at)
+        self.assertIsNone(task.session)
+
+        document = task.document
+        document.refresh_from_db()
+        self.assertEqual(
+            document.processing_status, DocumentProcessingStatusChoices.COMPLETED
+        )
+        self.assertEqual(document.extracted_text, "Purchase Order PO-2025-001")
+        self.assertEqual(document.extracted_data["extraction"]["method"], "text")
+        self.assertIn("classification", document.extracted_data)
+        self.assertIn("entities", document.extracted_data)
+
+        poll = self.client.get(reverse("ai-task-detail", args=[task.id]))
+        self.assertEqual(poll.status_code, status.HTTP_200_OK)
+        self.assertEqual(poll.data["progress_percentage"], 100)
+
+    def test_failed_stage_marks_task_failed(self):
+        """Test that a failing stage stops the chain and records the error."""
+        self.client.force_authenticate(user=self.user)
+        test_file = SimpleUploadedFile("po.txt", b"PO", content_type="text/plain")
+
+        with mock.patch(
+            "apps.ai_assistant.services.document_processor.ai_service"
+            ".classify_document_type",
+            side_effect=RuntimeError("classifier down"),
+        ), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("ai-document-list"),
+                {"file": test_file, "original_filename": "po.txt"},
+                format="multipart",
+            )
+
+        task = ProcessingTask.objects.get(id=response.data["processing_task_id"])
+        self.assertEqual(task.status, DocumentProcessingStatusChoices.FAILED)
+        self.assertEqual(task.progress_percentage, 40)
+        self.assertIn("classifier down", task.error_details)
+        self.assertEqual(
+            UploadedDocument.objects.get(id=task.document_id).processing_status,
+            DocumentProcessingStatusChoices.FAILED,
+        )
+
+    def upload(self, content, name):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("ai-document-list"),
+                {
+                    "file": SimpleUploadedFile(
+                        name, content, content_type="text/plain"
+                    ),
+                    "original_filename": name,
+                },
+                format="multipart",
+            )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        return UploadedDocument.objects.get(id=response.data["id"])
+
+    def test_duplicate_upload_reuses_result_and_storage(self):
+        """Test identical content is stored once and processed once."""
+        self.client.force_authenticate(user=self.user)
+        content = f"Invoice {uuid.uuid4()} for 40 lbs ribeye".encode()
+
+        first = self.upload(content, "invoice.txt")
+        self.assertEqual(first.content_hash, hashlib.sha256(content).hexdigest())
+        self.assertEqual(first.processing_metadata["processing_method"], "ai_service")
+
+        with mock.patch(
+            "apps.ai_assistant.services.document_processor.ai_service"
+            ".classify_document_type"
+        ) as classify:
+            second = self.upload(content, "copy-of-invoice.txt")
+        classify.assert_not_called()
+
+        self.assertEqual(second.file.name, first.file.name)
+        self.assertEqual(second.original_filename, "copy-of-invoice.txt")
+        self.assertEqual(second.processing_status, "completed")
+        self.assertEqual(
+            second.processing_metadata["processing_method"], "content_hash"
+        )
+        self.assertEqual(second.document_type, first.document_type)
+        self.assertEqual(
+            second.extracted_data["entities"], first.extracted_data["entities"]
+        )
+        task = ProcessingTask.objects.get(document=second)
+        self.assertEqual(task.progress_percentage, 100)
+
+        # Forced reprocessing runs the pipeline again
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("ai-document-reprocess", args=[second.id]), {"force": True}
+            )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        second.refresh_from_db()
+        self.assertEqual(second.processing_metadata["processing_method"], "ai_service")
+
+    def test_shared_storage_reveals_nothing_about_first_uploader(self):
+        """Test another user's identical upload shares a content-addressed file."""
+        content = f"Invoice {uuid.uuid4()} for 40 lbs ribeye".encode()
+        digest = hashlib.sha256(content).hexdigest()
+        self.client.force_authenticate(user=self.user)
+        first = self.upload(content, "acme-private-invoice.TXT")
+
+        other = User.objects.create_user(username="other", password="testpass123")
+        self.client.force_authenticate(user=other)
+        second = self.upload(content, "invoice.txt")
+
+        expected = f"ai_assistant/documents/{digest[:2]}/{digest}.txt"
+        self.assertEqual(first.file.name, expected)
+        self.assertEqual(second.file.name, expected)
+        self.assertEqual(second.owner, other)
+        self.assertEqual(second.original_filename, "invoice.txt")
+
+        response = self.client.get(reverse("ai-document-detail", args=[second.id]))
+        self.assertNotIn("acme", json.dumps(response.data))
+
+    def test_reprocess_rejects_queued_document(self):
+        """Test that a pending document with a queued task isn't queued again."""
+        self.client.force_authenticate(user=self.user)
+        upload = self.client.post(
+            reverse("ai-document-list"),
+            {
+                "file": SimpleUploadedFile("po.txt", b"PO", content_type="text/plain"),
+                "original_filename": "po.txt",
+            },
+            format="multipart",
+        )
+        url = reverse("ai-document-reprocess", args=[upload.data["id"]])
+
+        response = self.client.post(url)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["task_id"], upload.data["processing_task_id"])
+        self.assertEqual(ProcessingTask.objects.count(), 1)
+
+        ProcessingTask.objects.update(status=DocumentProcessingStatusChoices.COMPLETED)
+        response = self.client.post(url)
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(ProcessingTask.objects.count(), 2)
 
     def test_list_uploaded_documents(self):
         """Test listing uploaded documents."""
@@ -431,6 +1068,178 @@ class DocumentUploadAPITest(APITestCase):
         self.assertEqual(response.data["results"][0]["id"], str(document.id))
 
 
+def paged_extractor(
+    path, max_chars, options, on_progress
+) -> text_extraction.ExtractionResult:
+    """Stand-in for a paged format: 25 pages, progress every 10."""
+    for done in (10, 20, 25):
+        on_progress(done, 25)
+    return text_extraction.ExtractionResult(
+        text="\n".join(f"page {number}" for number in range(25)),
+        method="paged",
+        pages=25,
+    )
+
+
+def pdf_document(pages: List[str]) -> bytes:
+    """A minimal PDF with one line of Helvetica text per page."""
+    count = len(pages)
+    kids = " ".join(f"{3 + 2 * index} 0 R" for index in range(count))
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {count} >>",
+    ]
+    font = 3 + 2 * count
+    for index, text in enumerate(pages):
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Contents {4 + 2 * index} 0 R "
+            f"/Resources << /Font << /F1 {font} 0 R >> >> >>"
+        )
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    output = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        output += f"{offset:010d} 00000 n \n".encode()
+    output += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+        f"startxref\n{xref}\n%%EOF\n"
+    ).encode()
+    return output
+
+
+class TextExtractionTest(TestCase):
+    """Test the document text extraction stage."""
+
+    def setUp(self):
+        use_temporary_media_root(self)
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+
+    def document(self, name, content):
+        return UploadedDocument.objects.create(
+            file=SimpleUploadedFile(name, content),
+            original_filename=name,
+            file_size=len(content),
+            file_type="application/octet-stream",
+            owner=self.user,
+            created_by=self.user,
+            modified_by=self.user,
+        )
+
+    @override_settings(DOCUMENT_EXTRACTION_WORKERS=1)
+    def test_text_extracted_in_worker_process(self):
+        """Test uploaded text reaches classification via the process pool."""
+        content = "Invoice INV-2025-001\nRibeye 40 lbs, café grade".encode()
+        document = self.document("invoice.txt", content)
+
+        result = text_extraction.extract_text(document.file, ".txt")
+
+        self.assertEqual(result.text, content.decode())
+        self.assertEqual(result.method, "text")
+        self.assertFalse(result.truncated)
+
+    @override_settings(DOCUMENT_EXTRACTION_WORKERS=0)
+    def test_text_streamed_in_chunks_and_capped(self):
+        """Test multi-byte characters across chunks decode and text is capped."""
+        # An odd offset splits a two-byte character across the 64 KiB chunks
+        text = "a" + "é" * 40_000
+        document = self.document("notes.csv", text.encode())
+
+        result = text_extraction.extract_text(document.file, "csv")
+
+        self.assertEqual(result.text, text)
+        with override_settings(DOCUMENT_TEXT_MAX_CHARS=1000):
+            result = text_extraction.extract_text(document.file, "csv")
+        self.assertEqual(result.text, text[:1000])
+        self.assertTrue(result.truncated)
+
+    @override_settings(DOCUMENT_EXTRACTION_WORKERS=0)
+    def test_page_progress_reported(self):
+        """Test paged formats report progress after each batch of pages."""
+        document = self.document("report.pdf", b"%PDF-1.4")
+        progress = []
+
+        with mock.patch.dict(text_extraction.EXTRACTORS, {"pdf": paged_extractor}):
+            result = text_extraction.extract_text(
+                document.file, "pdf", on_progress=lambda *args: progress.append(args)
+            )
+
+        self.assertEqual(progress, [(10, 25), (20, 25), (25, 25)])
+        self.assertEqual(result.pages, 25)
+        self.assertEqual(len(result.text.splitlines()), 25)
+
+    @skipUnless(find_spec("pypdf"), "pypdf is not installed")
+    @override_settings(DOCUMENT_EXTRACTION_WORKERS=1)
+    def test_page_progress_relayed_from_worker_process(self):
+        """Test progress reported in a pool worker reaches the caller."""
+        pages = [f"page {number}" for number in range(12)]
+        document = self.document("report.pdf", pdf_document(pages))
+        progress = []
+
+        result = text_extraction.extract_text(
+            document.file, "pdf", on_progress=lambda *args: progress.append(args)
+        )
+
+        self.assertEqual(progress, [(10, 12), (12, 12)])
+        self.assertEqual(result.text.splitlines(), pages)
+
+    @skipUnless(find_spec("pypdf"), "pypdf is not installed")
+    @override_settings(DOCUMENT_EXTRACTION_WORKERS=0)
+    def test_pdf_pages_extracted_with_one_reader(self):
+        """Test a real PDF's pages are read in order by a single reader."""
+        import pypdf
+
+        pages = [f"Invoice INV-{number:03d} ribeye" for number in range(12)]
+        document = self.document("invoice.pdf", pdf_document(pages))
+        progress = []
+
+        with mock.patch("pypdf.PdfReader", wraps=pypdf.PdfReader) as reader:
+            result = text_extraction.extract_text(
+                document.file, "pdf", on_progress=lambda *args: progress.append(args)
+            )
+
+        reader.assert_called_once()
+        self.assertEqual(result.text.splitlines(), pages)
+        self.assertEqual(result.method, "pdf")
+        self.assertEqual(result.pages, 12)
+        self.assertEqual(progress, [(10, 12), (12, 12)])
+
+        with override_settings(DOCUMENT_TEXT_MAX_CHARS=30):
+            result = text_extraction.extract_text(document.file, "pdf")
+        self.assertEqual(result.text, "\n".join(pages)[:30])
+        self.assertTrue(result.truncated)
+
+    @skipUnless(find_spec("pypdf"), "pypdf is not installed")
+    @override_settings(DOCUMENT_EXTRACTION_WORKERS=0, DOCUMENT_TEXT_MAX_CHARS=10)
+    def test_pdf_text_capped_at_page_boundary(self):
+        """Test a page filling the text budget exactly isn't followed by more."""
+        document = self.document("short.pdf", pdf_document(["0123456789", "abc"]))
+
+        result = text_extraction.extract_text(document.file, "pdf")
+
+        self.assertEqual(result.text, "0123456789")
+        self.assertTrue(result.truncated)
+
+    def test_unsupported_type_gives_empty_text(self):
+        """Test files without an extractor are passed on with no text."""
+        document = self.document("sheet.xlsx", b"PK")
+
+        result = text_extraction.extract_text(document.file, "xlsx")
+
+        self.assertEqual(result.text, "")
+        self.assertEqual(result.method, "unsupported")
+
+
 class AIConfigurationTest(TestCase):
     """Test AI configuration functionality."""
 
@@ -468,3 +1277,391 @@ class AIConfigurationTest(TestCase):
         # Only config2 should be default now
         self.assertFalse(config1.is_default)
         self.assertTrue(config2.is_default)
+
+
+class StubCompletionHandler(BaseHTTPRequestHandler):
+    """Minimal chat completion endpoint that records connection use."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        self.rfile.read(int(self.headers["Content-Length"]))
+        with server.lock:
+            server.client_ports.add(self.client_address[1])
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        time.sleep(0.02)
+        with server.lock:
+            server.in_flight -= 1
+
+        body = json.dumps({"response": "stub reply"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubHTTPProvider(AIProviderInterface):
+    """Provider that keeps a pool of keep-alive connections to api_endpoint."""
+
+    def __init__(self, config):
+        self.config = config
+        self.host, port = config.api_endpoint.split("//")[1].split(":")
+        self.port = int(port)
+        self.connections = queue.LifoQueue()
+
+    def generate_response(self, messages, **kwargs):
+        try:
+            connection = self.connections.get_nowait()
+        except queue.Empty:
+            connection = http.client.HTTPConnection(self.host, self.port, timeout=5)
+        connection.request("POST", "/v1/chat/completions", body=json.dumps(messages))
+        result = json.loads(connection.getresponse().read())
+        self.connections.put(connection)
+        return result
+
+    def extract_entities(self, text, **kwargs):
+        return {}
+
+    def classify_document(self, text, **kwargs):
+        return {}
+
+    def close(self):
+        while not self.connections.empty():
+            self.connections.get_nowait().close()
+
+
+class ProviderRegistryTest(TestCase):
+    """Test long-lived provider instances and their concurrency limits."""
+
+    def setUp(self):
+        self.registry = ProviderRegistry(
+            {"local": MockAIProvider, "stub": StubHTTPProvider}, MockAIProvider
+        )
+        self.addCleanup(self.registry.clear)
+
+    def test_provider_reused_until_configuration_changes(self):
+        """Test that a provider is rebuilt only when its config is saved."""
+        config = AIConfiguration.objects.create(
+            name="Local", provider="local", model_name="mock-model"
+        )
+
+        provider = self.registry.get(config)
+        self.assertIs(self.registry.get(config), provider)
+        self.assertIs(
+            self.registry.get(AIConfiguration.objects.get(pk=config.pk)), provider
+        )
+
+        config.model_name = "mock-model-2"
+        config.save()
+
+        rebuilt = self.registry.get(config)
+        self.assertIsNot(rebuilt, provider)
+        self.assertEqual(rebuilt.model_name, "mock-model-2")
+
+    def test_replaced_provider_closed_after_last_use(self):
+        """Test that a provider isn't closed while a request is using it."""
+        config = AIConfiguration.objects.create(
+            name="Local", provider="local", model_name="mock-model"
+        )
+
+        with mock.patch.object(MockAIProvider, "close", create=True) as close:
+            with self.registry.use(config) as provider:
+                config.model_name = "mock-model-2"
+                config.save()
+                self.assertIsNot(self.registry.get(config), provider)
+                close.assert_not_called()
+            close.assert_called_once()
+
+            # A replaced provider nobody is using is closed straight away
+            config.model_name = "mock-model-3"
+            config.save()
+            self.registry.get(config)
+            self.assertEqual(close.call_count, 2)
+
+    def test_ai_service_shares_provider_and_discards_on_delete(self):
+        """Test that AIService reuses providers and releases deleted ones."""
+        config = AIConfiguration.objects.create(
+            name="Local", provider="local", model_name="mock-model"
+        )
+        provider = ai_service.get_provider(config)
+        self.assertIs(ai_service.get_provider(config), provider)
+
+        config.delete()
+
+        self.assertNotIn(config.pk, ai_service.registry._providers)
+
+    @override_settings(AI_PROVIDER_MAX_CONCURRENCY=1)
+    def test_concurrency_limit(self):
+        """Test that a full provider raises instead of waiting forever."""
+        config = AIConfiguration(name="Local", provider="local", model_name="m")
+
+        with self.registry.limit(config):
+            with self.assertRaises(ProviderBusyError):
+                with self.registry.limit(config, timeout=0.01):
+                    pass
+
+        # The slot is released afterwards
+        with self.registry.limit(config, timeout=0.01):
+            pass
+
+    @override_settings(AI_PROVIDER_MAX_CONCURRENCY=2)
+    def test_burst_against_stub_server(self):
+        """Test that a burst of calls reuses a bounded set of connections."""
+        server = ThreadingHTTPServer(("127.0.0.1", 0), StubCompletionHandler)
+        server.lock = threading.Lock()
+        server.client_ports = set()
+        server.in_flight = server.max_in_flight = 0
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        config = AIConfiguration(
+            name="Stub",
+            provider="stub",
+            model_name="stub-model",
+            api_endpoint=f"http://127.0.0.1:{server.server_address[1]}",
+        )
+        results = []
+
+        def call():
+            with self.registry.use(config) as provider:
+                results.append(provider.generate_response([{"role": "user"}]))
+
+        threads = [threading.Thread(target=call) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(results), 10)
+        self.assertEqual(results[0]["response"], "stub reply")
+        self.assertLessEqual(server.max_in_flight, 2)
+        self.assertLessEqual(len(server.client_ports), 2)
+
+
+@override_settings(ANALYTICS_FLUSH_INTERVAL=0, ANALYTICS_BUFFER_SIZE=50)
+class AnalyticsBufferTest(TestCase):
+    """Test buffered usage analytics writes."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+
+    def log(self, count):
+        for _ in range(count):
+            UsageAnalytics.log_action(
+                self.user, "chat", 0.1, ai_provider="mock", ai_model="mock-model"
+            )
+
+    def test_events_written_in_batches(self):
+        """Test events are queued without queries and written on flush."""
+        with self.assertNumQueries(0):
+            record = UsageAnalytics.log_action(
+                self.user, "chat", 0.25, ai_provider="mock", ai_model="mock-model"
+            )
+        self.assertEqual(UsageAnalytics.objects.count(), 0)
+        self.assertEqual(analytics_buffer.pending(), 1)
+
+        self.assertEqual(analytics_buffer.flush(), 1)
+        saved = UsageAnalytics.objects.get()
+        self.assertEqual(saved.pk, record.pk)
+        # The event time is kept, not the time of the flush
+        self.assertEqual(saved.created_at, record.created_at)
+
+    def test_size_threshold_flushes(self):
+        """Test a full buffer is written without an explicit flush."""
+        self.log(49)
+        self.assertEqual(UsageAnalytics.objects.count(), 0)
+
+        self.log(1)
+        self.assertEqual(UsageAnalytics.objects.count(), 50)
+        self.assertEqual(analytics_buffer.pending(), 0)
+
+    @override_settings(ANALYTICS_BUFFERED=False)
+    def test_unbuffered_writes_immediately(self):
+        """Test analytics can still be written synchronously."""
+        self.log(1)
+        self.assertEqual(UsageAnalytics.objects.count(), 1)
+
+    @override_settings(ANALYTICS_BUFFER_SIZE=51)
+    def test_request_path_overhead(self):
+        """Test buffering takes the inserts off the request path."""
+        events = 50
+
+        with self.assertNumQueries(0):
+            self.log(events)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(analytics_buffer.flush(), events)
+
+        inserts = [q["sql"] for q in queries if q["sql"].startswith("INSERT")]
+        self.assertEqual(len(inserts), 1)
+        self.assertIn("ai_assistant_usage_analytics", inserts[0])
+        self.assertEqual(UsageAnalytics.objects.count(), events)
+
+
+@override_settings(ANALYTICS_ROLLUP_LAG=300, ANALYTICS_RETENTION_DAYS=30)
+class UsageRollupTest(APITestCase):
+    """Test usage analytics rollups, purging and the analytics API."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+        self.admin = User.objects.create_user(
+            username="admin", password="adminpass123", is_staff=True
+        )
+        self.day = timezone.make_aware(datetime(2025, 1, 15))
+
+    def record(self, hour, minute, processing_time=0.2, recorded_at=None, **kwargs):
+        created_at = self.day + timedelta(hours=hour, minutes=minute)
+        # recorded_at is set when the row is written
+        with mock.patch(
+            "django.utils.timezone.now", return_value=recorded_at or created_at
+        ):
+            return UsageAnalytics.objects.create(
+                user=self.user,
+                action_type=kwargs.pop("action_type", "chat"),
+                processing_time=processing_time,
+                ai_provider="mock",
+                ai_model="mock-model",
+                created_at=created_at,
+                **kwargs,
+            )
+
+    def rollup(self, period, hour=0):
+        return UsageRollup.objects.get(
+            period=period, bucket_start=self.day + timedelta(hours=hour)
+        )
+
+    def test_rollup_is_incremental(self):
+        """Test each run folds in only rows added since the previous run."""
+        self.record(10, 5, 0.04, tokens_used=10)
+        self.record(10, 30, 0.7, tokens_used=20, success=False)
+        self.record(11, 10, 3.0)
+
+        rows = rollup_usage(now=self.day + timedelta(hours=12))
+        self.assertEqual(rows, 3)
+
+        hour = self.rollup("hour", 10)
+        self.assertEqual(hour.count, 2)
+        self.assertEqual(hour.success_rate, 0.5)
+        self.assertEqual(hour.tokens_used, 30)
+        self.assertEqual(hour.latency_buckets[0], 1)
+        self.assertEqual(hour.latency_buckets[4], 1)
+        self.assertEqual(self.rollup("day").count, 3)
+
+        # A row written since, and one still inside the rollup lag
+        self.record(11, 57, 3.0)
+        self.record(12, 2)
+        rows = rollup_usage(now=self.day + timedelta(hours=12, minutes=5))
+
+        self.assertEqual(rows, 1)
+        self.assertEqual(self.rollup("hour", 11).count, 2)
+        self.assertEqual(self.rollup("hour", 11).latency_buckets[6], 2)
+        self.assertEqual(self.rollup("day").count, 4)
+        self.assertEqual(rollup_usage(now=self.day + timedelta(hours=12, minutes=5)), 0)
+        self.assertEqual(self.rollup("day").count, 4)
+
+    @override_settings(ANALYTICS_PURGE_BATCH_SIZE=2)
+    def test_purge_keeps_rows_not_rolled_up(self):
+        """Test purging removes only old rows that are already rolled up."""
+        for minute in range(5):
+            self.record(10, minute)
+        rollup_usage(now=self.day + timedelta(hours=11))
+        self.record(11, 30)
+
+        deleted = purge_usage_analytics(now=self.day + timedelta(days=60))
+
+        self.assertEqual(deleted, 5)
+        self.assertEqual(UsageAnalytics.objects.count(), 1)
+        self.assertEqual(self.rollup("day").count, 5)
+
+    def test_rollup_counts_rows_written_late(self):
+        """Test rows written after their hour was rolled up are still counted."""
+        self.record(10, 5)
+        rollup_usage(now=self.day + timedelta(hours=12))
+
+        # Spooled through an outage: created at 10:30, written at 13:00
+        late = self.record(10, 30, recorded_at=self.day + timedelta(hours=13))
+        self.assertEqual(purge_usage_analytics(now=self.day + timedelta(days=120)), 1)
+        self.assertTrue(UsageAnalytics.objects.filter(pk=late.pk).exists())
+
+        rows = rollup_usage(now=self.day + timedelta(hours=14))
+
+        self.assertEqual(rows, 1)
+        self.assertEqual(self.rollup("hour", 10).count, 2)
+        self.assertEqual(self.rollup("day").count, 2)
+        self.assertEqual(purge_usage_analytics(now=self.day + timedelta(days=120)), 1)
+
+    @override_settings(ANALYTICS_PURGE_BATCH_SIZE=2)
+    def test_purge_deletes_each_batch_in_one_statement(self):
+        """Test purging doesn't load the rows it deletes."""
+        for minute in range(3):
+            self.record(10, minute)
+        rollup_usage(now=self.day + timedelta(hours=11))
+
+        with CaptureQueriesContext(connection) as queries:
+            deleted = purge_usage_analytics(now=self.day + timedelta(days=60))
+
+        self.assertEqual(deleted, 3)
+        deletes = [q["sql"] for q in queries if q["sql"].startswith("DELETE")]
+        self.assertEqual(len(deletes), 2)
+
+    def test_first_run_with_concurrently_created_state(self):
+        """Test a first run tolerates another run creating the state row."""
+        self.record(10, 5)
+        create = UsageRollupState.objects.get_or_create
+
+        def concurrent_create(**kwargs):
+            # The other run commits its state row first
+            UsageRollupState.objects.create(
+                name="usage_analytics", processed_through=self.day
+            )
+            return create(**kwargs)
+
+        with mock.patch.object(
+            UsageRollupState.objects, "get_or_create", side_effect=concurrent_create
+        ):
+            rows = rollup_usage(now=self.day + timedelta(hours=12))
+
+        self.assertEqual(rows, 1)
+        self.assertEqual(UsageRollupState.objects.count(), 1)
+
+    def test_percentile(self):
+        """Test quantiles are interpolated within histogram buckets."""
+        self.assertIsNone(percentile([0] * 11, 0.5))
+        self.assertAlmostEqual(percentile([0, 4] + [0] * 9, 0.5), 0.075)
+        self.assertEqual(percentile([0] * 10 + [1], 0.99), 60.0)
+
+    def test_analytics_api(self):
+        """Test rollups and summaries are served to staff only."""
+        self.record(10, 5, 0.3)
+        self.record(10, 6, 0.4, action_type="document_upload")
+        rollup_usage(now=self.day + timedelta(hours=12))
+
+        url = reverse("ai-analytics-list")
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(url, {"period": "day"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 2)
+
+        response = self.client.get(
+            reverse("ai-analytics-summary"), {"action_type": "chat"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        (summary,) = response.data["results"]
+        self.assertEqual(summary["count"], 1)
+        self.assertEqual(summary["success_rate"], 1.0)
+        self.assertAlmostEqual(summary["avg_processing_time"], 0.3)
+        self.assertIsNotNone(summary["p95_processing_time"])
@@ -15,6 +15,7 @@ from .views import (
     ChatSessionViewSet,
     ProcessingTaskViewSet,
     UploadedDocumentViewSet,
+    UsageRollupViewSet,
 )
 
 # Create router for ViewSets
@@ -27,6 +28,7 @@ router.register(
 )
 router.register(r"ai-tasks", ProcessingTaskViewSet, basename="ai-task")
 router.register(r"ai-chat", ChatBotAPIViewSet, basename="ai-chatbot")
+router.register(r"ai-analytics", UsageRollupViewSet, basename="ai-analytics")
 
 urlpatterns = [
     path("", include(router.urls)),
@@ -5,9 +5,14 @@ Provides REST API endpoints for chat interactions, document uploads,
 and AI-powered business intelligence for meat market operations.
 """
 
+import json
 import logging
 import time
+from typing import Optional
 
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, permissions, status, viewsets
@@ -16,6 +21,9 @@ from rest_framework.parsers import JSONParser, MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from apps.core.pagination import PowerAppsPagination
+from apps.core.search import PowerAppsOrderingFilter, PowerAppsSearchFilter
+
 from .models import (
     AIConfiguration,
     ChatMessage,
@@ -23,7 +31,9 @@ from .models import (
     DocumentProcessingStatusChoices,
     MessageTypeChoices,
     ProcessingTask,
+    RollupPeriodChoices,
     UploadedDocument,
+    UsageRollup,
 )
 from .serializers import (
     AIConfigurationSerializer,
@@ -38,8 +48,14 @@ from .serializers import (
     DocumentUploadSerializer,
     ProcessingTaskSerializer,
     UploadedDocumentSerializer,
+    UsageRollupSerializer,
+    UsageSummarySerializer,
 )
 from .services.ai_service import ai_service
+from .services.context_builder import build_context
+from .services.document_processor import active_processing_task
+from .services.usage_rollups import summarize
+from .tasks import queue_document_processing
 
 logger = logging.getLogger(__name__)
 
@@ -56,13 +72,14 @@ class ChatSessionViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
-        filters.OrderingFilter,
+        PowerAppsSearchFilter,
+        PowerAppsOrderingFilter,
     ]
     filterset_fields = ["session_status", "status"]
     search_fields = ["title"]
     ordering_fields = ["created_on", "last_activity", "title"]
     ordering = ["-last_activity"]
+    pagination_class = PowerAppsPagination
 
     def get_serializer_class(self):
         """Return appropriate serializer based on action."""
@@ -71,8 +88,12 @@ class ChatSessionViewSet(viewsets.ModelViewSet):
         return ChatSessionDetailSerializer
 
     def get_queryset(self):
-        """Filter sessions to current user only."""
-        return self.queryset.filter(owner=self.request.user)
+        """Filter sessions to current user only, with message stats annotated."""
+        return (
+            self.queryset.filter(owner=self.request.user)
+            .select_related("owner", "created_by", "modified_by")
+            .with_message_stats()
+        )
 
     def perform_create(self, serializer):
         """Set the owner when creating a new session."""
@@ -192,7 +213,9 @@ class ChatMessageViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ["message_type", "is_processed", "session"]
     ordering_fields = ["created_on"]
-    ordering = ["created_on"]
+    # Matches the (session, created_on) index used for keyset pagination
+    ordering = ["session_id", "created_on"]
+    pagination_class = PowerAppsPagination
 
     def get_serializer_class(self):
         """Return appropriate serializer based on action."""
@@ -219,15 +242,16 @@ class ChatMessageViewSet(viewsets.ModelViewSet):
     def _generate_ai_response(self, user_message: ChatMessage):
         """Generate and save AI response for a user message."""
         try:
-            # Get session message history
-            session_messages = user_message.session.messages.filter(
-                created_on__lt=user_message.created_on
-            ).order_by("created_on")
+            # Recent history within the context budget
+            context = build_context(
+                user_message.session, before=user_message.created_on
+            )
 
             # Generate AI response
             response_text, metadata = ai_service.generate_chat_response(
                 user_message=user_message.content,
-                session_messages=list(session_messages),
+                session_messages=context.messages,
+                summary=context.summary,
             )
 
             # Create AI response message
@@ -255,6 +279,27 @@ class ChatMessageViewSet(viewsets.ModelViewSet):
             )
 
 
+def _already_processing(document) -> Optional[Response]:
+    """
+    A 400 response if a (locked) document is queued or being processed.
+
+    Uploads are queued by create, so a pending document has a task too.
+    """
+    active_task = active_processing_task(document)
+    if (
+        active_task is None
+        and document.processing_status != DocumentProcessingStatusChoices.PROCESSING
+    ):
+        return None
+    return Response(
+        {
+            "error": "Document is already being processed",
+            "task_id": str(active_task.pk) if active_task else None,
+        },
+        status=status.HTTP_400_BAD_REQUEST,
+    )
+
+
 class UploadedDocumentViewSet(viewsets.ModelViewSet):
     """
     ViewSet for managing document uploads and processing.
@@ -267,8 +312,8 @@ class UploadedDocumentViewSet(viewsets.ModelViewSet):
     parser_classes = [MultiPartParser, JSONParser]
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
-        filters.OrderingFilter,
+        PowerAppsSearchFilter,
+        PowerAppsOrderingFilter,
     ]
     filterset_fields = ["document_type", "processing_status", "status"]
     search_fields = ["original_filename", "extracted_text"]
@@ -285,110 +330,56 @@ class UploadedDocumentViewSet(viewsets.ModelViewSet):
         """Filter documents to current user only."""
         return self.queryset.filter(owner=self.request.user)
 
-    def perform_create(self, serializer):
-        """Create document and initiate processing."""
-        document = serializer.save(
-            owner=self.request.user,
-            created_by=self.request.user,
-            modified_by=self.request.user,
-        )
-
-        # Start document processing
-        self._start_document_processing(document)
-
     def create(self, request, *args, **kwargs):
-        """Create document and return full serialized data."""
+        """
+        Store the upload and queue it for background processing.
+
+        Returns 202 with the document and the ProcessingTask id to poll.
+        """
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         document = serializer.save(
             owner=request.user, created_by=request.user, modified_by=request.user
         )
-
-        # Start document processing
-        self._start_document_processing(document)
+        task = queue_document_processing(document)
 
         # Return full document data
         full_serializer = UploadedDocumentSerializer(
             document, context={"request": request}
         )
+        data = dict(full_serializer.data)
+        data["processing_task_id"] = str(task.id)
         headers = self.get_success_headers(full_serializer.data)
-        return Response(
-            full_serializer.data, status=status.HTTP_201_CREATED, headers=headers
-        )
-
-    def _start_document_processing(self, document: UploadedDocument):
-        """Start background processing for uploaded document."""
-        try:
-            # Update status to processing
-            document.processing_status = DocumentProcessingStatusChoices.PROCESSING
-            document.save()
-
-            # For now, simulate processing with immediate mock results
-            # In production, this would be an async task
-            self._process_document_sync(document)
-
-        except Exception as e:
-            logger.error(f"Error starting document processing: {str(e)}")
-            document.processing_status = DocumentProcessingStatusChoices.FAILED
-            document.processing_error = str(e)
-            document.save()
-
-    def _process_document_sync(self, document: UploadedDocument):
-        """Synchronous document processing for demo purposes."""
-        try:
-            # Extract text (simplified - in production would use OCR for images/PDFs)
-            extracted_text = "Sample extracted text from document processing..."
-
-            # Classify document
-            classification = ai_service.classify_document_type(extracted_text)
-
-            # Extract entities
-            entities = ai_service.extract_document_entities(extracted_text)
-
-            # Update document with results
-            document.extracted_text = extracted_text
-            document.document_type = classification.get("document_type", "unknown")
-            document.confidence_score = classification.get("confidence", 0.0)
-            document.extracted_data = {
-                "classification": classification,
-                "entities": entities,
-                "processing_timestamp": timezone.now().isoformat(),
-            }
-            document.processing_status = DocumentProcessingStatusChoices.COMPLETED
-            document.processing_metadata = {
-                "processing_method": "ai_service",
-                "model_used": "mock",
-                "processing_time": 1.5,
-            }
-            document.save()
-
-        except Exception as e:
-            logger.error(f"Error processing document: {str(e)}")
-            document.processing_status = DocumentProcessingStatusChoices.FAILED
-            document.processing_error = str(e)
-            document.save()
+        return Response(data, status=status.HTTP_202_ACCEPTED, headers=headers)
 
     @action(detail=True, methods=["post"])
     def reprocess(self, request, pk=None):
-        """Reprocess a document."""
-        document = self.get_object()
+        """
+        Reprocess a document.
 
-        if document.processing_status == DocumentProcessingStatusChoices.PROCESSING:
-            return Response(
-                {"error": "Document is already being processed"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+        A previous result for identical content is reused unless ``force``
+        is true.
+        """
+        document = self.get_object()
+        force = str(request.data.get("force", "")).lower() in ("1", "true")
 
-        # Reset and reprocess
-        document.processing_status = DocumentProcessingStatusChoices.PENDING
-        document.processing_error = None
-        document.save()
+        with transaction.atomic():
+            # Lock the document so concurrent requests can't both queue it
+            document = UploadedDocument.objects.select_for_update().get(pk=document.pk)
+            busy = _already_processing(document)
+            if busy is not None:
+                return busy
 
-        self._start_document_processing(document)
+            # Reset and reprocess
+            document.processing_status = DocumentProcessingStatusChoices.PENDING
+            document.processing_error = None
+            document.save(update_fields=["processing_status", "processing_error"])
+            task = queue_document_processing(document, options={"force": force})
 
-        serializer = self.get_serializer(document)
-        return Response(serializer.data)
+        data = dict(self.get_serializer(document).data)
+        data["processing_task_id"] = str(task.id)
+        return Response(data, status=status.HTTP_202_ACCEPTED)
 
     @action(detail=True, methods=["post"])
     def create_entities(self, request, pk=None):
@@ -436,6 +427,43 @@ class AIConfigurationViewSet(viewsets.ReadOnlyModelViewSet):
     ordering = ["name"]
 
 
+class UsageRollupViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Read-only ViewSet for aggregated AI usage analytics.
+
+    Serves hourly and daily rollups, filterable by period, dimensions and
+    ``bucket_start__gte`` / ``bucket_start__lt``. Staff users only.
+    """
+
+    queryset = UsageRollup.objects.all()
+    serializer_class = UsageRollupSerializer
+    permission_classes = [permissions.IsAdminUser]
+    pagination_class = PowerAppsPagination
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = {
+        "period": ["exact"],
+        "action_type": ["exact"],
+        "ai_provider": ["exact"],
+        "ai_model": ["exact"],
+        "bucket_start": ["gte", "lt"],
+    }
+    ordering_fields = ["bucket_start", "count", "tokens_used"]
+    ordering = ["-bucket_start", "action_type"]
+
+    @action(detail=False, methods=["get"])
+    def summary(self, request):
+        """
+        Totals, success rate and latency percentiles per action type,
+        provider and model over the filtered rollups (hourly by default).
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        if "period" not in request.query_params:
+            queryset = queryset.filter(period=RollupPeriodChoices.HOUR)
+
+        serializer = UsageSummarySerializer(summarize(queryset), many=True)
+        return Response({"results": serializer.data})
+
+
 class ProcessingTaskViewSet(viewsets.ReadOnlyModelViewSet):
     """
     Read-only ViewSet for processing tasks.
@@ -473,6 +501,9 @@ class ChatBotAPIViewSet(viewsets.ViewSet):
         Send a message to the AI assistant and get a response.
 
         Automatically manages session creation and message handling.
+        With ``?stream=1`` the response is sent as server-sent events:
+        ``session``, one ``delta`` per chunk of text, then ``done`` with the
+        same payload as the non-streaming response (or ``error``).
         """
         serializer = ChatBotRequestSerializer(data=request.data)
         if not serializer.is_valid():
@@ -512,14 +543,19 @@ class ChatBotAPIViewSet(viewsets.ViewSet):
                 modified_by=request.user,
             )
 
-            # Get session history for context
-            session_messages = session.messages.filter(
-                created_on__lt=user_msg.created_on
-            ).order_by("created_on")
+            # Recent history within the context budget
+            context = build_context(session, before=user_msg.created_on)
+
+            if request.query_params.get("stream") in ("1", "true"):
+                return self._stream_chat(
+                    request, session, user_message, context, start_time
+                )
 
             # Generate AI response
             response_text, metadata = ai_service.generate_chat_response(
-                user_message=user_message, session_messages=list(session_messages)
+                user_message=user_message,
+                session_messages=context.messages,
+                summary=context.summary,
             )
 
             # Create AI response message
@@ -561,6 +597,57 @@ class ChatBotAPIViewSet(viewsets.ViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+    def _stream_chat(self, request, session, user_message, context, start_time):
+        """Stream the assistant's reply and save it once complete."""
+
+        def events():
+            yield _sse_event("session", {"session_id": session.id})
+            try:
+                for chunk in ai_service.stream_chat_response(
+                    user_message=user_message,
+                    session_messages=context.messages,
+                    summary=context.summary,
+                ):
+                    if not chunk.get("done"):
+                        yield _sse_event("delta", {"content": chunk["delta"]})
+                        continue
+
+                    ai_msg = ChatMessage.objects.create(
+                        session=session,
+                        message_type=MessageTypeChoices.ASSISTANT,
+                        content=chunk["response"],
+                        metadata=chunk["metadata"],
+                        owner=request.user,
+                        created_by=request.user,
+                        modified_by=request.user,
+                    )
+                    response_serializer = ChatBotResponseSerializer(
+                        data={
+                            "response": chunk["response"],
+                            "session_id": session.id,
+                            "message_id": ai_msg.id,
+                            "processing_time": time.time() - start_time,
+                            "metadata": chunk["metadata"],
+                        }
+                    )
+                    response_serializer.is_valid(raise_exception=True)
+                    yield _sse_event("done", response_serializer.data)
+            except Exception as e:
+                logger.error(f"Error in streaming chat API: {str(e)}")
+                yield _sse_event(
+                    "error",
+                    {
+                        "error": "Failed to generate response",
+                        "processing_time": time.time() - start_time,
+                    },
+                )
+
+        response = StreamingHttpResponse(events(), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        # Stop nginx from buffering the stream
+        response["X-Accel-Buffering"] = "no"
+        return response
+
     @action(detail=False, methods=["post"])
     def process_document(self, request):
         """
@@ -577,57 +664,12 @@ class ChatBotAPIViewSet(viewsets.ViewSet):
         processing_options = serializer.validated_data.get("processing_options", {})
 
         try:
-            # Get document
-            document = UploadedDocument.objects.get(id=document_id, owner=request.user)
-
-            # Get or create session
-            session = None
-            if session_id:
-                try:
-                    session = ChatSession.objects.get(id=session_id, owner=request.user)
-                except ChatSession.DoesNotExist:
-                    pass
-
-            if not session:
-                session = ChatSession.objects.create(
-                    title=f"Document Processing - {document.original_filename}",
-                    owner=request.user,
-                    created_by=request.user,
-                    modified_by=request.user,
+            with transaction.atomic():
+                # Lock the document so concurrent requests can't both queue it
+                document = UploadedDocument.objects.select_for_update().get(
+                    id=document_id, owner=request.user
                 )
-
-            # Create processing task
-            task = ProcessingTask.objects.create(
-                task_type="document_processing",
-                document=document,
-                session=session,
-                input_data={
-                    "document_id": str(document_id),
-                    "processing_options": processing_options,
-                },
-                owner=request.user,
-                created_by=request.user,
-                modified_by=request.user,
-            )
-
-            # Start processing (simplified for demo)
-            if document.processing_status == DocumentProcessingStatusChoices.PENDING:
-                # Start processing if not already started
-                viewset = UploadedDocumentViewSet()
-                viewset._start_document_processing(document)
-
-            response_serializer = DocumentProcessingResponseSerializer(
-                data={
-                    "task_id": task.id,
-                    "document_id": document.id,
-                    "status": document.processing_status,
-                    "message": f"Processing started for {document.original_filename}",
-                }
-            )
-            response_serializer.is_valid(raise_exception=True)
-
-            return Response(response_serializer.data, status=status.HTTP_202_ACCEPTED)
-
+                return self._queue_document(document, session_id, processing_options)
         except UploadedDocument.DoesNotExist:
             return Response(
                 {"error": "Document not found"}, status=status.HTTP_404_NOT_FOUND
@@ -638,3 +680,63 @@ class ChatBotAPIViewSet(viewsets.ViewSet):
                 {"error": "Failed to start document processing"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
+
+    def _queue_document(self, document, session_id, processing_options):
+        """
+        Queue a document's processing.
+
+        Uploads are queued by create, so a document with a queued or running
+        task gets that task back instead of a second one.
+        """
+        request = self.request
+        active_task = active_processing_task(document)
+        if active_task is None:
+            busy = _already_processing(document)
+            if busy is not None:
+                return busy
+
+        # Get or create session
+        session = None
+        if session_id:
+            try:
+                session = ChatSession.objects.get(id=session_id, owner=request.user)
+            except ChatSession.DoesNotExist:
+                pass
+
+        if not session:
+            session = ChatSession.objects.create(
+                title=f"Document Processing - {document.original_filename}",
+                owner=request.user,
+                created_by=request.user,
+                modified_by=request.user,
+            )
+
+        if active_task is not None:
+            if active_task.session_id is None:
+                active_task.session = session
+                active_task.save(update_fields=["session"])
+            task = active_task
+            message = f"Processing already queued for {document.original_filename}"
+        else:
+            # Queue the extraction -> classification -> entities pipeline
+            task = queue_document_processing(
+                document, session=session, options=processing_options
+            )
+            message = f"Processing started for {document.original_filename}"
+
+        response_serializer = DocumentProcessingResponseSerializer(
+            data={
+                "task_id": task.id,
+                "document_id": document.id,
+                "status": document.processing_status,
+                "message": message,
+            }
+        )
+        response_serializer.is_valid(raise_exception=True)
+
+        return Response(response_serializer.data, status=status.HTTP_202_ACCEPTED)
+
+
+def _sse_event(event: str, data) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
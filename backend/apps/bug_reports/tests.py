@@ -5,11 +5,14 @@ Tests for the bug reporting feature including GitHub integration.
 """
 
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 
+from apps.core.cache import reset_caches
+
 from .models import BugReport, BugReportPriority, BugReportStatus
 
 
@@ -116,3 +119,38 @@ class BugReportAPITest(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["count"], 2)  # Should see both bug reports
+
+    def test_stats_counted_in_one_query(self):
+        """Test that stats buckets come from a single cached aggregate."""
+        cache.clear()
+        reset_caches()
+        BugReport.objects.create(
+            reporter=self.user,
+            reporter_email=self.user.email,
+            title="Failed Bug",
+            description="Bug that failed to submit.",
+            priority=BugReportPriority.HIGH,
+            status=BugReportStatus.FAILED,
+        )
+        self.client.force_authenticate(user=self.user)
+        url = reverse("bug-reports-stats")
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["total"], 2)
+        self.assertEqual(response.data["failed_submissions"], 1)
+        self.assertEqual(response.data["by_priority"][BugReportPriority.HIGH], 1)
+        self.assertEqual(response.data["by_priority"][BugReportPriority.MEDIUM], 1)
+        self.assertEqual(
+            set(response.data["by_status"]),
+            {value for value, _ in BugReportStatus.choices},
+        )
+
+        # Served from cache until a bug report changes
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+        self.bug_report.delete()
+        self.assertEqual(self.client.get(url).data["total"], 1)
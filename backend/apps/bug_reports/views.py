@@ -8,14 +8,19 @@ with integrated GitHub issue creation.
 import logging
 
 from django.db import transaction
+from django.db.models import Q
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, status, viewsets
+from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from apps.core.aggregates import aggregate_counts, choice_buckets
+from apps.core.relations import with_serializer_relations
+from apps.core.search import PowerAppsOrderingFilter, PowerAppsSearchFilter
+
 from .github_service import GitHubIssueService
-from .models import BugReport, BugReportStatus
+from .models import BugReport, BugReportPriority, BugReportStatus
 from .serializers import (
     BugReportCreateSerializer,
     BugReportListSerializer,
@@ -37,8 +42,8 @@ class BugReportViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
-        filters.OrderingFilter,
+        PowerAppsSearchFilter,
+        PowerAppsOrderingFilter,
     ]
     filterset_fields = ["status", "priority", "assigned_to_copilot"]
     search_fields = ["title", "description", "reporter__username"]
@@ -59,7 +64,9 @@ class BugReportViewSet(viewsets.ModelViewSet):
         """
         Filter queryset based on user permissions.
         """
-        queryset = super().get_queryset()
+        queryset = with_serializer_relations(
+            super().get_queryset(), self.get_serializer_class()
+        )
 
         # Staff users can see all bug reports
         if self.request.user.is_staff:
@@ -186,36 +193,17 @@ class BugReportViewSet(viewsets.ModelViewSet):
         """
         Get bug report statistics.
         """
-        queryset = self.get_queryset()
-
-        stats = {
-            "total": queryset.count(),
-            "by_status": {},
-            "by_priority": {},
-            "submitted_to_github": queryset.filter(
-                status=BugReportStatus.SUBMITTED
-            ).count(),
-            "assigned_to_copilot": queryset.filter(assigned_to_copilot=True).count(),
-            "failed_submissions": queryset.filter(
-                status=BugReportStatus.FAILED
-            ).count(),
-        }
-
-        # Count by status
-        for status_choice in BugReportStatus.choices:
-            status_value = status_choice[0]
-            stats["by_status"][status_value] = queryset.filter(
-                status=status_value
-            ).count()
-
-        # Count by priority
-        from .models import BugReportPriority
-
-        for priority_choice in BugReportPriority.choices:
-            priority_value = priority_choice[0]
-            stats["by_priority"][priority_value] = queryset.filter(
-                priority=priority_value
-            ).count()
+        stats = aggregate_counts(
+            self.get_queryset(),
+            {
+                "total": None,
+                "by_status": choice_buckets("status", BugReportStatus.choices),
+                "by_priority": choice_buckets("priority", BugReportPriority.choices),
+                "submitted_to_github": Q(status=BugReportStatus.SUBMITTED),
+                "assigned_to_copilot": Q(assigned_to_copilot=True),
+                "failed_submissions": Q(status=BugReportStatus.FAILED),
+            },
+        )
 
         return Response(stats)
 
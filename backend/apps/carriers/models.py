@@ -101,7 +101,7 @@ class CarrierInfo(OwnedModel, StatusModel):
     @property
     def has_supplier(self):
         """Helper property to check if linked to supplier."""
-        return self.supplier is not None
+        return self.supplier_id is not None
 
     @classmethod
     def get_powerapps_entity_name(cls):
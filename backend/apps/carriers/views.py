@@ -10,6 +10,7 @@ from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from apps.core.aggregates import record_counts
 from apps.core.views import PowerAppsModelViewSet
 
 from .models import CarrierInfo
@@ -93,9 +94,7 @@ class CarrierInfoViewSet(PowerAppsModelViewSet):
         Endpoint to get PowerApps migration information.
         Useful for documentation and verification.
         """
-        queryset = self.get_queryset()
-        total_count = queryset.count()
-        active_count = queryset.filter(status="active").count()
+        counts = record_counts(self.get_queryset())
 
         field_mappings = {
             "cr7c4_name": "name",
@@ -116,8 +115,8 @@ class CarrierInfoViewSet(PowerAppsModelViewSet):
                 "powerapps_entity_name": "cr7c4_carrierinfo",
                 "django_model_name": "CarrierInfo",
                 "django_app_name": "carriers",
-                "total_records": total_count,
-                "active_records": active_count,
+                "total_records": counts["total_records"],
+                "active_records": counts["active_records"],
                 "field_mappings": field_mappings,
                 "computed_fields": {
                     "has_contact_info": "bool(contact_name)",
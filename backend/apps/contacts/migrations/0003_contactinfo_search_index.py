@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:40
+
+from django.db import migrations
+
+import apps.core.search
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("contacts", "0002_contactinfo_contact_inf_name_05b51f_idx_and_more"),
+    ]
+
+    operations = [
+        apps.core.search.AddSearchIndex(
+            model_name="contactinfo",
+            vector=[
+                ("name", "A"),
+                ("email", "B"),
+                ("position", "C"),
+            ],
+            trigram=["name"],
+        ),
+    ]
@@ -118,7 +118,7 @@ class ContactInfo(OwnedModel, StatusModel):
     @property
     def has_relationships(self):
         """Helper property to check if linked to customer or supplier."""
-        return bool(self.customer or self.supplier)
+        return bool(self.customer_id or self.supplier_id)
 
     @classmethod
     def get_powerapps_entity_name(cls):
@@ -12,13 +12,16 @@ Endpoints:
 - DELETE /api/v1/contacts/{id}/ - Delete contact info
 """
 
-from django.contrib.auth.models import User
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema, extend_schema_view
-from rest_framework import filters, status, viewsets
+from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from apps.core.aggregates import record_counts
+from apps.core.search import PowerAppsOrderingFilter, PowerAppsSearchFilter
+from apps.core.views import PowerAppsModelViewSet
+
 from .models import ContactInfo
 from .serializers import (
     ContactInfoCreateSerializer,
@@ -59,7 +62,7 @@ from .serializers import (
         tags=["Contact Information"],
     ),
 )
-class ContactInfoViewSet(viewsets.ModelViewSet):
+class ContactInfoViewSet(PowerAppsModelViewSet):
     """
     ViewSet for managing ContactInfo entities.
 
@@ -78,8 +81,8 @@ class ContactInfoViewSet(viewsets.ModelViewSet):
     queryset = ContactInfo.objects.all()
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
-        filters.OrderingFilter,
+        PowerAppsSearchFilter,
+        PowerAppsOrderingFilter,
     ]
     filterset_fields = ["status", "contact_type", "customer", "supplier"]
     search_fields = ["name", "email", "position"]
@@ -111,10 +114,6 @@ class ContactInfoViewSet(viewsets.ModelViewSet):
         """
         queryset = super().get_queryset()
 
-        # Filter by active status
-        if self.request.query_params.get("active") == "true":
-            queryset = queryset.filter(status="active")
-
         # Filter by records with contact details
         if self.request.query_params.get("has_contact_details") == "true":
             queryset = queryset.exclude(email__isnull=True, phone__isnull=True)
@@ -125,50 +124,6 @@ class ContactInfoViewSet(viewsets.ModelViewSet):
 
         return queryset
 
-    def perform_create(self, serializer):
-        """
-        Set ownership fields when creating new records.
-        Maps to PowerApps CreatedBy/ModifiedBy/OwnerId pattern.
-        """
-        # In production, get the authenticated user
-        # For now, we'll create a default user if none exists
-        user = (
-            self.request.user
-            if self.request.user.is_authenticated
-            else self._get_default_user()
-        )
-
-        serializer.save(created_by=user, modified_by=user, owner=user)
-
-    def perform_update(self, serializer):
-        """Update modified_by field when updating records."""
-        user = (
-            self.request.user
-            if self.request.user.is_authenticated
-            else self._get_default_user()
-        )
-        serializer.save(modified_by=user)
-
-    def perform_destroy(self, instance):
-        """
-        Soft delete by setting status to inactive (PowerApps pattern).
-        Preserves data for audit trails.
-        """
-        instance.status = "inactive"
-        instance.save()
-
-    def _get_default_user(self):
-        """Get or create a default user for development/testing."""
-        user, created = User.objects.get_or_create(
-            username="system",
-            defaults={
-                "email": "system@projectmeats.com",
-                "first_name": "System",
-                "last_name": "User",
-            },
-        )
-        return user
-
     @extend_schema(
         summary="Get PowerApps Migration Info",
         description="Get information about the PowerApps to Django migration for this entity.",
@@ -192,9 +147,7 @@ class ContactInfoViewSet(viewsets.ModelViewSet):
         Endpoint to get PowerApps migration information.
         Useful for documentation and verification.
         """
-        queryset = self.get_queryset()
-        total_count = queryset.count()
-        active_count = queryset.filter(status="active").count()
+        counts = record_counts(self.get_queryset())
 
         field_mappings = {
             "pro_name": "name",
@@ -217,8 +170,8 @@ class ContactInfoViewSet(viewsets.ModelViewSet):
                 "powerapps_entity_name": "pro_contactinfo",
                 "django_model_name": "ContactInfo",
                 "django_app_name": "contacts",
-                "total_records": total_count,
-                "active_records": active_count,
+                "total_records": counts["total_records"],
+                "active_records": counts["active_records"],
                 "field_mappings": field_mappings,
                 "api_endpoints": {
                     "list": "/api/v1/contacts/",
@@ -0,0 +1,173 @@
+"""
+Single-query count aggregation for dashboard and stats endpoints.
+
+``aggregate_counts`` turns a (possibly nested) mapping of bucket names to
+``Q`` filters into one ``SELECT COUNT(*) FILTER (WHERE ...)`` query::
+
+    aggregate_counts(queryset, {
+        "total": None,
+        "active": Q(status="active"),
+        "by_status": choice_buckets("status", StatusChoices.choices),
+    })
+    # {"total": 12, "active": 9, "by_status": {"active": 9, "inactive": 3}}
+
+Results are cached for ``STATS_CACHE_TIMEOUT`` seconds in the "stats" cache
+namespace, keyed on the queryset's SQL and the buckets requested. Only the
+models in ``COUNTED_MODELS`` are cached: saving or deleting one of their
+rows starts a new cache generation for that model. The process that wrote
+sees fresh counts straight away; other processes may keep the previous
+generation in their L1 tier for up to ``CACHE_L1_TIMEOUT`` seconds, so
+their counts can lag a write by that long.
+"""
+
+import hashlib
+import uuid
+from functools import partial
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet
+from django.db import transaction
+from django.db.models import Count, Q
+from django.db.models.signals import post_delete, post_save
+
+from .cache import get_cache
+
+Buckets = Mapping[str, Any]
+
+# Models whose counts are cached. Their saves and deletes start a new cache
+# generation; counts of other models are computed on every call.
+COUNTED_MODELS = (
+    "accounts_receivables.AccountsReceivable",
+    "bug_reports.BugReport",
+    "carriers.CarrierInfo",
+    "contacts.ContactInfo",
+    "customers.Customer",
+    "plants.Plant",
+    "purchase_orders.PurchaseOrder",
+    "suppliers.Supplier",
+    "suppliers.SupplierLocation",
+    "suppliers.SupplierPlantMapping",
+)
+
+
+def choice_buckets(field: str, choices: Iterable[Tuple[Any, str]]) -> Dict[str, Q]:
+    """Return one bucket per choice value of ``field``."""
+    return {str(value): Q(**{field: value}) for value, _label in choices}
+
+
+def record_counts(queryset) -> Dict[str, int]:
+    """Total and active record counts reported by ``migration_info``."""
+    counts = aggregate_counts(queryset, {"total": None, "active": Q(status="active")})
+    return {"total_records": counts["total"], "active_records": counts["active"]}
+
+
+def aggregate_counts(
+    queryset, buckets: Buckets, timeout: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Count ``queryset`` rows in every bucket with a single query.
+
+    A bucket is either a ``Q`` filter, ``None`` (count all rows) or a nested
+    mapping of buckets. The result mirrors the shape of ``buckets``.
+    """
+    flat = dict(_flatten(buckets))
+    if timeout is None:
+        timeout = settings.STATS_CACHE_TIMEOUT
+
+    key = _cache_key(queryset, flat) if timeout else None
+    if key is None:
+        return _unflatten(_count(queryset, flat))
+
+    counts = get_cache("stats").get_or_compute(
+        key, lambda: _count(queryset, flat), timeout
+    )
+    return _unflatten(counts)
+
+
+def _flatten(buckets: Buckets, prefix: Tuple[str, ...] = ()):
+    for name, bucket in buckets.items():
+        path = prefix + (name,)
+        if isinstance(bucket, Mapping):
+            yield from _flatten(bucket, path)
+        else:
+            yield path, bucket
+
+
+def _unflatten(counts: Dict[Tuple[str, ...], int]) -> Dict[str, Any]:
+    result: Dict[str, Any] = {}
+    for path, value in counts.items():
+        node = result
+        for name in path[:-1]:
+            node = node.setdefault(name, {})
+        node[path[-1]] = value
+    return result
+
+
+def _count(queryset, flat: Dict[Tuple[str, ...], Optional[Q]]) -> Dict[tuple, int]:
+    # Positional aliases keep arbitrary bucket names out of the SQL
+    aliases = {f"bucket_{index}": path for index, path in enumerate(flat)}
+    aggregates = {
+        alias: Count("pk", filter=flat[path]) for alias, path in aliases.items()
+    }
+    try:
+        row = queryset.order_by().aggregate(**aggregates)
+    except EmptyResultSet:
+        row = {}
+    return {path: row.get(alias) or 0 for alias, path in aliases.items()}
+
+
+def _cache_key(queryset, flat: Dict[Tuple[str, ...], Optional[Q]]) -> Optional[str]:
+    model = queryset.model
+    if model._meta.label not in COUNTED_MODELS:
+        # Nothing would invalidate the cached counts
+        return None
+    try:
+        sql, params = queryset.order_by().query.sql_with_params()
+    except EmptyResultSet:
+        return None
+
+    label = model._meta.label_lower
+    generation = get_cache("stats").get(f"generation:{label}")
+    digest = hashlib.md5(
+        f"{sql}|{params!r}|{sorted(flat.items(), key=repr)!r}".encode()
+    ).hexdigest()
+    return f"counts:{label}:{generation}:{digest}"
+
+
+def invalidate_counts(model, using=None) -> None:
+    """
+    Invalidate cached counts for a model.
+
+    Called for every save and delete of a ``COUNTED_MODELS`` row; bulk
+    writes that send no signals (``bulk_create``, ``bulk_update``,
+    ``QuerySet.update``) call it directly.
+    """
+    _bump_generation(model)
+    if transaction.get_connection(using).in_atomic_block:
+        # Bump again once committed so counts cached by other processes in
+        # between don't outlive the transaction
+        transaction.on_commit(partial(_bump_generation, model), using=using)
+
+
+def _new_generation(sender, using=None, **kwargs) -> None:
+    """Invalidate cached counts for a model after one of its rows changes."""
+    invalidate_counts(sender, using=using)
+
+
+def connect_signals() -> None:
+    """Invalidate counts on saves and deletes of the ``COUNTED_MODELS``."""
+    # Receivers are connected per model: a receiver for every sender would
+    # also stop Django deleting other models' rows without loading them
+    for label in COUNTED_MODELS:
+        model = apps.get_model(label)
+        uid = f"aggregates:{label}"
+        post_save.connect(_new_generation, sender=model, dispatch_uid=uid)
+        post_delete.connect(_new_generation, sender=model, dispatch_uid=uid)
+
+
+def _bump_generation(model) -> None:
+    get_cache("stats").set(
+        f"generation:{model._meta.label_lower}", uuid.uuid4().hex, None
+    )
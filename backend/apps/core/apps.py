@@ -5,3 +5,12 @@ class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.core"
     verbose_name = "Core"
+
+    def ready(self):
+        # Connect the system-user, stats cache and search document signals
+        from . import aggregates, global_search, ownership  # noqa: F401
+        from .checks import log_database_settings
+
+        aggregates.connect_signals()
+        global_search.connect_signals()
+        log_database_settings()
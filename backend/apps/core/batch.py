@@ -0,0 +1,240 @@
+"""
+Batch create, update and soft-delete for ProjectMeats entity viewsets.
+
+``BatchMixin`` adds a ``batch`` action (``/api/v1/<entity>/batch/``) that
+applies a list of changes in one request and one transaction:
+
+* ``POST``: a list of new records, validated by the create serializer with
+  ``many=True`` and inserted with ``bulk_create``;
+* ``PATCH``: a list of partial records, each with its ``id``, loaded in one
+  query and saved with ``bulk_update``;
+* ``DELETE``: ``{"ids": [...]}``, soft-deleted with a single
+  ``UPDATE ... SET status = 'inactive'``.
+
+Items that fail validation (or don't exist) are reported and skipped; the
+rest are applied. The response lists a result per item, in request order.
+Batches are limited to ``API_BATCH_MAX_SIZE`` items.
+"""
+
+from typing import Any, Dict, List
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.utils import model_meta
+
+from .aggregates import invalidate_counts
+from .global_search import index_documents
+from .ownership import ownership
+
+
+class BatchMixin:
+    """Adds the ``batch`` action to a ``PowerAppsModelViewSet``."""
+
+    @action(detail=False, methods=["post", "patch", "delete"], url_path="batch")
+    def batch(self, request):
+        """Create, update or soft-delete a list of records."""
+        if request.method == "POST":
+            results = self._batch_create(self._batch_items(request.data))
+        elif request.method == "PATCH":
+            results = self._batch_update(self._batch_items(request.data))
+        else:
+            data = request.data
+            ids = data.get("ids") if isinstance(data, dict) else data
+            results = self._batch_delete(self._batch_items(ids))
+        return self._batch_response(results)
+
+    def get_batch_serializer_class(self, action_name: str):
+        """Serializer class the single-record ``action_name`` action uses."""
+        batch_action, self.action = self.action, action_name
+        try:
+            return self.get_serializer_class()
+        finally:
+            self.action = batch_action
+
+    def _batch_items(self, items) -> List[Any]:
+        if not isinstance(items, list):
+            raise ValidationError({"non_field_errors": ["Expected a list of items."]})
+        if not items:
+            raise ValidationError({"non_field_errors": ["The batch is empty."]})
+        limit = settings.API_BATCH_MAX_SIZE
+        if len(items) > limit:
+            raise ValidationError(
+                {"non_field_errors": [f"A batch holds at most {limit} items."]}
+            )
+        return items
+
+    def _batch_create(self, items) -> List[Dict[str, Any]]:
+        serializer_class = self.get_batch_serializer_class("create")
+        context = self.get_serializer_context()
+        serializer = serializer_class(data=items, many=True, context=context)
+        errors = [{}] * len(items)
+        if not serializer.is_valid():
+            # An invalid list keeps no validated data: validate the valid
+            # items again on their own
+            errors = _item_errors(serializer.errors, len(items))
+            serializer = serializer_class(
+                data=[item for item, error in zip(items, errors) if not error],
+                many=True,
+                context=context,
+            )
+            serializer.is_valid(raise_exception=True)
+
+        model = serializer_class.Meta.model
+        valid = iter(serializer.validated_data)
+        results, pending = [], []
+        for index, item_errors in enumerate(errors):
+            if item_errors:
+                results.append(
+                    {"index": index, "status": "error", "errors": item_errors}
+                )
+                continue
+            result = {"index": index, "status": "created"}
+            results.append(result)
+            pending.append((result, next(valid)))
+
+        if pending:
+            owned = ownership.creation_fields(self.request)
+            to_many = {
+                name
+                for name, relation in model_meta.get_field_info(model).relations.items()
+                if relation.to_many
+            }
+            with transaction.atomic():
+                if any(to_many & set(data) for _, data in pending):
+                    # Many-to-many values need the row saved first
+                    instances = [
+                        serializer.child.create({**data, **owned})
+                        for _, data in pending
+                    ]
+                else:
+                    instances = model.objects.bulk_create(
+                        [model(**data, **owned) for _, data in pending]
+                    )
+                    index_documents(model, instances)
+                invalidate_counts(model)
+            for (result, _), instance in zip(pending, instances):
+                result["id"] = instance.pk
+        return results
+
+    def _batch_update(self, items) -> List[Dict[str, Any]]:
+        serializer_class = self.get_batch_serializer_class("partial_update")
+        context = self.get_serializer_context()
+        model = serializer_class.Meta.model
+
+        ids = [item.get("id") if isinstance(item, dict) else None for item in items]
+        instances = self.get_queryset().in_bulk(
+            [pk for pk in ids if isinstance(pk, int)]
+        )
+
+        results, changed, fields = [], [], set()
+        for index, (pk, item) in enumerate(zip(ids, items)):
+            instance = instances.get(pk)
+            if instance is None:
+                results.append(_missing(index, pk))
+                continue
+            serializer = serializer_class(
+                instance, data=item, partial=True, context=context
+            )
+            if not serializer.is_valid():
+                results.append(
+                    {
+                        "index": index,
+                        "id": pk,
+                        "status": "error",
+                        "errors": serializer.errors,
+                    }
+                )
+                continue
+            for name, value in serializer.validated_data.items():
+                setattr(instance, name, value)
+                fields.add(name)
+            results.append({"index": index, "id": pk, "status": "updated"})
+            changed.append(instance)
+
+        if changed:
+            modified = ownership.modification_fields(self.request)
+            now = timezone.now()
+            for instance in changed:
+                for name, value in modified.items():
+                    setattr(instance, name, value)
+                # bulk_update doesn't apply auto_now
+                instance.modified_on = now
+            fields.update(name.removesuffix("_id") for name in modified)
+            fields.add("modified_on")
+            with transaction.atomic():
+                model.objects.bulk_update(changed, sorted(fields))
+                invalidate_counts(model)
+                index_documents(model, changed)
+        return results
+
+    def _batch_delete(self, ids) -> List[Dict[str, Any]]:
+        queryset = self.get_queryset()
+        found = set(
+            queryset.filter(pk__in=[pk for pk in ids if isinstance(pk, int)])
+            .values_list("pk", flat=True)
+            .order_by()
+        )
+        results = [
+            {"index": index, "id": pk, "status": "deleted"}
+            if pk in found
+            else _missing(index, pk)
+            for index, pk in enumerate(ids)
+        ]
+        if found:
+            with transaction.atomic():
+                queryset.model.objects.filter(pk__in=found).update(
+                    status="inactive",
+                    modified_on=timezone.now(),
+                    **ownership.modification_fields(self.request),
+                )
+                invalidate_counts(queryset.model)
+        return results
+
+    def _batch_response(self, results: List[Dict[str, Any]]) -> Response:
+        failed = sum(1 for result in results if result["status"] == "error")
+        applied = len(results) - failed
+        if not applied:
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif failed:
+            response_status = status.HTTP_207_MULTI_STATUS
+        elif self.request.method == "POST":
+            response_status = status.HTTP_201_CREATED
+        else:
+            response_status = status.HTTP_200_OK
+        return Response(
+            {"applied": applied, "failed": failed, "results": results},
+            status=response_status,
+        )
+
+
+def _item_errors(errors, count: int) -> List[Any]:
+    """
+    One entry per item of the errors of an invalid list serializer.
+
+    DRF versions report item errors as a list aligned with the items or as
+    a dict keyed by item index. Errors of the list as a whole, such as
+    ``non_field_errors``, apply to every item.
+    """
+    if isinstance(errors, list) and len(errors) == count:
+        return list(errors)
+    if (
+        isinstance(errors, dict)
+        and errors
+        and all(isinstance(key, int) for key in errors)
+    ):
+        return [errors.get(index, {}) for index in range(count)]
+    return [errors] * count
+
+
+def _missing(index: int, pk) -> Dict[str, Any]:
+    return {
+        "index": index,
+        "id": pk,
+        "status": "error",
+        "errors": {"id": ["Not found."]},
+    }
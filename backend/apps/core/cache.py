@@ -0,0 +1,410 @@
+"""
+Shared cache layer for ProjectMeats.
+
+Wraps Django's cache framework (Redis in production, see ``CACHES`` in
+settings) with:
+
+- per-app key namespacing and versioning, so one app can invalidate all of
+  its keys by bumping its version in ``CACHE_NAMESPACES``;
+- a short-lived in-process L1 tier in front of the shared cache, so hot keys
+  don't cost a Redis round trip on every read;
+- hit/miss counters per namespace and tier, also exported to /metrics;
+- ``get_or_compute``, which coalesces concurrent misses for a key behind a
+  short lock in the shared cache (only one process computes the value, the
+  others wait for it) and refreshes hot keys early at random, so entries
+  don't all expire at the same moment.
+
+Usage:
+    from apps.core.cache import get_cache
+
+    ai_cache = get_cache("ai_assistant")
+    value = ai_cache.get("default_config")
+    config = ai_cache.get_or_compute("default_config", load_config, 300)
+"""
+
+import logging
+import math
+import pickle
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Sentinel distinguishing "not cached" from a cached ``None``
+MISSING = object()
+
+DEFAULT_TIMEOUT = object()
+
+# Lookup counters exported to Prometheus
+METRIC_RESULTS = {"l1_hits": "l1_hit", "l2_hits": "l2_hit", "misses": "miss"}
+
+# Delay between checks while waiting for another process to compute a value
+LOCK_POLL_INTERVAL = 0.05
+
+
+class ComputedValue(NamedTuple):
+    """
+    Value stored by ``get_or_compute``.
+
+    ``cost`` is how long the value took to compute and ``expires_at`` the
+    wall-clock expiry (``None`` for no expiry); together they decide when
+    a read refreshes the value early.
+    """
+
+    value: Any
+    cost: float
+    expires_at: Optional[float]
+
+
+class LocalCacheTier:
+    """
+    Bounded, thread-safe in-process cache with a fixed short TTL.
+
+    Values are stored pickled so callers get an independent copy on every
+    read, exactly as they would from Redis.
+    """
+
+    def __init__(self, timeout: float, max_entries: int = 1000):
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, payload = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return MISSING
+        return pickle.loads(payload)
+
+    def set(self, key: str, value: Any, timeout: Optional[float] = None) -> None:
+        ttl = self.timeout if timeout is None else min(timeout, self.timeout)
+        if ttl <= 0:
+            return
+        payload = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, payload)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class NamespacedCache:
+    """
+    Two-tier cache bound to a single application namespace.
+
+    Keys are prefixed with the namespace and stored with the namespace's
+    version through Django's native cache versioning. Reads check the local
+    L1 tier first, then the shared cache, and populate L1 on a shared hit.
+    Writes and deletes go to both tiers; other processes see a delete once
+    their L1 entry expires (at most ``l1_timeout`` seconds).
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        version: int = 1,
+        l1_timeout: float = 5,
+        l1_max_entries: int = 1000,
+        alias: str = "default",
+    ):
+        self.namespace = namespace
+        self.version = version
+        self.alias = alias
+        self.local = LocalCacheTier(l1_timeout, l1_max_entries) if l1_timeout else None
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "l1_hits": 0,
+            "l2_hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "computed": 0,
+            "coalesced": 0,
+            "early_refreshes": 0,
+        }
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def make_key(self, key: str) -> str:
+        """Return the namespaced key passed to the shared backend."""
+        return f"{self.namespace}:{key}"
+
+    def _record(self, stat: str) -> None:
+        with self._stats_lock:
+            self._stats[stat] += 1
+        if stat in METRIC_RESULTS:
+            metrics.record_cache_access(self.namespace, METRIC_RESULTS[stat])
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get a value, checking the L1 tier before the shared cache."""
+        full_key = self.make_key(key)
+
+        if self.local is not None:
+            value = self.local.get(full_key)
+            if value is not MISSING:
+                self._record("l1_hits")
+                return value
+
+        value = self.backend.get(full_key, MISSING, version=self.version)
+        if value is MISSING:
+            self._record("misses")
+            return default
+
+        self._record("l2_hits")
+        if self.local is not None:
+            self.local.set(full_key, value)
+        return value
+
+    def set(self, key: str, value: Any, timeout: Any = DEFAULT_TIMEOUT) -> None:
+        """Store a value in both tiers."""
+        full_key = self.make_key(key)
+        if timeout is DEFAULT_TIMEOUT:
+            self.backend.set(full_key, value, version=self.version)
+            l1_timeout = None
+        else:
+            self.backend.set(full_key, value, timeout, version=self.version)
+            l1_timeout = timeout
+        if self.local is not None:
+            self.local.set(full_key, value, l1_timeout)
+        self._record("sets")
+
+    def delete(self, key: str) -> None:
+        """Remove a value from both tiers."""
+        full_key = self.make_key(key)
+        if self.local is not None:
+            self.local.delete(full_key)
+        self.backend.delete(full_key, version=self.version)
+
+    def get_or_set(
+        self, key: str, default: Callable[[], Any], timeout: Any = DEFAULT_TIMEOUT
+    ) -> Any:
+        """Return the cached value, computing and storing it on a miss."""
+        value = self.get(key, MISSING)
+        if value is MISSING:
+            value = default()
+            self.set(key, value, timeout)
+        return value
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        timeout: Any = DEFAULT_TIMEOUT,
+        force: bool = False,
+    ) -> Any:
+        """
+        Return the cached value, computing it at most once across processes.
+
+        On a miss, the caller that takes the key's lock computes and stores
+        the value; concurrent callers wait up to ``CACHE_LOCK_WAIT_TIMEOUT``
+        seconds for it (and compute it themselves if it never arrives).
+        Shortly before expiry, a read may refresh the value early while
+        every other caller keeps getting the current one. ``force`` always
+        recomputes. Exceptions from ``compute`` propagate and nothing is
+        stored.
+
+        Only read keys written by this method through ``peek``, not ``get``.
+        """
+        entry = MISSING if force else self.get(key, MISSING)
+        if isinstance(entry, ComputedValue):
+            if not self._refresh_early(entry):
+                return entry.value
+            with self.lock(key) as acquired:
+                if not acquired:
+                    # Someone else is already refreshing it
+                    return entry.value
+                self._record("early_refreshes")
+                return self._compute(key, compute, timeout)
+
+        with self.lock(key) as acquired:
+            if acquired:
+                if not force:
+                    # The previous holder may have stored it since our read
+                    value = self._shared_value(key)
+                    if value is not MISSING:
+                        return value
+                return self._compute(key, compute, timeout)
+
+        value = self.wait(key)
+        if value is not MISSING:
+            self._record("coalesced")
+            return value
+        return self._compute(key, compute, timeout)
+
+    def peek(self, key: str, default: Any = None) -> Any:
+        """Return a value stored by ``get_or_compute`` without refreshing it."""
+        entry = self.get(key, MISSING)
+        return entry.value if isinstance(entry, ComputedValue) else default
+
+    def store(
+        self, key: str, value: Any, timeout: Any = DEFAULT_TIMEOUT, cost: float = 0
+    ) -> None:
+        """Store a value for ``get_or_compute`` and ``peek`` readers."""
+        ttl = self.backend.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+        expires_at = None if ttl is None else time.time() + ttl
+        self.set(key, ComputedValue(value, cost, expires_at), timeout)
+
+    @contextmanager
+    def lock(self, key: str, timeout: Optional[float] = None):
+        """
+        Try to take a short lock on ``key`` in the shared cache.
+
+        Yields whether the lock was acquired; it is never waited for. The
+        lock expires after ``timeout`` seconds (``CACHE_LOCK_TIMEOUT``) in
+        case its holder dies.
+        """
+        if timeout is None:
+            timeout = settings.CACHE_LOCK_TIMEOUT
+        lock_key = self.make_key(f"lock:{key}")
+        token = uuid.uuid4().hex
+        acquired = self.backend.add(lock_key, token, timeout, version=self.version)
+        try:
+            yield acquired
+        finally:
+            if acquired and self.backend.get(lock_key, version=self.version) == token:
+                self.backend.delete(lock_key, version=self.version)
+
+    def wait(self, key: str, timeout: Optional[float] = None) -> Any:
+        """
+        Wait for another process to store ``key``.
+
+        Returns the value, or ``MISSING`` if the lock holder gave up or
+        ``timeout`` (``CACHE_LOCK_WAIT_TIMEOUT``) seconds passed first.
+        """
+        if timeout is None:
+            timeout = settings.CACHE_LOCK_WAIT_TIMEOUT
+        lock_key = self.make_key(f"lock:{key}")
+        deadline = time.monotonic() + timeout
+
+        while True:
+            value = self._shared_value(key)
+            if value is not MISSING:
+                return value
+            if self.backend.get(lock_key, version=self.version) is None:
+                return MISSING
+            if time.monotonic() >= deadline:
+                return MISSING
+            time.sleep(LOCK_POLL_INTERVAL)
+
+    def _shared_value(self, key: str) -> Any:
+        """Read a computed value from the shared cache, bypassing L1."""
+        full_key = self.make_key(key)
+        entry = self.backend.get(full_key, MISSING, version=self.version)
+        if not isinstance(entry, ComputedValue):
+            return MISSING
+        if self.local is not None:
+            self.local.set(full_key, entry)
+        return entry.value
+
+    def _compute(self, key: str, compute: Callable[[], Any], timeout: Any) -> Any:
+        started = time.monotonic()
+        value = compute()
+        self._record("computed")
+        self.store(key, value, timeout, time.monotonic() - started)
+        return value
+
+    @staticmethod
+    def _refresh_early(entry: ComputedValue) -> bool:
+        """
+        Decide whether this read should refresh ``entry`` before it expires.
+
+        Probabilistic early expiration: the chance grows as expiry nears,
+        and sooner for values that are slow to compute.
+        """
+        if entry.expires_at is None:
+            return False
+        beta = settings.CACHE_EARLY_REFRESH_BETA
+        gap = -entry.cost * beta * math.log(1.0 - random.random())
+        return time.time() + gap >= entry.expires_at
+
+    def clear_local(self) -> None:
+        """Drop this process's L1 entries for the namespace."""
+        if self.local is not None:
+            self.local.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for this process."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats["l1_hits"] + stats["l2_hits"] + stats["misses"]
+        stats["hit_ratio"] = (
+            (stats["l1_hits"] + stats["l2_hits"]) / lookups if lookups else 0.0
+        )
+        return stats
+
+
+_registry: Dict[str, NamespacedCache] = {}
+_registry_lock = threading.Lock()
+
+
+def get_cache(namespace: str) -> NamespacedCache:
+    """
+    Return the shared ``NamespacedCache`` for an application namespace.
+
+    Per-namespace options (``version``, ``l1_timeout``, ``l1_max_entries``,
+    ``alias``) come from ``settings.CACHE_NAMESPACES``.
+    """
+    cache = _registry.get(namespace)
+    if cache is not None:
+        return cache
+
+    with _registry_lock:
+        cache = _registry.get(namespace)
+        if cache is None:
+            options = getattr(settings, "CACHE_NAMESPACES", {}).get(namespace, {})
+            cache = NamespacedCache(
+                namespace,
+                version=options.get("version", 1),
+                l1_timeout=options.get(
+                    "l1_timeout", getattr(settings, "CACHE_L1_TIMEOUT", 5)
+                ),
+                l1_max_entries=options.get("l1_max_entries", 1000),
+                alias=options.get("alias", "default"),
+            )
+            _registry[namespace] = cache
+    return cache
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Return hit/miss counters for every namespace used in this process."""
+    return {name: cache.stats() for name, cache in list(_registry.items())}
+
+
+def reset_caches() -> None:
+    """Forget all namespace instances (and their L1 entries)."""
+    with _registry_lock:
+        for cache in _registry.values():
+            cache.clear_local()
+        _registry.clear()
+
+
+@receiver(setting_changed)
+def _reset_on_setting_change(setting, **kwargs):
+    if setting in ("CACHES", "CACHE_NAMESPACES", "CACHE_L1_TIMEOUT"):
+        reset_caches()
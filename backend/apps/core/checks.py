@@ -0,0 +1,87 @@
+"""
+Startup checks for ProjectMeats.
+
+``check_database_connections`` is a Django system check, so ``manage.py
+check``, ``migrate`` and ``runserver`` report unsafe connection settings.
+Gunicorn and Celery workers don't run system checks, so ``CoreConfig.ready``
+also logs the effective connection settings once per process.
+"""
+
+import logging
+from typing import Any, Dict
+
+from django.conf import settings
+from django.core.checks import Error, Warning, register
+
+logger = logging.getLogger(__name__)
+
+
+def database_connection_settings(alias: str = "default") -> Dict[str, Any]:
+    """Return the effective connection reuse settings for a database."""
+    database = settings.DATABASES[alias]
+    return {
+        "engine": database.get("ENGINE", ""),
+        "conn_max_age": database.get("CONN_MAX_AGE", 0),
+        "conn_health_checks": database.get("CONN_HEALTH_CHECKS", False),
+        "server_side_cursors": not database.get("DISABLE_SERVER_SIDE_CURSORS", False),
+        "pgbouncer_transaction_pooling": getattr(
+            settings, "PGBOUNCER_TRANSACTION_POOLING", False
+        ),
+    }
+
+
+def log_database_settings() -> None:
+    """Log each database's connection settings at startup."""
+    for alias in settings.DATABASES:
+        effective = database_connection_settings(alias)
+        logger.info(
+            "Database '%s' (%s): CONN_MAX_AGE=%s CONN_HEALTH_CHECKS=%s "
+            "server-side cursors=%s PgBouncer transaction pooling=%s",
+            alias,
+            effective["engine"].rsplit(".", 1)[-1],
+            effective["conn_max_age"],
+            effective["conn_health_checks"],
+            "on" if effective["server_side_cursors"] else "off",
+            "on" if effective["pgbouncer_transaction_pooling"] else "off",
+        )
+
+
+@register()
+def check_database_connections(app_configs, **kwargs):
+    """Warn about connection settings that cost a connection per request."""
+    messages = []
+    for alias in settings.DATABASES:
+        effective = database_connection_settings(alias)
+        is_postgres = "postgresql" in effective["engine"]
+        persistent = effective["conn_max_age"] is None or effective["conn_max_age"] > 0
+
+        if is_postgres and not persistent and not settings.DEBUG:
+            messages.append(
+                Warning(
+                    f"Database '{alias}' opens a new connection for every request.",
+                    hint="Set CONN_MAX_AGE to reuse connections between requests.",
+                    id="core.W001",
+                )
+            )
+        if persistent and not effective["conn_health_checks"]:
+            messages.append(
+                Warning(
+                    f"Database '{alias}' reuses connections without health checks.",
+                    hint="Set CONN_HEALTH_CHECKS=True so dropped connections "
+                    "are replaced instead of failing the next request.",
+                    id="core.W002",
+                )
+            )
+        if (
+            effective["pgbouncer_transaction_pooling"]
+            and effective["server_side_cursors"]
+        ):
+            messages.append(
+                Error(
+                    f"Database '{alias}' uses server-side cursors behind "
+                    "PgBouncer transaction pooling.",
+                    hint="Set DISABLE_SERVER_SIDE_CURSORS in DATABASES.",
+                    id="core.E001",
+                )
+            )
+    return messages
@@ -0,0 +1,244 @@
+"""
+Cross-entity search for ProjectMeats.
+
+Every record of the models in ``SEARCH_DOCUMENTS`` has a ``SearchDocument``
+row with its entity type, id, title and body text. On PostgreSQL that table
+gets the same generated ``search_vector`` column and GIN indexes as the
+entity tables (see ``apps.core.search``), so ``global_search`` finds the
+best matches of every entity type with one indexed query instead of a
+``LIKE`` scan per entity. Elsewhere it falls back to ``icontains``.
+
+Documents are written on ``post_save`` and removed on ``post_delete`` of
+the searched models (see ``connect_signals``).
+Bulk writes that send no signals (the batch endpoints and imports) call
+``index_documents`` themselves. Migration ``core.0003`` fills the table
+for existing records, and the ``rebuild_search_index`` command rebuilds it
+from the entity tables.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, Q, Value, When, Window
+from django.db.models.functions import RowNumber
+from django.db.models.signals import post_delete, post_save
+
+from .models import SearchDocument
+from .search import RANK_ANNOTATION, search
+
+DEFAULT_RESULTS_PER_TYPE = 5
+MAX_RESULTS_PER_TYPE = 50
+
+# Documents written per INSERT ... ON CONFLICT statement
+DOCUMENT_BATCH_SIZE = 1000
+
+TITLE_LENGTH = SearchDocument._meta.get_field("title").max_length
+
+
+@dataclass(frozen=True)
+class DocumentSpec:
+    """The fields of a model that make up its search document."""
+
+    entity_type: str
+    title: str
+    body: Tuple[str, ...] = field(default=())
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        return (self.title, *self.body)
+
+    def document(self, instance) -> SearchDocument:
+        return SearchDocument(**self.values(instance))
+
+    def values(self, instance) -> Dict[str, Any]:
+        """Field values of the search document of ``instance``."""
+        body = (getattr(instance, name) for name in self.body)
+        return {
+            "entity_type": self.entity_type,
+            "object_id": instance.pk,
+            "title": str(getattr(instance, self.title) or "")[:TITLE_LENGTH],
+            "body": " ".join(str(value) for value in body if value),
+        }
+
+
+SEARCH_DOCUMENTS: Dict[str, DocumentSpec] = {
+    "suppliers.Supplier": DocumentSpec("suppliers", "name"),
+    "customers.Customer": DocumentSpec("customers", "name"),
+    "contacts.ContactInfo": DocumentSpec("contacts", "name", ("email", "position")),
+    "plants.Plant": DocumentSpec("plants", "name", ("location",)),
+    "carriers.CarrierInfo": DocumentSpec(
+        "carriers", "name", ("contact_name", "release_number", "address")
+    ),
+    "purchase_orders.PurchaseOrder": DocumentSpec(
+        "purchase_orders", "po_number", ("item",)
+    ),
+}
+
+ENTITY_TYPES = tuple(spec.entity_type for spec in SEARCH_DOCUMENTS.values())
+
+
+def index_documents(model, instances: Iterable[Any], using=None) -> int:
+    """
+    Write (insert or replace) the search documents of saved ``instances``.
+
+    Returns the number of documents written; 0 if ``model`` isn't searched.
+    """
+    spec = SEARCH_DOCUMENTS.get(model._meta.label)
+    if spec is None:
+        return 0
+    documents = [spec.document(instance) for instance in instances]
+    SearchDocument.objects.using(using).bulk_create(
+        documents,
+        batch_size=DOCUMENT_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=["entity_type", "object_id"],
+        update_fields=["title", "body", "modified_on"],
+    )
+    return len(documents)
+
+
+def rebuild_documents(model, using=None) -> int:
+    """Replace every search document of ``model``; returns how many it has."""
+    spec = SEARCH_DOCUMENTS[model._meta.label]
+    rows = (
+        model._default_manager.using(using)
+        .only(*spec.fields)
+        .order_by()
+        .iterator(chunk_size=DOCUMENT_BATCH_SIZE)
+    )
+    count = 0
+    with transaction.atomic(using=using):
+        _delete(
+            SearchDocument.objects.using(using).filter(entity_type=spec.entity_type)
+        )
+        batch = []
+        for instance in rows:
+            batch.append(instance)
+            if len(batch) >= DOCUMENT_BATCH_SIZE:
+                count += index_documents(model, batch, using=using)
+                batch = []
+        count += index_documents(model, batch, using=using)
+    return count
+
+
+def searched_models() -> List[Any]:
+    """The models in ``SEARCH_DOCUMENTS``."""
+    return [apps.get_model(label) for label in SEARCH_DOCUMENTS]
+
+
+def ranked_documents(
+    text: str,
+    entity_types: Optional[Iterable[str]] = None,
+    limit: int = DEFAULT_RESULTS_PER_TYPE,
+):
+    """
+    Rows of the best ``limit`` documents of each entity type matching ``text``.
+
+    Each row also has the match's position within its entity type and the
+    entity type's ``total`` matches, computed by window functions in the
+    same query.
+    """
+    queryset = SearchDocument.objects.all()
+    if entity_types:
+        queryset = queryset.filter(entity_type__in=list(entity_types))
+    matches = search(queryset, text)
+    if matches is None:
+        matches = _like_search(queryset, text)
+
+    by_type = [F("entity_type")]
+    return (
+        matches.annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=by_type,
+                order_by=[F(RANK_ANNOTATION).desc(), F("title").asc(), F("pk").asc()],
+            ),
+            total=Window(Count("pk"), partition_by=by_type),
+        )
+        .filter(position__lte=limit)
+        .order_by("entity_type", "position")
+        .values("entity_type", "object_id", "title", RANK_ANNOTATION, "total")
+    )
+
+
+def global_search(
+    text: str,
+    entity_types: Optional[Iterable[str]] = None,
+    limit: int = DEFAULT_RESULTS_PER_TYPE,
+) -> List[Dict[str, Any]]:
+    """
+    Search every entity type and return the best ``limit`` matches of each.
+
+    Returns one group per entity type with matches, best group first::
+
+        [{"entity_type": "suppliers", "total": 12,
+          "results": [{"id": 3, "title": "Acme Foods", "rank": 0.9}, ...]}]
+    """
+    rows = ranked_documents(text, entity_types, limit)
+    groups: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        group = groups.setdefault(
+            row["entity_type"],
+            {"entity_type": row["entity_type"], "total": row["total"], "results": []},
+        )
+        group["results"].append(
+            {
+                "id": row["object_id"],
+                "title": row["title"],
+                "rank": row[RANK_ANNOTATION],
+            }
+        )
+    return sorted(
+        groups.values(), key=lambda group: group["results"][0]["rank"], reverse=True
+    )
+
+
+def _like_search(queryset, text: str):
+    """Match every word in the title or body; rank title matches first."""
+    condition = Q()
+    for word in text.split():
+        condition &= Q(title__icontains=word) | Q(body__icontains=word)
+    rank = Case(
+        When(title__iexact=text, then=Value(3.0)),
+        When(title__istartswith=text, then=Value(2.0)),
+        When(title__icontains=text, then=Value(1.0)),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+    return queryset.filter(condition).annotate(**{RANK_ANNOTATION: rank})
+
+
+def _delete(queryset) -> None:
+    # Search documents have no dependent relations or signal receivers, so
+    # this is one DELETE statement that doesn't load the rows
+    queryset.delete()
+
+
+def connect_signals() -> None:
+    """Keep the search documents of the ``SEARCH_DOCUMENTS`` models current."""
+    # Receivers are connected per model: a receiver for every sender would
+    # also stop Django deleting other models' rows without loading them
+    for model in searched_models():
+        uid = f"global_search:{model._meta.label}"
+        post_save.connect(_index_saved, sender=model, dispatch_uid=uid)
+        post_delete.connect(_remove_deleted, sender=model, dispatch_uid=uid)
+
+
+def _index_saved(sender, instance, using=None, update_fields=None, **kwargs) -> None:
+    """Write the search document of a saved record."""
+    spec = SEARCH_DOCUMENTS[sender._meta.label]
+    if update_fields is not None and not set(spec.fields) & set(update_fields):
+        return
+    index_documents(sender, [instance], using=using)
+
+
+def _remove_deleted(sender, instance, using=None, **kwargs) -> None:
+    """Remove the search document of a deleted record."""
+    spec = SEARCH_DOCUMENTS[sender._meta.label]
+    _delete(
+        SearchDocument.objects.using(using).filter(
+            entity_type=spec.entity_type, object_id=instance.pk
+        )
+    )
@@ -0,0 +1,534 @@
+"""
+Bulk imports for ProjectMeats entities.
+
+``BulkImporter`` loads CSV or NDJSON rows into one of the entities in
+``IMPORT_SPECS`` (used by the ``import_records`` management command and the
+``import`` action of the entity viewsets):
+
+* rows are read from the file as a stream and handled in batches of
+  ``IMPORT_BATCH_SIZE``;
+* each batch is validated column by column with converters built once per
+  import from the model fields, so bad rows are reported with their errors
+  and skipped while the rest of the batch is imported;
+* foreign keys (``supplier``, ``customer``, ``accounts_receivable``,
+  ``plant``...) are given by name, or by id in a ``<field>_id`` column, and
+  resolved against name -> id maps loaded once per import;
+* valid rows are inserted with PostgreSQL ``COPY`` (psycopg 3, when
+  ``IMPORT_USE_COPY`` is set) or ``bulk_create``. A batch the database
+  rejects is retried row by row so only the offending rows fail.
+
+Ownership fields are set to the importing user, and imported records are
+added to the global search documents (``apps.core.global_search``).
+"""
+
+import csv
+import datetime
+import io
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import DatabaseError, connection, models, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+
+from .aggregates import invalidate_counts
+from .global_search import index_documents
+from .ownership import ownership
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+TRUE_VALUES = {"true", "t", "yes", "y", "1"}
+FALSE_VALUES = {"false", "f", "no", "n", "0"}
+
+OWNERSHIP_FIELDS = ("created_by", "modified_by", "owner")
+
+
+class ImportFileError(ValueError):
+    """Raised when an import file can't be imported at all."""
+
+
+def _fulfillment_after_purchase(row: Dict[str, Any]) -> Dict[str, str]:
+    fulfillment_date = row.get("fulfillment_date")
+    purchase_date = row.get("purchase_date")
+    if fulfillment_date and purchase_date and fulfillment_date < purchase_date:
+        return {"fulfillment_date": "Fulfillment date cannot be before purchase date"}
+    return {}
+
+
+@dataclass(frozen=True)
+class ImportSpec:
+    """Columns an entity can be imported with."""
+
+    model: str
+    fields: Tuple[str, ...]
+    # Foreign keys, given by the related record's name or a <field>_id column
+    relations: Tuple[str, ...] = ()
+    # Cross-field checks; each returns {field: message} for an invalid row
+    checks: Tuple[Callable[[Dict[str, Any]], Dict[str, str]], ...] = ()
+
+    def get_model(self):
+        return apps.get_model(self.model)
+
+
+IMPORT_SPECS: Dict[str, ImportSpec] = {
+    "suppliers": ImportSpec(
+        model="suppliers.Supplier",
+        fields=("name", "credit_application_date", "delivery_type_profile", "status"),
+        relations=("accounts_receivable",),
+    ),
+    "customers": ImportSpec(model="customers.Customer", fields=("name", "status")),
+    "plants": ImportSpec(
+        model="plants.Plant",
+        fields=(
+            "name",
+            "location",
+            "plant_type",
+            "release_number",
+            "load_pickup_requirements",
+            "storage",
+            "status",
+        ),
+        relations=("supplier",),
+    ),
+    "purchase_orders": ImportSpec(
+        model="purchase_orders.PurchaseOrder",
+        fields=(
+            "po_number",
+            "item",
+            "quantity",
+            "price_per_unit",
+            "purchase_date",
+            "fulfillment_date",
+            "status",
+        ),
+        relations=("customer", "supplier", "origin_location", "end_location"),
+        checks=(_fulfillment_after_purchase,),
+    ),
+}
+
+
+@dataclass
+class ImportResult:
+    """Outcome of an import."""
+
+    rows: int = 0
+    created: int = 0
+    failed: int = 0
+    # The first IMPORT_MAX_ERRORS failed rows with their errors
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    ignored_columns: List[str] = field(default_factory=list)
+    dry_run: bool = False
+
+    def add_error(self, row: int, errors: Dict[str, Any]) -> None:
+        self.failed += 1
+        if len(self.errors) < settings.IMPORT_MAX_ERRORS:
+            self.errors.append({"row": row, "errors": errors})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "created": self.created,
+            "failed": self.failed,
+            "errors": self.errors,
+            "ignored_columns": self.ignored_columns,
+            "dry_run": self.dry_run,
+        }
+
+
+def read_rows(stream, import_format: str) -> Tuple[Optional[List[str]], Iterator]:
+    """
+    Read a binary CSV or NDJSON stream.
+
+    Returns:
+        The CSV header (None for NDJSON) and an iterator of (row number,
+        row) pairs. A malformed NDJSON line is given as an
+        ``ImportFileError`` so it can be reported for that row.
+    """
+    if import_format not in IMPORT_FORMATS:
+        raise ImportFileError(
+            f"Unsupported import format; use one of: {', '.join(IMPORT_FORMATS)}"
+        )
+
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if import_format == "csv":
+        reader = csv.DictReader(text)
+        # Reads the header line
+        header = reader.fieldnames
+        return header, _detaching(text, enumerate(reader, start=1))
+    return None, _detaching(text, _ndjson_rows(text))
+
+
+def _ndjson_rows(text) -> Iterator[Tuple[int, Any]]:
+    number = 0
+    for line in text:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield number, ImportFileError(f"Invalid JSON: {str(e)}")
+            continue
+        if not isinstance(row, dict):
+            row = ImportFileError("Each line must be a JSON object")
+        yield number, row
+
+
+def _detaching(text, rows) -> Iterator[Tuple[int, Any]]:
+    try:
+        yield from rows
+    finally:
+        # Leave the caller's stream open
+        text.detach()
+
+
+class Column:
+    """Converts and validates one imported model field."""
+
+    def __init__(self, model_field: models.Field):
+        self.field = model_field
+        self.name = model_field.name
+
+    def convert(self, value):
+        model_field = self.field
+        if isinstance(value, str):
+            value = value.strip()
+        if value == "" or value is None:
+            if model_field.has_default():
+                return model_field.get_default()
+            is_text = isinstance(model_field, (models.CharField, models.TextField))
+            value = "" if is_text and not model_field.null else None
+        elif isinstance(model_field, models.BooleanField) and isinstance(value, str):
+            lowered = value.lower()
+            if lowered in TRUE_VALUES:
+                value = True
+            elif lowered in FALSE_VALUES:
+                value = False
+            else:
+                raise DjangoValidationError(f"'{value}' is not true or false.")
+
+        value = model_field.clean(value, None)
+        if (
+            isinstance(value, datetime.datetime)
+            and settings.USE_TZ
+            and timezone.is_naive(value)
+        ):
+            value = timezone.make_aware(value)
+        return value
+
+
+class RelationColumn:
+    """Resolves a foreign key from the related record's name or id."""
+
+    def __init__(self, model_field: models.ForeignKey, lookup: "RelationLookup"):
+        self.field = model_field
+        self.name = model_field.name
+        self.attname = model_field.attname
+        self.lookup = lookup
+
+    def convert(self, row: Dict[str, Any]):
+        value = row.get(self.attname)
+        if isinstance(value, str):
+            value = value.strip()
+        if value not in (None, ""):
+            try:
+                pk = int(value)
+            except (TypeError, ValueError):
+                raise DjangoValidationError(f"'{value}' is not a valid id.")
+            if pk not in self.lookup.ids:
+                raise DjangoValidationError(f"No {self.lookup.label} with id {pk}.")
+            return pk
+
+        value = row.get(self.name)
+        if isinstance(value, str):
+            value = value.strip()
+        if value in (None, ""):
+            if not self.field.null:
+                raise DjangoValidationError("This field is required.")
+            return None
+        return self.lookup.resolve(str(value))
+
+
+class RelationLookup:
+    """Name -> id map of a related model, loaded once per import."""
+
+    AMBIGUOUS = object()
+
+    def __init__(self, model):
+        self.label = model._meta.verbose_name
+        self.ids = set()
+        self.by_name: Dict[str, Any] = {}
+        for pk, name in model._default_manager.values_list("pk", "name").iterator():
+            self.ids.add(pk)
+            key = (name or "").strip().casefold()
+            self.by_name[key] = self.AMBIGUOUS if key in self.by_name else pk
+
+    def resolve(self, name: str) -> int:
+        pk = self.by_name.get(name.casefold())
+        if pk is None:
+            raise DjangoValidationError(f"No {self.label} named '{name}'.")
+        if pk is self.AMBIGUOUS:
+            raise DjangoValidationError(
+                f"Several {self.label} records are named '{name}'; use an id."
+            )
+        return pk
+
+
+class BulkImporter:
+    """Imports rows into one ``IMPORT_SPECS`` entity."""
+
+    def __init__(
+        self,
+        entity: str,
+        user_id: int,
+        batch_size: Optional[int] = None,
+        dry_run: bool = False,
+    ):
+        try:
+            self.spec = IMPORT_SPECS[entity]
+        except KeyError:
+            raise ImportFileError(
+                f"Unknown entity '{entity}'; use one of: {', '.join(IMPORT_SPECS)}"
+            )
+        self.model = self.spec.get_model()
+        self.user_id = user_id
+        self.batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+        self.dry_run = dry_run
+
+        meta = self.model._meta
+        self.columns = [Column(meta.get_field(name)) for name in self.spec.fields]
+        lookups: Dict[Any, RelationLookup] = {}
+        self.relations = []
+        for name in self.spec.relations:
+            model_field = meta.get_field(name)
+            related = model_field.related_model
+            if related not in lookups:
+                lookups[related] = RelationLookup(related)
+            self.relations.append(RelationColumn(model_field, lookups[related]))
+
+    def run(
+        self, rows: Iterable[Tuple[int, Any]], header: Optional[List[str]] = None
+    ) -> ImportResult:
+        """Validate and insert ``read_rows`` output; returns the report."""
+        result = ImportResult(dry_run=self.dry_run)
+        if header is not None:
+            self._check_header(header, result)
+
+        batch: List[Tuple[int, Any]] = []
+        for number, row in rows:
+            batch.append((number, row))
+            if len(batch) >= self.batch_size:
+                self._import_batch(batch, result)
+                batch = []
+        if batch:
+            self._import_batch(batch, result)
+
+        verb = "Validated" if self.dry_run else "Imported"
+        logger.info(
+            f"{verb} {result.rows} {self.model._meta.verbose_name_plural}: "
+            f"{result.created} created, {result.failed} failed"
+        )
+        return result
+
+    def _check_header(self, header: List[str], result: ImportResult) -> None:
+        header = set(header)
+        known = {column.name for column in self.columns}
+        missing = [
+            column.name
+            for column in self.columns
+            if column.name not in header
+            and not column.field.has_default()
+            and not column.field.null
+        ]
+        for relation in self.relations:
+            known.update((relation.name, relation.attname))
+            if (
+                not relation.field.null
+                and not {
+                    relation.name,
+                    relation.attname,
+                }
+                & header
+            ):
+                missing.append(relation.name)
+        if missing:
+            raise ImportFileError(f"Missing required columns: {', '.join(missing)}")
+        result.ignored_columns = sorted(header - known)
+
+    def _import_batch(self, batch, result: ImportResult) -> None:
+        result.rows += len(batch)
+        valid = self._validate(batch, result)
+        if self.dry_run or not valid:
+            return
+
+        instances = [self.model(**values) for _, values in valid]
+        try:
+            with transaction.atomic():
+                self._insert(instances)
+                invalidate_counts(self.model)
+                index_documents(self.model, instances)
+            result.created += len(instances)
+        except DatabaseError:
+            # Find the rows the database rejects and insert the others
+            for (number, _), instance in zip(valid, instances):
+                try:
+                    with transaction.atomic():
+                        instance.save(force_insert=True)
+                    result.created += 1
+                except DatabaseError as e:
+                    result.add_error(number, {"non_field_errors": [str(e)]})
+
+    def _validate(self, batch, result: ImportResult):
+        """Convert the batch column by column; returns (row, values) pairs."""
+        errors: Dict[int, Dict[str, List[str]]] = {}
+        values: List[Dict[str, Any]] = [{} for _ in batch]
+
+        for index, (_, row) in enumerate(batch):
+            if isinstance(row, Exception):
+                errors[index] = {"non_field_errors": [str(row)]}
+
+        for column in self.columns:
+            convert = column.convert
+            name = column.name
+            has_default = column.field.has_default()
+            for index, (_, row) in enumerate(batch):
+                if index in errors and "non_field_errors" in errors[index]:
+                    continue
+                if has_default and name not in row:
+                    # Absent column: keep the model default
+                    continue
+                try:
+                    values[index][name] = convert(row.get(name))
+                except DjangoValidationError as e:
+                    errors.setdefault(index, {})[name] = e.messages
+
+        for relation in self.relations:
+            for index, (_, row) in enumerate(batch):
+                if index in errors and "non_field_errors" in errors[index]:
+                    continue
+                try:
+                    values[index][relation.attname] = relation.convert(row)
+                except DjangoValidationError as e:
+                    errors.setdefault(index, {})[relation.name] = e.messages
+
+        valid = []
+        owned = {f"{name}_id": self.user_id for name in OWNERSHIP_FIELDS}
+        for index, (number, _) in enumerate(batch):
+            if index not in errors:
+                for check in self.spec.checks:
+                    problems = check(values[index])
+                    if problems:
+                        errors[index] = {
+                            name: [message] for name, message in problems.items()
+                        }
+                        break
+            if index in errors:
+                result.add_error(number, errors[index])
+                continue
+            values[index].update(owned)
+            valid.append((number, values[index]))
+        return valid
+
+    def _insert(self, instances) -> None:
+        if settings.IMPORT_USE_COPY and connection.vendor == "postgresql":
+            from django.db.backends.postgresql.psycopg_any import is_psycopg3
+
+            if is_psycopg3:
+                self._copy(instances)
+                return
+        self.model.objects.bulk_create(instances, batch_size=settings.IMPORT_BATCH_SIZE)
+
+    def _copy(self, instances) -> None:
+        """Insert with ``COPY ... FROM STDIN`` (PostgreSQL, psycopg 3)."""
+        meta = self.model._meta
+        fields = meta.concrete_fields
+        quote = connection.ops.quote_name
+        sql = (
+            f"COPY {quote(meta.db_table)} "
+            f"({', '.join(quote(f.column) for f in fields)}) FROM STDIN"
+        )
+        with connection.cursor() as cursor:
+            # Take the ids from the table's sequence, as COPY can't return
+            # them, so the instances have their primary keys afterwards
+            cursor.execute(
+                "SELECT nextval(pg_get_serial_sequence(%s, %s)) "
+                "FROM generate_series(1, %s)",
+                [meta.db_table, meta.pk.column, len(instances)],
+            )
+            for instance, (pk,) in zip(instances, cursor.fetchall()):
+                instance.pk = pk
+            with cursor.cursor.copy(sql) as copy:
+                for instance in instances:
+                    copy.write_row(
+                        [
+                            f.get_db_prep_save(f.pre_save(instance, True), connection)
+                            for f in fields
+                        ]
+                    )
+
+
+def import_format_for(name: str, default: str = "csv") -> str:
+    """Guess the import format from a file name."""
+    extension = name.rsplit(".", 1)[-1].lower() if "." in name else ""
+    if extension in ("ndjson", "jsonl"):
+        return "ndjson"
+    if extension == "csv":
+        return "csv"
+    return default
+
+
+class BulkImportMixin:
+    """
+    Adds a bulk ``import`` action (``POST <entity>/import/``) to a viewset.
+
+    Upload the file as multipart ``file``; the format comes from
+    ``import_format`` (csv or ndjson) or the file extension, and
+    ``dry_run=true`` only validates. ``import_entity`` names the
+    ``IMPORT_SPECS`` entry.
+    """
+
+    import_entity = None
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        parser_classes=[MultiPartParser],
+    )
+    def bulk_import(self, request):
+        """Import records from an uploaded CSV or NDJSON file."""
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise ValidationError({"file": "Upload the CSV or NDJSON file as 'file'."})
+
+        import_format = request.data.get("import_format") or import_format_for(
+            upload.name
+        )
+        dry_run = str(request.data.get("dry_run", "")).lower() == "true"
+        try:
+            importer = BulkImporter(
+                self.import_entity,
+                user_id=ownership.get_acting_user_id(request),
+                dry_run=dry_run,
+            )
+            upload.seek(0)
+            header, rows = read_rows(upload.file, import_format)
+            result = importer.run(rows, header)
+        except ImportFileError as e:
+            raise ValidationError({"file": str(e)})
+
+        return Response(
+            result.as_dict(),
+            status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED,
+        )
@@ -0,0 +1,109 @@
+"""
+Bulk import suppliers, customers, plants or purchase orders from a file.
+
+Rows are validated and inserted in batches by ``apps.core.imports``; rows
+with errors are reported and skipped without stopping the import.
+
+Usage:
+    python manage.py import_records purchase_orders orders.csv
+    python manage.py import_records suppliers suppliers.ndjson --user alice
+    python manage.py import_records plants plants.csv --dry-run
+"""
+
+import json
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.imports import (
+    IMPORT_FORMATS,
+    IMPORT_SPECS,
+    BulkImporter,
+    ImportFileError,
+    import_format_for,
+    read_rows,
+)
+from apps.core.ownership import ownership
+
+
+class Command(BaseCommand):
+    help = "Bulk import entity records from a CSV or NDJSON file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("entity", choices=sorted(IMPORT_SPECS))
+        parser.add_argument("path", help="CSV or NDJSON file to import")
+        parser.add_argument(
+            "--format",
+            dest="import_format",
+            choices=IMPORT_FORMATS,
+            help="File format (default: from the file extension, else csv)",
+        )
+        parser.add_argument(
+            "--user",
+            help="Username the records are owned by (default: the system user)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Rows validated and inserted per batch (default: IMPORT_BATCH_SIZE)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Validate the file without inserting anything",
+        )
+        parser.add_argument(
+            "--errors",
+            type=int,
+            default=20,
+            help="Failed rows to print (the rest are only counted)",
+        )
+
+    def handle(self, *args, **options):
+        user_id = self._user_id(options["user"])
+        import_format = options["import_format"] or import_format_for(options["path"])
+
+        started = time.perf_counter()
+        try:
+            importer = BulkImporter(
+                options["entity"],
+                user_id=user_id,
+                batch_size=options["batch_size"],
+                dry_run=options["dry_run"],
+            )
+            with open(options["path"], "rb") as f:
+                header, rows = read_rows(f, import_format)
+                result = importer.run(rows, header)
+        except (OSError, ImportFileError) as e:
+            raise CommandError(str(e))
+        elapsed = time.perf_counter() - started
+
+        for error in result.errors[: options["errors"]]:
+            self.stderr.write(f"Row {error['row']}: {json.dumps(error['errors'])}")
+        if result.ignored_columns:
+            self.stdout.write(f"Ignored columns: {', '.join(result.ignored_columns)}")
+
+        verb = "Validated" if result.dry_run else "Imported"
+        count = result.rows - result.failed if result.dry_run else result.created
+        rate = result.rows / elapsed if elapsed else 0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {count} of {result.rows} rows, {result.failed} failed "
+                f"({elapsed:.1f}s, {rate:,.0f} rows/s)"
+            )
+        )
+
+    @staticmethod
+    def _user_id(username):
+        if not username:
+            return ownership.get_system_user_id()
+        user_id = (
+            get_user_model()
+            .objects.filter(username=username)
+            .values_list("pk", flat=True)
+            .first()
+        )
+        if user_id is None:
+            raise CommandError(f"No user named '{username}'")
+        return user_id
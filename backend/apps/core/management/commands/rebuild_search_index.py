@@ -0,0 +1,46 @@
+"""
+Rebuild the global search documents from the entity tables.
+
+Needed once after the search documents table is created, and after data is
+changed without model signals (raw SQL, ``QuerySet.update()``).
+
+Usage:
+    python manage.py rebuild_search_index
+    python manage.py rebuild_search_index --entity suppliers --entity plants
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.core.global_search import (
+    ENTITY_TYPES,
+    SEARCH_DOCUMENTS,
+    rebuild_documents,
+    searched_models,
+)
+
+
+class Command(BaseCommand):
+    help = "Rebuild the global search documents"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--entity",
+            action="append",
+            choices=ENTITY_TYPES,
+            help="Entity type to rebuild (repeatable; default: all)",
+        )
+
+    def handle(self, *args, **options):
+        entities = options["entity"] or ENTITY_TYPES
+        for model in searched_models():
+            entity_type = SEARCH_DOCUMENTS[model._meta.label].entity_type
+            if entity_type not in entities:
+                continue
+            started = time.perf_counter()
+            count = rebuild_documents(model)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                self.style.SUCCESS(f"Indexed {count} {entity_type} ({elapsed:.1f}s)")
+            )
@@ -0,0 +1,123 @@
+"""
+Prometheus metrics for ProjectMeats.
+
+Defines the application metrics recorded by ``PrometheusMetricsMiddleware``
+and the shared cache layer, and the ``/metrics`` view scraped by
+monitoring/prometheus.yml.
+
+When ``PROMETHEUS_MULTIPROC_DIR`` is set (see gunicorn.conf.py), every
+gunicorn worker writes its samples to that directory and the view aggregates
+them, so counters survive worker recycling and cover all workers. The
+``prometheus_client`` package is optional; without it recording is a no-op
+and the endpoint returns 503.
+"""
+
+import logging
+import os
+
+from django.http import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        REGISTRY,
+        CollectorRegistry,
+        Counter,
+        Histogram,
+        generate_latest,
+        multiprocess,
+    )
+
+    PROMETHEUS_AVAILABLE = True
+except ImportError:  # pragma: no cover - prometheus_client is a prod dependency
+    PROMETHEUS_AVAILABLE = False
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+if PROMETHEUS_AVAILABLE:
+    REQUEST_LATENCY = Histogram(
+        "projectmeats_http_request_duration_seconds",
+        "Request latency by view and action",
+        ["view", "method", "status"],
+        buckets=LATENCY_BUCKETS,
+    )
+    RESPONSE_SIZE = Histogram(
+        "projectmeats_http_response_size_bytes",
+        "Response body size by view and action",
+        ["view"],
+        buckets=SIZE_BUCKETS,
+    )
+    DB_QUERY_COUNT = Histogram(
+        "projectmeats_db_queries_per_request",
+        "Number of database queries executed per request",
+        ["view"],
+        buckets=QUERY_COUNT_BUCKETS,
+    )
+    DB_QUERY_TIME = Histogram(
+        "projectmeats_db_query_duration_seconds_per_request",
+        "Total database query time per request",
+        ["view"],
+        buckets=LATENCY_BUCKETS,
+    )
+    CACHE_REQUESTS = Counter(
+        "projectmeats_cache_requests_total",
+        "Cache lookups by namespace and result (l1_hit, l2_hit, miss)",
+        ["namespace", "result"],
+    )
+
+
+def observe_request(
+    view: str,
+    method: str,
+    status: int,
+    duration: float,
+    response_size: int,
+    query_count: int,
+    query_time: float,
+) -> None:
+    """Record the metrics for one finished request."""
+    if not PROMETHEUS_AVAILABLE:
+        return
+    REQUEST_LATENCY.labels(view, method, str(status)).observe(duration)
+    RESPONSE_SIZE.labels(view).observe(response_size)
+    DB_QUERY_COUNT.labels(view).observe(query_count)
+    DB_QUERY_TIME.labels(view).observe(query_time)
+
+
+def record_cache_access(namespace: str, result: str) -> None:
+    """Count one cache lookup; ``result`` is l1_hit, l2_hit or miss."""
+    if PROMETHEUS_AVAILABLE:
+        CACHE_REQUESTS.labels(namespace, result).inc()
+
+
+def get_registry():
+    """Return the registry to expose, aggregating workers in multiprocess mode."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def metrics_view(request):
+    """Expose metrics in the Prometheus text format."""
+    if not PROMETHEUS_AVAILABLE:
+        return HttpResponse(
+            "prometheus_client is not installed\n",
+            status=503,
+            content_type="text/plain",
+        )
+    return HttpResponse(
+        generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST
+    )
+
+
+def mark_process_dead(pid: int) -> None:
+    """Clean up a dead worker's live gauges (called from gunicorn.conf.py)."""
+    if PROMETHEUS_AVAILABLE and os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)
@@ -1,12 +1,19 @@
 """
-Custom middleware to disable CSRF for API endpoints.
+Custom middleware for ProjectMeats.
 
-This addresses the authentication issue where CSRF tokens were preventing
-API authentication from working properly.
+- DisableCSRFForAPIMiddleware: disables CSRF for API endpoints. This addresses
+  the authentication issue where CSRF tokens were preventing API
+  authentication from working properly.
+- PrometheusMetricsMiddleware: records request metrics for /metrics.
 """
 
+import time
+
+from django.db import connection
 from django.utils.deprecation import MiddlewareMixin
 
+from . import metrics
+
 
 class DisableCSRFForAPIMiddleware(MiddlewareMixin):
     """
@@ -20,4 +27,78 @@ class DisableCSRFForAPIMiddleware(MiddlewareMixin):
         """Disable CSRF for API endpoints"""
         if request.path.startswith('/api/'):
             setattr(request, '_dont_enforce_csrf_checks', True)
-        return None
\ No newline at end of file
+        return None
+
+
+class PrometheusMetricsMiddleware:
+    """
+    Record per-request latency, response size and database usage.
+
+    Requests are labelled by DRF viewset and action (``SupplierViewSet.list``,
+    ``ChatBotAPIViewSet.chat``), or by view name for plain views. Database
+    queries are counted and timed with ``connection.execute_wrapper``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        query_stats = QueryStats()
+        start_time = time.perf_counter()
+
+        with connection.execute_wrapper(query_stats):
+            response = self.get_response(request)
+
+        duration = time.perf_counter() - start_time
+        metrics.observe_request(
+            view=getattr(request, "_metrics_view_label", "unmatched"),
+            method=request.method,
+            status=response.status_code,
+            duration=duration,
+            response_size=self._response_size(response),
+            query_count=query_stats.count,
+            query_time=query_stats.duration,
+        )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._metrics_view_label = view_label(view_func, request.method)
+        return None
+
+    @staticmethod
+    def _response_size(response) -> int:
+        if response.streaming:
+            return int(response.get("Content-Length") or 0)
+        return len(response.content)
+
+
+class QueryStats:
+    """``execute_wrapper`` callable counting and timing database queries."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start_time = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start_time
+
+
+def view_label(view_func, method: str) -> str:
+    """Build a low-cardinality metrics label for a resolved view."""
+    view_class = getattr(view_func, "cls", None) or getattr(
+        view_func, "view_class", None
+    )
+    if view_class is None:
+        return getattr(view_func, "__name__", "unknown")
+
+    actions = getattr(view_func, "actions", None)
+    if actions:
+        action = actions.get(method.lower(), method.lower())
+    else:
+        action = method.lower()
+    return f"{view_class.__name__}.{action}"
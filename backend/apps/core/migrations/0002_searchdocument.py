@@ -0,0 +1,71 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:36
+
+from django.db import migrations, models
+
+import apps.core.search
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchDocument",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "entity_type",
+                    models.CharField(
+                        help_text="Entity the record belongs to, e.g. suppliers",
+                        max_length=50,
+                    ),
+                ),
+                (
+                    "object_id",
+                    models.PositiveBigIntegerField(
+                        help_text="Primary key of the record"
+                    ),
+                ),
+                (
+                    "title",
+                    models.CharField(help_text="Record name or number", max_length=255),
+                ),
+                (
+                    "body",
+                    models.TextField(
+                        blank=True, help_text="Other searchable record text"
+                    ),
+                ),
+                ("modified_on", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Search Document",
+                "verbose_name_plural": "Search Documents",
+                "db_table": "search_documents",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="searchdocument",
+            constraint=models.UniqueConstraint(
+                fields=("entity_type", "object_id"), name="unique_search_document"
+            ),
+        ),
+        apps.core.search.AddSearchIndex(
+            model_name="searchdocument",
+            vector=[
+                ("title", "A"),
+                ("body", "B"),
+            ],
+            trigram=["title"],
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 4.2.7 on 2026-10-16 21:40
+
+from django.db import migrations
+
+# Frozen copy of the search document fields at the time of this migration:
+# model label -> (entity type, title field, body fields)
+SEARCH_DOCUMENTS = {
+    "suppliers.Supplier": ("suppliers", "name", ()),
+    "customers.Customer": ("customers", "name", ()),
+    "contacts.ContactInfo": ("contacts", "name", ("email", "position")),
+    "plants.Plant": ("plants", "name", ("location",)),
+    "carriers.CarrierInfo": (
+        "carriers",
+        "name",
+        ("contact_name", "release_number", "address"),
+    ),
+    "purchase_orders.PurchaseOrder": ("purchase_orders", "po_number", ("item",)),
+}
+
+DOCUMENT_BATCH_SIZE = 1000
+
+
+def populate_search_documents(apps, schema_editor):
+    """Write the search documents of the records that existed before search."""
+    SearchDocument = apps.get_model("core", "SearchDocument")
+    title_length = SearchDocument._meta.get_field("title").max_length
+    using = schema_editor.connection.alias
+    for label, (entity_type, title, body) in SEARCH_DOCUMENTS.items():
+        model = apps.get_model(label)
+        rows = (
+            model._default_manager.using(using)
+            .only(title, *body)
+            .order_by()
+            .iterator(chunk_size=DOCUMENT_BATCH_SIZE)
+        )
+        batch = []
+        for instance in rows:
+            values = (getattr(instance, name) for name in body)
+            batch.append(
+                SearchDocument(
+                    entity_type=entity_type,
+                    object_id=instance.pk,
+                    title=str(getattr(instance, title) or "")[:title_length],
+                    body=" ".join(str(value) for value in values if value),
+                )
+            )
+            if len(batch) >= DOCUMENT_BATCH_SIZE:
+                _write(SearchDocument, batch, using)
+                batch = []
+        _write(SearchDocument, batch, using)
+
+
+def _write(SearchDocument, documents, using):
+    SearchDocument.objects.using(using).bulk_create(documents, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0002_searchdocument"),
+        ("carriers", "0002_carrierinfo_search_index"),
+        ("contacts", "0003_contactinfo_search_index"),
+        ("customers", "0003_customer_search_index"),
+        ("plants", "0002_plant_search_index"),
+        ("purchase_orders", "0004_purchaseorder_search_index"),
+        ("suppliers", "0006_supplier_search_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            populate_search_documents, migrations.RunPython.noop, elidable=True
+        ),
+    ]
@@ -176,3 +176,34 @@ class UserProfile(TimestampedModel):
                 self.job_title,
             ]
         )
+
+
+class SearchDocument(models.Model):
+    """
+    Denormalized search text of one entity record.
+
+    One row per record of the models in
+    ``apps.core.global_search.SEARCH_DOCUMENTS``, kept in sync on save and
+    delete, so ``/api/v1/search/`` searches every entity with one query.
+    """
+
+    entity_type = models.CharField(
+        max_length=50, help_text="Entity the record belongs to, e.g. suppliers"
+    )
+    object_id = models.PositiveBigIntegerField(help_text="Primary key of the record")
+    title = models.CharField(max_length=255, help_text="Record name or number")
+    body = models.TextField(blank=True, help_text="Other searchable record text")
+    modified_on = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Search Document"
+        verbose_name_plural = "Search Documents"
+        db_table = "search_documents"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["entity_type", "object_id"], name="unique_search_document"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.entity_type} {self.object_id}: {self.title}"
@@ -0,0 +1,106 @@
+"""
+Ownership resolution for ProjectMeats entities.
+
+Maps the PowerApps CreatedBy/ModifiedBy/OwnerId pattern onto the
+``created_by``/``modified_by``/``owner`` fields of ``OwnedModel``. Writes by
+an authenticated user are attributed to that user; anonymous writes (API
+access during development) are attributed to a shared "system" user.
+
+Ownership is assigned by primary key (``created_by_id`` etc.) so no User
+rows are loaded, and the system user's primary key is cached per process.
+The cache is cleared whenever that user is saved or deleted.
+"""
+
+import logging
+import threading
+from functools import partial
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_USERNAME = "system"
+SYSTEM_USER_DEFAULTS = {
+    "email": "system@projectmeats.com",
+    "first_name": "System",
+    "last_name": "User",
+}
+
+
+class OwnershipService:
+    """Resolve and assign ownership fields by user id."""
+
+    def __init__(self):
+        self._system_user_id: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def get_system_user_id(self) -> int:
+        """Return the system user's primary key, creating the user if needed."""
+        user_id = self._system_user_id
+        if user_id is not None:
+            return user_id
+
+        User = get_user_model()
+        user_id = (
+            User.objects.filter(username=SYSTEM_USERNAME)
+            .values_list("pk", flat=True)
+            .first()
+        )
+        if user_id is None:
+            user, _ = User.objects.get_or_create(
+                username=SYSTEM_USERNAME, defaults=SYSTEM_USER_DEFAULTS
+            )
+            user_id = user.pk
+
+        # Only remember ids that are committed; a rolled-back user must not
+        # stay cached for the rest of the process.
+        transaction.on_commit(partial(self._remember, user_id))
+        return user_id
+
+    def get_acting_user_id(self, request) -> int:
+        """Return the id of the user a request's writes are attributed to."""
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            return user.pk
+        return self.get_system_user_id()
+
+    def creation_fields(self, request) -> Dict[str, int]:
+        """Ownership fields for a newly created record."""
+        user_id = self.get_acting_user_id(request)
+        return {
+            "created_by_id": user_id,
+            "modified_by_id": user_id,
+            "owner_id": user_id,
+        }
+
+    def modification_fields(self, request) -> Dict[str, int]:
+        """Ownership fields for an updated record."""
+        return {"modified_by_id": self.get_acting_user_id(request)}
+
+    def invalidate(self) -> None:
+        """Forget the cached system user id."""
+        with self._lock:
+            self._system_user_id = None
+
+    def _remember(self, user_id: int) -> None:
+        with self._lock:
+            self._system_user_id = user_id
+
+
+ownership = OwnershipService()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def _invalidate_system_user(sender, instance, **kwargs):
+    """Clear the cached id when the system user changes or is removed."""
+    if (
+        instance.pk == ownership._system_user_id
+        or instance.get_username() == SYSTEM_USERNAME
+    ):
+        ownership.invalidate()
@@ -2,12 +2,275 @@
 Pagination utilities for ProjectMeats API.
 
 Provides enhanced pagination classes that match PowerApps data loading patterns.
+
+``PowerAppsPagination`` is page-number based by default. Clients opt into
+keyset (cursor) pagination with ``?pagination=cursor``; the ``next`` and
+``previous`` links then carry an opaque ``cursor`` parameter. Keyset pages
+are selected with a ``WHERE (ordering columns) > (last row)`` filter on the
+list's ordering, so they cost the same on page 1000 as on page 1 and skip
+the ``COUNT(*)`` unless ``?include_count=true`` is passed.
 """
 
+import base64
+import binascii
+import copy
+import datetime
+import json
 from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
 
-from rest_framework.pagination import PageNumberPagination
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def _cursor_value(value) -> str:
+    """JSON-encode ordering values without losing datetime precision."""
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return str(value)
+
+
+class KeysetColumn:
+    """One ordering column of a keyset-paginated queryset."""
+
+    def __init__(self, queryset, ordering: str):
+        self.descending = ordering.startswith("-")
+        name = ordering.lstrip("-")
+        if name == "pk":
+            name = queryset.model._meta.pk.name
+
+        self.lookup, self.attrs, self.field, self.nullable = self._resolve(
+            queryset, name
+        )
+
+    @staticmethod
+    def _resolve(queryset, name: str):
+        """Return the filter lookup, attribute path and field for ``name``."""
+        annotation = queryset.query.annotations.get(name)
+        if annotation is not None:
+            return name, [name], annotation.output_field, False
+
+        model = queryset.model
+        attrs = []
+        nullable = False
+        for part in name.split("__"):
+            try:
+                field = model._meta.get_field(part)
+            except FieldDoesNotExist:
+                raise ValidationError(
+                    {"pagination": f"Cannot use cursor pagination on '{name}'."}
+                )
+            attrs.append(part)
+            nullable = nullable or field.null
+            if field.is_relation:
+                model = field.related_model
+
+        if field.is_relation:
+            # Ordering by a foreign key would follow the related model's
+            # Meta.ordering; key on the local column instead.
+            attrs[-1] = field.attname
+            name = "__".join(attrs)
+        return name, attrs, field, nullable
+
+    def order_by(self):
+        if not self.nullable:
+            return f"-{self.lookup}" if self.descending else self.lookup
+        # NULLs sort as the largest value on every database
+        if self.descending:
+            return F(self.lookup).desc(nulls_first=True)
+        return F(self.lookup).asc(nulls_last=True)
+
+    def reversed(self) -> "KeysetColumn":
+        column = copy.copy(self)
+        column.descending = not self.descending
+        return column
+
+    def value(self, obj) -> Any:
+        for attr in self.attrs:
+            if obj is None:
+                return None
+            obj = getattr(obj, attr)
+        return obj
+
+    def to_python(self, value) -> Any:
+        if value is None:
+            return None
+        target = getattr(self.field, "target_field", self.field)
+        return target.to_python(value)
+
+    def equal(self, value) -> Q:
+        return Q(**{self.lookup: value})
+
+    def beyond(self, value) -> Optional[Q]:
+        """Rows strictly after ``value`` in this column's direction."""
+        if value is None:
+            # NULL is the largest value
+            if self.descending:
+                return Q(**{f"{self.lookup}__isnull": False})
+            return None
+        if self.descending:
+            return Q(**{f"{self.lookup}__lt": value})
+        condition = Q(**{f"{self.lookup}__gt": value})
+        if self.nullable:
+            condition |= Q(**{f"{self.lookup}__isnull": True})
+        return condition
+
+
+class PowerAppsCursorPagination(BasePagination):
+    """
+    Keyset pagination over a queryset's ordering.
+
+    The ordering is taken from the (already filtered and ordered) queryset,
+    falling back to the model's Meta.ordering, with the primary key appended
+    as a tie-breaker. Uses the same response envelope as
+    ``PowerAppsPagination``; ``count`` is only included on request.
+    """
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    count_query_param = "include_count"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.columns = self.get_columns(queryset)
+
+        self.count = None
+        if request.query_params.get(self.count_query_param) == "true":
+            self.count = queryset.count()
+
+        position, self.reverse = self.decode_cursor(request)
+        columns = self.columns
+        if self.reverse:
+            columns = [column.reversed() for column in columns]
+        if position is not None:
+            queryset = queryset.filter(self.keyset_filter(columns, position))
+
+        queryset = queryset.order_by(*[column.order_by() for column in columns])
+        rows = list(queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+
+        if self.reverse:
+            rows.reverse()
+            self.has_previous, self.has_next = has_more, True
+        else:
+            self.has_previous, self.has_next = position is not None, has_more
+
+        self.first = rows[0] if rows else None
+        self.last = rows[-1] if rows else None
+        self.page = rows
+        return rows
+
+    def get_page_size(self, request) -> int:
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_columns(self, queryset) -> List[KeysetColumn]:
+        ordering = list(queryset.query.order_by)
+        if not ordering and queryset.query.default_ordering:
+            ordering = list(queryset.model._meta.ordering)
+        if not all(isinstance(item, str) for item in ordering):
+            raise ValidationError(
+                {"pagination": "This list does not support cursor pagination."}
+            )
+
+        pk_names = {"pk", queryset.model._meta.pk.name}
+        if not any(item.lstrip("-") in pk_names for item in ordering):
+            ordering.append("pk")
+        return [KeysetColumn(queryset, item) for item in ordering]
+
+    @staticmethod
+    def keyset_filter(columns: List[KeysetColumn], position: List[Any]) -> Q:
+        """Lexicographic "after position" filter over the ordering columns."""
+        condition = Q(pk__in=[])
+        for index, column in enumerate(columns):
+            beyond = column.beyond(position[index])
+            if beyond is None:
+                continue
+            for previous, value in zip(columns[:index], position):
+                beyond &= previous.equal(value)
+            condition |= beyond
+        return condition
+
+    def decode_cursor(self, request) -> Tuple[Optional[List[Any]], bool]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            values, reverse = payload["p"], bool(payload.get("r"))
+            if len(values) != len(self.columns):
+                raise ValueError("cursor does not match ordering")
+            position = [
+                column.to_python(value) for column, value in zip(self.columns, values)
+            ]
+        except (
+            binascii.Error,
+            ValueError,
+            TypeError,
+            KeyError,
+            json.JSONDecodeError,
+        ) as e:
+            raise NotFound(f"Invalid cursor: {e}")
+        return position, reverse
+
+    def encode_cursor(self, obj, reverse: bool) -> str:
+        payload = {"p": [column.value(obj) for column in self.columns]}
+        if reverse:
+            payload["r"] = 1
+        data = json.dumps(payload, default=_cursor_value).encode()
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, "page")
+        return replace_query_param(
+            url,
+            self.cursor_query_param,
+            base64.urlsafe_b64encode(data).decode(),
+        )
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next or self.last is None:
+            return None
+        return self.encode_cursor(self.last, reverse=False)
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.has_previous or self.first is None:
+            return None
+        return self.encode_cursor(self.first, reverse=True)
+
+    def get_paginated_response(self, data):
+        fields = []
+        if self.count is not None:
+            fields.append(("count", self.count))
+        fields += [
+            ("page_size", self.page_size),
+            ("has_next", self.has_next),
+            ("has_previous", self.has_previous),
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+            ("results", data),
+            (
+                "pagination_info",
+                {
+                    "mode": "cursor",
+                    "has_data": bool(self.page),
+                    "is_first_page": not self.has_previous,
+                    "is_last_page": not self.has_next,
+                },
+            ),
+        ]
+        return Response(OrderedDict(fields))
 
 
 class PowerAppsPagination(PageNumberPagination):
@@ -21,6 +284,48 @@ class PowerAppsPagination(PageNumberPagination):
     page_size = 20
     page_size_query_param = "page_size"
     max_page_size = 100
+    mode_query_param = "pagination"
+    cursor_class = PowerAppsCursorPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Paginate by page number, or by keyset when the client opts in."""
+        self.cursor = None
+        if (
+            request.query_params.get(self.mode_query_param) == "cursor"
+            or self.cursor_class.cursor_query_param in request.query_params
+        ):
+            self.cursor = self.cursor_class()
+            self.cursor.page_size = self.page_size
+            self.cursor.max_page_size = self.max_page_size
+            return self.cursor.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        cursor = self.cursor_class
+        return parameters + [
+            {
+                "name": self.mode_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Set to 'cursor' for keyset pagination.",
+                "schema": {"type": "string", "enum": ["page", "cursor"]},
+            },
+            {
+                "name": cursor.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Cursor from a previous next/previous link.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": cursor.count_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Include the total count in cursor mode.",
+                "schema": {"type": "boolean"},
+            },
+        ]
 
     def get_paginated_response(self, data):
         """
@@ -29,6 +334,9 @@ class PowerAppsPagination(PageNumberPagination):
         Includes PowerApps-style pagination info that helps frontend
         components render pagination controls effectively.
         """
+        if self.cursor is not None:
+            return self.cursor.get_paginated_response(data)
+
         return Response(
             OrderedDict(
                 [
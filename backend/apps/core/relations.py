@@ -0,0 +1,105 @@
+"""
+Derive relation loading for DRF serializers.
+
+List serializers expose related display values through ``source=`` paths
+such as ``supplier.name``. Rendering those one row at a time issues a query
+per row for every relation. ``serializer_relations`` walks a serializer's
+fields, resolves each dotted source against the model and returns the
+lookups to pass to ``select_related`` (forward foreign keys and one-to-one
+relations) and ``prefetch_related`` (reverse and many-to-many relations).
+
+Results are cached per serializer class, so a viewset pays the cost of
+building its serializer's fields once per process.
+"""
+
+from functools import lru_cache
+from typing import Iterable, List, Tuple
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+Relations = Tuple[Tuple[str, ...], Tuple[str, ...]]
+
+
+def _field_paths(serializer) -> Iterable[Tuple[List[str], serializers.Field]]:
+    """Yield the source path and field for each readable serializer field."""
+    for field in serializer.fields.values():
+        if field.write_only or field.source == "*":
+            continue
+        yield list(field.source_attrs), field
+
+
+def _resolve(model, path: List[str], select: set, prefetch: set) -> None:
+    """Record the relation lookups needed to follow ``path`` from ``model``."""
+    lookup = []
+    for name in path:
+        try:
+            model_field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # Properties and methods (e.g. get_full_name) end the path
+            return
+        if not model_field.is_relation:
+            return
+
+        lookup.append(name)
+        if model_field.many_to_many or model_field.one_to_many:
+            # prefetch_related follows the rest of the path itself
+            prefetch.add("__".join(lookup))
+            return
+        select.add("__".join(lookup))
+        model = model_field.related_model
+
+
+def _collect(serializer, model, prefix: List[str], select: set, prefetch: set):
+    for path, field in _field_paths(serializer):
+        if isinstance(
+            field, (serializers.ListSerializer, serializers.ManyRelatedField)
+        ):
+            _resolve(model, prefix + path, select, prefetch)
+        elif isinstance(field, serializers.BaseSerializer):
+            # Nested object: load it, then whatever its own fields need
+            _resolve(model, prefix + path, select, prefetch)
+            _collect(field, model, prefix + path, select, prefetch)
+        elif len(path) > 1:
+            # The last attribute is read from the final related object.
+            # Single-attribute sources (including primary key related
+            # fields, which read the local *_id column) need no join.
+            _resolve(model, prefix + path[:-1], select, prefetch)
+
+
+@lru_cache(maxsize=None)
+def serializer_relations(serializer_class) -> Relations:
+    """
+    Return ``(select_related, prefetch_related)`` lookups for a serializer.
+
+    Only ``ModelSerializer`` subclasses are inspected; other serializers
+    return empty lookups.
+    """
+    meta = getattr(serializer_class, "Meta", None)
+    model = getattr(meta, "model", None)
+    if model is None:
+        return (), ()
+
+    select, prefetch = set(), set()
+    _collect(serializer_class(), model, [], select, prefetch)
+
+    # Prefetches that start with a selected relation are still valid, but a
+    # select_related lookup that is a prefix of another is redundant.
+    select = {
+        lookup
+        for lookup in select
+        if not any(other.startswith(lookup + "__") for other in select)
+    }
+    return tuple(sorted(select)), tuple(sorted(prefetch))
+
+
+def with_serializer_relations(queryset, serializer_class):
+    """Apply the relation lookups a serializer needs to a queryset."""
+    if serializer_class is None:
+        return queryset
+    select, prefetch = serializer_relations(serializer_class)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset
@@ -0,0 +1,356 @@
+"""
+Full-text and trigram search for ProjectMeats entities.
+
+On PostgreSQL each model in ``SEARCH_INDEXES`` has a generated, stored
+``search_vector`` tsvector column built from its text fields (weighted A-D)
+with a GIN index, plus ``pg_trgm`` GIN indexes on its name-like fields. The
+``AddSearchIndex`` migration operation creates them; on other databases it
+does nothing.
+
+``PowerAppsSearchFilter`` replaces DRF's ``SearchFilter`` on the entity
+viewsets. For indexed models on PostgreSQL, ``?search=`` matches rows
+where every term is a prefix of a word in the row's vector or in a related
+record's vector (related ``search_fields`` such as ``supplier__name``
+search the related model's index), or whose trigram fields are similar to
+the search text (fuzzy name matching). As with DRF, different terms may
+match different fields. The indexes are used instead of
+``UPPER(col) LIKE '%term%'`` scans. Matches are annotated with
+``search_rank`` and ``PowerAppsOrderingFilter`` orders by it unless the
+client passes ``?ordering=``.
+
+Elsewhere (SQLite in development, unindexed models, or
+``SEARCH_FULL_TEXT = False``) both filters are DRF's own.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connection, models
+from django.db.migrations.operations.base import Operation
+from django.db.models import F, Func, Q, Value
+from django.db.models.expressions import Col, Expression
+from rest_framework.filters import OrderingFilter, SearchFilter
+
+VECTOR_COLUMN = "search_vector"
+TEXT_SEARCH_CONFIG = "simple"
+RANK_ANNOTATION = "search_rank"
+
+# Characters of each column indexed, keeping long text (such as extracted
+# document text) under PostgreSQL's tsvector size limit
+MAX_INDEXED_CHARS = 100_000
+
+WEIGHTS = ("A", "B", "C", "D")
+
+
+@dataclass(frozen=True)
+class SearchIndex:
+    """Columns of one model's search vector and trigram indexes."""
+
+    vector: Tuple[Tuple[str, str], ...]
+    trigram: Tuple[str, ...] = field(default=())
+
+
+SEARCH_INDEXES: Dict[str, SearchIndex] = {
+    "accounts_receivables.AccountsReceivable": SearchIndex(
+        vector=(("name", "A"), ("email", "B")), trigram=("name",)
+    ),
+    "ai_assistant.UploadedDocument": SearchIndex(
+        vector=(("original_filename", "A"), ("extracted_text", "D")),
+        trigram=("original_filename",),
+    ),
+    "carriers.CarrierInfo": SearchIndex(
+        vector=(
+            ("name", "A"),
+            ("contact_name", "B"),
+            ("release_number", "B"),
+            ("address", "C"),
+        ),
+        trigram=("name",),
+    ),
+    "core.SearchDocument": SearchIndex(
+        vector=(("title", "A"), ("body", "B")), trigram=("title",)
+    ),
+    "contacts.ContactInfo": SearchIndex(
+        vector=(("name", "A"), ("email", "B"), ("position", "C")),
+        trigram=("name",),
+    ),
+    "customers.Customer": SearchIndex(vector=(("name", "A"),), trigram=("name",)),
+    "plants.Plant": SearchIndex(
+        vector=(("name", "A"), ("location", "B")), trigram=("name",)
+    ),
+    "purchase_orders.PurchaseOrder": SearchIndex(
+        vector=(("po_number", "A"), ("item", "B")), trigram=("po_number", "item")
+    ),
+    "suppliers.Supplier": SearchIndex(vector=(("name", "A"),), trigram=("name",)),
+}
+
+
+def search_index(model) -> Optional[SearchIndex]:
+    """The model's search index, if full-text search can be used for it."""
+    if not settings.SEARCH_FULL_TEXT or connection.vendor != "postgresql":
+        return None
+    return SEARCH_INDEXES.get(model._meta.label)
+
+
+def search_words(text: str) -> List[str]:
+    """The lowercased words of ``text``, without punctuation."""
+    return re.findall(r"\w+", text.lower())
+
+
+def prefix_query(text: str) -> Optional[str]:
+    """``to_tsquery`` text matching every word of ``text`` as a prefix."""
+    words = search_words(text)
+    if not words:
+        return None
+    return " & ".join(f"{word}:*" for word in words)
+
+
+class SearchVector(Expression):
+    """The ``search_vector`` column of the queryset's model."""
+
+    def resolve_expression(self, query=None, *args, **kwargs):
+        vector = models.Field()
+        vector.set_attributes_from_name(VECTOR_COLUMN)
+        vector.model = query.model
+        # A Col is relabelled with its table alias when used in a subquery
+        return Col(query.get_initial_alias(), vector)
+
+
+class Matches(Func):
+    template = "%(expressions)s"
+    arg_joiner = " @@ "
+    output_field = models.BooleanField()
+
+
+class TSQuery(Func):
+    template = f"to_tsquery('{TEXT_SEARCH_CONFIG}'::regconfig, %(expressions)s)"
+
+
+class TSRank(Func):
+    function = "ts_rank_cd"
+    output_field = models.FloatField()
+
+
+class WordSimilar(Func):
+    # ``text <% column``: a word of ``column`` is similar to ``text``
+    template = "%(expressions)s"
+    arg_joiner = " <%% "
+    output_field = models.BooleanField()
+
+
+class WordSimilarity(Func):
+    function = "word_similarity"
+    output_field = models.FloatField()
+
+
+def search(queryset, text: str, related: Tuple[str, ...] = ()):
+    """
+    Filter ``queryset`` to rows matching ``text`` and annotate their rank.
+
+    Like DRF's ``SearchFilter``, each word may match a different field: a
+    row matches if every word is in its own vector or in the vector of a
+    related record, or if its trigram fields are similar to ``text``.
+
+    Args:
+        queryset: Queryset of a model with a search index
+        text: Search text
+        related: Lookup paths to related models' fields (``supplier__name``);
+            words found in the related record count as matches too
+
+    Returns:
+        The filtered queryset, or None if the model has no usable index or
+        ``text`` has no words
+    """
+    index = search_index(queryset.model)
+    words = search_words(text)
+    if index is None or not words:
+        return None
+
+    relations = {}
+    for path in related:
+        target, relation = _related_target(queryset.model, path)
+        if target is not None and search_index(target) is not None:
+            relations[relation] = target
+
+    vector = SearchVector()
+    condition = Q()
+    for word in words:
+        word_query = TSQuery(Value(f"{word}:*"))
+        word_condition = Q(Matches(vector, word_query))
+        for relation, target in relations.items():
+            matches = target._default_manager.filter(
+                Matches(SearchVector(), word_query)
+            )
+            word_condition |= Q(**{f"{relation}__in": matches.values("pk")})
+        condition &= word_condition
+
+    tsquery = TSQuery(Value(prefix_query(text)))
+    rank = TSRank(vector, tsquery)
+    for name in index.trigram:
+        condition |= Q(WordSimilar(Value(text), F(name)))
+        rank = rank + WordSimilarity(Value(text), F(name))
+
+    return queryset.filter(condition).annotate(**{RANK_ANNOTATION: rank})
+
+
+def _related_target(model, path: str):
+    """Return the model a ``a__b__field`` path ends on and the ``a__b`` part."""
+    *relations, _ = path.split("__")
+    target = model
+    for name in relations:
+        try:
+            target = target._meta.get_field(name).related_model
+        except FieldDoesNotExist:
+            return None, None
+        if target is None:
+            return None, None
+    return target, "__".join(relations)
+
+
+class PowerAppsSearchFilter(SearchFilter):
+    """``SearchFilter`` using the PostgreSQL search indexes when available."""
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        terms = self.get_search_terms(request)
+        if not search_fields or not terms:
+            return queryset
+
+        related = tuple(
+            name.lstrip("^=@$") for name in search_fields if "__" in name.lstrip("^=@$")
+        )
+        results = search(queryset, " ".join(terms), related)
+        if results is None:
+            return super().filter_queryset(request, queryset, view)
+        return results
+
+
+class PowerAppsOrderingFilter(OrderingFilter):
+    """
+    ``OrderingFilter`` that puts the best search matches first by default.
+
+    A view's ``ordering_aliases`` maps ``?ordering=`` names to the annotation
+    or field actually sorted on.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        return self._aliased(view, super().get_ordering(request, queryset, view))
+
+    def filter_queryset(self, request, queryset, view):
+        explicit = request.query_params.get(self.ordering_param)
+        if RANK_ANNOTATION in queryset.query.annotations and not explicit:
+            ordering = self._aliased(view, self.get_default_ordering(view)) or []
+            return queryset.order_by(f"-{RANK_ANNOTATION}", *ordering, "pk")
+        return super().filter_queryset(request, queryset, view)
+
+    @staticmethod
+    def _aliased(view, ordering):
+        aliases = getattr(view, "ordering_aliases", None)
+        if not ordering or not aliases:
+            return ordering
+        aliased = []
+        for term in ordering:
+            name = term.lstrip("-")
+            aliased.append(term[: len(term) - len(name)] + aliases.get(name, name))
+        return aliased
+
+
+class AddSearchIndex(Operation):
+    """
+    Add the ``search_vector`` column and search indexes to a model's table.
+
+    Only runs on PostgreSQL; the column is generated from ``vector``
+    ((column, weight) pairs) and ``trigram`` columns get ``gin_trgm_ops``
+    indexes (needs the ``pg_trgm`` extension, created if missing).
+    """
+
+    reversible = True
+
+    def __init__(self, model_name: str, vector, trigram=()):
+        self.model_name = model_name
+        self.vector = [tuple(entry) for entry in vector]
+        self.trigram = list(trigram)
+        for _, weight in self.vector:
+            if weight not in WEIGHTS:
+                raise ValueError(f"Search weight must be one of {WEIGHTS}")
+
+    def deconstruct(self):
+        kwargs = {"model_name": self.model_name, "vector": self.vector}
+        if self.trigram:
+            kwargs["trigram"] = self.trigram
+        return self.__class__.__qualname__, [], kwargs
+
+    def state_forwards(self, app_label, state):
+        # The generated column isn't part of the Django model
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        model = to_state.apps.get_model(app_label, self.model_name)
+        for sql in self.forwards_sql(model, schema_editor):
+            schema_editor.execute(sql)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        model = from_state.apps.get_model(app_label, self.model_name)
+        for sql in self.backwards_sql(model, schema_editor):
+            schema_editor.execute(sql)
+
+    def forwards_sql(self, model, schema_editor) -> List[str]:
+        quote = schema_editor.quote_name
+        table = model._meta.db_table
+        parts = []
+        for name, weight in self.vector:
+            column = quote(model._meta.get_field(name).column)
+            parts.append(
+                f"setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', "
+                f"left(coalesce({column}::text, ''), {MAX_INDEXED_CHARS})), "
+                f"'{weight}')"
+            )
+        vector_index = self._index_name(schema_editor, table, VECTOR_COLUMN, "_gin")
+        statements = [
+            f"ALTER TABLE {quote(table)} ADD COLUMN {quote(VECTOR_COLUMN)} tsvector "
+            f"GENERATED ALWAYS AS ({' || '.join(parts)}) STORED",
+            f"CREATE INDEX {quote(vector_index)} "
+            f"ON {quote(table)} USING gin ({quote(VECTOR_COLUMN)})",
+        ]
+        if self.trigram:
+            statements.insert(0, "CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for name in self.trigram:
+            column = model._meta.get_field(name).column
+            trigram_index = self._index_name(schema_editor, table, column, "_trgm")
+            statements.append(
+                f"CREATE INDEX {quote(trigram_index)} "
+                f"ON {quote(table)} USING gin ({quote(column)} gin_trgm_ops)"
+            )
+        return statements
+
+    def backwards_sql(self, model, schema_editor) -> List[str]:
+        quote = schema_editor.quote_name
+        table = model._meta.db_table
+        statements = []
+        for name in self.trigram:
+            column = model._meta.get_field(name).column
+            trigram_index = self._index_name(schema_editor, table, column, "_trgm")
+            statements.append(f"DROP INDEX IF EXISTS {quote(trigram_index)}")
+        # Dropping the column drops its GIN index
+        statements.append(
+            f"ALTER TABLE {quote(table)} DROP COLUMN IF EXISTS {quote(VECTOR_COLUMN)}"
+        )
+        return statements
+
+    @staticmethod
+    def _index_name(schema_editor, table: str, column: str, suffix: str) -> str:
+        return schema_editor._create_index_name(table, [column], suffix=suffix)
+
+    def describe(self):
+        return f"Add search vector and indexes to {self.model_name}"
+
+    @property
+    def migration_name_fragment(self):
+        return f"{self.model_name.lower()}_search_index"
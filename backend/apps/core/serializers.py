@@ -11,6 +11,7 @@ from django.contrib.auth.models import User
 from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
+from .global_search import DEFAULT_RESULTS_PER_TYPE, ENTITY_TYPES, MAX_RESULTS_PER_TYPE
 from .models import UserProfile
 
 
@@ -282,3 +283,24 @@ class AuthLogoutSerializer(serializers.Serializer):
     """Serializer for user logout (no fields required)."""
 
     pass
+
+
+class GlobalSearchQuerySerializer(serializers.Serializer):
+    """Serializer for global search query parameters."""
+
+    q = serializers.CharField(max_length=200)
+    types = serializers.CharField(required=False)
+    limit = serializers.IntegerField(
+        min_value=1, max_value=MAX_RESULTS_PER_TYPE, default=DEFAULT_RESULTS_PER_TYPE
+    )
+
+    def validate_types(self, value):
+        """Split the comma-separated entity types and check they exist."""
+        types = [name.strip() for name in value.split(",") if name.strip()]
+        unknown = [name for name in types if name not in ENTITY_TYPES]
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unknown entity types: {', '.join(unknown)}; "
+                f"use any of: {', '.join(ENTITY_TYPES)}"
+            )
+        return types
@@ -1 +1,1217 @@
-# Create your tests here.
+"""
+Tests for core infrastructure.
+
+Covers the shared cache layer, metrics, ownership resolution and other
+cross-app utilities in apps.core.
+"""
+
+import csv
+import io
+import json
+import tempfile
+import threading
+import time
+from decimal import Decimal
+from importlib import import_module
+from unittest import mock, skipUnless
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.deletion import Collector
+from django.db.models.signals import post_delete
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APITestCase
+
+from apps.accounts_receivables.models import AccountsReceivable
+from apps.carriers.models import CarrierInfo
+from apps.contacts.models import ContactInfo
+from apps.customers.models import Customer
+from apps.plants.models import Plant
+from apps.purchase_orders.models import PurchaseOrder
+from apps.suppliers.models import Supplier, SupplierLocation, SupplierPlantMapping
+from apps.suppliers.serializers import SupplierPlantMappingListSerializer
+
+from . import batch, checks, global_search, metrics, search
+from .aggregates import aggregate_counts, choice_buckets, record_counts
+from .cache import MISSING, NamespacedCache, get_cache, reset_caches
+from .imports import BulkImporter, read_rows
+from .models import SearchDocument, UserProfile
+from .ownership import SYSTEM_USERNAME, ownership
+from .relations import serializer_relations
+from .search import SEARCH_INDEXES
+
+
+class NamespacedCacheTest(TestCase):
+    """Test the two-tier namespaced cache."""
+
+    def setUp(self):
+        cache.clear()
+        reset_caches()
+
+    def test_keys_are_namespaced_and_versioned(self):
+        """Test that namespaces and versions don't collide."""
+        v1 = NamespacedCache("reports", version=1)
+        v2 = NamespacedCache("reports", version=2)
+        other = NamespacedCache("other", version=1)
+
+        v1.set("key", "v1 value")
+
+        self.assertEqual(v1.get("key"), "v1 value")
+        self.assertIsNone(v2.get("key"))
+        self.assertIsNone(other.get("key"))
+        self.assertEqual(cache.get("reports:key", version=1), "v1 value")
+
+    def test_l1_tier_serves_repeat_reads(self):
+        """Test that repeat reads are served from the local tier."""
+        ns_cache = NamespacedCache("reports", l1_timeout=60)
+        ns_cache.set("key", {"value": 1})
+
+        with mock.patch.object(cache, "get") as backend_get:
+            self.assertEqual(ns_cache.get("key"), {"value": 1})
+            backend_get.assert_not_called()
+
+        stats = ns_cache.stats()
+        self.assertEqual(stats["l1_hits"], 1)
+        self.assertEqual(stats["hit_ratio"], 1.0)
+
+    def test_l1_returns_independent_copies(self):
+        """Test that mutating a cached value doesn't change the cache."""
+        ns_cache = NamespacedCache("reports", l1_timeout=60)
+        ns_cache.set("key", {"value": 1})
+
+        ns_cache.get("key")["value"] = 2
+
+        self.assertEqual(ns_cache.get("key"), {"value": 1})
+
+    def test_shared_hit_populates_l1(self):
+        """Test that a value written by another process is picked up."""
+        ns_cache = NamespacedCache("reports", l1_timeout=60)
+        cache.set("reports:key", "shared", version=1)
+
+        self.assertEqual(ns_cache.get("key"), "shared")
+        self.assertEqual(ns_cache.get("key"), "shared")
+
+        stats = ns_cache.stats()
+        self.assertEqual(stats["l2_hits"], 1)
+        self.assertEqual(stats["l1_hits"], 1)
+
+    def test_cached_none_is_distinguished_from_miss(self):
+        """Test that a cached None is returned instead of the default."""
+        ns_cache = NamespacedCache("reports")
+        self.assertIs(ns_cache.get("key", MISSING), MISSING)
+
+        ns_cache.set("key", None)
+
+        self.assertIsNone(ns_cache.get("key", MISSING))
+        self.assertEqual(ns_cache.stats()["misses"], 1)
+
+    def test_delete_clears_both_tiers(self):
+        """Test deleting a key."""
+        ns_cache = NamespacedCache("reports", l1_timeout=60)
+        ns_cache.set("key", "value")
+
+        ns_cache.delete("key")
+
+        self.assertIsNone(ns_cache.get("key"))
+        self.assertIsNone(cache.get("reports:key", version=1))
+
+    def test_get_or_set(self):
+        """Test computing a value only on a miss."""
+        ns_cache = NamespacedCache("reports")
+        compute = mock.Mock(return_value=42)
+
+        self.assertEqual(ns_cache.get_or_set("key", compute), 42)
+        self.assertEqual(ns_cache.get_or_set("key", compute), 42)
+        compute.assert_called_once()
+
+    def test_get_or_compute_coalesces_concurrent_misses(self):
+        """Test that concurrent misses share a single computation."""
+        ns_cache = NamespacedCache("reports")
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return "value"
+
+        results = []
+        barrier = threading.Barrier(5)
+
+        def worker():
+            barrier.wait()
+            results.append(ns_cache.get_or_compute("key", compute, 60))
+
+        threads = [threading.Thread(target=worker) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, ["value"] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(ns_cache.stats()["coalesced"], 4)
+
+    def test_get_or_compute_refreshes_early(self):
+        """Test that slow-to-compute values are refreshed before expiry."""
+        ns_cache = NamespacedCache("reports")
+        ns_cache.store("slow", "old", 60, cost=30)
+        ns_cache.store("fast", "old", 60, cost=0)
+
+        with mock.patch("apps.core.cache.random.random", return_value=0.99):
+            self.assertEqual(ns_cache.get_or_compute("slow", lambda: "new", 60), "new")
+            self.assertEqual(ns_cache.get_or_compute("fast", lambda: "new", 60), "old")
+        self.assertEqual(ns_cache.stats()["early_refreshes"], 1)
+
+    def test_get_or_compute_errors_are_not_cached(self):
+        """Test that a failed computation releases the lock and stores nothing."""
+        ns_cache = NamespacedCache("reports")
+
+        with self.assertRaises(ValueError):
+            ns_cache.get_or_compute("key", mock.Mock(side_effect=ValueError), 60)
+
+        self.assertIs(ns_cache.peek("key", MISSING), MISSING)
+        with ns_cache.lock("key") as acquired:
+            self.assertTrue(acquired)
+        self.assertEqual(ns_cache.get_or_compute("key", lambda: 1, 60), 1)
+
+    @override_settings(CACHE_NAMESPACES={"reports": {"version": 3, "l1_timeout": 0}})
+    def test_get_cache_reads_namespace_settings(self):
+        """Test that get_cache applies CACHE_NAMESPACES and is memoized."""
+        ns_cache = get_cache("reports")
+
+        self.assertIs(get_cache("reports"), ns_cache)
+        self.assertEqual(ns_cache.version, 3)
+        self.assertIsNone(ns_cache.local)
+
+
+@mock.patch.dict("os.environ", {"PROMETHEUS_MULTIPROC_DIR": ""})
+class PrometheusMetricsTest(APITestCase):
+    """Test the metrics middleware and /metrics endpoint."""
+
+    def sample(self, name, labels):
+        return metrics.REGISTRY.get_sample_value(name, labels) or 0
+
+    def setUp(self):
+        if not metrics.PROMETHEUS_AVAILABLE:
+            self.skipTest("prometheus_client is not installed")
+
+    def test_request_labelled_by_viewset_action(self):
+        """Test that API requests are labelled ViewSet.action."""
+        labels = {"view": "SupplierViewSet.list", "method": "GET", "status": "200"}
+        before = self.sample("projectmeats_http_request_duration_seconds_count", labels)
+        queries_before = self.sample(
+            "projectmeats_db_queries_per_request_count",
+            {"view": "SupplierViewSet.list"},
+        )
+
+        response = self.client.get("/api/v1/suppliers/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.sample("projectmeats_http_request_duration_seconds_count", labels),
+            before + 1,
+        )
+        self.assertEqual(
+            self.sample(
+                "projectmeats_db_queries_per_request_count",
+                {"view": "SupplierViewSet.list"},
+            ),
+            queries_before + 1,
+        )
+
+    def test_custom_action_label(self):
+        """Test that @action routes use the action name."""
+        labels = {
+            "view": "SupplierViewSet.migration_info",
+            "method": "GET",
+            "status": "200",
+        }
+        before = self.sample("projectmeats_http_request_duration_seconds_count", labels)
+
+        self.client.get("/api/v1/suppliers/migration_info/")
+
+        self.assertEqual(
+            self.sample("projectmeats_http_request_duration_seconds_count", labels),
+            before + 1,
+        )
+
+    def test_cache_lookups_are_counted(self):
+        """Test that cache hits and misses are exported."""
+        labels = {"namespace": "metrics_test", "result": "miss"}
+        before = self.sample("projectmeats_cache_requests_total", labels)
+
+        NamespacedCache("metrics_test").get("absent")
+
+        self.assertEqual(
+            self.sample("projectmeats_cache_requests_total", labels), before + 1
+        )
+
+    def test_metrics_endpoint(self):
+        """Test that /metrics exposes the text format."""
+        self.client.get("/api/v1/suppliers/")
+
+        response = self.client.get("/metrics")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            b"projectmeats_http_request_duration_seconds_bucket", response.content
+        )
+
+
+class OwnershipServiceTest(APITestCase):
+    """Test ownership resolution for entity writes."""
+
+    def setUp(self):
+        ownership.invalidate()
+        self.addCleanup(ownership.invalidate)
+        self.request = RequestFactory().get("/")
+        self.request.user = mock.Mock(is_authenticated=False)
+
+    def test_authenticated_user_owns_records(self):
+        """Test that writes are attributed to the authenticated user."""
+        user = User.objects.create_user(username="owner", password="testpass123")
+        self.request.user = user
+
+        with self.assertNumQueries(0):
+            fields = ownership.creation_fields(self.request)
+
+        self.assertEqual(
+            fields,
+            {"created_by_id": user.pk, "modified_by_id": user.pk, "owner_id": user.pk},
+        )
+
+    def test_system_user_created_for_anonymous_writes(self):
+        """Test that anonymous writes fall back to the system user."""
+        fields = ownership.modification_fields(self.request)
+
+        system_user = User.objects.get(username=SYSTEM_USERNAME)
+        self.assertEqual(fields, {"modified_by_id": system_user.pk})
+
+    def test_system_user_id_cached_after_commit(self):
+        """Test that the system user id is only looked up once per process."""
+        with self.captureOnCommitCallbacks(execute=True):
+            user_id = ownership.get_system_user_id()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(ownership.get_system_user_id(), user_id)
+
+    def test_cache_invalidated_when_system_user_changes(self):
+        """Test that deleting the system user clears the cached id."""
+        with self.captureOnCommitCallbacks(execute=True):
+            user_id = ownership.get_system_user_id()
+
+        User.objects.filter(pk=user_id).delete()
+
+        self.assertNotEqual(ownership.get_system_user_id(), user_id)
+
+    def test_anonymous_api_create_uses_system_user(self):
+        """Test the base viewset assigns ownership by id."""
+        response = self.client.post(
+            "/api/v1/customers/", {"name": "Anonymous Customer"}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 201)
+        customer = Customer.objects.get(name="Anonymous Customer")
+        self.assertEqual(customer.owner.username, SYSTEM_USERNAME)
+        self.assertEqual(customer.created_by_id, customer.modified_by_id)
+
+
+class ListQueryCountTest(APITestCase):
+    """Test that entity list endpoints don't issue a query per row."""
+
+    endpoints = [
+        "/api/v1/accounts-receivables/",
+        "/api/v1/suppliers/",
+        "/api/v1/supplier-plant-mappings/",
+        "/api/v1/supplier-locations/",
+        "/api/v1/customers/",
+        "/api/v1/contacts/",
+        "/api/v1/plants/",
+        "/api/v1/carrier-infos/",
+        "/api/v1/purchase-orders/",
+    ]
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="pass")
+        self.owned = {
+            "created_by": self.user,
+            "modified_by": self.user,
+            "owner": self.user,
+        }
+
+    def create_rows(self, index):
+        """Create one fully related row for every entity."""
+        owned = self.owned
+        receivable = AccountsReceivable.objects.create(name=f"AR {index}", **owned)
+        supplier = Supplier.objects.create(
+            name=f"Supplier {index}", accounts_receivable=receivable, **owned
+        )
+        customer = Customer.objects.create(name=f"Customer {index}", **owned)
+        contact = ContactInfo.objects.create(
+            name=f"Contact {index}", customer=customer, supplier=supplier, **owned
+        )
+        plant = Plant.objects.create(name=f"Plant {index}", supplier=supplier, **owned)
+        SupplierPlantMapping.objects.create(
+            name=f"Mapping {index}",
+            supplier=supplier,
+            customer=customer,
+            contact_info=contact,
+            plant=plant,
+            **owned,
+        )
+        SupplierLocation.objects.create(
+            name=f"Location {index}", supplier=supplier, **owned
+        )
+        CarrierInfo.objects.create(name=f"Carrier {index}", supplier=supplier, **owned)
+        PurchaseOrder.objects.create(
+            po_number=f"PO-{index}",
+            item="Item",
+            quantity=1,
+            price_per_unit=Decimal("1.00"),
+            purchase_date=timezone.now(),
+            customer=customer,
+            supplier=supplier,
+            origin_location=plant,
+            end_location=plant,
+            **owned,
+        )
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return len(queries)
+
+    def test_list_queries_do_not_grow_with_rows(self):
+        """Test that every list endpoint uses a constant number of queries."""
+        self.create_rows(0)
+        single = {url: self.count_queries(url) for url in self.endpoints}
+
+        for index in range(1, 5):
+            self.create_rows(index)
+
+        for url in self.endpoints:
+            with self.subTest(url=url):
+                self.assertEqual(self.count_queries(url), single[url])
+
+    def test_supplier_plant_mapping_list_joins_relations(self):
+        """Test that the mapping list is a count plus a single select."""
+        for index in range(3):
+            self.create_rows(index)
+
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/v1/supplier-plant-mappings/")
+
+        row = response.data["results"][0]
+        self.assertTrue(row["supplier_name"].startswith("Supplier"))
+        self.assertTrue(row["contact_info_name"].startswith("Contact"))
+
+    def test_relations_derived_from_serializer_sources(self):
+        """Test that dotted sources become select_related lookups."""
+        select, prefetch = serializer_relations(SupplierPlantMappingListSerializer)
+
+        self.assertEqual(select, ("contact_info", "customer", "supplier"))
+        self.assertEqual(prefetch, ())
+
+
+class AggregateCountsTest(TestCase):
+    """Test single-query count aggregation."""
+
+    def setUp(self):
+        cache.clear()
+        reset_caches()
+        self.user = User.objects.create_user(username="testuser", password="pass")
+        for name, status in [("A", "active"), ("B", "active"), ("C", "inactive")]:
+            Customer.objects.create(
+                name=name,
+                status=status,
+                created_by=self.user,
+                modified_by=self.user,
+                owner=self.user,
+            )
+
+    def test_nested_buckets_in_one_query(self):
+        """Test that all buckets are counted by one query."""
+        with self.assertNumQueries(1):
+            counts = aggregate_counts(
+                Customer.objects.all(),
+                {
+                    "total": None,
+                    "named_a": Q(name="A"),
+                    "by_status": choice_buckets(
+                        "status", [("active", "Active"), ("inactive", "Inactive")]
+                    ),
+                },
+            )
+
+        self.assertEqual(
+            counts,
+            {
+                "total": 3,
+                "named_a": 1,
+                "by_status": {"active": 2, "inactive": 1},
+            },
+        )
+
+    def test_counts_cached_per_filter_until_write(self):
+        """Test caching by queryset filters and invalidation on save."""
+        self.assertEqual(
+            record_counts(Customer.objects.all()),
+            {"total_records": 3, "active_records": 2},
+        )
+        with self.assertNumQueries(0):
+            record_counts(Customer.objects.all())
+
+        # A different filter is a different cache entry
+        with self.assertNumQueries(1):
+            counts = record_counts(Customer.objects.filter(name="C"))
+        self.assertEqual(counts, {"total_records": 1, "active_records": 0})
+
+        Customer.objects.filter(name="C").get().delete()
+
+        with self.assertNumQueries(1):
+            counts = record_counts(Customer.objects.all())
+        self.assertEqual(counts["total_records"], 2)
+
+    def test_only_counted_models_are_cached(self):
+        """Test that other models' writes don't touch the stats cache."""
+        with mock.patch("apps.core.aggregates._bump_generation") as bump:
+            UserProfile.objects.create(user=self.user)
+            Customer.objects.create(
+                name="D",
+                created_by=self.user,
+                modified_by=self.user,
+                owner=self.user,
+            )
+        self.assertEqual({call.args[0] for call in bump.call_args_list}, {Customer})
+
+        # Nothing would invalidate them, so their counts aren't cached
+        aggregate_counts(UserProfile.objects.all(), {"total": None})
+        with self.assertNumQueries(1):
+            aggregate_counts(UserProfile.objects.all(), {"total": None})
+
+    def test_empty_queryset_skips_database(self):
+        """Test that querysets that can't match return zeros without a query."""
+        with self.assertNumQueries(0):
+            counts = record_counts(Customer.objects.none())
+
+        self.assertEqual(counts, {"total_records": 0, "active_records": 0})
+
+
+class CursorPaginationTest(APITestCase):
+    """Test opt-in keyset pagination on entity lists."""
+
+    url = "/api/v1/purchase-orders/"
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="pass")
+        owned = {"created_by": self.user, "modified_by": self.user, "owner": self.user}
+        customer = Customer.objects.create(name="Customer", **owned)
+        supplier = Supplier.objects.create(name="Supplier", **owned)
+        now = timezone.now()
+        # Two orders per purchase date so pages split rows with equal keys
+        for index in range(7):
+            PurchaseOrder.objects.create(
+                po_number=f"PO-{index:03d}",
+                item="Item",
+                quantity=1,
+                price_per_unit=Decimal("1.00"),
+                purchase_date=now - timezone.timedelta(days=index // 2),
+                customer=customer,
+                supplier=supplier,
+                **owned,
+            )
+        self.expected = list(
+            PurchaseOrder.objects.order_by("-purchase_date", "po_number").values_list(
+                "po_number", flat=True
+            )
+        )
+
+    def po_numbers(self, response):
+        return [row["po_number"] for row in response.data["results"]]
+
+    def test_walks_forward_and_back_on_default_ordering(self):
+        """Test following next and previous links across every row."""
+        response = self.client.get(self.url, {"pagination": "cursor", "page_size": 3})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("count", response.data)
+        self.assertFalse(response.data["has_previous"])
+        self.assertEqual(response.data["pagination_info"]["mode"], "cursor")
+
+        pages = [self.po_numbers(response)]
+        while response.data["next"]:
+            response = self.client.get(response.data["next"])
+            pages.append(self.po_numbers(response))
+
+        self.assertEqual([row for page in pages for row in page], self.expected)
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertFalse(response.data["has_next"])
+
+        response = self.client.get(response.data["previous"])
+        self.assertEqual(self.po_numbers(response), pages[1])
+        self.assertTrue(response.data["has_previous"])
+
+    def test_respects_ordering_parameter_and_optional_count(self):
+        """Test keyset pagination on a client-chosen ordering."""
+        response = self.client.get(
+            self.url,
+            {
+                "pagination": "cursor",
+                "ordering": "po_number",
+                "page_size": 4,
+                "include_count": "true",
+            },
+        )
+        self.assertEqual(response.data["count"], 7)
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual(self.po_numbers(response), sorted(self.expected)[4:])
+
+    def test_cursor_page_skips_count_query(self):
+        """Test that cursor pages don't run COUNT(*)."""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url, {"pagination": "cursor"})
+
+        self.assertFalse(
+            any("COUNT(" in query["sql"].upper() for query in queries.captured_queries)
+        )
+
+    def test_invalid_cursor(self):
+        """Test that a malformed cursor is a 404, not a 500."""
+        response = self.client.get(self.url, {"cursor": "not-a-cursor"})
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_page_number_mode_unchanged(self):
+        """Test that page-number pagination stays the default."""
+        response = self.client.get(self.url, {"page_size": 3, "page": 2})
+
+        self.assertEqual(response.data["count"], 7)
+        self.assertEqual(response.data["current_page"], 2)
+        self.assertEqual(self.po_numbers(response), self.expected[3:6])
+
+
+class ExportTest(APITestCase):
+    """Test streaming CSV/NDJSON exports of entity lists."""
+
+    url = "/api/v1/suppliers/export/"
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="pass")
+        owned = {"created_by": self.user, "modified_by": self.user, "owner": self.user}
+        for name in ["Beta Meats", "Alpha Meats", "Gamma Foods"]:
+            Supplier.objects.create(name=name, **owned)
+        Supplier.objects.create(name="Delta Meats", status="inactive", **owned)
+
+    def read(self, response):
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv_export_applies_list_filters(self):
+        """Test that search, active and ordering narrow the CSV rows."""
+        response = self.client.get(
+            self.url, {"search": "meats", "active": "true", "ordering": "-name"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/csv"))
+        self.assertIn('filename="suppliers.csv"', response["Content-Disposition"])
+        rows = list(csv.DictReader(io.StringIO(self.read(response))))
+        self.assertEqual([row["name"] for row in rows], ["Beta Meats", "Alpha Meats"])
+        self.assertEqual(rows[0]["created_by_id"], str(self.user.pk))
+
+    def test_ndjson_export_with_selected_fields(self):
+        """Test one JSON object per line with only the requested fields."""
+        response = self.client.get(
+            self.url, {"export_format": "ndjson", "fields": "name,status"}
+        )
+
+        self.assertTrue(response["Content-Type"].startswith("application/x-ndjson"))
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[0], {"name": "Alpha Meats", "status": "active"})
+
+    @override_settings(EXPORT_CHUNK_SIZE=2)
+    def test_export_skips_count_and_pagination(self):
+        """Test that every row is exported without COUNT(*) or page limits."""
+        with CaptureQueriesContext(connection) as queries:
+            body = self.read(self.client.get(self.url, {"page_size": 1}))
+
+        self.assertEqual(len(body.strip().splitlines()), 5)
+        self.assertFalse(
+            any("COUNT(" in query["sql"].upper() for query in queries.captured_queries)
+        )
+
+    def test_invalid_format_and_fields(self):
+        """Test that unknown formats and fields are rejected with 400."""
+        response = self.client.get(self.url, {"export_format": "xml"})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get(self.url, {"fields": "name,password"})
+        self.assertEqual(response.status_code, 400)
+
+
+class BulkImportTest(APITestCase):
+    """Test bulk CSV/NDJSON imports of entity records."""
+
+    url = "/api/v1/purchase-orders/import/"
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="pass")
+        owned = {"created_by": self.user, "modified_by": self.user, "owner": self.user}
+        self.customer = Customer.objects.create(name="Acme Foods", **owned)
+        self.supplier = Supplier.objects.create(name="Prime Beef", **owned)
+        Supplier.objects.create(name="Twin Farms", **owned)
+        Supplier.objects.create(name="twin farms", **owned)
+        self.client.force_authenticate(self.user)
+
+    def upload(self, content, name="orders.csv", **data):
+        upload = io.BytesIO(content.encode())
+        upload.name = name
+        return self.client.post(self.url, {"file": upload, **data}, format="multipart")
+
+    def test_csv_import_reports_bad_rows_and_imports_the_rest(self):
+        """Test that invalid rows are reported while valid rows are created."""
+        content = (
+            "po_number,item,quantity,price_per_unit,purchase_date,customer,"
+            "supplier_id,supplier,notes\n"
+            f"PO-1,Beef,10,12.50,2024-03-01T10:00:00,acme foods,,Prime Beef,x\n"
+            f"PO-2,Pork,0,12.50,2024-03-01,Acme Foods,,Prime Beef,x\n"
+            f"PO-3,Lamb,5,9.99,2024-03-01,Acme Foods,,Twin Farms,x\n"
+            f"PO-4,Veal,5,abc,2024-03-01,Nobody,,Prime Beef,x\n"
+            f"PO-5,Chicken,3,4.00,2024-03-02,Acme Foods,{self.supplier.pk},,x\n"
+        )
+        response = self.upload(content)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["rows"], 5)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(response.data["failed"], 3)
+        self.assertEqual(response.data["ignored_columns"], ["notes"])
+        errors = {error["row"]: error["errors"] for error in response.data["errors"]}
+        self.assertEqual(set(errors), {2, 3, 4})
+        self.assertIn("quantity", errors[2])
+        self.assertIn("Several", errors[3]["supplier"][0])
+        self.assertEqual(set(errors[4]), {"price_per_unit", "customer"})
+
+        orders = PurchaseOrder.objects.order_by("po_number")
+        self.assertEqual([order.po_number for order in orders], ["PO-1", "PO-5"])
+        self.assertEqual(orders[0].supplier_id, self.supplier.pk)
+        self.assertEqual(orders[0].owner_id, self.user.pk)
+        self.assertEqual(orders[0].status, "active")
+        self.assertTrue(timezone.is_aware(orders[0].purchase_date))
+
+    def test_ndjson_import_with_dry_run(self):
+        """Test NDJSON rows, malformed lines and validation-only imports."""
+        content = "\n".join(
+            [
+                json.dumps(
+                    {
+                        "po_number": "PO-1",
+                        "item": "Beef",
+                        "quantity": 2,
+                        "price_per_unit": "3.00",
+                        "purchase_date": "2024-03-05T00:00:00Z",
+                        "fulfillment_date": "2024-03-01T00:00:00Z",
+                        "customer": "Acme Foods",
+                        "supplier": "Prime Beef",
+                    }
+                ),
+                "{not json",
+                "",
+            ]
+        )
+        response = self.upload(content, name="orders.ndjson", dry_run="true")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["dry_run"])
+        self.assertEqual(response.data["failed"], 2)
+        self.assertIn("fulfillment_date", response.data["errors"][0]["errors"])
+        self.assertIn("non_field_errors", response.data["errors"][1]["errors"])
+        self.assertFalse(PurchaseOrder.objects.exists())
+
+    def test_missing_required_column(self):
+        """Test that a file without a required column is rejected up front."""
+        response = self.upload("po_number,item\nPO-1,Beef\n")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("quantity", str(response.data["file"]))
+
+    @override_settings(IMPORT_BATCH_SIZE=2)
+    def test_rejected_batch_is_retried_row_by_row(self):
+        """Test that a batch the database rejects falls back to single inserts."""
+        content = "name,delivery_type_profile\nNorth,yes\nSouth,no\nEast,\n"
+        with mock.patch.object(
+            BulkImporter, "_insert", side_effect=IntegrityError("rejected")
+        ):
+            importer = BulkImporter("suppliers", user_id=self.user.pk)
+            header, rows = read_rows(io.BytesIO(content.encode()), "csv")
+            result = importer.run(rows, header)
+
+        self.assertEqual((result.rows, result.created, result.failed), (3, 3, 0))
+        self.assertEqual(
+            dict(
+                Supplier.objects.filter(
+                    name__in=["North", "South", "East"]
+                ).values_list("name", "delivery_type_profile")
+            ),
+            {"North": True, "South": False, "East": False},
+        )
+
+    def test_import_records_command(self):
+        """Test the management command on a CSV file."""
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as f:
+            f.write('name\nBeta Foods\n"Gamma, Inc"\n')
+            f.flush()
+            out = io.StringIO()
+            call_command("import_records", "customers", f.name, stdout=out)
+
+        self.assertIn("Imported 2 of 2 rows, 0 failed", out.getvalue())
+        self.assertTrue(Customer.objects.filter(name="Gamma, Inc").exists())
+
+
+class BatchOperationsTest(APITestCase):
+    """Test batch create, update and soft delete on entity viewsets."""
+
+    url = "/api/v1/suppliers/batch/"
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="pass")
+        self.client.force_authenticate(self.user)
+        self.other = User.objects.create_user(username="other", password="pass")
+        self.suppliers = [
+            Supplier.objects.create(
+                name=f"Supplier {index}",
+                created_by=self.other,
+                modified_by=self.other,
+                owner=self.other,
+            )
+            for index in range(3)
+        ]
+
+    def test_batch_create_reports_invalid_items(self):
+        """Test that valid items are created and invalid ones reported."""
+        payload = [
+            {"name": "North Meats", "delivery_type_profile": True},
+            {"name": "  "},
+            {"name": "South Meats"},
+        ]
+        response = self.client.post(self.url, payload, format="json")
+
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual((response.data["applied"], response.data["failed"]), (2, 1))
+        results = response.data["results"]
+        self.assertEqual(
+            [r["status"] for r in results], ["created", "error", "created"]
+        )
+        self.assertIn("name", results[1]["errors"])
+
+        created = Supplier.objects.get(pk=results[0]["id"])
+        self.assertEqual(created.name, "North Meats")
+        self.assertTrue(created.delivery_type_profile)
+        self.assertEqual(created.owner_id, self.user.pk)
+        self.assertEqual(Supplier.objects.get(pk=results[2]["id"]).name, "South Meats")
+
+    def test_batch_create_all_valid(self):
+        """Test a fully valid batch in one INSERT, plus one for its search documents."""
+        payload = [{"name": f"Batch {index}"} for index in range(5)]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, payload, format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["applied"], 5)
+        inserts = [
+            q["sql"] for q in queries.captured_queries if q["sql"].startswith("INSERT")
+        ]
+        self.assertEqual(len(inserts), 2)
+        self.assertTrue(inserts[0].startswith('INSERT INTO "suppliers"'))
+        self.assertTrue(inserts[1].startswith('INSERT INTO "search_documents"'))
+        self.assertEqual(
+            SearchDocument.objects.filter(title__startswith="Batch ").count(), 5
+        )
+
+    def test_item_errors_shapes(self):
+        """Test list serializer errors are spread over the items in every shape."""
+        blank = {"name": ["This field may not be blank."]}
+        whole = {"non_field_errors": ["Expected a list of items."]}
+
+        self.assertEqual(batch._item_errors([{}, blank, {}], 3), [{}, blank, {}])
+        self.assertEqual(batch._item_errors({1: blank}, 3), [{}, blank, {}])
+        self.assertEqual(batch._item_errors(whole, 2), [whole, whole])
+
+    def test_batch_update(self):
+        """Test partial updates applied with one bulk update."""
+        first, second, _ = self.suppliers
+        before = first.modified_on
+        payload = [
+            {"id": first.pk, "name": "Renamed"},
+            {"id": second.pk, "delivery_type_profile": True},
+            {"id": 999999, "name": "Missing"},
+            {"id": second.pk, "name": ""},
+        ]
+        response = self.client.patch(self.url, payload, format="json")
+
+        self.assertEqual(response.status_code, 207)
+        statuses = [result["status"] for result in response.data["results"]]
+        self.assertEqual(statuses, ["updated", "updated", "error", "error"])
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.name, "Renamed")
+        self.assertEqual(first.modified_by_id, self.user.pk)
+        self.assertGreater(first.modified_on, before)
+        self.assertTrue(second.delivery_type_profile)
+        self.assertEqual(second.name, "Supplier 1")
+
+    def test_batch_soft_delete(self):
+        """Test soft deleting a list of ids with one UPDATE."""
+        ids = [supplier.pk for supplier in self.suppliers[:2]]
+        self.assertEqual(record_counts(Supplier.objects.all())["active_records"], 3)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.delete(
+                self.url, {"ids": ids + [999999]}, format="json"
+            )
+
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.data["applied"], 2)
+        updates = [q for q in queries.captured_queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(
+            set(
+                Supplier.objects.filter(status="inactive").values_list("pk", flat=True)
+            ),
+            set(ids),
+        )
+        self.assertEqual(record_counts(Supplier.objects.all())["active_records"], 1)
+
+    @override_settings(API_BATCH_MAX_SIZE=2)
+    def test_batch_size_limit(self):
+        """Test that oversized and malformed batches are rejected."""
+        response = self.client.post(
+            self.url, [{"name": "A"}, {"name": "B"}, {"name": "C"}], format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(self.url, {"name": "A"}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Supplier.objects.count(), 3)
+
+
+class SearchBackendTest(APITestCase):
+    """Test the full-text search backend and its SQLite fallback."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="pass")
+        owned = {"created_by": self.user, "modified_by": self.user, "owner": self.user}
+        for name in ["Acme Foods", "Beta Meats", "Macme Supply"]:
+            Supplier.objects.create(name=name, **owned)
+
+    def indexed(self):
+        """Use the search indexes as if connected to PostgreSQL."""
+        return mock.patch.object(
+            search, "search_index", lambda model: SEARCH_INDEXES.get(model._meta.label)
+        )
+
+    def test_sqlite_falls_back_to_like_search(self):
+        """Test that ?search= keeps substring matching without PostgreSQL."""
+        response = self.client.get("/api/v1/suppliers/", {"search": "acme"})
+
+        names = [row["name"] for row in response.data["results"]]
+        self.assertEqual(names, ["Acme Foods", "Macme Supply"])
+
+    def test_prefix_query(self):
+        """Test that search text becomes prefix terms and punctuation is dropped."""
+        self.assertEqual(search.prefix_query("Acme, Foods!"), "acme:* & foods:*")
+        self.assertIsNone(search.prefix_query("--"))
+
+    def test_full_text_query_uses_vector_and_related_indexes(self):
+        """Test the PostgreSQL query: vector match, trigram and related subqueries."""
+        with self.indexed():
+            queryset = search.search(
+                PurchaseOrder.objects.select_related("supplier"),
+                "acme beef",
+                ("customer__name", "supplier__name"),
+            )
+            sql = str(queryset.query)
+
+        self.assertIn(
+            '"purchase_orders_purchaseorder"."search_vector" @@ to_tsquery(', sql
+        )
+        self.assertIn('<% "purchase_orders_purchaseorder"."po_number"', sql)
+        # Subqueries on the related tables reference their own alias
+        self.assertIn('FROM "suppliers" U0 WHERE U0."search_vector" @@', sql)
+        self.assertIn('FROM "customers" U0 WHERE U0."search_vector" @@', sql)
+        self.assertIn("search_rank", queryset.query.annotations)
+        self.assertNotIn("LIKE", sql.upper())
+
+    def test_each_term_may_match_a_different_record(self):
+        """Test every term is matched on the row or any related record."""
+        with self.indexed():
+            queryset = search.search(
+                PurchaseOrder.objects.all(), "acme beef", ("customer__name",)
+            )
+            sql = str(queryset.query)
+
+        own = '"purchase_orders_purchaseorder"."search_vector" @@ to_tsquery('
+        customer = (
+            '"purchase_orders_purchaseorder"."customer_id" IN (SELECT U0."id" '
+            'FROM "customers" U0 WHERE U0."search_vector" @@ to_tsquery('
+        )
+        for word in ("acme", "beef"):
+            term = f"'simple'::regconfig, {word}:*)"
+            self.assertIn(f"({own}{term} OR {customer}{term})", sql)
+        self.assertIn(") AND (", sql)
+
+    @skipUnless(connection.vendor == "postgresql", "needs PostgreSQL")
+    def test_terms_found_in_row_and_related_record(self):
+        """Test "acme beef" finds a PO for customer Acme whose item is beef."""
+        owned = {"created_by": self.user, "modified_by": self.user, "owner": self.user}
+        customer = Customer.objects.create(name="Acme", **owned)
+        beef, _ = [
+            PurchaseOrder.objects.create(
+                po_number=f"PO-{item}",
+                item=item,
+                quantity=1,
+                price_per_unit=Decimal("1.00"),
+                purchase_date=timezone.now(),
+                customer=customer,
+                supplier=Supplier.objects.get(name="Beta Meats"),
+                **owned,
+            )
+            for item in ("beef", "pork")
+        ]
+
+        queryset = search.search(
+            PurchaseOrder.objects.all(), "acme beef", ("customer__name",)
+        )
+
+        self.assertEqual(list(queryset), [beef])
+
+    def test_ranked_ordering_unless_ordering_requested(self):
+        """Test that search matches are ordered by rank by default."""
+        view = mock.Mock(
+            ordering=["name"], ordering_fields=["name"], ordering_aliases={}
+        )
+        ordering_filter = search.PowerAppsOrderingFilter()
+        queryset = Supplier.objects.annotate(
+            search_rank=Value(1.0, output_field=FloatField())
+        )
+
+        request = Request(RequestFactory().get("/"))
+        ordered = ordering_filter.filter_queryset(request, queryset, view)
+        self.assertEqual(ordered.query.order_by, ("-search_rank", "name", "pk"))
+
+        request = Request(RequestFactory().get("/", {"ordering": "-name"}))
+        ordered = ordering_filter.filter_queryset(request, queryset, view)
+        self.assertEqual(ordered.query.order_by, ("-name",))
+
+    def test_search_index_migration(self):
+        """Test the PostgreSQL DDL and that other databases are left alone."""
+        operation = search.AddSearchIndex("supplier", [("name", "A")], ["name"])
+        # Only the editor's quoting and index naming are used
+        schema_editor = connection.SchemaEditorClass(connection)
+        statements = operation.forwards_sql(Supplier, schema_editor)
+
+        self.assertEqual(statements[0], "CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        self.assertIn("GENERATED ALWAYS AS (setweight(to_tsvector(", statements[1])
+        self.assertIn('USING gin ("search_vector")', statements[2])
+        self.assertIn("gin_trgm_ops", statements[3])
+
+        with connection.cursor() as cursor:
+            columns = connection.introspection.get_table_description(
+                cursor, Supplier._meta.db_table
+            )
+        self.assertNotIn("search_vector", [column.name for column in columns])
+
+
+class GlobalSearchTest(APITestCase):
+    """Test the search documents and the global search endpoint."""
+
+    url = "/api/v1/search/"
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="pass")
+        self.owned = {
+            "created_by": self.user,
+            "modified_by": self.user,
+            "owner": self.user,
+        }
+        self.supplier = Supplier.objects.create(name="Acme Foods", **self.owned)
+        Supplier.objects.create(name="Acme Meats", **self.owned)
+        Supplier.objects.create(name="Beta Farms", **self.owned)
+        Customer.objects.create(name="Acme", **self.owned)
+        ContactInfo.objects.create(
+            name="Jane Doe", email="jane@acme.example", **self.owned
+        )
+
+    def document(self, instance):
+        return SearchDocument.objects.filter(object_id=instance.pk).first()
+
+    def test_documents_follow_saves_and_deletes(self):
+        """Test that documents are written on save and removed on delete."""
+        self.assertEqual(self.document(self.supplier).title, "Acme Foods")
+
+        self.supplier.name = "Acme Provisions"
+        self.supplier.save()
+        self.assertEqual(self.document(self.supplier).title, "Acme Provisions")
+
+        self.supplier.status = "inactive"
+        with CaptureQueriesContext(connection) as queries:
+            self.supplier.save(update_fields=["status"])
+        self.assertFalse(
+            any("search_documents" in q["sql"] for q in queries.captured_queries)
+        )
+
+        self.supplier.delete()
+        self.assertIsNone(self.document(self.supplier))
+
+    def test_migration_indexes_existing_records(self):
+        """Test that the data migration writes documents for existing records."""
+        migration = import_module("apps.core.migrations.0003_populate_search_documents")
+        SearchDocument.objects.all().delete()
+
+        migration.populate_search_documents(apps, mock.Mock(connection=connection))
+
+        self.assertEqual(self.document(self.supplier).title, "Acme Foods")
+        self.assertEqual(SearchDocument.objects.count(), 5)
+        self.assertEqual(
+            SearchDocument.objects.get(entity_type="contacts").body,
+            "jane@acme.example",
+        )
+
+    def test_other_models_deleted_without_loading_rows(self):
+        """Test that only searched models get the search document receivers."""
+        for label in global_search.SEARCH_DOCUMENTS:
+            self.assertTrue(post_delete.has_listeners(apps.get_model(label)))
+        for model in (UserProfile, SearchDocument):
+            self.assertTrue(
+                Collector(using="default").can_fast_delete(model.objects.all())
+            )
+
+    def test_search_groups_ranked_matches_by_entity_type(self):
+        """Test one query returning the best matches of each entity type."""
+        self.client.force_authenticate(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {"q": "acme", "limit": 1})
+
+        self.assertEqual(response.status_code, 200)
+        searches = [
+            q for q in queries.captured_queries if "search_documents" in q["sql"]
+        ]
+        self.assertEqual(len(searches), 1)
+        groups = {group["entity_type"]: group for group in response.data["results"]}
+        self.assertEqual(set(groups), {"suppliers", "customers", "contacts"})
+        # An exact title match ranks first
+        self.assertEqual(response.data["results"][0]["entity_type"], "customers")
+        self.assertEqual(groups["suppliers"]["total"], 2)
+        self.assertEqual(
+            groups["suppliers"]["results"],
+            [{"id": self.supplier.pk, "title": "Acme Foods", "rank": 2.0}],
+        )
+
+    def test_search_by_entity_type(self):
+        """Test narrowing the search to some entity types."""
+        response = self.client.get(self.url, {"q": "acme", "types": "contacts"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["results"][0]["title"], "Jane Doe")
+
+    def test_invalid_parameters(self):
+        """Test that a missing query or unknown entity type is rejected."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("q", response.data)
+
+        response = self.client.get(self.url, {"q": "acme", "types": "widgets"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("types", response.data)
+
+    def test_full_text_query(self):
+        """Test the PostgreSQL query: vector match ranked within each type."""
+        with mock.patch.object(
+            search, "search_index", lambda model: SEARCH_INDEXES.get(model._meta.label)
+        ):
+            sql = str(global_search.ranked_documents("acme", limit=3).query)
+
+        self.assertIn('"search_documents"."search_vector" @@ to_tsquery(', sql)
+        self.assertIn('ROW_NUMBER() OVER (PARTITION BY "search_documents"', sql)
+        self.assertNotIn("LIKE", sql.upper())
+
+    def test_bulk_writes_are_indexed(self):
+        """Test that imports, which send no signals, write documents too."""
+        header, rows = read_rows(io.BytesIO(b"name\nImported Acme\n"), "csv")
+        BulkImporter("suppliers", user_id=self.user.pk).run(rows, header)
+
+        imported = Supplier.objects.get(name="Imported Acme")
+        self.assertEqual(self.document(imported).title, "Imported Acme")
+
+    def test_rebuild_command(self):
+        """Test rebuilding the documents from the entity tables."""
+        SearchDocument.objects.all().delete()
+        SearchDocument.objects.create(
+            entity_type="suppliers", object_id=0, title="Gone"
+        )
+
+        out = io.StringIO()
+        call_command("rebuild_search_index", "--entity", "suppliers", stdout=out)
+
+        self.assertIn("Indexed 3 suppliers", out.getvalue())
+        titles = SearchDocument.objects.values_list("title", flat=True)
+        self.assertEqual(sorted(titles), ["Acme Foods", "Acme Meats", "Beta Farms"])
+
+
+class DatabaseConnectionChecksTest(TestCase):
+    """Test the connection reuse system checks."""
+
+    def effective(self, **overrides):
+        values = {
+            "engine": "django.db.backends.postgresql",
+            "conn_max_age": 60,
+            "conn_health_checks": True,
+            "server_side_cursors": True,
+            "pgbouncer_transaction_pooling": False,
+        }
+        values.update(overrides)
+        return mock.patch.object(
+            checks, "database_connection_settings", return_value=values
+        )
+
+    def check_ids(self):
+        return [message.id for message in checks.check_database_connections(None)]
+
+    def test_persistent_connections_pass(self):
+        """Test that the default settings raise nothing."""
+        with self.effective():
+            self.assertEqual(self.check_ids(), [])
+
+    @override_settings(DEBUG=False)
+    def test_per_request_connections_warn(self):
+        """Test the warnings for per-request and unchecked connections."""
+        with self.effective(conn_max_age=0):
+            self.assertEqual(self.check_ids(), ["core.W001"])
+        with self.effective(conn_health_checks=False):
+            self.assertEqual(self.check_ids(), ["core.W002"])
+
+    def test_pgbouncer_requires_disabled_server_side_cursors(self):
+        """Test that transaction pooling with server-side cursors is an error."""
+        with self.effective(pgbouncer_transaction_pooling=True):
+            self.assertEqual(self.check_ids(), ["core.E001"])
+        with self.effective(
+            pgbouncer_transaction_pooling=True, server_side_cursors=False
+        ):
+            self.assertEqual(self.check_ids(), [])
+
+    def test_settings_read_from_databases(self):
+        """Test that the effective settings come from DATABASES."""
+        effective = checks.database_connection_settings()
+
+        self.assertEqual(effective["conn_max_age"], settings.CONN_MAX_AGE)
+        self.assertEqual(effective["conn_health_checks"], settings.CONN_HEALTH_CHECKS)
@@ -0,0 +1,60 @@
+"""
+Upload handlers for ProjectMeats.
+
+The handlers in ``FILE_UPLOAD_HANDLERS`` hash each uploaded file while its
+chunks stream in, so the SHA-256 digest is available as
+``uploaded_file.content_hash`` without reading the file a second time.
+"""
+
+import hashlib
+
+from django.core.files.uploadhandler import (
+    MemoryFileUploadHandler,
+    TemporaryFileUploadHandler,
+)
+
+HASH_ALGORITHM = "sha256"
+
+
+class ContentHashMixin:
+    """Hash the chunks this handler stores and attach the digest to the file."""
+
+    def new_file(self, *args, **kwargs):
+        # Set first: the memory handler stops later handlers by raising here
+        self.hasher = hashlib.new(HASH_ALGORITHM)
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        passed_on = super().receive_data_chunk(raw_data, start)
+        if passed_on is None:
+            # This handler kept the chunk
+            self.hasher.update(raw_data)
+        return passed_on
+
+    def file_complete(self, file_size):
+        uploaded_file = super().file_complete(file_size)
+        if uploaded_file is not None:
+            uploaded_file.content_hash = self.hasher.hexdigest()
+        return uploaded_file
+
+
+class HashingMemoryFileUploadHandler(ContentHashMixin, MemoryFileUploadHandler):
+    """``MemoryFileUploadHandler`` that records the content hash."""
+
+
+class HashingTemporaryFileUploadHandler(ContentHashMixin, TemporaryFileUploadHandler):
+    """``TemporaryFileUploadHandler`` that records the content hash."""
+
+
+def content_hash(file) -> str:
+    """Return the content hash of a file, reusing the upload-time digest."""
+    digest = getattr(file, "content_hash", None)
+    if digest:
+        return digest
+
+    hasher = hashlib.new(HASH_ALGORITHM)
+    for chunk in file.chunks():
+        hasher.update(chunk)
+    file.seek(0)
+    file.content_hash = hasher.hexdigest()
+    return file.content_hash
@@ -10,6 +10,7 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     UserProfileViewSet,
     auth_status_view,
+    global_search_view,
     login_view,
     logout_view,
     signup_view,
@@ -26,4 +27,6 @@ urlpatterns = [
     path("auth/logout/", logout_view, name="auth-logout"),
     path("auth/signup/", signup_view, name="auth-signup"),
     path("auth/status/", auth_status_view, name="auth-status"),
+    # Search across every entity type
+    path("search/", global_search_view, name="global-search"),
 ]
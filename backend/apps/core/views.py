@@ -5,7 +5,7 @@ Base view classes that provide common functionality for all entities
 migrated from PowerApps/Dataverse.
 """
 
-from django.contrib.auth import authenticate, get_user_model, login, logout
+from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import User
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
@@ -13,21 +13,28 @@ from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema, extend_schema_view
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
-from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.response import Response
 
+from .batch import BatchMixin
+from .exports import ExportMixin
+from .global_search import global_search
 from .models import UserProfile
+from .ownership import ownership
+from .pagination import PowerAppsPagination
+from .relations import with_serializer_relations
+from .search import PowerAppsOrderingFilter, PowerAppsSearchFilter
 from .serializers import (
     AuthLoginSerializer,
     AuthLogoutSerializer,
     AuthSignupSerializer,
+    GlobalSearchQuerySerializer,
     UserProfileCreateSerializer,
     UserProfileSerializer,
 )
 
 
-class PowerAppsModelViewSet(viewsets.ModelViewSet):
+class PowerAppsModelViewSet(BatchMixin, ExportMixin, viewsets.ModelViewSet):
     """
     Base ViewSet that provides common PowerApps migration patterns.
 
@@ -35,13 +42,22 @@ class PowerAppsModelViewSet(viewsets.ModelViewSet):
     - Automatic ownership assignment (created_by, modified_by, owner)
     - Soft delete (sets status to inactive)
     - Standard filtering and search
+    - Page-number or opt-in cursor pagination (?pagination=cursor)
     - Migration information endpoint
+    - Streaming CSV/NDJSON export of filtered records (export/)
+    - Batch create/update/soft delete of record lists (batch/)
     - Consistent serializer selection pattern
+    - Related objects loaded from the serializer's ``source=`` paths
     """
 
     # Default filter backends (can be overridden by subclasses)
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [
+        DjangoFilterBackend,
+        PowerAppsSearchFilter,
+        PowerAppsOrderingFilter,
+    ]
     ordering = ["name"]  # Default ordering by name
+    pagination_class = PowerAppsPagination
 
     # Serializer classes that must be defined by subclasses
     list_serializer_class = None
@@ -66,8 +82,12 @@ class PowerAppsModelViewSet(viewsets.ModelViewSet):
 
         Supports filtering by:
         - active: only active records (status='active')
+
+        Relations dereferenced by the current action's serializer are
+        joined or prefetched (see ``apps.core.relations``).
         """
         queryset = super().get_queryset()
+        queryset = with_serializer_relations(queryset, self.get_serializer_class())
 
         # Filter by active status if requested
         if self.request.query_params.get("active") == "true":
@@ -79,35 +99,25 @@ class PowerAppsModelViewSet(viewsets.ModelViewSet):
         """
         Set ownership fields automatically on creation.
 
-        Maps to PowerApps CreatedBy/ModifiedBy/OwnerId pattern.
-        In production, this would use request.user instead of a default user.
+        Maps to PowerApps CreatedBy/ModifiedBy/OwnerId pattern. Uses the
+        authenticated user, or the shared system user for anonymous access.
         """
-        User = get_user_model()
-        default_user = User.objects.first()  # Get first available user
-
-        if default_user:
-            serializer.save(
-                created_by=default_user,
-                modified_by=default_user,
-                owner=default_user,
-            )
-        else:
-            serializer.save()
+        serializer.save(**ownership.creation_fields(self.request))
 
     def perform_update(self, serializer):
         """Set modified_by field automatically on update."""
-        User = get_user_model()
-        default_user = User.objects.first()
-
-        if default_user:
-            serializer.save(modified_by=default_user)
-        else:
-            serializer.save()
+        serializer.save(**ownership.modification_fields(self.request))
 
     def perform_destroy(self, instance):
-        """Soft delete by setting status to inactive instead of actual deletion."""
+        """
+        Soft delete by setting status to inactive instead of actual deletion.
+
+        Preserves data for audit trails (PowerApps pattern).
+        """
         instance.status = "inactive"
-        instance.save()
+        for field, value in ownership.modification_fields(self.request).items():
+            setattr(instance, field, value)
+        instance.save(update_fields=["status", "modified_by", "modified_on"])
 
     @action(detail=False, methods=["get"])
     def migration_info(self, request):
@@ -119,7 +129,7 @@ class PowerAppsModelViewSet(viewsets.ModelViewSet):
         raise NotImplementedError("Subclasses must implement the migration_info action")
 
 
-class ReadOnlyPowerAppsModelViewSet(viewsets.ReadOnlyModelViewSet):
+class ReadOnlyPowerAppsModelViewSet(ExportMixin, viewsets.ReadOnlyModelViewSet):
     """
     Base ReadOnly ViewSet for PowerApps entities that don't support modification.
 
@@ -128,8 +138,13 @@ class ReadOnlyPowerAppsModelViewSet(viewsets.ReadOnlyModelViewSet):
     """
 
     # Default filter backends
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [
+        DjangoFilterBackend,
+        PowerAppsSearchFilter,
+        PowerAppsOrderingFilter,
+    ]
     ordering = ["name"]
+    pagination_class = PowerAppsPagination
 
     # Serializer classes
     list_serializer_class = None
@@ -145,8 +160,9 @@ class ReadOnlyPowerAppsModelViewSet(viewsets.ReadOnlyModelViewSet):
             return super().get_serializer_class()
 
     def get_queryset(self):
-        """Base queryset with common filtering options."""
+        """Base queryset with common filtering options and related objects."""
         queryset = super().get_queryset()
+        queryset = with_serializer_relations(queryset, self.get_serializer_class())
 
         # Filter by active status if requested
         if self.request.query_params.get("active") == "true":
@@ -208,7 +224,11 @@ class UserProfileViewSet(viewsets.ModelViewSet):
     queryset = UserProfile.objects.select_related("user").all()
     serializer_class = UserProfileSerializer
     parser_classes = [MultiPartParser, FormParser, JSONParser]  # Support file uploads
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [
+        DjangoFilterBackend,
+        PowerAppsSearchFilter,
+        PowerAppsOrderingFilter,
+    ]
     filterset_fields = ["department", "email_notifications"]
     search_fields = [
         "user__username",
@@ -454,6 +474,32 @@ def auth_status_view(request):
         return Response({"authenticated": False, "user": None})
 
 
+@extend_schema(
+    summary="Global Search",
+    description=(
+        "Search suppliers, customers, contacts, plants, carriers and purchase "
+        "orders at once. Returns the best matches of each entity type, grouped "
+        "by entity type. Narrow with ?types=suppliers,customers and set the "
+        "matches per type with ?limit=."
+    ),
+    tags=["Search"],
+    parameters=[GlobalSearchQuerySerializer],
+    responses={200: {"description": "Matches grouped by entity type"}},
+)
+@api_view(["GET"])
+def global_search_view(request):
+    """Search every entity type with one query."""
+    params = GlobalSearchQuerySerializer(data=request.query_params)
+    params.is_valid(raise_exception=True)
+    text = params.validated_data["q"]
+    results = global_search(
+        text,
+        entity_types=params.validated_data.get("types"),
+        limit=params.validated_data["limit"],
+    )
+    return Response({"query": text, "results": results})
+
+
 @extend_schema(
     summary="Health Check",
     description="Simple health check endpoint for deployment monitoring",
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:40
+
+from django.db import migrations
+
+import apps.core.search
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("customers", "0002_customer_customers_name_25d5e3_idx_and_more"),
+    ]
+
+    operations = [
+        apps.core.search.AddSearchIndex(
+            model_name="customer",
+            vector=[
+                ("name", "A"),
+            ],
+            trigram=["name"],
+        ),
+    ]
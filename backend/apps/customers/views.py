@@ -17,6 +17,8 @@ from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from apps.core.aggregates import record_counts
+from apps.core.imports import BulkImportMixin
 from apps.core.views import PowerAppsModelViewSet
 
 from .models import Customer
@@ -59,7 +61,7 @@ from .serializers import (
         tags=["Customers"],
     ),
 )
-class CustomerViewSet(PowerAppsModelViewSet):
+class CustomerViewSet(BulkImportMixin, PowerAppsModelViewSet):
     """
     ViewSet for managing Customer entities.
 
@@ -75,9 +77,8 @@ class CustomerViewSet(PowerAppsModelViewSet):
     - Maintains PowerApps status (Active/Inactive) pattern
     """
 
-    queryset = Customer.objects.select_related(
-        "created_by", "modified_by", "owner"
-    ).all()
+    queryset = Customer.objects.all()
+    import_entity = "customers"
     filterset_fields = ["status"]
     search_fields = ["name"]
     ordering_fields = ["name", "created_on", "modified_on", "status"]
@@ -110,9 +111,7 @@ class CustomerViewSet(PowerAppsModelViewSet):
         Endpoint to get PowerApps migration information.
         Useful for documentation and verification.
         """
-        queryset = self.get_queryset()
-        total_count = queryset.count()
-        active_count = queryset.filter(status="active").count()
+        counts = record_counts(self.get_queryset())
 
         field_mappings = {
             "pro_customername": "name",
@@ -129,8 +128,8 @@ class CustomerViewSet(PowerAppsModelViewSet):
                 "powerapps_entity_name": "pro_customer",
                 "django_model_name": "Customer",
                 "django_app_name": "customers",
-                "total_records": total_count,
-                "active_records": active_count,
+                "total_records": counts["total_records"],
+                "active_records": counts["active_records"],
                 "field_mappings": field_mappings,
                 "api_endpoints": {
                     "list": "/api/v1/customers/",
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:40
+
+from django.db import migrations
+
+import apps.core.search
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("plants", "0001_initial"),
+    ]
+
+    operations = [
+        apps.core.search.AddSearchIndex(
+            model_name="plant",
+            vector=[
+                ("name", "A"),
+                ("location", "B"),
+            ],
+            trigram=["name"],
+        ),
+    ]
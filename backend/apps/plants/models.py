@@ -156,7 +156,7 @@ class Plant(OwnedModel, StatusModel):
     @property
     def has_supplier(self):
         """Helper property to check if supplier is linked."""
-        return self.supplier is not None
+        return self.supplier_id is not None
 
     @property
     def load_pickup_requirements_list(self):
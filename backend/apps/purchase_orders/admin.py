@@ -137,12 +137,16 @@ class PurchaseOrderAdmin(admin.ModelAdmin):
 
     mark_inactive.short_description = "Mark selected purchase orders as inactive"
 
+    def get_queryset(self, request):
+        """Annotate the total amount so the column can be sorted in SQL."""
+        return super().get_queryset(request).with_total_amount()
+
     def total_amount(self, obj):
         """Display calculated total amount."""
         return f"${obj.total_amount:,.2f}"
 
     total_amount.short_description = "Total Amount"
-    total_amount.admin_order_field = "total_amount"
+    total_amount.admin_order_field = "total_amount_sql"
 
     def is_fulfilled(self, obj):
         """Display whether the order is fulfilled."""
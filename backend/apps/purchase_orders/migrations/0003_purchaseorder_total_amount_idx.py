@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-16 19:33
+
+from django.db import migrations, models
+import django.db.models.expressions
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("purchase_orders", "0002_purchaseorder_end_location_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="purchaseorder",
+            index=models.Index(
+                models.ExpressionWrapper(
+                    django.db.models.expressions.CombinedExpression(
+                        models.F("quantity"), "*", models.F("price_per_unit")
+                    ),
+                    output_field=models.DecimalField(decimal_places=2, max_digits=20),
+                ),
+                name="po_total_amount_idx",
+            ),
+        ),
+    ]
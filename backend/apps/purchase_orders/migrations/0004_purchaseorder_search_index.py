@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:40
+
+from django.db import migrations
+
+import apps.core.search
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("purchase_orders", "0003_purchaseorder_total_amount_idx"),
+    ]
+
+    operations = [
+        apps.core.search.AddSearchIndex(
+            model_name="purchaseorder",
+            vector=[
+                ("po_number", "A"),
+                ("item", "B"),
+            ],
+            trigram=["po_number", "item"],
+        ),
+    ]
@@ -12,10 +12,33 @@ from decimal import Decimal
 
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.db.models import ExpressionWrapper, F
 
 from apps.core.models import OwnedModel, StatusModel
 
 
+def total_amount_expression():
+    """SQL expression for quantity * price_per_unit."""
+    return ExpressionWrapper(
+        F("quantity") * F("price_per_unit"),
+        output_field=models.DecimalField(max_digits=20, decimal_places=2),
+    )
+
+
+class PurchaseOrderQuerySet(models.QuerySet):
+    """QuerySet helpers for purchase orders."""
+
+    def with_total_amount(self):
+        """
+        Annotate ``total_amount_sql`` so the total can be filtered and ordered
+        in SQL.
+
+        Matches the ``po_total_amount_idx`` expression index, so amount
+        range filters can use an index scan.
+        """
+        return self.annotate(total_amount_sql=total_amount_expression())
+
+
 class PurchaseOrder(OwnedModel, StatusModel):
     """
     Purchase Order entity migrated from PowerApps pro_purchaseorder.
@@ -122,6 +145,8 @@ class PurchaseOrder(OwnedModel, StatusModel):
         help_text="Equivalent to PowerApps pro_supplierdocuments field (Supplier document uploads)",
     )
 
+    objects = PurchaseOrderQuerySet.as_manager()
+
     class Meta:
         db_table = "purchase_orders_purchaseorder"
         verbose_name = "Purchase Order"
@@ -135,6 +160,7 @@ class PurchaseOrder(OwnedModel, StatusModel):
             models.Index(fields=["supplier"]),
             models.Index(fields=["origin_location"]),
             models.Index(fields=["end_location"]),
+            models.Index(total_amount_expression(), name="po_total_amount_idx"),
         ]
 
     def __str__(self):
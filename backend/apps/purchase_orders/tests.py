@@ -5,12 +5,14 @@ Tests the REST API endpoints for managing PurchaseOrder entities
 migrated from PowerApps pro_purchaseorder.
 """
 
+import shutil
+import tempfile
 from datetime import timedelta
 from decimal import Decimal
 
 from django.contrib.auth.models import User
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework import status
@@ -27,6 +29,12 @@ class PurchaseOrderAPITest(APITestCase):
 
     def setUp(self):
         """Set up test dependencies."""
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media_override = override_settings(MEDIA_ROOT=media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
         self.user = User.objects.create_user(
             username="testuser",
             email="test@example.com",
@@ -172,6 +180,65 @@ class PurchaseOrderAPITest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data["results"]), 1)
 
+    def _create_order(self, po_number, quantity, price_per_unit):
+        return PurchaseOrder.objects.create(
+            po_number=po_number,
+            item="Test Item",
+            quantity=quantity,
+            price_per_unit=Decimal(price_per_unit),
+            purchase_date=timezone.now(),
+            customer=self.customer,
+            supplier=self.supplier,
+            created_by=self.user,
+            modified_by=self.user,
+            owner=self.user,
+        )
+
+    def test_amount_range_filters(self):
+        """Test min_amount/max_amount filter on quantity * price_per_unit."""
+        self._create_order("PO-002", 2, "10.00")  # 20.00
+        self._create_order("PO-003", 100, "5.00")  # 500.00
+        url = reverse("purchaseorder-list")
+
+        response = self.client.get(url, {"min_amount": "100"})
+        self.assertEqual(
+            {row["po_number"] for row in response.data["results"]},
+            {"PO-001", "PO-003"},
+        )
+
+        response = self.client.get(url, {"min_amount": "100", "max_amount": "300"})
+        self.assertEqual(
+            [row["po_number"] for row in response.data["results"]], ["PO-001"]
+        )
+
+        # Invalid amounts are ignored
+        for amount in ["abc", "NaN", "sNaN", "Infinity", "-inf"]:
+            response = self.client.get(url, {"max_amount": amount})
+            self.assertEqual(response.status_code, status.HTTP_200_OK, amount)
+            self.assertEqual(len(response.data["results"]), 3)
+
+    def test_ordering_by_total_amount(self):
+        """Test ordering by the SQL total_amount annotation."""
+        self._create_order("PO-002", 2, "10.00")  # 20.00
+        self._create_order("PO-003", 100, "5.00")  # 500.00
+        url = reverse("purchaseorder-list")
+
+        response = self.client.get(url, {"ordering": "-total_amount"})
+
+        self.assertEqual(
+            [row["po_number"] for row in response.data["results"]],
+            ["PO-003", "PO-001", "PO-002"],
+        )
+        self.assertEqual(response.data["results"][0]["total_amount"], "500.00")
+
+    def test_total_amount_is_read_only(self):
+        """Test that total_amount can't be assigned on the model."""
+        order = PurchaseOrder.objects.with_total_amount().get(po_number="PO-001")
+        self.assertEqual(order.total_amount_sql, order.total_amount)
+
+        with self.assertRaises(AttributeError):
+            order.total_amount = Decimal("1.00")
+
 
 class PurchaseOrderModelTest(TestCase):
     """Test the PurchaseOrder model."""
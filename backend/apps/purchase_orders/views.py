@@ -13,16 +13,20 @@ Endpoints:
 - GET /api/v1/purchase-orders/migration_info/ - PowerApps migration info
 """
 
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 
-from django.contrib.auth.models import User
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema, extend_schema_view
-from rest_framework import filters, status, viewsets
+from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.response import Response
 
+from apps.core.aggregates import record_counts
+from apps.core.imports import BulkImportMixin
+from apps.core.search import PowerAppsOrderingFilter, PowerAppsSearchFilter
+from apps.core.views import PowerAppsModelViewSet
+
 from .models import PurchaseOrder
 from .serializers import (
     PurchaseOrderCreateSerializer,
@@ -63,7 +67,7 @@ from .serializers import (
         tags=["Purchase Orders"],
     ),
 )
-class PurchaseOrderViewSet(viewsets.ModelViewSet):
+class PurchaseOrderViewSet(BulkImportMixin, PowerAppsModelViewSet):
     """
     ViewSet for managing PurchaseOrder entities.
 
@@ -82,12 +86,13 @@ class PurchaseOrderViewSet(viewsets.ModelViewSet):
     - Enhanced document fields to support actual file uploads
     """
 
-    queryset = PurchaseOrder.objects.all()
+    queryset = PurchaseOrder.objects.with_total_amount()
+    import_entity = "purchase_orders"
     parser_classes = [MultiPartParser, FormParser, JSONParser]  # Support file uploads
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
-        filters.OrderingFilter,
+        PowerAppsSearchFilter,
+        PowerAppsOrderingFilter,
     ]
     filterset_fields = [
         "status",
@@ -106,6 +111,8 @@ class PurchaseOrderViewSet(viewsets.ModelViewSet):
         "status",
         "total_amount",
     ]
+    # ?ordering=total_amount sorts on the with_total_amount() annotation
+    ordering_aliases = {"total_amount": "total_amount_sql"}
     ordering = ["-purchase_date", "po_number"]  # Default ordering
 
     def get_serializer_class(self):
@@ -130,10 +137,6 @@ class PurchaseOrderViewSet(viewsets.ModelViewSet):
         """
         queryset = super().get_queryset()
 
-        # Filter by active status
-        if self.request.query_params.get("active") == "true":
-            queryset = queryset.filter(status="active")
-
         # Filter by fulfillment status
         if self.request.query_params.get("fulfilled") == "true":
             from django.utils import timezone
@@ -159,72 +162,28 @@ class PurchaseOrderViewSet(viewsets.ModelViewSet):
                 supplier_documents="",
             )
 
-        # Filter by amount range
-        min_amount = self.request.query_params.get("min_amount")
-        max_amount = self.request.query_params.get("max_amount")
+        # Filter by amount range (the total amount is annotated in SQL)
+        min_amount = self._parse_amount("min_amount")
+        if min_amount is not None:
+            queryset = queryset.filter(total_amount_sql__gte=min_amount)
 
-        if min_amount:
-            try:
-                # We need to filter by computed total, but we can't easily do this in the DB
-                # For now, we'll document this as a limitation
-                # TODO: Implement computed field filtering for min_amount
-                Decimal(min_amount)  # Validate format only
-            except (ValueError, TypeError):
-                pass
-
-        if max_amount:
-            try:
-                # Same limitation as min_amount
-                # TODO: Implement computed field filtering for max_amount
-                Decimal(max_amount)  # Validate format only
-            except (ValueError, TypeError):
-                pass
+        max_amount = self._parse_amount("max_amount")
+        if max_amount is not None:
+            queryset = queryset.filter(total_amount_sql__lte=max_amount)
 
         return queryset
 
-    def perform_create(self, serializer):
-        """
-        Set ownership fields when creating new records.
-        Maps to PowerApps CreatedBy/ModifiedBy/OwnerId pattern.
-        """
-        # In production, get the authenticated user
-        # For now, we'll create a default user if none exists
-        user = (
-            self.request.user
-            if self.request.user.is_authenticated
-            else self._get_default_user()
-        )
-
-        serializer.save(created_by=user, modified_by=user, owner=user)
-
-    def perform_update(self, serializer):
-        """Update modified_by field when updating records."""
-        user = (
-            self.request.user
-            if self.request.user.is_authenticated
-            else self._get_default_user()
-        )
-        serializer.save(modified_by=user)
-
-    def perform_destroy(self, instance):
-        """
-        Soft delete by setting status to inactive (PowerApps pattern).
-        Preserves data for audit trails.
-        """
-        instance.status = "inactive"
-        instance.save()
-
-    def _get_default_user(self):
-        """Get or create a default user for development/testing."""
-        user, created = User.objects.get_or_create(
-            username="system",
-            defaults={
-                "email": "system@projectmeats.com",
-                "first_name": "System",
-                "last_name": "User",
-            },
-        )
-        return user
+    def _parse_amount(self, param):
+        """Return a query parameter as a Decimal, ignoring invalid values."""
+        value = self.request.query_params.get(param)
+        if not value:
+            return None
+        try:
+            amount = Decimal(value)
+        except (InvalidOperation, ValueError, TypeError):
+            return None
+        # NaN and Infinity parse, but can't be compared with a decimal column
+        return amount if amount.is_finite() else None
 
     @extend_schema(
         summary="Get PowerApps Migration Info",
@@ -249,9 +208,7 @@ class PurchaseOrderViewSet(viewsets.ModelViewSet):
         Endpoint to get PowerApps migration information.
         Useful for documentation and verification.
         """
-        queryset = self.get_queryset()
-        total_count = queryset.count()
-        active_count = queryset.filter(status="active").count()
+        counts = record_counts(self.get_queryset())
 
         field_mappings = {
             "pro_po_number": "po_number",
@@ -277,8 +234,8 @@ class PurchaseOrderViewSet(viewsets.ModelViewSet):
                 "powerapps_entity_name": "pro_purchaseorder",
                 "django_model_name": "PurchaseOrder",
                 "django_app_name": "purchase_orders",
-                "total_records": total_count,
-                "active_records": active_count,
+                "total_records": counts["total_records"],
+                "active_records": counts["active_records"],
                 "field_mappings": field_mappings,
                 "computed_fields": {
                     "total_amount": "quantity * price_per_unit",
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:40
+
+from django.db import migrations
+
+import apps.core.search
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("suppliers", "0005_supplier_suppliers_name_ed482a_idx_and_more"),
+    ]
+
+    operations = [
+        apps.core.search.AddSearchIndex(
+            model_name="supplier",
+            vector=[
+                ("name", "A"),
+            ],
+            trigram=["name"],
+        ),
+    ]
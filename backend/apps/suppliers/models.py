@@ -93,7 +93,7 @@ class Supplier(OwnedModel, StatusModel):
     @property
     def has_accounts_receivable(self):
         """Helper property to check if linked to accounts receivable."""
-        return self.accounts_receivable is not None
+        return self.accounts_receivable_id is not None
 
     @classmethod
     def get_powerapps_entity_name(cls):
@@ -194,7 +194,7 @@ class SupplierPlantMapping(OwnedModel, StatusModel):
     @property
     def has_contact_info(self):
         """Helper property to check if contact info is linked."""
-        return bool(self.contact_info)
+        return self.contact_info_id is not None
 
     @property
     def has_documents(self):
@@ -12,13 +12,17 @@ Endpoints:
 - DELETE /api/v1/suppliers/{id}/ - Delete supplier
 """
 
-from django.contrib.auth.models import User
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema, extend_schema_view
-from rest_framework import filters, status, viewsets
+from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from apps.core.aggregates import record_counts
+from apps.core.imports import BulkImportMixin
+from apps.core.search import PowerAppsOrderingFilter, PowerAppsSearchFilter
+from apps.core.views import PowerAppsModelViewSet
+
 from .models import Supplier, SupplierLocation, SupplierPlantMapping
 from .serializers import (
     SupplierCreateSerializer,
@@ -65,7 +69,7 @@ from .serializers import (
         tags=["Suppliers"],
     ),
 )
-class SupplierViewSet(viewsets.ModelViewSet):
+class SupplierViewSet(BulkImportMixin, PowerAppsModelViewSet):
     """
     ViewSet for managing Supplier entities.
 
@@ -81,13 +85,12 @@ class SupplierViewSet(viewsets.ModelViewSet):
     - Maintains PowerApps status (Active/Inactive) pattern
     """
 
-    queryset = Supplier.objects.select_related(
-        "accounts_receivable", "created_by", "modified_by", "owner"
-    ).all()
+    queryset = Supplier.objects.all()
+    import_entity = "suppliers"
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
-        filters.OrderingFilter,
+        PowerAppsSearchFilter,
+        PowerAppsOrderingFilter,
     ]
     filterset_fields = [
         "status",
@@ -123,10 +126,6 @@ class SupplierViewSet(viewsets.ModelViewSet):
         """
         queryset = super().get_queryset()
 
-        # Filter by active status
-        if self.request.query_params.get("active") == "true":
-            queryset = queryset.filter(status="active")
-
         # Filter by records with credit application
         if self.request.query_params.get("has_credit_application") == "true":
             queryset = queryset.exclude(credit_application_date__isnull=True)
@@ -137,50 +136,6 @@ class SupplierViewSet(viewsets.ModelViewSet):
 
         return queryset
 
-    def perform_create(self, serializer):
-        """
-        Set ownership fields when creating new records.
-        Maps to PowerApps CreatedBy/ModifiedBy/OwnerId pattern.
-        """
-        # In production, get the authenticated user
-        # For now, we'll create a default user if none exists
-        user = (
-            self.request.user
-            if self.request.user.is_authenticated
-            else self._get_default_user()
-        )
-
-        serializer.save(created_by=user, modified_by=user, owner=user)
-
-    def perform_update(self, serializer):
-        """Update modified_by field when updating records."""
-        user = (
-            self.request.user
-            if self.request.user.is_authenticated
-            else self._get_default_user()
-        )
-        serializer.save(modified_by=user)
-
-    def perform_destroy(self, instance):
-        """
-        Soft delete by setting status to inactive (PowerApps pattern).
-        Preserves data for audit trails.
-        """
-        instance.status = "inactive"
-        instance.save()
-
-    def _get_default_user(self):
-        """Get or create a default user for development/testing."""
-        user, created = User.objects.get_or_create(
-            username="system",
-            defaults={
-                "email": "system@projectmeats.com",
-                "first_name": "System",
-                "last_name": "User",
-            },
-        )
-        return user
-
     @extend_schema(
         summary="Get PowerApps Migration Info",
         description="Get information about the PowerApps to Django migration for this entity.",
@@ -204,9 +159,7 @@ class SupplierViewSet(viewsets.ModelViewSet):
         Endpoint to get PowerApps migration information.
         Useful for documentation and verification.
         """
-        queryset = self.get_queryset()
-        total_count = queryset.count()
-        active_count = queryset.filter(status="active").count()
+        counts = record_counts(self.get_queryset())
 
         field_mappings = {
             "cr7c4_nameofsupplier": "name",
@@ -226,8 +179,8 @@ class SupplierViewSet(viewsets.ModelViewSet):
                 "powerapps_entity_name": "cr7c4_supplier",
                 "django_model_name": "Supplier",
                 "django_app_name": "suppliers",
-                "total_records": total_count,
-                "active_records": active_count,
+                "total_records": counts["total_records"],
+                "active_records": counts["active_records"],
                 "field_mappings": field_mappings,
                 "api_endpoints": {
                     "list": "/api/v1/suppliers/",
@@ -271,7 +224,7 @@ class SupplierViewSet(viewsets.ModelViewSet):
         tags=["Supplier Plant Mappings"],
     ),
 )
-class SupplierPlantMappingViewSet(viewsets.ModelViewSet):
+class SupplierPlantMappingViewSet(PowerAppsModelViewSet):
     """
     ViewSet for managing Supplier Plant Mapping entities.
 
@@ -285,8 +238,8 @@ class SupplierPlantMappingViewSet(viewsets.ModelViewSet):
     queryset = SupplierPlantMapping.objects.all()
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
-        filters.OrderingFilter,
+        PowerAppsSearchFilter,
+        PowerAppsOrderingFilter,
     ]
     filterset_fields = ["status", "supplier", "customer", "contact_info"]
     search_fields = [
@@ -307,48 +260,6 @@ class SupplierPlantMappingViewSet(viewsets.ModelViewSet):
         else:
             return SupplierPlantMappingDetailSerializer
 
-    def perform_create(self, serializer):
-        """Set ownership when creating new records."""
-        user = getattr(self.request, "user", None)
-        if user and user.is_authenticated:
-            owner_user = user
-        else:
-            owner_user = self._get_or_create_system_user()
-
-        serializer.save(created_by=owner_user, modified_by=owner_user, owner=owner_user)
-
-    def perform_update(self, serializer):
-        """Update modified_by when updating records."""
-        user = getattr(self.request, "user", None)
-        if user and user.is_authenticated:
-            modified_user = user
-        else:
-            modified_user = self._get_or_create_system_user()
-
-        serializer.save(modified_by=modified_user)
-
-    def perform_destroy(self, instance):
-        """Soft delete by marking as inactive instead of actual deletion."""
-        instance.status = "inactive"
-        user = getattr(self.request, "user", None)
-        if user and user.is_authenticated:
-            instance.modified_by = user
-        else:
-            instance.modified_by = self._get_or_create_system_user()
-        instance.save()
-
-    def _get_or_create_system_user(self):
-        """Get or create a system user for ownership."""
-        user, created = User.objects.get_or_create(
-            username="system",
-            defaults={
-                "email": "system@projectmeats.com",
-                "first_name": "System",
-                "last_name": "User",
-            },
-        )
-        return user
-
     @extend_schema(
         summary="Get PowerApps Migration Info",
         description="Get information about the PowerApps to Django migration for this entity.",
@@ -372,9 +283,7 @@ class SupplierPlantMappingViewSet(viewsets.ModelViewSet):
         Endpoint to get PowerApps migration information.
         Useful for documentation and verification.
         """
-        queryset = self.get_queryset()
-        total_count = queryset.count()
-        active_count = queryset.filter(status="active").count()
+        counts = record_counts(self.get_queryset())
 
         field_mappings = {
             "pro_supplierplantmapping1": "name",
@@ -396,8 +305,8 @@ class SupplierPlantMappingViewSet(viewsets.ModelViewSet):
                 "powerapps_entity_name": "pro_supplierplantmapping",
                 "django_model_name": "SupplierPlantMapping",
                 "django_app_name": "suppliers",
-                "total_records": total_count,
-                "active_records": active_count,
+                "total_records": counts["total_records"],
+                "active_records": counts["active_records"],
                 "field_mappings": field_mappings,
                 "api_endpoints": {
                     "list": "/api/v1/supplier-plant-mappings/",
@@ -436,7 +345,7 @@ class SupplierPlantMappingViewSet(viewsets.ModelViewSet):
         tags=["Supplier Locations"],
     ),
 )
-class SupplierLocationViewSet(viewsets.ModelViewSet):
+class SupplierLocationViewSet(PowerAppsModelViewSet):
     """
     ViewSet for managing Supplier Location records.
 
@@ -450,11 +359,7 @@ class SupplierLocationViewSet(viewsets.ModelViewSet):
     - Soft delete (status=inactive)
     """
 
-    def get_queryset(self):
-        """Return queryset with optimized database queries."""
-        return SupplierLocation.objects.select_related(
-            "supplier", "created_by", "modified_by", "owner"
-        ).all()
+    queryset = SupplierLocation.objects.all()
 
     def get_serializer_class(self):
         """Return appropriate serializer based on action."""
@@ -468,8 +373,8 @@ class SupplierLocationViewSet(viewsets.ModelViewSet):
     # Filtering and search configuration
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
-        filters.OrderingFilter,
+        PowerAppsSearchFilter,
+        PowerAppsOrderingFilter,
     ]
     filterset_fields = [
         "status",
@@ -495,39 +400,6 @@ class SupplierLocationViewSet(viewsets.ModelViewSet):
     ]
     ordering = ["supplier__name", "name"]
 
-    def perform_create(self, serializer):
-        """Set ownership fields when creating new supplier location."""
-        # In a real application, you'd use the authenticated user
-        # For now, we'll use the first available user or create a default
-        try:
-            default_user = User.objects.first()
-            if not default_user:
-                default_user = User.objects.create_user(
-                    username="system", email="system@projectmeats.com"
-                )
-        except Exception:
-            default_user = None
-
-        serializer.save(
-            created_by=default_user,
-            modified_by=default_user,
-            owner=default_user,
-        )
-
-    def perform_update(self, serializer):
-        """Update modified_by field when updating supplier location."""
-        try:
-            default_user = User.objects.first()
-        except Exception:
-            default_user = None
-
-        serializer.save(modified_by=default_user)
-
-    def perform_destroy(self, instance):
-        """Soft delete by setting status to inactive instead of actual deletion."""
-        instance.status = "inactive"
-        instance.save(update_fields=["status"])
-
     @action(detail=False, methods=["get"])
     def migration_info(self, request):
         """
@@ -536,8 +408,7 @@ class SupplierLocationViewSet(viewsets.ModelViewSet):
         Returns metadata about the migration from PowerApps pro_supplier_locations
         to Django SupplierLocation model.
         """
-        total_count = SupplierLocation.objects.count()
-        active_count = SupplierLocation.objects.filter(status="active").count()
+        counts = record_counts(SupplierLocation.objects.all())
 
         # Field mappings from PowerApps to Django
         field_mappings = {
@@ -568,8 +439,8 @@ class SupplierLocationViewSet(viewsets.ModelViewSet):
                 "powerapps_entity_name": "pro_supplier_locations",
                 "django_model_name": "SupplierLocation",
                 "django_app_name": "suppliers",
-                "total_records": total_count,
-                "active_records": active_count,
+                "total_records": counts["total_records"],
+                "active_records": counts["active_records"],
                 "field_mappings": field_mappings,
                 "api_endpoints": {
                     "list": "/api/v1/supplier-locations/",
@@ -0,0 +1,35 @@
+"""
+Gunicorn server hooks for ProjectMeats.
+
+Gunicorn loads ./gunicorn.conf.py automatically; command-line flags in
+docker-compose.prod.yml and Dockerfile.prod still control workers, threads
+and timeouts. These hooks prepare Prometheus multiprocess mode so /metrics
+aggregates samples from every worker, and write each worker's buffered
+usage analytics before it exits.
+"""
+
+import os
+import shutil
+
+
+def on_starting(server):
+    """Start each deployment with an empty Prometheus multiprocess directory."""
+    multiproc_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if multiproc_dir:
+        shutil.rmtree(multiproc_dir, ignore_errors=True)
+        os.makedirs(multiproc_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """Release a recycled worker's metrics files."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from apps.core.metrics import mark_process_dead
+
+        mark_process_dead(worker.pid)
+
+
+def worker_exit(server, worker):
+    """Write the exiting worker's buffered usage analytics."""
+    from apps.ai_assistant.services.analytics import analytics_buffer
+
+    analytics_buffer.shutdown()
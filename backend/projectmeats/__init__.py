@@ -0,0 +1,7 @@
+# Load the Celery app when Django starts so shared_task uses it.
+try:
+    from .celery import app as celery_app
+except ImportError:  # Celery is only installed with requirements-prod.txt
+    celery_app = None
+
+__all__ = ("celery_app",)
@@ -0,0 +1,24 @@
+"""
+Celery application for ProjectMeats.
+
+Started in production by the ``celery -A projectmeats worker`` service in
+docker-compose.prod.yml. Configuration is read from Django settings keys
+prefixed with ``CELERY_`` and tasks are discovered from each app's
+``tasks.py``.
+"""
+
+import os
+
+from celery import Celery
+
+if not os.environ.get("DJANGO_SETTINGS_MODULE"):
+    django_env = os.environ.get("DJANGO_ENV", "production")
+    if django_env == "development":
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "apps.settings.development")
+    else:
+        # Match projectmeats.wsgi so the worker and web processes agree
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "apps.settings.production")
+
+app = Celery("projectmeats")
+app.config_from_object("django.conf:settings", namespace="CELERY")
+app.autodiscover_tasks()
@@ -56,6 +56,8 @@ LOCAL_APPS = [
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    # Outermost, to time the full request
+    "apps.core.middleware.PrometheusMetricsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -89,11 +91,174 @@ WSGI_APPLICATION = "projectmeats.wsgi.application"
 
 # Database Configuration
 # Supports both SQLite (dev) and PostgreSQL (production) via DATABASE_URL
+# Persistent connections: each worker thread reuses its connection for up to
+# CONN_MAX_AGE seconds (0 closes it after every request) and checks it is
+# still usable before reuse.
+CONN_MAX_AGE = config("CONN_MAX_AGE", default=60, cast=int)
+CONN_HEALTH_CHECKS = config("CONN_HEALTH_CHECKS", default=True, cast=bool)
+
+# Set when DATABASE_URL points at PgBouncer in transaction pooling mode.
+# Server-side cursors (QuerySet.iterator()) don't survive across pooled
+# transactions, so they are disabled.
+PGBOUNCER_TRANSACTION_POOLING = config(
+    "PGBOUNCER_TRANSACTION_POOLING", default=False, cast=bool
+)
+
 DATABASES = {
     "default": dj_database_url.config(
-        default=config("DATABASE_URL", default=f"sqlite:///{BASE_DIR}/db.sqlite3")
+        default=config("DATABASE_URL", default=f"sqlite:///{BASE_DIR}/db.sqlite3"),
+        conn_max_age=CONN_MAX_AGE,
+        conn_health_checks=CONN_HEALTH_CHECKS,
     )
 }
+if PGBOUNCER_TRANSACTION_POOLING:
+    DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
+
+# Cache Configuration
+# Shared Redis cache when REDIS_URL is set (production), per-process memory otherwise
+REDIS_URL = config("REDIS_URL", default="")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": REDIS_URL,
+            "KEY_PREFIX": "projectmeats",
+            "TIMEOUT": 300,
+            "OPTIONS": {
+                "CLIENT_CLASS": "django_redis.client.DefaultClient",
+                # A Redis outage degrades to cache misses instead of 500s
+                "IGNORE_EXCEPTIONS": True,
+            },
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "projectmeats",
+            "KEY_PREFIX": "projectmeats",
+            "TIMEOUT": 300,
+        }
+    }
+
+# Per-process L1 cache in front of the shared cache (seconds, 0 disables)
+CACHE_L1_TIMEOUT = config("CACHE_L1_TIMEOUT", default=5, cast=int)
+
+# Cache stampede protection (get_or_compute): how long one process may hold
+# a key's lock while computing it, how long others wait for the result, and
+# how eagerly hot keys are refreshed before they expire (0 disables)
+CACHE_LOCK_TIMEOUT = config("CACHE_LOCK_TIMEOUT", default=60, cast=int)
+CACHE_LOCK_WAIT_TIMEOUT = config("CACHE_LOCK_WAIT_TIMEOUT", default=30, cast=float)
+CACHE_EARLY_REFRESH_BETA = config("CACHE_EARLY_REFRESH_BETA", default=1.0, cast=float)
+
+# Per-app cache namespaces; bump "version" to invalidate an app's keys
+CACHE_NAMESPACES = {
+    "ai_assistant": {"version": 1},
+    "stats": {"version": 1},
+    "documents": {"version": 1},
+}
+
+# Seconds to cache dashboard counts (apps.core.aggregates); 0 disables
+STATS_CACHE_TIMEOUT = config("STATS_CACHE_TIMEOUT", default=15, cast=int)
+
+# Entity exports (?export_format=csv|ndjson on <entity>/export/): rows read
+# from the database per chunk while the response streams
+EXPORT_CHUNK_SIZE = config("EXPORT_CHUNK_SIZE", default=2000, cast=int)
+
+# Entity bulk imports (import_records command and <entity>/import/): rows
+# validated and inserted per batch, whether PostgreSQL COPY is used for
+# inserts, and how many failed rows are listed in the report
+IMPORT_BATCH_SIZE = config("IMPORT_BATCH_SIZE", default=5000, cast=int)
+IMPORT_USE_COPY = config("IMPORT_USE_COPY", default=True, cast=bool)
+IMPORT_MAX_ERRORS = config("IMPORT_MAX_ERRORS", default=1000, cast=int)
+
+# Most items accepted by one <entity>/batch/ create, update or delete request
+API_BATCH_MAX_SIZE = config("API_BATCH_MAX_SIZE", default=500, cast=int)
+
+# ?search= on PostgreSQL uses the full-text and trigram indexes from
+# apps.core.search; False (or another database) keeps LIKE matching
+SEARCH_FULL_TEXT = config("SEARCH_FULL_TEXT", default=True, cast=bool)
+
+# Celery Configuration (background document processing)
+# Without a broker, tasks run inline (eager), which is also what tests use
+CELERY_BROKER_URL = config("CELERY_BROKER_URL", default=REDIS_URL or "memory://")
+CELERY_TASK_ALWAYS_EAGER = config(
+    "CELERY_TASK_ALWAYS_EAGER", default=not REDIS_URL, cast=bool
+)
+CELERY_TASK_EAGER_PROPAGATES = True
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_TASK_ACKS_LATE = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_TASK_TIME_LIMIT = config("CELERY_TASK_TIME_LIMIT", default=600, cast=int)
+CELERY_TASK_SOFT_TIME_LIMIT = config(
+    "CELERY_TASK_SOFT_TIME_LIMIT", default=540, cast=int
+)
+
+# AI Assistant providers: concurrent upstream calls allowed per provider
+# configuration in each worker process, and how long a request waits for a
+# free slot before falling back
+AI_PROVIDER_MAX_CONCURRENCY = config("AI_PROVIDER_MAX_CONCURRENCY", default=4, cast=int)
+AI_PROVIDER_ACQUIRE_TIMEOUT = config(
+    "AI_PROVIDER_ACQUIRE_TIMEOUT", default=30, cast=float
+)
+
+# AI Assistant conversation context: estimated tokens of history sent with
+# each chat turn, most recent messages read per turn, and the size of the
+# rolling summary kept for older messages
+AI_CONTEXT_TOKEN_BUDGET = config("AI_CONTEXT_TOKEN_BUDGET", default=2000, cast=int)
+AI_CONTEXT_MAX_MESSAGES = config("AI_CONTEXT_MAX_MESSAGES", default=50, cast=int)
+AI_CONTEXT_SUMMARY_TOKENS = config("AI_CONTEXT_SUMMARY_TOKENS", default=500, cast=int)
+
+# AI Assistant mock responses: intent table file (empty for the bundled
+# apps/ai_assistant/intents.json) and how often it is checked for changes
+AI_INTENTS_FILE = config("AI_INTENTS_FILE", default="")
+AI_INTENTS_RELOAD_INTERVAL = config("AI_INTENTS_RELOAD_INTERVAL", default=5, cast=float)
+
+# Seconds processing results are shared between uploads of identical files
+DOCUMENT_RESULT_CACHE_TIMEOUT = config(
+    "DOCUMENT_RESULT_CACHE_TIMEOUT", default=7 * 24 * 3600, cast=int
+)
+
+# Document text extraction: worker processes parsing uploads (0 parses in
+# the calling process), extra memory each worker may use, longest text kept
+# per document, and whether images are OCRed (needs pytesseract)
+DOCUMENT_EXTRACTION_WORKERS = config("DOCUMENT_EXTRACTION_WORKERS", default=2, cast=int)
+DOCUMENT_EXTRACTION_MEMORY_MB = config(
+    "DOCUMENT_EXTRACTION_MEMORY_MB", default=512, cast=int
+)
+DOCUMENT_TEXT_MAX_CHARS = config("DOCUMENT_TEXT_MAX_CHARS", default=1_000_000, cast=int)
+DOCUMENT_OCR_ENABLED = config("DOCUMENT_OCR_ENABLED", default=False, cast=bool)
+
+# AI Assistant usage analytics: events are buffered and written in batches
+# of ANALYTICS_BUFFER_SIZE at least every ANALYTICS_FLUSH_INTERVAL seconds
+# (0 disables the background flush). ANALYTICS_SPOOL_URL keeps the buffer
+# in a Redis list shared by all workers instead of process memory.
+ANALYTICS_BUFFERED = config("ANALYTICS_BUFFERED", default=True, cast=bool)
+ANALYTICS_BUFFER_SIZE = config("ANALYTICS_BUFFER_SIZE", default=100, cast=int)
+ANALYTICS_FLUSH_INTERVAL = config("ANALYTICS_FLUSH_INTERVAL", default=5, cast=float)
+ANALYTICS_SPOOL_URL = config("ANALYTICS_SPOOL_URL", default="")
+
+# Usage analytics rollups: how often new rows are rolled up, how long written
+# rows are left to commit first, and how long raw rows are kept once rolled up
+ANALYTICS_ROLLUP_INTERVAL = config("ANALYTICS_ROLLUP_INTERVAL", default=300, cast=float)
+ANALYTICS_ROLLUP_LAG = config("ANALYTICS_ROLLUP_LAG", default=300, cast=int)
+ANALYTICS_RETENTION_DAYS = config("ANALYTICS_RETENTION_DAYS", default=90, cast=int)
+ANALYTICS_PURGE_BATCH_SIZE = config(
+    "ANALYTICS_PURGE_BATCH_SIZE", default=5000, cast=int
+)
+
+# Periodic tasks, run by the worker's embedded beat (celery worker -B)
+CELERY_BEAT_SCHEDULE = {
+    "rollup-usage-analytics": {
+        "task": "apps.ai_assistant.tasks.rollup_usage_analytics",
+        "schedule": ANALYTICS_ROLLUP_INTERVAL,
+    },
+    "purge-usage-analytics": {
+        "task": "apps.ai_assistant.tasks.purge_usage_analytics",
+        "schedule": 3600.0,
+    },
+}
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -125,6 +290,12 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Upload handlers that record each file's SHA-256 while it streams in
+FILE_UPLOAD_HANDLERS = [
+    "apps.core.uploads.HashingMemoryFileUploadHandler",
+    "apps.core.uploads.HashingTemporaryFileUploadHandler",
+]
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -15,6 +15,7 @@ from drf_spectacular.views import (
     SpectacularSwaggerView,
 )
 
+from apps.core.metrics import metrics_view
 from apps.core.views import health_check_view
 
 urlpatterns = [
@@ -23,6 +24,8 @@ urlpatterns = [
     path("health", health_check_view, name="health-check-no-slash"),
     # API health endpoint (for deployment scripts)
     path("api/health", health_check_view, name="api-health-check"),
+    # Prometheus metrics (scraped by monitoring/prometheus.yml)
+    path("metrics", metrics_view, name="metrics"),
     # Admin interface
     path("admin/", admin.site.urls),
     # API v1 endpoints